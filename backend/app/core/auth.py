@@ -1,5 +1,5 @@
 from fastapi import Header, HTTPException, Depends
-from app.core.firebase import verify_firebase_token
+from app.core.auth_provider import verify_token
 from app.core.supabase import get_db
 from supabase import Client
 
@@ -44,9 +44,9 @@ def get_current_user(
     
     token = authorization.replace("Bearer ", "")
     
-    # Verify Firebase token
+    # Verify token with the configured provider (Firebase in production)
     try:
-        decoded_token = verify_firebase_token(token)
+        decoded_token = verify_token(token)
         firebase_uid = decoded_token['uid']
     except Exception as e:
         # Check if it's an expired token explicitly if possible, ensuring correct 401
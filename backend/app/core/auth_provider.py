@@ -0,0 +1,102 @@
+from app.core.config import settings
+from abc import ABC, abstractmethod
+from functools import lru_cache
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+LOCAL_TOKEN_ALGORITHM = "HS256"
+LOCAL_TOKEN_ISSUER = "edunexus-local"
+LOCAL_SECRET_MIN_LENGTH = 32
+
+
+class AuthProvider(ABC):
+    """Verifies bearer tokens and returns the decoded claims (at least 'uid')"""
+
+    name = "base"
+
+    @abstractmethod
+    def verify_token(self, id_token: str) -> dict:
+        ...
+
+
+class FirebaseAuthProvider(AuthProvider):
+    """Firebase ID tokens via firebase_admin"""
+
+    name = "firebase"
+
+    def __init__(self):
+        from app.core.firebase import init_firebase
+
+        init_firebase()
+
+    def verify_token(self, id_token: str) -> dict:
+        from app.core.firebase import verify_firebase_token
+
+        return verify_firebase_token(id_token)
+
+
+class LocalAuthProvider(AuthProvider):
+    """
+    HS256 tokens signed with LOCAL_AUTH_SECRET (see create_local_token)
+
+    For offline runs and load tests; refused when APP_ENV is production.
+    There is no default secret: anyone who knew it could sign tokens for
+    any user.
+    """
+
+    name = "local"
+
+    def __init__(self, secret: str):
+        self.secret = _local_secret(secret)
+
+    def verify_token(self, id_token: str) -> dict:
+        from jose import jwt, JWTError
+
+        try:
+            claims = jwt.decode(
+                id_token, self.secret,
+                algorithms=[LOCAL_TOKEN_ALGORITHM], issuer=LOCAL_TOKEN_ISSUER
+            )
+        except JWTError as e:
+            raise Exception(f"Invalid local token: {str(e)}")
+        claims["uid"] = claims["sub"]
+        return claims
+
+
+def create_local_token(uid: str, email: str = None, expires_in: int = 3600, secret: str = None) -> str:
+    """Sign a token the local provider accepts (uid = users.firebase_uid)"""
+    from jose import jwt
+
+    now = int(time.time())
+    claims = {"sub": uid, "iss": LOCAL_TOKEN_ISSUER, "iat": now, "exp": now + expires_in}
+    if email:
+        claims["email"] = email
+    return jwt.encode(claims, _local_secret(secret or settings.LOCAL_AUTH_SECRET), algorithm=LOCAL_TOKEN_ALGORITHM)
+
+
+def _local_secret(secret: str) -> str:
+    if len(secret or "") < LOCAL_SECRET_MIN_LENGTH:
+        raise RuntimeError(
+            f"AUTH_PROVIDER=local requires LOCAL_AUTH_SECRET of at least {LOCAL_SECRET_MIN_LENGTH} characters"
+        )
+    return secret
+
+
+@lru_cache()
+def get_auth_provider() -> AuthProvider:
+    """Provider selected by settings.AUTH_PROVIDER (created on first use)"""
+    if settings.AUTH_PROVIDER == "local":
+        if settings.APP_ENV == "production":
+            raise RuntimeError("AUTH_PROVIDER=local is not allowed when APP_ENV=production")
+        provider = LocalAuthProvider(settings.LOCAL_AUTH_SECRET)
+        logger.warning("Using local test-token auth: Firebase is not consulted")
+        return provider
+    return FirebaseAuthProvider()
+
+
+def verify_token(id_token: str) -> dict:
+    """Verify a bearer token with the configured provider"""
+    return get_auth_provider().verify_token(id_token)
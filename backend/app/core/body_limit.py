@@ -0,0 +1,49 @@
+from app.core.config import settings
+from fastapi import HTTPException
+from starlette.responses import JSONResponse
+
+
+# Form fields and multipart framing around an uploaded file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+
+class BodySizeLimitMiddleware:
+    """
+    Refuse request bodies larger than MAX_NOTE_FILE_BYTES plus form overhead
+
+    A declared Content-Length over the limit gets 413 before any of the body
+    is read; chunked bodies are counted as they arrive and cut off with 413
+    once they pass it. Note uploads are the only large bodies, so one limit
+    covers every route. The exact file size is checked again by the upload
+    service.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        limit = settings.MAX_NOTE_FILE_BYTES + MULTIPART_OVERHEAD_BYTES
+        detail = f"Request body is larger than {limit} bytes"
+
+        declared = dict(scope["headers"]).get(b"content-length", b"")
+        if declared.isdigit() and int(declared) > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside the body read; FastAPI passes HTTPException through
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
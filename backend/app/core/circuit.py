@@ -0,0 +1,86 @@
+from app.core.config import settings
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class Circuit:
+    """
+    Per-dependency circuit fed by readiness probes
+
+    Opens after CIRCUIT_FAILURE_THRESHOLD consecutive failed probes; once
+    open, callers fail fast instead of waiting on a broken dependency. After
+    CIRCUIT_COOLDOWN_SECONDS without a successful probe it goes half-open and
+    lets calls through again, so a worker that is never probed cannot stay
+    stuck open.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.failures = 0
+        self.last_error: str = None
+        self._opened_at: float = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return CLOSED
+        if time.monotonic() - self._opened_at >= settings.CIRCUIT_COOLDOWN_SECONDS:
+            return HALF_OPEN
+        return OPEN
+
+    def allow(self) -> bool:
+        """False while open: skip the dependency and fail fast"""
+        return self.state != OPEN
+
+    def record(self, ok: bool, error: str = None):
+        with self._lock:
+            if ok:
+                if self._opened_at is not None:
+                    logger.info(f"Circuit '{self.name}' closed")
+                self.failures = 0
+                self.last_error = None
+                self._opened_at = None
+                return
+
+            self.failures += 1
+            self.last_error = error
+            if self.failures >= settings.CIRCUIT_FAILURE_THRESHOLD:
+                if self.state != OPEN:
+                    logger.warning(f"Circuit '{self.name}' open after {self.failures} failures: {error}")
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> dict:
+        return {"state": self.state, "failures": self.failures, "last_error": self.last_error}
+
+
+class CircuitRegistry:
+    """Circuits by dependency name, created on first use"""
+
+    def __init__(self):
+        self._circuits: dict[str, Circuit] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str) -> Circuit:
+        with self._lock:
+            if name not in self._circuits:
+                self._circuits[name] = Circuit(name)
+            return self._circuits[name]
+
+    def allow(self, name: str) -> bool:
+        return self.get(name).allow()
+
+    def snapshot(self) -> dict:
+        return {name: circuit.snapshot() for name, circuit in self._circuits.items()}
+
+
+# Global instance
+circuits = CircuitRegistry()
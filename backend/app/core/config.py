@@ -1,6 +1,6 @@
 from pydantic_settings import BaseSettings
 from functools import lru_cache
-from typing import List
+from typing import List, Literal, Optional
 from pydantic import ConfigDict
 
 
@@ -12,15 +12,63 @@ class Settings(BaseSettings):
     
     # Firebase (AUTH ONLY)
     FIREBASE_CREDENTIALS_PATH: str = "firebase/secrets/firebase-admin.json"
+
+    # Token verification: Firebase, or locally signed test tokens (never in production)
+    AUTH_PROVIDER: Literal["firebase", "local"] = "firebase"
+    LOCAL_AUTH_SECRET: str = ""  # Required with AUTH_PROVIDER=local, at least 32 characters
     
     # Supabase (DATABASE + STORAGE)
     SUPABASE_URL: str
     SUPABASE_KEY: str
     SUPABASE_SERVICE_KEY: str
     
-    # Gemini AI
-    GEMINI_API_KEY: str
-    
+    # Direct Postgres connection (LISTEN/NOTIFY for cross-worker events)
+    DATABASE_URL: Optional[str] = None
+
+    # Gemini AI (required unless LLM_PROVIDER=fake)
+    GEMINI_API_KEY: Optional[str] = None
+
+    # LLM backend: Gemini, or a deterministic offline fake for load tests
+    LLM_PROVIDER: Literal["gemini", "fake"] = "gemini"
+    FAKE_LLM_GENERATE_LATENCY_MS: float = 0.0
+    FAKE_LLM_EMBED_LATENCY_MS: float = 0.0
+    FAKE_LLM_ERROR_RATE: float = 0.0  # Fraction of calls failing with a provider error
+    FAKE_LLM_RATE_LIMIT_RATE: float = 0.0  # Fraction of calls failing with a rate limit
+
+    # Real-time events
+    EVENTS_QUEUE_SIZE: int = 100  # Buffered events per connection
+    EVENTS_MAX_DROPPED: int = 500  # Drops before a slow client is disconnected
+    EVENTS_HEARTBEAT_SECONDS: int = 15
+
+    # Note uploads (signed direct-to-storage uploads, finalized by the API)
+    MAX_NOTE_FILE_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_SPOOL_BYTES: int = 1024 * 1024  # Downloads larger than this spool to disk while extracting
+    MAX_NOTE_PAGES: int = 500  # PDF pages, or 4000-character reader pages for text
+    UPLOAD_CHUNK_MAX_BYTES: int = 8 * 1024 * 1024  # Largest PATCH body of a resumable upload
+    RESUMABLE_UPLOAD_TTL_HOURS: int = 24
+
+    # Note downloads (GET /notes/{id}/file) through a local disk LRU
+    NOTE_CACHE_DIR: Optional[str] = None  # Default: <system temp>/edunexus-note-cache
+    NOTE_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # 0 = stream every download from storage
+
+    # Storage garbage collection (orphaned objects in the notes bucket)
+    STORAGE_GC_INTERVAL_MINUTES: int = 0  # In-process schedule; 0 = off (run scripts/gc_storage.py instead)
+    STORAGE_GC_GRACE_MINUTES: int = 60  # Objects and unreferenced files younger than this are kept
+    STORAGE_GC_BATCH_SIZE: int = 100  # Objects per delete call
+    STORAGE_GC_DELETES_PER_SECOND: float = 200.0
+    STORAGE_GC_LEASE_SECONDS: int = 300  # Renewed while collecting; a crashed collector's lease frees up after this
+
+    # Readiness probes (/ready) and the circuits they feed
+    READINESS_CACHE_SECONDS: float = 5.0
+    READINESS_PROBE_TIMEOUT_SECONDS: float = 2.0
+    READINESS_REQUIRED: List[str] = ["supabase", "storage"]  # Others only mark the worker degraded
+    CIRCUIT_FAILURE_THRESHOLD: int = 2  # Consecutive failed probes before a circuit opens
+    CIRCUIT_COOLDOWN_SECONDS: float = 30.0  # Open -> half-open without a successful probe
+
+    # Startup
+    STARTUP_WARMUP: bool = False  # Create clients/providers before serving instead of on first use
+    COLD_START_BUDGET_MS: int = 3000  # Import + startup; logged as a warning when exceeded
+
     # Application
     APP_ENV: str = "development"
     DEBUG: bool = True
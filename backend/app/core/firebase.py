@@ -32,6 +32,3 @@ def verify_firebase_token(id_token: str) -> dict:
     except Exception as e:
         raise Exception(f"Invalid Firebase token: {str(e)}")
 
-
-# Initialize on module load
-init_firebase()
@@ -0,0 +1,113 @@
+from app.core.config import settings
+from app.core import metrics
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Periodic jobs started with the worker, cancelled on shutdown
+_background_tasks: list[asyncio.Task] = []
+
+
+# Everything below is created on first use; warmup just gets there before the
+# first request does. Heavy SDK imports stay inside the steps.
+
+def _warm_supabase():
+    """Create both clients and open a pooled connection to PostgREST"""
+    from app.core.supabase import get_supabase_client, get_supabase_admin_client
+
+    for client in (get_supabase_client(), get_supabase_admin_client()):
+        client.table("users").select("id").limit(1).execute()
+
+
+def _warm_auth():
+    """Firebase Admin SDK + credentials (or the local test-token provider)"""
+    from app.core.auth_provider import get_auth_provider
+
+    get_auth_provider()
+
+
+def _warm_llm():
+    """google-generativeai import, configure and model objects"""
+    from app.services.llm_provider import get_llm_provider
+
+    get_llm_provider()
+
+
+def _warm_documents():
+    """pdfminer is the slowest import on the upload path"""
+    import pdfminer.high_level  # noqa: F401
+
+
+WARMUP_STEPS = {
+    "supabase": _warm_supabase,
+    "auth": _warm_auth,
+    "llm": _warm_llm,
+    "documents": _warm_documents,
+}
+
+
+def _run_step(name: str, step) -> float:
+    start = time.perf_counter()
+    try:
+        step()
+    except Exception as e:
+        # Warmup is best effort; the request path retries initialization
+        logger.warning(f"Warmup step '{name}' failed: {e}")
+    return time.perf_counter() - start
+
+
+async def warmup() -> dict[str, float]:
+    """Run all warmup steps concurrently in threads; returns seconds per step"""
+    names = list(WARMUP_STEPS)
+    durations = await asyncio.gather(*(
+        asyncio.to_thread(_run_step, name, WARMUP_STEPS[name]) for name in names
+    ))
+    return dict(zip(names, durations))
+
+
+async def startup(import_seconds: float):
+    """Called from the FastAPI lifespan before the worker accepts traffic"""
+    start = time.perf_counter()
+    steps = await warmup() if settings.STARTUP_WARMUP else {}
+    startup_seconds = time.perf_counter() - start
+
+    metrics.record_startup("import", import_seconds)
+    metrics.record_startup("startup", startup_seconds)
+    for name, seconds in steps.items():
+        metrics.record_startup(f"warmup_{name}", seconds)
+
+    total_ms = (import_seconds + startup_seconds) * 1000
+    detail = ", ".join(f"{name}={seconds * 1000:.0f}ms" for name, seconds in steps.items())
+    logger.info(
+        f"Worker ready in {total_ms:.0f}ms (import {import_seconds * 1000:.0f}ms"
+        f"{', warmup ' + detail if detail else ''})"
+    )
+    if settings.COLD_START_BUDGET_MS and total_ms > settings.COLD_START_BUDGET_MS:
+        logger.warning(
+            f"Cold start took {total_ms:.0f}ms, over the {settings.COLD_START_BUDGET_MS}ms budget"
+        )
+
+    if settings.STORAGE_GC_INTERVAL_MINUTES > 0:
+        from app.services.storage_gc import storage_gc
+
+        _background_tasks.append(asyncio.create_task(storage_gc.run_periodically()))
+
+
+async def shutdown():
+    """Release connections created during the worker's lifetime"""
+    from app.core.supabase import get_supabase_client, get_supabase_admin_client
+    from app.services.event_hub import event_hub
+
+    event_hub.close()
+    for task in _background_tasks:
+        task.cancel()
+    _background_tasks.clear()
+    for getter in (get_supabase_client, get_supabase_admin_client):
+        # Only clients that were actually created
+        if getter.cache_info().currsize:
+            try:
+                getter().postgrest.session.close()
+            except Exception as e:
+                logger.warning(f"Failed to close Supabase session: {e}")
@@ -0,0 +1,315 @@
+from prometheus_client import Counter, Gauge, Histogram, CONTENT_TYPE_LATEST, generate_latest
+from contextlib import contextmanager
+from contextvars import ContextVar
+from collections import defaultdict
+from typing import Optional
+import threading
+import time
+import httpx
+
+
+# ============================================
+# METRICS
+# ============================================
+
+HTTP_REQUEST_DURATION = Histogram(
+    "edunexus_http_request_duration_seconds",
+    "HTTP request latency by route",
+    ["method", "route", "status"]
+)
+
+DB_CALLS = Counter(
+    "edunexus_db_calls_total",
+    "PostgREST calls by originating route, HTTP method and table/RPC",
+    ["route", "method", "table"]
+)
+
+DB_CALL_DURATION = Histogram(
+    "edunexus_db_call_duration_seconds",
+    "Latency of a single PostgREST call",
+    ["method", "table"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+DB_CALLS_PER_REQUEST = Histogram(
+    "edunexus_db_calls_per_request",
+    "PostgREST calls made while serving one request (N+1 shows up here)",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+)
+
+DB_TIME_PER_REQUEST = Histogram(
+    "edunexus_db_time_per_request_seconds",
+    "Total PostgREST time spent while serving one request",
+    ["route"]
+)
+
+LLM_CALLS = Counter(
+    "edunexus_llm_calls_total",
+    "Gemini calls by service, operation and outcome",
+    ["service", "operation", "outcome"]
+)
+
+LLM_CALL_DURATION = Histogram(
+    "edunexus_llm_call_duration_seconds",
+    "Latency of a single Gemini call",
+    ["service", "operation"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+)
+
+LLM_TOKENS = Counter(
+    "edunexus_llm_tokens_total",
+    "Gemini tokens reported by the API",
+    ["service", "operation", "kind"]
+)
+
+LLM_CALLS_PER_REQUEST = Histogram(
+    "edunexus_llm_calls_per_request",
+    "Gemini calls made while serving one request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20)
+)
+
+LLM_TIME_PER_REQUEST = Histogram(
+    "edunexus_llm_time_per_request_seconds",
+    "Total Gemini time spent while serving one request",
+    ["route"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+)
+
+STAGE_DURATION = Histogram(
+    "edunexus_stage_duration_seconds",
+    "Duration of named pipeline stages (e.g. RAG embed/search/generate)",
+    ["stage"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 4, 8, 16, 32)
+)
+
+STARTUP_SECONDS = Gauge(
+    "edunexus_startup_seconds",
+    "Worker cold start by phase (import, startup, warmup_<step>)",
+    ["phase"]
+)
+
+STORAGE_GC_DELETED_OBJECTS = Counter(
+    "edunexus_storage_gc_deleted_objects_total",
+    "Orphaned objects removed from the notes bucket"
+)
+
+STORAGE_GC_RECLAIMED_BYTES = Counter(
+    "edunexus_storage_gc_reclaimed_bytes_total",
+    "Bytes of orphaned objects removed from the notes bucket"
+)
+
+
+# ============================================
+# PER-REQUEST ACCOUNTING
+# ============================================
+
+class RequestStats:
+    """DB/LLM calls attributed to the request being served"""
+
+    def __init__(self):
+        self.db_calls: dict[tuple[str, str], int] = defaultdict(int)
+        self.db_seconds = 0.0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.stages: dict[str, float] = {}
+        # Calls run in worker threads (asyncio.to_thread) share this object
+        self._lock = threading.Lock()
+
+    def add_db_call(self, method: str, table: str, seconds: float):
+        with self._lock:
+            self.db_calls[(method, table)] += 1
+            self.db_seconds += seconds
+
+    def add_llm_call(self, seconds: float):
+        with self._lock:
+            self.llm_calls += 1
+            self.llm_seconds += seconds
+
+    def add_stage(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+
+_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+def start_request() -> RequestStats:
+    """Begin accounting for the current request (call from middleware)"""
+    stats = RequestStats()
+    _request_stats.set(stats)
+    return stats
+
+
+def finish_request(stats: RequestStats, method: str, route: str, status: int, seconds: float):
+    """Record the request's latency and its DB/LLM totals under its route"""
+    HTTP_REQUEST_DURATION.labels(method, route, str(status)).observe(seconds)
+
+    with stats._lock:
+        db_calls = dict(stats.db_calls)
+        db_seconds = stats.db_seconds
+        llm_calls = stats.llm_calls
+        llm_seconds = stats.llm_seconds
+
+    for (db_method, table), count in db_calls.items():
+        DB_CALLS.labels(route, db_method, table).inc(count)
+    DB_CALLS_PER_REQUEST.labels(route).observe(sum(db_calls.values()))
+    DB_TIME_PER_REQUEST.labels(route).observe(db_seconds)
+    LLM_CALLS_PER_REQUEST.labels(route).observe(llm_calls)
+    LLM_TIME_PER_REQUEST.labels(route).observe(llm_seconds)
+
+
+def current_stages() -> dict[str, float]:
+    """Stage timings recorded so far for the current request"""
+    stats = _request_stats.get()
+    if stats is None:
+        return {}
+    with stats._lock:
+        return dict(stats.stages)
+
+
+def server_timing_header(stats: RequestStats) -> str:
+    """
+    Server-Timing value: named stages, then PostgREST and Gemini totals
+
+    e.g. chapter_lookup;dur=21.4, embed_query;dur=180.2, db;dur=64.0;desc="3 PostgREST calls"
+    """
+    with stats._lock:
+        stages = dict(stats.stages)
+        db_count = sum(stats.db_calls.values())
+        db_seconds = stats.db_seconds
+        llm_count = stats.llm_calls
+        llm_seconds = stats.llm_seconds
+
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in stages.items()]
+    if db_count:
+        parts.append(f'db;dur={db_seconds * 1000:.1f};desc="{db_count} PostgREST calls"')
+    if llm_count:
+        parts.append(f'llm;dur={llm_seconds * 1000:.1f};desc="{llm_count} Gemini calls"')
+    return ", ".join(parts)
+
+
+@contextmanager
+def timed_stage(name: str):
+    """
+    Time a named stage of the current request
+
+    Stages show up in the Server-Timing header and in
+    edunexus_stage_duration_seconds; repeated stages are summed.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_DURATION.labels(name).observe(seconds)
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.add_stage(name, seconds)
+
+
+def route_label(scope: dict) -> str:
+    """Route template (e.g. /api/v1/notes/{note_id}) so labels stay bounded"""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def record_startup(phase: str, seconds: float):
+    STARTUP_SECONDS.labels(phase).set(seconds)
+
+
+def record_storage_gc(deleted_objects: int, reclaimed_bytes: int):
+    STORAGE_GC_DELETED_OBJECTS.inc(deleted_objects)
+    STORAGE_GC_RECLAIMED_BYTES.inc(reclaimed_bytes)
+
+
+def metrics_response_body() -> tuple[bytes, str]:
+    """Prometheus exposition for this worker"""
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+# ============================================
+# POSTGREST INSTRUMENTATION
+# ============================================
+
+def _postgrest_target(url: httpx.URL) -> str:
+    """'/rest/v1/notes' -> 'notes', '/rest/v1/rpc/join_classroom' -> 'rpc/join_classroom'"""
+    path = url.path.split("/rest/v1/", 1)[-1].strip("/")
+    return path or "root"
+
+
+def _on_postgrest_request(request: httpx.Request):
+    request.extensions["metrics_start"] = time.perf_counter()
+
+
+def _on_postgrest_response(response: httpx.Response):
+    # Read the body here so the timing covers the whole call
+    response.read()
+    request = response.request
+    start = request.extensions.get("metrics_start")
+    if start is None:
+        return
+    seconds = time.perf_counter() - start
+    table = _postgrest_target(request.url)
+
+    DB_CALL_DURATION.labels(request.method, table).observe(seconds)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.add_db_call(request.method, table, seconds)
+
+
+def instrument_supabase_client(client):
+    """Count and time every PostgREST call made through a Supabase client"""
+    hooks = client.postgrest.session.event_hooks
+    hooks["request"] = [*hooks.get("request", []), _on_postgrest_request]
+    hooks["response"] = [*hooks.get("response", []), _on_postgrest_response]
+    return client
+
+
+# ============================================
+# GEMINI INSTRUMENTATION
+# ============================================
+
+class LLMCall:
+    """Handle yielded by track_llm_call for reporting token usage"""
+
+    def __init__(self):
+        self.tokens: dict[str, int] = {}
+
+    def record_usage(self, generation):
+        """Pick up token counts from an LLM provider Generation (None = unknown)"""
+        if generation.prompt_tokens:
+            self.tokens["prompt"] = generation.prompt_tokens
+        if generation.completion_tokens:
+            self.tokens["completion"] = generation.completion_tokens
+
+
+@contextmanager
+def track_llm_call(service: str, operation: str):
+    """
+    Time an LLM provider call and attribute it to the current request
+
+    Usage:
+        with track_llm_call("ai_service", "generate_content") as call:
+            generation = await get_llm_provider().generate(prompt)
+            call.record_usage(generation)
+    """
+    call = LLMCall()
+    outcome = "success"
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception:
+        outcome = "error"
+        raise
+    finally:
+        seconds = time.perf_counter() - start
+        LLM_CALLS.labels(service, operation, outcome).inc()
+        LLM_CALL_DURATION.labels(service, operation).observe(seconds)
+        for kind, count in call.tokens.items():
+            LLM_TOKENS.labels(service, operation, kind).inc(count)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.add_llm_call(seconds)
@@ -0,0 +1,141 @@
+from app.core.config import settings
+from app.core.circuit import circuits
+from datetime import datetime, timezone
+import asyncio
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+NIL_UUID = "00000000-0000-0000-0000-000000000000"
+
+
+# Probes are synchronous (the Supabase/Gemini clients are) and run in threads.
+
+def _probe_supabase():
+    """One-row PostgREST read"""
+    from app.core.supabase import get_supabase_admin_client
+
+    get_supabase_admin_client().table("users").select("id").limit(1).execute()
+
+
+def _probe_storage():
+    """Notes bucket metadata"""
+    from app.core.supabase import get_supabase_admin_client
+    from app.modules.chapter.upload.service import UploadService
+
+    get_supabase_admin_client().storage.get_bucket(UploadService.DEFAULT_BUCKET)
+
+
+def _probe_vector():
+    """pgvector search RPC against a chapter that cannot exist (index path, no rows)"""
+    from app.core.supabase import get_supabase_admin_client
+    from app.services.llm_provider import EMBEDDING_DIMENSION
+
+    get_supabase_admin_client().rpc(
+        "search_notes_by_similarity",
+        {
+            "query_embedding": [1.0] + [0.0] * (EMBEDDING_DIMENSION - 1),
+            "target_chapter_id": NIL_UUID,
+            "result_limit": 1
+        }
+    ).execute()
+
+
+def _probe_llm():
+    """Model metadata lookup (reachability and key, no generation quota)"""
+    from app.services.llm_provider import get_llm_provider
+
+    get_llm_provider().check()
+
+
+PROBES = {
+    "supabase": _probe_supabase,
+    "storage": _probe_storage,
+    "vector": _probe_vector,
+    "llm": _probe_llm,
+}
+
+
+class ReadinessChecker:
+    """
+    Runs every probe in parallel with a strict timeout and caches the report
+    for READINESS_CACHE_SECONDS; concurrent callers share one probe round.
+
+    A timed-out probe keeps its thread until the client gives up, so the next
+    round waits on that same probe instead of starting another - a hung
+    dependency costs at most one thread per probe.
+    """
+
+    def __init__(self):
+        self._report: dict = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self._inflight: dict[str, asyncio.Future] = {}
+
+    async def check(self) -> dict:
+        if self._fresh():
+            return {**self._report, "cached": True}
+        async with self._lock:
+            # Another caller may have refreshed while we waited
+            if self._fresh():
+                return {**self._report, "cached": True}
+            self._report = await self._run()
+            self._checked_at = time.monotonic()
+            return {**self._report, "cached": False}
+
+    def _fresh(self) -> bool:
+        return (
+            self._report is not None
+            and time.monotonic() - self._checked_at < settings.READINESS_CACHE_SECONDS
+        )
+
+    async def _run(self) -> dict:
+        names = list(PROBES)
+        results = await asyncio.gather(*(self._probe(name) for name in names))
+        checks = dict(zip(names, results))
+
+        failed_required = [
+            name for name in settings.READINESS_REQUIRED
+            if name in checks and not checks[name]["ok"]
+        ]
+        all_ok = all(check["ok"] for check in checks.values())
+        return {
+            "status": "ready" if all_ok else "degraded" if not failed_required else "unavailable",
+            "ready": not failed_required,
+            "checks": checks,
+            "checked_at": datetime.now(timezone.utc).isoformat()
+        }
+
+    async def _probe(self, name: str) -> dict:
+        start = time.perf_counter()
+        error = None
+        task = self._inflight.get(name)
+        if task is None or task.done():
+            task = asyncio.ensure_future(asyncio.to_thread(PROBES[name]))
+            self._inflight[name] = task
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(task),
+                timeout=settings.READINESS_PROBE_TIMEOUT_SECONDS
+            )
+        except asyncio.TimeoutError:
+            error = f"timed out after {settings.READINESS_PROBE_TIMEOUT_SECONDS}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        circuit = circuits.get(name)
+        circuit.record(error is None, error)
+        if error:
+            logger.warning(f"Readiness probe '{name}' failed: {error}")
+        return {
+            "ok": error is None,
+            "latency_ms": round((time.perf_counter() - start) * 1000, 1),
+            "error": error,
+            "circuit": circuit.state
+        }
+
+
+# Global instance
+readiness_checker = ReadinessChecker()
@@ -1,6 +1,9 @@
 from supabase import create_client, Client
 from app.core.config import settings
+from app.core.metrics import instrument_supabase_client
 from functools import lru_cache
+from typing import Optional
+from urllib.parse import unquote
 
 
 @lru_cache()
@@ -9,7 +12,7 @@ def get_supabase_client() -> Client:
     Get Supabase client for database operations
     Uses anon key for row-level security
     """
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+    return instrument_supabase_client(create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY))
 
 
 @lru_cache()
@@ -18,7 +21,7 @@ def get_supabase_admin_client() -> Client:
     Get Supabase admin client for admin operations
     Uses service role key to bypass RLS
     """
-    return create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY)
+    return instrument_supabase_client(create_client(settings.SUPABASE_URL, settings.SUPABASE_SERVICE_KEY))
 
 
 def get_db() -> Client:
@@ -29,3 +32,26 @@ def get_db() -> Client:
 def get_admin_db() -> Client:
     """Dependency for admin database access"""
     return get_supabase_admin_client()
+
+
+def returning(query, columns: str):
+    """
+    Shape the rows PostgREST returns from an insert/update/upsert
+
+    Writes already use `Prefer: return=representation`; adding `select`
+    (embedded resources included) makes the written row come back fully
+    joined, so no follow-up select is needed.
+
+    Usage:
+        returning(db.table("questions").update(data).eq("id", qid), QUESTION_SELECT).execute()
+    """
+    query.params = query.params.set("select", "".join(columns.split()))
+    return query
+
+
+def public_object_path(url: Optional[str], bucket: str) -> Optional[str]:
+    """Object path inside bucket from a get_public_url URL (None for other URLs)"""
+    marker = f"/object/public/{bucket}/"
+    if not url or marker not in url:
+        return None
+    return unquote(url.split(marker, 1)[1].split("?", 1)[0])
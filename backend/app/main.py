@@ -1,6 +1,15 @@
-from fastapi import FastAPI
+import time
+
+# Measured for the cold-start report (see lifecycle.startup)
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
+from app.core import lifecycle, metrics
+from app.core.body_limit import BodySizeLimitMiddleware
+from app.core.readiness import readiness_checker
 
 # Import all routers
 from app.modules.auth.routes import router as auth_router
@@ -13,15 +22,34 @@ from app.modules.chapter.upload.routes import router as upload_router
 from app.modules.chapter.notebook.routes import router as notebook_router
 from app.modules.chapter.community.routes import router as community_router
 from app.modules.dashboard.routes import router as dashboard_router
+from app.modules.events.routes import router as events_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Worker startup/shutdown
+
+    Importing the app has no side effects: Supabase clients, Firebase and
+    Gemini are created on first use, or up front with STARTUP_WARMUP=true.
+    """
+    await lifecycle.startup(import_seconds=_import_time)
+    yield
+    await lifecycle.shutdown()
 
 
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version="1.0.0",
-    description="EduNexus - Smart Collaborative Classroom & Notebook Backend"
+    description="EduNexus - Smart Collaborative Classroom & Notebook Backend",
+    lifespan=lifespan
 )
 
+# Oversized uploads are refused before they are read (inside CORS, so
+# browsers can read the 413)
+app.add_middleware(BodySizeLimitMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -31,6 +59,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """
+    Per-route latency plus the DB/LLM calls made while serving the request
+    
+    Also reports stage timings and DB/LLM totals in a Server-Timing header
+    """
+    stats = metrics.start_request()
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        server_timing = metrics.server_timing_header(stats)
+        if server_timing:
+            response.headers["Server-Timing"] = server_timing
+        return response
+    finally:
+        metrics.finish_request(
+            stats,
+            method=request.method,
+            route=metrics.route_label(request.scope),
+            status=status,
+            seconds=time.perf_counter() - start
+        )
+
 # Include routers
 app.include_router(auth_router, prefix=settings.API_V1_STR)
 app.include_router(classroom_router, prefix=settings.API_V1_STR)
@@ -42,6 +96,9 @@ app.include_router(upload_router, prefix=settings.API_V1_STR)
 app.include_router(notebook_router, prefix=settings.API_V1_STR)
 app.include_router(community_router, prefix=settings.API_V1_STR)
 app.include_router(dashboard_router, prefix=settings.API_V1_STR)
+app.include_router(events_router, prefix=settings.API_V1_STR)
+
+_import_time = time.perf_counter() - _import_started
 
 
 @app.get("/")
@@ -63,6 +120,27 @@ async def health_check():
     }
 
 
+@app.get("/ready")
+async def readiness_check(response: Response):
+    """
+    Dependency readiness for load balancers
+    
+    Probes Supabase, storage, pgvector and the LLM in parallel (cached for a
+    few seconds). 503 when a READINESS_REQUIRED dependency is down.
+    """
+    report = await readiness_checker.check()
+    if not report["ready"]:
+        response.status_code = 503
+    return report
+
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Prometheus metrics for this worker"""
+    body, content_type = metrics.metrics_response_body()
+    return Response(content=body, media_type=content_type)
+
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
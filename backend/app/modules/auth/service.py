@@ -1,6 +1,5 @@
 from supabase import Client
 from app.modules.auth.schemas import UserCreate, UserResponse
-from datetime import datetime
 
 
 class AuthService:
@@ -10,36 +9,24 @@ class AuthService:
         """
         Create user profile in database
         
-        Called after Firebase signup on frontend
+        Called after Firebase signup on frontend. Single round-trip: the
+        create_user_profile RPC relies on the unique firebase_uid/email
+        constraints and reports which one conflicted.
         """
-        # Check if user already exists
-        existing = db.table("users")\
-            .select("*")\
-            .eq("firebase_uid", user_data.firebase_uid)\
-            .execute()
+        response = db.rpc("create_user_profile", {
+            "p_firebase_uid": user_data.firebase_uid,
+            "p_email": user_data.email,
+            "p_name": user_data.name,
+            "p_role": user_data.role
+        }).execute()
         
-        if existing.data:
+        result = response.data
+        if result['status'] == "uid_exists":
             raise Exception("User profile already exists")
-            
-        # Check if email already exists
-        email_check = db.table("users")\
-            .select("*")\
-            .eq("email", user_data.email)\
-            .execute()
-            
-        if email_check.data:
+        if result['status'] == "email_exists":
             raise Exception("Email already registered")
         
-        # Insert new user
-        response = db.table("users").insert({
-            "firebase_uid": user_data.firebase_uid,
-            "email": user_data.email,
-            "name": user_data.name,
-            "role": user_data.role,
-            "created_at": datetime.utcnow().isoformat()
-        }).execute()
-        
-        return UserResponse(**response.data[0])
+        return UserResponse(**result['user'])
     
     def get_user_profile(self, db: Client, user_id: str) -> UserResponse:
         """Get user profile by ID"""
@@ -1,8 +1,14 @@
 from supabase import Client
 from app.modules.chapter.community.schemas import AnnouncementResponse
+from app.services.event_hub import event_hub
+from app.core.supabase import returning
 from datetime import datetime
 
 
+# Announcement row with creator name, shared by reads and returning writes
+ANNOUNCEMENT_SELECT = "*, users(name)"
+
+
 class CommunityService:
     """Community management service"""
     
@@ -15,23 +21,27 @@ class CommunityService:
         content: str
     ) -> AnnouncementResponse:
         """Create announcement (teacher only)"""
-        response = db.table("announcements").insert({
-            "chapter_id": chapter_id,
-            "title": title,
-            "content": content,
-            "created_by": teacher_id,
-            "created_at": datetime.utcnow().isoformat()
-        }).execute()
+        response = returning(
+            db.table("announcements").insert({
+                "chapter_id": chapter_id,
+                "title": title,
+                "content": content,
+                "created_by": teacher_id,
+                "created_at": datetime.utcnow().isoformat()
+            }),
+            ANNOUNCEMENT_SELECT
+        ).execute()
         
-        # Fetch with user details
-        announcement_id = response.data[0]['id']
-        full_response = db.table("announcements")\
-            .select("*, users(name)")\
-            .eq("id", announcement_id)\
-            .single()\
-            .execute()
+        announcement = self._build_announcement_response(response.data[0])
         
-        a = full_response.data
+        # Push to every member of the chapter's classroom
+        member_ids = self._get_chapter_member_ids(db, chapter_id)
+        await event_hub.publish(member_ids, "announcement.created", announcement.model_dump())
+        
+        return announcement
+    
+    def _build_announcement_response(self, a: dict) -> AnnouncementResponse:
+        """Build AnnouncementResponse from a row selected with ANNOUNCEMENT_SELECT"""
         return AnnouncementResponse(
             id=a['id'],
             chapter_id=a['chapter_id'],
@@ -42,6 +52,17 @@ class CommunityService:
             created_at=a['created_at']
         )
     
+    def _get_chapter_member_ids(self, db: Client, chapter_id: str) -> list[str]:
+        """Members of the classroom that owns chapter_id (single embedded query)"""
+        try:
+            response = db.table("classroom_members")\
+                .select("user_id, classrooms!inner(subjects!inner(chapters!inner(id)))")\
+                .eq("classrooms.subjects.chapters.id", chapter_id)\
+                .execute()
+            return [m['user_id'] for m in response.data]
+        except Exception:
+            return []  # Notification is best-effort
+    
     async def list_announcements(
         self,
         db: Client,
@@ -49,22 +70,12 @@ class CommunityService:
     ) -> list[AnnouncementResponse]:
         """List all announcements for chapter"""
         response = db.table("announcements")\
-            .select("*, users(name)")\
+            .select(ANNOUNCEMENT_SELECT)\
             .eq("chapter_id", chapter_id)\
             .order("created_at", desc=True)\
             .execute()
         
-        announcements = []
-        for a in response.data:
-            announcements.append(AnnouncementResponse(
-                id=a['id'],
-                chapter_id=a['chapter_id'],
-                title=a['title'],
-                content=a['content'],
-                created_by=a['created_by'],
-                creator_name=a.get('users', {}).get('name') if a.get('users') else 'Unknown User',
-                created_at=a['created_at']
-            ))
+        announcements = [self._build_announcement_response(a) for a in response.data]
         
         return announcements
 
@@ -133,22 +144,12 @@ class CommunityService:
             
         # 4. Get announcements
         response = db.table("announcements")\
-            .select("*, users(name)")\
+            .select(ANNOUNCEMENT_SELECT)\
             .in_("chapter_id", chapter_ids)\
             .order("created_at", desc=True)\
             .execute()
             
-        announcements = []
-        for a in response.data:
-            announcements.append(AnnouncementResponse(
-                id=a['id'],
-                chapter_id=a['chapter_id'],
-                title=a['title'],
-                content=a['content'],
-                created_by=a['created_by'],
-                creator_name=a.get('users', {}).get('name') if a.get('users') else 'Unknown User',
-                created_at=a['created_at']
-            ))
+        announcements = [self._build_announcement_response(a) for a in response.data]
         
         return announcements
 
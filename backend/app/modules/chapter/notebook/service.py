@@ -2,6 +2,12 @@ from supabase import Client
 from app.modules.chapter.notebook.schemas import NotebookResponse, RecommendationsResponse, RecommendationItem
 from app.services.rag_service import rag_service
 from app.services.recommendation_service import recommendation_service
+from app.core.metrics import timed_stage, current_stages
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 
 class NotebookService:
@@ -17,13 +23,19 @@ class NotebookService:
         Query AI notebook with chapter-scoped RAG
         
         Only uses approved notes from the current chapter
+        
+        Stage timings (chapter_lookup, embed_query, vector_search, generate)
+        go to the Server-Timing header and one structured log line
         """
+        start = time.perf_counter()
+        
         # Get chapter details
-        chapter = db.table("chapters")\
-            .select("name")\
-            .eq("id", chapter_id)\
-            .single()\
-            .execute()
+        with timed_stage("chapter_lookup"):
+            chapter = db.table("chapters")\
+                .select("name")\
+                .eq("id", chapter_id)\
+                .single()\
+                .execute()
         
         if not chapter.data:
             raise Exception("Chapter not found")
@@ -38,6 +50,13 @@ class NotebookService:
             db=db
         )
         
+        logger.info("notebook_query %s", json.dumps({
+            "chapter_id": chapter_id,
+            "note_count": result['note_count'],
+            "total_ms": round((time.perf_counter() - start) * 1000, 1),
+            "stages_ms": {name: round(seconds * 1000, 1) for name, seconds in current_stages().items()}
+        }))
+        
         return NotebookResponse(
             answer=result['answer'],
             sources=result['sources'],
@@ -1,10 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.modules.chapter.notes.schemas import NoteResponse, NoteApprovalUpdate
-from app.modules.chapter.notes.service import note_service
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from app.modules.chapter.notes.schemas import NoteResponse, NoteDetailResponse, NoteApprovalUpdate, NoteBulkApprovalRequest, NoteBulkApprovalResponse
+from app.modules.chapter.notes.service import note_service, NoteFile
 from app.core.auth import get_current_user, CurrentUser
 from app.core.permissions import require_teacher, check_chapter_access
 from app.core.supabase import get_db, get_admin_db
 from supabase import Client
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional, Union
+from urllib.parse import quote
+import mimetypes
 
 
 router = APIRouter(prefix="/notes", tags=["Notes"])
@@ -49,6 +54,24 @@ async def list_my_notes(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.patch("/approval", response_model=NoteBulkApprovalResponse)
+async def bulk_approve_or_reject_notes(
+    request: NoteBulkApprovalRequest,
+    background_tasks: BackgroundTasks,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """Approve or reject many notes in one request (teachers of the notes' subjects)"""
+    require_teacher(current_user)
+    
+    try:
+        return await note_service.approve_notes_bulk(
+            db, request.decisions, current_user.user_id, background_tasks
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.patch("/{note_id}/approval", response_model=NoteResponse)
 async def approve_or_reject_note(
     note_id: str,
@@ -65,6 +88,98 @@ async def approve_or_reject_note(
         )
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/{note_id}", response_model=NoteDetailResponse)
+async def get_note(
+    note_id: str,
+    page: int = Query(1, ge=1),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """
+    Get note with one page of its full text
+
+    Students: approved public + own notes
+    Teachers: all notes
+    """
+    try:
+        note = await note_service.get_note(
+            db, note_id, current_user.user_id, current_user.role, page
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    access = check_chapter_access(db, current_user.user_id, current_user.role, note.chapter_id)
+    if not access['allowed']:
+        raise HTTPException(status_code=403, detail="No access to this chapter")
+    return note
+
+
+@router.get("/{note_id}/file")
+async def download_note_file(
+    note_id: str,
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """
+    Download a note's file through the API (same access rules as GET /notes/{note_id})
+
+    Supports single byte ranges (206, 416 when unsatisfiable, If-Range) and
+    conditional GETs (If-None-Match / If-Modified-Since -> 304). Files are
+    served from the worker's disk cache after the first download.
+    """
+    try:
+        file = await note_service.get_note_file(
+            db, note_id, current_user.user_id, current_user.role
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    access = check_chapter_access(db, current_user.user_id, current_user.role, file.chapter_id)
+    if not access['allowed']:
+        raise HTTPException(status_code=403, detail="No access to this chapter")
+
+    headers = {
+        "ETag": file.etag,
+        "Last-Modified": format_datetime(file.last_modified, usegmt=True),
+        "Accept-Ranges": "bytes",
+        # Revalidated on every use, so revoked access takes effect at once
+        "Cache-Control": "private, no-cache"
+    }
+    if _not_modified(request, file):
+        return Response(status_code=304, headers=headers)
+    media_type = mimetypes.guess_type(file.file_name)[0] or "application/octet-stream"
+    headers["Content-Disposition"] = f"inline; filename*=UTF-8''{quote(file.file_name)}"
+    if not file.size:
+        return Response(headers=headers, media_type=media_type)
+
+    start, end = 0, file.size - 1
+    status_code = 200
+    byte_range = _byte_range(request, file)
+    if byte_range == "unsatisfiable":
+        return Response(status_code=416, headers={**headers, "Content-Range": f"bytes */{file.size}"})
+    if byte_range is not None:
+        start, end = byte_range
+        status_code = 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{file.size}"
+
+    try:
+        body = await note_service.read_note_file(db, file, start, end)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Storage error: {e}")
+
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(body, status_code=status_code, headers=headers, media_type=media_type)
+
+
 @router.delete("/{note_id}")
 async def delete_note(
     note_id: str,
@@ -83,3 +198,49 @@ async def delete_note(
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _not_modified(request: Request, file: NoteFile) -> bool:
+    """If-None-Match (weak comparison) wins over If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or file.etag in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return file.last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _byte_range(request: Request, file: NoteFile) -> Optional[Union[tuple[int, int], str]]:
+    """
+    (start, end) of a single `bytes=` range, "unsatisfiable", or None to
+    send the whole file (no Range, a stale If-Range, or several ranges)
+    """
+    header = request.headers.get("range")
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    if_range = request.headers.get("if-range")
+    if if_range and if_range != file.etag and if_range != format_datetime(file.last_modified, usegmt=True):
+        return None
+
+    first, _, last = header[len("bytes="):].strip().partition("-")
+    if not (first or last) or (first and not first.isdigit()) or (last and not last.isdigit()):
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return "unsatisfiable"
+        return max(file.size - length, 0), file.size - 1
+    start = int(first)
+    end = min(int(last), file.size - 1) if last else file.size - 1
+    if last and int(last) < start:
+        return None
+    if start >= file.size:
+        return "unsatisfiable"
+    return start, end
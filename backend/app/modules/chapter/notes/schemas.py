@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, Literal
 
 
@@ -23,7 +23,31 @@ class NoteResponse(BaseModel):
         from_attributes = True
 
 
+class NoteDetailResponse(NoteResponse):
+    """Schema for a note with one page of its full text"""
+    page: int
+    page_count: int
+    text: str
+
+
 class NoteApprovalUpdate(BaseModel):
     """Schema for approving/rejecting note"""
     status: Literal['approved', 'rejected']
     reason: Optional[str] = None  # Rejection reason
+
+
+class NoteBulkApprovalItem(BaseModel):
+    """Single decision in a bulk moderation request"""
+    note_id: str
+    status: Literal['approved', 'rejected']
+
+
+class NoteBulkApprovalRequest(BaseModel):
+    """Schema for approving/rejecting many notes at once"""
+    decisions: list[NoteBulkApprovalItem] = Field(..., min_length=1, max_length=500)
+
+
+class NoteBulkApprovalResponse(BaseModel):
+    """Schema for bulk moderation result"""
+    notes: list[NoteResponse]
+    not_found: list[str] = []  # Requested IDs that matched no note
@@ -1,7 +1,58 @@
 from supabase import Client
-from app.modules.chapter.notes.schemas import NoteResponse
+from fastapi import BackgroundTasks
+from app.modules.chapter.notes.schemas import NoteResponse, NoteDetailResponse, NoteBulkApprovalItem, NoteBulkApprovalResponse
 from app.services.vector_service import vector_service
+from app.services.event_hub import event_hub
+from app.services.file_cache import note_file_cache
+from app.modules.chapter.upload.service import UploadService
+from app.core.supabase import returning, public_object_path
+from dataclasses import dataclass
 from datetime import datetime
+from typing import Iterator
+import asyncio
+import hashlib
+import httpx
+
+
+# Column projections for every notes query. Never `*`: notes.embedding is a
+# vector(768) that PostgREST would serialize into each row as ~10 KB of text.
+NOTE_COLUMNS = (
+    "id, chapter_id, title, content, file_url, file_name, file_id, "
+    "visibility, approval_status, uploaded_by, approved_by, created_at"
+)
+
+# Note row with uploader/approver details, used by reads and by writes
+# (via returning) so every path builds the same NoteResponse
+NOTE_SELECT = (
+    f"{NOTE_COLUMNS}, "
+    "uploader:users!notes_uploaded_by_fkey(name, role), approver:users!notes_approved_by_fkey(name)"
+)
+
+# Teacher dashboard moderation queue (filtered on chapters.subject_id)
+PENDING_NOTE_SELECT = (
+    "id, title, content, file_url, file_name, approval_status, uploaded_by, created_at, "
+    "users!uploaded_by(name), chapters!inner(name, id, subject_id)"
+)
+
+# Notes of a file carry a preview; the full text is read one page at a time
+NOTE_PAGE_SELECT = f"{NOTE_SELECT}, file:note_files(page_count, pages:note_file_pages(page, content))"
+
+# What a download needs: visibility, the stored object and its identity
+NOTE_FILE_SELECT = (
+    "id, chapter_id, file_url, file_name, visibility, approval_status, uploaded_by, created_at, "
+    "file:note_files(sha256, storage_path, size_bytes, created_at)"
+)
+
+
+@dataclass
+class NoteFile:
+    """A note's stored file, as served by GET /notes/{note_id}/file"""
+    chapter_id: str
+    storage_path: str
+    file_name: str
+    size: int
+    etag: str  # Quoted; content hash, so it only changes with the bytes
+    last_modified: datetime
 
 
 class NoteService:
@@ -25,7 +76,7 @@ class NoteService:
         - All notes
         """
         query = db.table("notes")\
-            .select("*, uploader:users!notes_uploaded_by_fkey(name, role), approver:users!notes_approved_by_fkey(name)")\
+            .select(NOTE_SELECT)\
             .eq("chapter_id", chapter_id)
         
         if role == "student":
@@ -34,24 +85,7 @@ class NoteService:
         
         response = query.execute()
         
-        notes = []
-        for note in response.data:
-            notes.append(NoteResponse(
-                id=note['id'],
-                chapter_id=note['chapter_id'],
-                title=note['title'],
-                content=note['content'],
-                file_url=note.get('file_url'),
-                file_name=note.get('file_name'),
-                visibility=note['visibility'],
-                approval_status=note['approval_status'],
-                uploaded_by=note['uploaded_by'],
-                uploader_name=note.get('uploader', {}).get('name') if note.get('uploader') else 'Unknown User',
-                uploader_role=note.get('uploader', {}).get('role') if note.get('uploader') else 'student',
-                approved_by=note.get('approved_by'),
-                approver_name=note.get('approver', {}).get('name') if note.get('approver') else None,
-                created_at=note['created_at']
-            ))
+        notes = [self._build_note_response(note) for note in response.data]
         
         return notes
 
@@ -64,28 +98,12 @@ class NoteService:
         List all notes uploaded by the user
         """
         response = db.table("notes")\
-            .select("*, uploader:users!notes_uploaded_by_fkey(name, role), approver:users!notes_approved_by_fkey(name)")\
+            .select(NOTE_SELECT)\
             .eq("uploaded_by", user_id)\
             .order("created_at", desc=True)\
             .execute()
         
-        notes = []
-        for note in response.data:
-            notes.append(NoteResponse(
-                id=note['id'],
-                chapter_id=note['chapter_id'],
-                title=note['title'],
-                content=note['content'],
-                file_url=note.get('file_url'),
-                file_name=note.get('file_name'),
-                visibility=note['visibility'],
-                approval_status=note['approval_status'],
-                uploaded_by=note['uploaded_by'],
-                uploader_name=note.get('uploader', {}).get('name') if note.get('uploader') else 'Unknown User',
-                approved_by=note.get('approved_by'),
-                approver_name=note.get('approver', {}).get('name') if note.get('approver') else None,
-                created_at=note['created_at']
-            ))
+        notes = [self._build_note_response(note) for note in response.data]
         
         return notes
     
@@ -100,50 +118,277 @@ class NoteService:
         Approve or reject note (teacher only)
         
         On approval: create embedding in Supabase
-        On rejection: delete embedding from Supabase if exists
-        """
-        # Get note details
-        note = db.table("notes")\
-            .select("*")\
-            .eq("id", note_id)\
-            .single()\
-            .execute()
-        
-        if not note.data:
-            raise Exception("Note not found")
+        On rejection: clear the embedding in the same update
         
-        # Update status
-        response = db.table("notes").update({
+        The update returns the joined row, so no select before or after it
+        """
+        update = {
             "approval_status": status,
             "approved_by": teacher_id if status == "approved" else None,
             "approved_at": datetime.utcnow().isoformat() if status == "approved" else None
-        }).eq("id", note_id).execute()
+        }
+        if status != "approved":
+            update["embedding"] = None
+        
+        response = returning(
+            db.table("notes").update(update).eq("id", note_id),
+            NOTE_SELECT
+        ).execute()
+        
+        if not response.data:
+            raise Exception("Note not found")
+        
+        moderated = self._build_note_response(response.data[0])
         
-        # Sync with vector DB
         # Sync with vector DB
         if status == "approved":
-            # Add to vector DB
             await vector_service.add_note_embedding(
                 db=db,
                 note_id=note_id,
-                title=note.data['title'],
-                content=note.data['content']
+                title=moderated.title,
+                content=moderated.content,
+                file_id=response.data[0].get('file_id')
             )
+        
+        # Push to the uploader's open connections
+        await event_hub.publish([moderated.uploaded_by], f"note.{status}", moderated.model_dump())
+        
+        return moderated
+
+    async def approve_notes_bulk(
+        self,
+        db: Client,
+        decisions: list[NoteBulkApprovalItem],
+        teacher_id: str,
+        background_tasks: BackgroundTasks
+    ) -> NoteBulkApprovalResponse:
+        """
+        Approve or reject many notes at once (teacher only)
+        
+        - Only notes in subjects the teacher teaches (classroom creator or
+          teacher_access) are moderated; the others are reported with the
+          unknown ids in not_found
+        - One set-based update (moderate_notes RPC) that returns the
+          updated notes with user details; rejected notes lose their
+          embedding in the same statement
+        - Embeddings for approved notes are generated as one batch after
+          the response is sent
+        """
+        requested_ids = list(dict.fromkeys(d.note_id for d in decisions))
+        allowed_ids = self._moderated_by(db, requested_ids, teacher_id)
+        decisions = [d for d in decisions if d.note_id in allowed_ids]
+        
+        updated_rows = []
+        if decisions:
+            updated_rows = db.rpc("moderate_notes", {
+                "decisions": [d.model_dump() for d in decisions],
+                "moderator_id": teacher_id
+            }).select(NOTE_SELECT).execute().data or []
+        
+        notes = [self._build_note_response(n) for n in updated_rows]
+        updated_ids = {n.id for n in notes}
+        not_found = [note_id for note_id in requested_ids if note_id not in updated_ids]
+        
+        # Queue embeddings as one batch
+        approved = [
+            {'id': n['id'], 'title': n['title'], 'content': n['content'], 'file_id': n.get('file_id')}
+            for n in updated_rows if n['approval_status'] == "approved"
+        ]
+        if approved:
+            background_tasks.add_task(vector_service.add_note_embeddings, db, approved)
+        
+        for note in notes:
+            await event_hub.publish([note.uploaded_by], f"note.{note.approval_status}", note.model_dump())
+        
+        return NoteBulkApprovalResponse(notes=notes, not_found=not_found)
+    
+    def _moderated_by(self, db: Client, note_ids: list[str], teacher_id: str) -> set[str]:
+        """Ids of the notes whose subject this teacher teaches (one query for the batch)"""
+        if not note_ids:
+            return set()
+        response = db.table("notes")\
+            .select("id, chapters!inner(subjects!inner(classrooms!inner(created_by), teacher_access(teacher_id)))")\
+            .in_("id", note_ids)\
+            .execute()
+        
+        allowed = set()
+        for note in response.data:
+            subject = note['chapters']['subjects']
+            is_creator = subject['classrooms']['created_by'] == teacher_id
+            has_access = any(a['teacher_id'] == teacher_id for a in subject.get('teacher_access') or [])
+            if is_creator or has_access:
+                allowed.add(note['id'])
+        return allowed
+
+    async def get_note(
+        self,
+        db: Client,
+        note_id: str,
+        user_id: str,
+        role: str,
+        page: int = 1
+    ) -> NoteDetailResponse:
+        """
+        Get a note with one page of its full text
+
+        Students only see approved public notes and their own. Notes uploaded
+        before file pages existed are a single page (their stored content).
+        """
+        response = db.table("notes")\
+            .select(NOTE_PAGE_SELECT)\
+            .eq("id", note_id)\
+            .eq("file.pages.page", page)\
+            .execute()
+        if not response.data:
+            raise LookupError("Note not found")
+
+        n = response.data[0]
+        if not self._visible(n, user_id, role):
+            raise LookupError("Note not found")
+
+        if n.get('file'):
+            page_count = n['file']['page_count']
+            pages = n['file']['pages']
+            text = pages[0]['content'] if pages else None
         else:
-            # Remove from vector DB
-            try:
-                await vector_service.delete_note_embedding(db=db, note_id=note_id)
-            except:
-                pass  # Embedding might not exist
-        
-        # Fetch updated note with user details
-        full_response = db.table("notes")\
-            .select("*, uploader:users!notes_uploaded_by_fkey(name, role), approver:users!notes_approved_by_fkey(name)")\
+            page_count = 1
+            text = n['content'] if page == 1 else None
+        if text is None:
+            raise LookupError(f"Page {page} not found (note has {page_count})")
+
+        return NoteDetailResponse(
+            **self._build_note_response(n).model_dump(),
+            page=page,
+            page_count=page_count,
+            text=text
+        )
+
+    async def get_note_file(
+        self,
+        db: Client,
+        note_id: str,
+        user_id: str,
+        role: str
+    ) -> NoteFile:
+        """
+        Locate a note's stored file (same visibility rules as get_note)
+
+        Notes uploaded before note_files only have their public URL; the
+        object's size then comes from Storage and its path stands in for
+        the content hash.
+        """
+        response = db.table("notes")\
+            .select(NOTE_FILE_SELECT)\
             .eq("id", note_id)\
-            .single()\
             .execute()
-        
-        n = full_response.data
+        if not response.data or not self._visible(response.data[0], user_id, role):
+            raise LookupError("Note not found")
+
+        n = response.data[0]
+        file = n.get('file')
+        if file:
+            return NoteFile(
+                chapter_id=n['chapter_id'],
+                storage_path=file['storage_path'],
+                file_name=n.get('file_name') or file['storage_path'].rsplit("/", 1)[-1],
+                size=file['size_bytes'],
+                etag=f'"{file["sha256"]}"',
+                last_modified=datetime.fromisoformat(file['created_at'])
+            )
+
+        storage_path = public_object_path(n.get('file_url'), UploadService.DEFAULT_BUCKET)
+        if storage_path is None:
+            raise LookupError("Note has no file")
+        head = await asyncio.to_thread(
+            db.storage.session.head, f"object/{UploadService.DEFAULT_BUCKET}/{storage_path}"
+        )
+        if head.status_code != 200:
+            raise LookupError("Note file not found in storage")
+        return NoteFile(
+            chapter_id=n['chapter_id'],
+            storage_path=storage_path,
+            file_name=n.get('file_name') or storage_path.rsplit("/", 1)[-1],
+            size=int(head.headers["content-length"]),
+            etag=f'"{hashlib.sha256(storage_path.encode()).hexdigest()}"',
+            last_modified=datetime.fromisoformat(n['created_at'])
+        )
+
+    async def read_note_file(self, db: Client, file: NoteFile, start: int, end: int) -> Iterator[bytes]:
+        """
+        Bytes start..end (inclusive) of a note's file
+
+        Files that fit the disk cache are served from it (downloaded whole
+        on the first request); larger ones stream from Storage with a
+        Range request.
+        """
+        if note_file_cache.fits(file.size):
+            handle = await note_file_cache.open(
+                file.etag.strip('"'), lambda: self._stream_object(db, file.storage_path)
+            )
+            return self._read_range(handle, start, end)
+
+        response = await asyncio.to_thread(self._request_range, db, file.storage_path, start, end)
+        return self._stream_range(response, start, end)
+
+    def _stream_object(self, db: Client, storage_path: str) -> Iterator[bytes]:
+        with db.storage.session.stream("GET", f"object/{UploadService.DEFAULT_BUCKET}/{storage_path}") as response:
+            if response.status_code in (400, 404):
+                # Storage answers 400 for missing objects
+                raise LookupError("Note file not found in storage")
+            response.raise_for_status()
+            yield from response.iter_bytes(UploadService.CHUNK_BYTES)
+
+    def _request_range(self, db: Client, storage_path: str, start: int, end: int) -> httpx.Response:
+        session = db.storage.session
+        request = session.build_request(
+            "GET", f"object/{UploadService.DEFAULT_BUCKET}/{storage_path}",
+            headers={"Range": f"bytes={start}-{end}"}
+        )
+        response = session.send(request, stream=True)
+        if response.status_code in (400, 404):
+            response.close()
+            raise LookupError("Note file not found in storage")
+        if response.status_code not in (200, 206):
+            response.close()
+            response.raise_for_status()
+        return response
+
+    def _stream_range(self, response: httpx.Response, start: int, end: int) -> Iterator[bytes]:
+        # A 200 means Storage ignored the Range header: skip to start ourselves
+        skip = start if response.status_code == 200 else 0
+        remaining = end - start + 1
+        try:
+            for chunk in response.iter_bytes(UploadService.CHUNK_BYTES):
+                if skip:
+                    dropped = min(skip, len(chunk))
+                    chunk, skip = chunk[dropped:], skip - dropped
+                if chunk:
+                    yield chunk[:remaining]
+                    remaining -= len(chunk)
+                if remaining <= 0:
+                    break
+        finally:
+            response.close()
+
+    def _read_range(self, handle, start: int, end: int) -> Iterator[bytes]:
+        with handle:
+            handle.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = handle.read(min(UploadService.CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    def _visible(self, n: dict, user_id: str, role: str) -> bool:
+        """Students see approved public notes and their own; teachers see all"""
+        return role != "student" or n['uploaded_by'] == user_id or (
+            n['approval_status'] == 'approved' and n['visibility'] == 'public'
+        )
+
+    def _build_note_response(self, n: dict) -> NoteResponse:
+        """Build NoteResponse from a row selected with NOTE_SELECT"""
         return NoteResponse(
             id=n['id'],
             chapter_id=n['chapter_id'],
@@ -161,8 +406,6 @@ class NoteService:
             created_at=n['created_at']
         )
 
-
-
     async def delete_note(
         self,
         db: Client,
@@ -41,40 +41,17 @@ class ChapterService:
         user_id: str,
         chapter_id: str
     ) -> bool:
-        """Delete chapter (teacher only - validation should happen in route or via helper)"""
-        # Validate ownership via subject -> classroom -> created_by OR teacher_access
-        # For efficiency, we'll verify the user is a teacher who has access to the subject of this chapter
+        """
+        Delete chapter (classroom creator or subject teacher)
         
-        # 1. Get chapter's subject_id
-        chapter_res = db.table("chapters").select("subject_id").eq("id", chapter_id).single().execute()
-        if not chapter_res.data:
-            return False
-        subject_id = chapter_res.data['subject_id']
+        Single round-trip: the ownership/teacher_access check is part of the DELETE
+        """
+        response = db.rpc("delete_chapter", {
+            "p_chapter_id": chapter_id,
+            "p_user_id": user_id
+        }).execute()
         
-        # 2. Check subject's classroom creator OR teacher_access
-        # Check if creator
-        subject_res = db.table("subjects")\
-            .select("classrooms!inner(created_by)")\
-            .eq("id", subject_id)\
-            .single()\
-            .execute()
-            
-        if subject_res.data and subject_res.data['classrooms']['created_by'] == user_id:
-             # Owner - OK
-             pass
-        else:
-             # Check explicit access
-             access_res = db.table("teacher_access")\
-                .select("id")\
-                .eq("teacher_id", user_id)\
-                .eq("subject_id", subject_id)\
-                .execute()
-                
-             if not access_res.data:
-                 return False # No access
-                 
-        db.table("chapters").delete().eq("id", chapter_id).execute()
-        return True
+        return response.data['status'] == "deleted"
 
 # Global instance
 chapter_service = ChapterService()
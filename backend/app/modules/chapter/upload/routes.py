@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from app.modules.chapter.upload.schemas import NoteUploadResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Header, Request, Response
+from app.modules.chapter.upload.schemas import (
+    NoteUploadResponse, NoteUploadRequest, NoteUploadTicket, NoteResumableRequest, NoteResumableUpload
+)
 from app.modules.chapter.upload.service import upload_service
 from app.core.auth import get_current_user, CurrentUser
+from app.core.circuit import circuits
 from app.core.permissions import check_chapter_access
 from app.core.supabase import get_db, get_admin_db
+from app.services.document_processor import document_processor, DocumentTooLargeError, UnsupportedDocumentError
 from supabase import Client
 
 
@@ -20,36 +24,212 @@ async def upload_note(
     db: Client = Depends(get_admin_db)
 ):
     """
-    Upload note file (PDF/TXT)
+    Upload note file (PDF, DOCX, PPTX, Markdown or TXT)
     
     - Students: pending approval for public, auto-approved for private
     - Teachers: always auto-approved
+    - 413 over MAX_NOTE_FILE_BYTES / MAX_NOTE_PAGES, 415 when the content
+      does not match the extension
     """
     # Verify chapter access
     access = check_chapter_access(db, current_user.user_id, current_user.role, chapter_id)
     if not access['allowed']:
         raise HTTPException(status_code=403, detail="No access to this chapter")
     
+    # Storage probes failing: refuse before reading the body
+    if not circuits.allow("storage"):
+        raise HTTPException(status_code=503, detail="File storage is temporarily unavailable")
+    
     # Validate file type
-    if not file.filename.lower().endswith(('.pdf', '.txt')):
-        raise HTTPException(status_code=400, detail="Only PDF and TXT files are supported")
+    if not document_processor.supports(file.filename):
+        raise HTTPException(status_code=400, detail=f"Supported file types: {', '.join(document_processor.extensions)}")
     
     # Validate visibility
     if visibility not in ['public', 'private']:
         raise HTTPException(status_code=400, detail="Visibility must be 'public' or 'private'")
     
     try:
-        file_bytes = await file.read()
-        
         return await upload_service.upload_note(
             db=db,
             chapter_id=chapter_id,
             user_id=current_user.user_id,
             role=current_user.role,
             title=title,
-            file_bytes=file_bytes,
+            file=file.file,
             filename=file.filename,
             visibility=visibility
         )
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedDocumentError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/chapter/{chapter_id}/note/sign", response_model=NoteUploadTicket)
+async def sign_note_upload(
+    chapter_id: str,
+    request: NoteUploadRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """
+    Start a direct-to-storage note upload (PDF, DOCX, PPTX, Markdown or TXT)
+    
+    PUT the file to `upload_url` (valid for two hours), then call
+    `POST /upload/{upload_id}/finalize`. The file never passes through the API.
+    """
+    access = check_chapter_access(db, current_user.user_id, current_user.role, chapter_id)
+    if not access['allowed']:
+        raise HTTPException(status_code=403, detail="No access to this chapter")
+    
+    if not circuits.allow("storage"):
+        raise HTTPException(status_code=503, detail="File storage is temporarily unavailable")
+    
+    if not document_processor.supports(request.file_name):
+        raise HTTPException(status_code=400, detail=f"Supported file types: {', '.join(document_processor.extensions)}")
+    
+    try:
+        return await upload_service.create_upload(
+            db=db,
+            chapter_id=chapter_id,
+            user_id=current_user.user_id,
+            title=request.title,
+            filename=request.file_name,
+            visibility=request.visibility
+        )
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/chapter/{chapter_id}/note/resumable", response_model=NoteResumableUpload)
+async def create_resumable_upload(
+    chapter_id: str,
+    request: NoteResumableRequest,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """
+    Start a resumable note upload (PDF, DOCX, PPTX, Markdown or TXT) of `size` bytes
+    
+    PATCH `/upload/{upload_id}` with `Upload-Offset` and up to `chunk_bytes`
+    of the file per request; after a dropped connection, HEAD the upload for
+    the offset to resume from. Finalize once offset reaches length.
+    """
+    access = check_chapter_access(db, current_user.user_id, current_user.role, chapter_id)
+    if not access['allowed']:
+        raise HTTPException(status_code=403, detail="No access to this chapter")
+    
+    if not circuits.allow("storage"):
+        raise HTTPException(status_code=503, detail="File storage is temporarily unavailable")
+    
+    if not document_processor.supports(request.file_name):
+        raise HTTPException(status_code=400, detail=f"Supported file types: {', '.join(document_processor.extensions)}")
+    
+    try:
+        return await upload_service.create_resumable_upload(
+            db=db,
+            chapter_id=chapter_id,
+            user_id=current_user.user_id,
+            title=request.title,
+            filename=request.file_name,
+            visibility=request.visibility,
+            size=request.size
+        )
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.head("/{upload_id}")
+async def get_upload_offset(
+    upload_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """Offset to resume a resumable upload from (Upload-Offset / Upload-Length headers)"""
+    try:
+        upload = await upload_service.get_resumable_upload(db, upload_id, current_user.user_id)
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Response(headers={
+        "Upload-Offset": str(upload.offset),
+        "Upload-Length": str(upload.length),
+        "Cache-Control": "no-store"
+    })
+
+
+@router.patch("/{upload_id}", status_code=204)
+async def append_upload_chunk(
+    upload_id: str,
+    request: Request,
+    upload_offset: int = Header(..., ge=0),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """
+    Append the request body to a resumable upload at Upload-Offset
+    
+    409 when Upload-Offset is not the upload's current offset (HEAD for
+    it); the response's Upload-Offset is where the next chunk starts.
+    """
+    if not circuits.allow("storage"):
+        raise HTTPException(status_code=503, detail="File storage is temporarily unavailable")
+    
+    try:
+        offset = await upload_service.append_chunk(
+            db, upload_id, current_user.user_id, upload_offset, request.stream()
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedDocumentError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    return Response(status_code=204, headers={"Upload-Offset": str(offset)})
+
+
+@router.post("/{upload_id}/finalize", response_model=NoteUploadResponse)
+async def finalize_note_upload(
+    upload_id: str,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """
+    Create the note from an uploaded file
+    
+    Extracts text from the stored object; approval rules match the direct
+    upload. Safe to retry: a finalized upload returns its note.
+    """
+    if not circuits.allow("storage"):
+        raise HTTPException(status_code=503, detail="File storage is temporarily unavailable")
+    
+    try:
+        return await upload_service.finalize_upload(
+            db=db,
+            upload_id=upload_id,
+            user_id=current_user.user_id,
+            role=current_user.role
+        )
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except DocumentTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except UnsupportedDocumentError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
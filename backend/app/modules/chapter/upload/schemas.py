@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Literal
 
 
@@ -16,3 +16,34 @@ class NoteUploadResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class NoteUploadRequest(BaseModel):
+    """Schema for requesting a signed direct-to-storage upload"""
+    title: str
+    file_name: str
+    visibility: Literal['public', 'private']
+
+
+class NoteUploadTicket(BaseModel):
+    """Signed upload target; PUT the file to upload_url, then finalize"""
+    upload_id: str
+    bucket: str
+    path: str
+    upload_url: str
+    token: str
+    expires_at: str
+
+
+class NoteResumableRequest(NoteUploadRequest):
+    """Schema for starting a resumable upload"""
+    size: int = Field(..., gt=0)  # Total file size in bytes
+
+
+class NoteResumableUpload(BaseModel):
+    """Resumable upload state; PATCH bytes at offset until it reaches length, then finalize"""
+    upload_id: str
+    offset: int
+    length: int
+    chunk_bytes: int  # Largest accepted PATCH body
+    expires_at: str
@@ -1,15 +1,41 @@
 from supabase import Client
-from app.modules.chapter.upload.schemas import NoteUploadResponse
-from app.services.document_processor import document_processor
+from app.core.config import settings
+from app.modules.chapter.upload.schemas import NoteUploadResponse, NoteUploadTicket, NoteResumableUpload
+from app.core.supabase import returning
+from app.services.document_processor import document_processor, DocumentTooLargeError, UnsupportedDocumentError
 from app.utils.helpers import sanitize_filename
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterable, BinaryIO, Iterable, Optional
+import asyncio
+import bisect
+import hashlib
+import logging
+import os
+import tempfile
 import uuid
 
+logger = logging.getLogger(__name__)
+
+
+FILE_SELECT = "id, storage_path, lead, page_count, char_count"
+
 
 class UploadService:
     """File upload service for Supabase Storage"""
     
     DEFAULT_BUCKET = "notes"
+    # Supabase signed upload URLs are valid for two hours (not configurable)
+    SIGNED_UPLOAD_TTL = timedelta(hours=2)
+    # notes.content is a list preview; the full text is in note_file_pages
+    PREVIEW_CHARS = 500
+    # Opening text kept on the file for embeddings and RAG context
+    LEAD_CHARS = 5000
+    # note_file_pages / note_file_chunks rows per insert while a file is extracted
+    PAGE_BATCH = 50
+    CHUNK_BATCH = 100
+    # Read size for uploaded files and storage streams
+    CHUNK_BYTES = 64 * 1024
     
     async def upload_note(
         self,
@@ -18,7 +44,7 @@ class UploadService:
         user_id: str,
         role: str,
         title: str,
-        file_bytes: bytes,
+        file: BinaryIO,
         filename: str,
         visibility: str
     ) -> NoteUploadResponse:
@@ -27,30 +53,611 @@ class UploadService:
         
         - Students: pending approval (unless private)
         - Teachers: auto-approved
+        - The file is read in chunks and never held in memory: a content
+          that does not match its extension (415) or a file over
+          MAX_NOTE_FILE_BYTES / MAX_NOTE_PAGES (413) is rejected before
+          extraction or storage
+        - A file already uploaded by anyone (same SHA-256) is reused:
+          no extraction, storage upload or embedding
+        """
+        shared = await asyncio.to_thread(self._ingest_file, db, chapter_id, file, filename)
+        
+        return await self._create_note(
+            db, chapter_id, user_id, role, title, shared, filename, visibility
+        )
+    
+    async def create_upload(
+        self,
+        db: Client,
+        chapter_id: str,
+        user_id: str,
+        title: str,
+        filename: str,
+        visibility: str
+    ) -> NoteUploadTicket:
+        """
+        Start a direct-to-storage upload
+        
+        Signs an upload URL for a fresh object path and records the pending
+        upload; the client PUTs the file there and then calls finalize.
+        """
+        upload_id = str(uuid.uuid4())
+        file_path = f"{chapter_id}/{upload_id}_{sanitize_filename(filename)}"
+        
+        try:
+            signed = db.storage.from_(self.DEFAULT_BUCKET).create_signed_upload_url(file_path)
+        except Exception as e:
+            raise Exception(f"Error signing upload: {str(e)}")
+        
+        expires_at = (datetime.now(timezone.utc) + self.SIGNED_UPLOAD_TTL).isoformat()
+        db.table("note_uploads").insert({
+            "id": upload_id,
+            "chapter_id": chapter_id,
+            "uploaded_by": user_id,
+            "title": title,
+            "file_name": filename,
+            "visibility": visibility,
+            "storage_path": file_path,
+            "expires_at": expires_at
+        }, returning="minimal").execute()
+        
+        return NoteUploadTicket(
+            upload_id=upload_id,
+            bucket=self.DEFAULT_BUCKET,
+            path=file_path,
+            upload_url=signed["signed_url"],
+            token=signed["token"],
+            expires_at=expires_at
+        )
+    
+    async def create_resumable_upload(
+        self,
+        db: Client,
+        chapter_id: str,
+        user_id: str,
+        title: str,
+        filename: str,
+        visibility: str,
+        size: int
+    ) -> NoteResumableUpload:
+        """
+        Start a resumable upload of a file of the given size
+        
+        The client PATCHes chunks at the current offset (resuming from HEAD
+        after a dropped connection) and finalizes once all bytes are in.
+        """
+        if size > settings.MAX_NOTE_FILE_BYTES:
+            raise DocumentTooLargeError(f"File is larger than {settings.MAX_NOTE_FILE_BYTES} bytes")
+        
+        upload_id = str(uuid.uuid4())
+        expires_at = (
+            datetime.now(timezone.utc) + timedelta(hours=settings.RESUMABLE_UPLOAD_TTL_HOURS)
+        ).isoformat()
+        db.table("note_uploads").insert({
+            "id": upload_id,
+            "chapter_id": chapter_id,
+            "uploaded_by": user_id,
+            "title": title,
+            "file_name": filename,
+            "visibility": visibility,
+            "storage_path": f"{chapter_id}/{upload_id}_{sanitize_filename(filename)}",
+            "upload_length": size,
+            "expires_at": expires_at
+        }, returning="minimal").execute()
+        
+        return NoteResumableUpload(
+            upload_id=upload_id,
+            offset=0,
+            length=size,
+            chunk_bytes=settings.UPLOAD_CHUNK_MAX_BYTES,
+            expires_at=expires_at
+        )
+    
+    async def get_resumable_upload(self, db: Client, upload_id: str, user_id: str) -> NoteResumableUpload:
+        """Current offset of a resumable upload (where the next PATCH starts)"""
+        upload = self._resumable(db, upload_id, user_id)
+        return NoteResumableUpload(
+            upload_id=upload_id,
+            offset=upload["upload_offset"],
+            length=upload["upload_length"],
+            chunk_bytes=settings.UPLOAD_CHUNK_MAX_BYTES,
+            expires_at=upload["expires_at"]
+        )
+    
+    async def append_chunk(
+        self,
+        db: Client,
+        upload_id: str,
+        user_id: str,
+        offset: int,
+        body: AsyncIterable[bytes]
+    ) -> int:
+        """
+        Store one PATCH body as the next part of a resumable upload
+        
+        The body is spooled (never held in memory) and stored as its own
+        object; the upload's offset then moves forward only if it is still
+        the one the client sent, so a duplicate or racing PATCH changes
+        nothing. A first chunk whose content does not match the file type
+        fails the upload at once.
+        
+        Returns:
+            The new offset
+        """
+        upload = self._resumable(db, upload_id, user_id)
+        if offset != upload["upload_offset"]:
+            raise ValueError(f"Upload offset is {upload['upload_offset']}, not {offset}")
+        
+        with tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_BYTES) as spool:
+            size = 0
+            async for chunk in body:
+                size += len(chunk)
+                if size > settings.UPLOAD_CHUNK_MAX_BYTES:
+                    raise DocumentTooLargeError(f"Chunk is larger than {settings.UPLOAD_CHUNK_MAX_BYTES} bytes")
+                if offset + size > upload["upload_length"]:
+                    raise DocumentTooLargeError(f"Chunk goes past the declared size of {upload['upload_length']} bytes")
+                spool.write(chunk)
+            if size == 0:
+                return offset
+            
+            spool.seek(0)
+            if offset == 0:
+                try:
+                    self._check_head(spool.read(document_processor.SIGNATURE_BYTES), upload)
+                except UnsupportedDocumentError as e:
+                    self._set_upload_status(db, upload_id, "failed", error=str(e))
+                    raise
+                spool.seek(0)
+            
+            part_path = f"{upload['storage_path']}.part-{offset:012d}-{uuid.uuid4().hex[:8]}"
+            try:
+                await asyncio.to_thread(self._put_object, db, part_path, self._chunks(spool), size)
+            except Exception as e:
+                raise Exception(f"Error uploading file: {str(e)}")
+        
+        advanced = returning(
+            db.table("note_uploads").update({
+                "upload_offset": offset + size,
+                "parts": upload["parts"] + [part_path],
+                "updated_at": datetime.utcnow().isoformat()
+            }).eq("id", upload_id).eq("status", "pending").eq("upload_offset", offset),
+            "id"
+        ).execute()
+        if not advanced.data:
+            self._remove_objects(db, [part_path])
+            raise ValueError("Another request already wrote at this offset")
+        return offset + size
+    
+    async def finalize_upload(
+        self,
+        db: Client,
+        upload_id: str,
+        user_id: str,
+        role: str
+    ) -> NoteUploadResponse:
+        """
+        Extract text from an uploaded object and create the note
+        
+        One caller claims the upload (pending -> processing); retries after
+        completion return the same note. If the note cannot be created the
+        upload goes back to pending with its ingested file, so a retry only
+        creates the note.
         """
-        # Process document to extract text
+        claimed = db.table("note_uploads").update({
+            "status": "processing",
+            "updated_at": datetime.utcnow().isoformat()
+        }).eq("id", upload_id).eq("uploaded_by", user_id).eq("status", "pending").execute()
+        
+        if not claimed.data:
+            return self._finalized_note(db, upload_id, user_id)
+        upload = claimed.data[0]
+        
         try:
-            content = document_processor.process_document(file_bytes, filename)
+            if upload["file_id"] is not None:
+                shared = self._get_file(db, upload["file_id"])
+            elif upload["upload_length"] is not None:
+                shared = await asyncio.to_thread(self._ingest_parts, db, upload)
+            else:
+                shared = await asyncio.to_thread(
+                    self._ingest_from_storage, db, upload["storage_path"], upload["file_name"]
+                )
+        except FileNotFoundError as e:
+            # Not uploaded yet: let the client finish the upload and retry
+            self._set_upload_status(db, upload_id, "pending")
+            raise ValueError(str(e))
         except Exception as e:
+            self._set_upload_status(db, upload_id, "failed", error=str(e))
+            if upload["file_id"] is None:
+                self._remove_objects(db, [upload["storage_path"], *upload["parts"]])
+            if isinstance(e, (DocumentTooLargeError, UnsupportedDocumentError)):
+                raise
             raise Exception(f"Error processing document: {str(e)}")
         
-        # Generate unique file path
-        safe_filename = sanitize_filename(filename)
-        file_id = str(uuid.uuid4())
-        file_path = f"{chapter_id}/{file_id}_{safe_filename}"
+        note = None
+        try:
+            note = await self._create_note(
+                db, upload["chapter_id"], user_id, role, upload["title"], shared,
+                upload["file_name"], upload["visibility"]
+            )
+            self._set_upload_status(db, upload_id, "completed", note_id=note.id)
+        except Exception:
+            self._release_upload(db, upload_id, shared["id"], note)
+            raise
+        return note
+    
+    def _release_upload(self, db: Client, upload_id: str, file_id: str, note: Optional[NoteUploadResponse]):
+        """Back to pending after the note step failed, keeping the ingested file for the retry"""
+        try:
+            if note is not None:
+                # Created but not recorded as completed: a retry would duplicate it
+                db.table("notes").delete().eq("id", note.id).execute()
+            self._set_upload_status(db, upload_id, "pending", file_id=file_id)
+        except Exception as e:
+            logger.warning(f"Failed to release upload {upload_id}: {e}")
+    
+    def _finalized_note(self, db: Client, upload_id: str, user_id: str) -> NoteUploadResponse:
+        """Finalize called on an upload that is not pending"""
+        response = db.table("note_uploads").select(
+            "status, error, notes(id, chapter_id, title, content, file_url, file_name, visibility, approval_status, created_at)"
+        ).eq("id", upload_id).eq("uploaded_by", user_id).execute()
+        
+        if not response.data:
+            raise LookupError("Upload not found")
+        upload = response.data[0]
+        if upload["status"] == "completed" and upload["notes"]:
+            note = upload["notes"]
+            return NoteUploadResponse(**{**note, "content": note["content"][:self.PREVIEW_CHARS]})
+        if upload["status"] == "processing":
+            raise ValueError("Upload is already being finalized")
+        raise ValueError(f"Upload failed: {upload['error'] or upload['status']}")
+    
+    def _resumable(self, db: Client, upload_id: str, user_id: str) -> dict:
+        """A pending, unexpired resumable upload of this user"""
+        response = db.table("note_uploads")\
+            .select("storage_path, file_name, status, upload_length, upload_offset, parts, expires_at")\
+            .eq("id", upload_id)\
+            .eq("uploaded_by", user_id)\
+            .execute()
+        
+        if not response.data or response.data[0]["upload_length"] is None:
+            raise LookupError("Upload not found")
+        upload = response.data[0]
+        if upload["status"] != "pending":
+            raise ValueError(f"Upload is {upload['status']}")
+        if datetime.fromisoformat(upload["expires_at"]) < datetime.now(timezone.utc):
+            raise LookupError("Upload has expired")
+        return upload
+    
+    def _check_head(self, head: bytes, upload: dict):
+        """Signature check on a first chunk, once it holds enough bytes to decide"""
+        if len(head) == document_processor.SIGNATURE_BYTES or len(head) == upload["upload_length"]:
+            document_processor.check_signature(head, upload["file_name"])
+    
+    def _get_file(self, db: Client, file_id: str) -> dict:
+        response = db.table("note_files").select(FILE_SELECT).eq("id", file_id).execute()
+        if not response.data:
+            raise FileNotFoundError("Uploaded file is no longer stored")
+        return response.data[0]
+    
+    def _find_file(self, db: Client, digest: str) -> Optional[dict]:
+        """
+        The stored file with this digest, if any
+        
+        Stamped as used in the same statement, so the storage collector
+        keeps it for the grace period while the note is created.
+        """
+        response = returning(
+            db.table("note_files").update({"last_used_at": datetime.now(timezone.utc).isoformat()}).eq("sha256", digest),
+            FILE_SELECT
+        ).execute()
+        return response.data[0] if response.data else None
+    
+    def _register_file(
+        self,
+        db: Client,
+        digest: str,
+        file_path: str,
+        size: int,
+        file: BinaryIO,
+        filename: str,
+        stored: bool
+    ) -> dict:
+        """
+        Record a new file, writing its text pages and chunks as they are extracted
+        
+        The row is inserted without its digest, so no other upload reuses it
+        before complete_note_file sets the digest, lead and counts. If an
+        identical upload completed first, its file wins: our row goes with
+        its pages and our object is removed. Unless already stored, the file
+        is uploaded while it is extracted.
+        """
+        file_id = returning(
+            db.table("note_files").insert({"storage_path": file_path, "size_bytes": size}), "id"
+        ).execute().data[0]["id"]
+        try:
+            if stored:
+                text = self._write_pages(db, file_id, self._extract(file, filename))
+            else:
+                text = self._extract_while_storing(db, file, file_path, size, filename, file_id)
+        except Exception:
+            self._discard_file(db, file_id)
+            raise
+        
+        result = db.rpc("complete_note_file", {
+            "p_file_id": file_id,
+            "p_sha256": digest,
+            "p_lead": text["lead"],
+            "p_char_count": text["char_count"],
+            "p_page_count": text["page_count"]
+        }).execute().data
+        
+        if result["status"] == "exists":
+            self._remove_objects(db, [file_path])
+        return result["file"]
+    
+    def _write_pages(self, db: Client, file_id: str, pages: Iterable[str]) -> dict:
+        """
+        Insert reader pages and their chunks in batches as they are extracted
+        
+        The pages feed iter_chunks on their way to note_file_pages (form
+        feeds between pages, as in the lead), so chunk offsets index the file
+        text and neither pages nor chunks are collected. Returns the lead
+        (first LEAD_CHARS of the text), char_count and page_count.
+        """
+        text = {"lead": "", "char_count": 0, "page_count": 0}
+        page_starts = []  # Text offset of each page, for the page a chunk starts on
+        page_rows = []
+        
+        def fragments() -> Iterable[str]:
+            for number, page in enumerate(pages, start=1):
+                if number > 1:
+                    yield "\f"
+                page_starts.append(text["char_count"] + number - 1)
+                if len(text["lead"]) < self.LEAD_CHARS:
+                    text["lead"] = (f"{text['lead']}\f{page}" if number > 1 else page)[:self.LEAD_CHARS]
+                text["char_count"] += len(page)
+                text["page_count"] = number
+                page_rows.append({"file_id": file_id, "page": number, "content": page})
+                if len(page_rows) == self.PAGE_BATCH:
+                    self._insert_batch(db, "note_file_pages", page_rows)
+                yield page
+            self._insert_batch(db, "note_file_pages", page_rows)
         
-        # Upload to Supabase Storage
+        chunk_rows = []
+        for number, chunk in enumerate(document_processor.iter_chunks(fragments()), start=1):
+            chunk_rows.append({
+                "file_id": file_id,
+                "chunk": number,
+                "page": bisect.bisect_right(page_starts, chunk.start),
+                "start_offset": chunk.start,
+                "end_offset": chunk.end,
+                "tokens": chunk.tokens,
+                "content": chunk.text
+            })
+            if len(chunk_rows) == self.CHUNK_BATCH:
+                self._insert_batch(db, "note_file_chunks", chunk_rows)
+        self._insert_batch(db, "note_file_chunks", chunk_rows)
+        return text
+    
+    def _insert_batch(self, db: Client, table: str, rows: list[dict]):
+        """Insert the batch (if any) and empty it"""
+        if rows:
+            db.table(table).insert(rows, returning="minimal").execute()
+            rows.clear()
+    
+    def _discard_file(self, db: Client, file_id: str):
+        """Drop an unfinished file row with its pages and chunks; left over, the storage collector removes it"""
         try:
-            storage_response = db.storage.from_(self.DEFAULT_BUCKET).upload(
-                file_path,
-                file_bytes,
-                {"content-type": "application/octet-stream"}
+            db.table("note_files").delete().eq("id", file_id).execute()
+        except Exception as e:
+            logger.warning(f"Failed to discard unfinished note file {file_id}: {e}")
+    
+    def _ingest_from_storage(self, db: Client, file_path: str, filename: str) -> dict:
+        """
+        Hash a stored upload and return its note_files row
+        
+        Streams the object into a spooled temp file (memory stays at
+        UPLOAD_SPOOL_BYTES whatever the file size) while hashing it. A known
+        digest drops the new object and skips extraction. Runs in a thread.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_BYTES) as spool:
+            with db.storage.session.stream("GET", f"object/{self.DEFAULT_BUCKET}/{file_path}") as response:
+                if response.status_code in (400, 404):
+                    # Storage answers 400 for missing objects
+                    raise FileNotFoundError("File has not been uploaded yet")
+                response.raise_for_status()
+                size, digest = self._scan(response.iter_bytes(self.CHUNK_BYTES), filename, sink=spool)
+            
+            shared = self._find_file(db, digest)
+            if shared is not None:
+                self._remove_objects(db, [file_path])
+                return shared
+            
+            spool.seek(0)
+            return self._register_file(db, digest, file_path, size, spool, filename, stored=True)
+    
+    def _ingest_parts(self, db: Client, upload: dict) -> dict:
+        """
+        Assemble a resumable upload and return its note_files row
+        
+        The parts stream through the same scan as any upload into a spooled
+        temp file, the assembled file is stored once at the upload's path
+        and the parts are removed. Runs in a thread.
+        """
+        if upload["upload_offset"] < upload["upload_length"]:
+            raise FileNotFoundError(
+                f"Upload is incomplete: {upload['upload_offset']} of {upload['upload_length']} bytes received"
             )
+        
+        file_path = upload["storage_path"]
+        with tempfile.SpooledTemporaryFile(max_size=settings.UPLOAD_SPOOL_BYTES) as spool:
+            size, digest = self._scan(self._read_objects(db, upload["parts"]), upload["file_name"], sink=spool)
+            shared = self._find_file(db, digest)
+            if shared is None:
+                spool.seek(0)
+                shared = self._register_file(
+                    db, digest, file_path, size, spool, upload["file_name"], stored=False
+                )
+        
+        self._remove_objects(db, upload["parts"])
+        return shared
+    
+    def _read_objects(self, db: Client, file_paths: list[str]) -> Iterable[bytes]:
+        """Chunks of several stored objects, one after another"""
+        for file_path in file_paths:
+            with db.storage.session.stream("GET", f"object/{self.DEFAULT_BUCKET}/{file_path}") as response:
+                response.raise_for_status()
+                yield from response.iter_bytes(self.CHUNK_BYTES)
+    
+    def _ingest_file(self, db: Client, chapter_id: str, file: BinaryIO, filename: str) -> dict:
+        """
+        Validate, hash, extract and store an uploaded file; returns its note_files row
+        
+        The request file is already spooled by the multipart parser; it is
+        scanned in chunks, then extracted and stored at the same time rather
+        than loaded. Runs in a thread.
+        """
+        size, digest = self._scan(self._chunks(file), filename)
+        shared = self._find_file(db, digest)
+        if shared is not None:
+            return shared
+        
+        file_path = f"{chapter_id}/{uuid.uuid4()}_{sanitize_filename(filename)}"
+        file.seek(0)
+        return self._register_file(db, digest, file_path, size, file, filename, stored=False)
+    
+    def _extract_while_storing(
+        self,
+        db: Client,
+        file: BinaryIO,
+        file_path: str,
+        size: int,
+        filename: str,
+        file_id: str
+    ) -> dict:
+        """
+        Upload a spooled file to storage while extracting its text
+        
+        Extraction (CPU) and writing the pages and chunks run here and the transfer
+        (network) in a second thread, so the upload takes about as long as
+        the slower of the two. The transfer reads the file by position,
+        leaving the file offset to the extractor. If either fails the stored
+        object is removed.
+        
+        Returns:
+            Lead and counts from _write_pages
+        """
+        if not hasattr(os, "pread"):
+            # No positional reads on this platform: one after the other
+            text = self._write_pages(db, file_id, self._extract(file, filename))
+            self._store(db, file_path, self._chunks(file, start=0), size)
+            return text
+        
+        # Rolls an in-memory spool over to disk so both readers share it
+        fileno = file.fileno()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            stored = pool.submit(self._store, db, file_path, self._chunks_at(fileno, size), size)
+            try:
+                text = self._write_pages(db, file_id, self._extract(file, filename))
+            except Exception:
+                if stored.exception() is None:
+                    self._remove_objects(db, [file_path])
+                raise
+            stored.result()
+        return text
+    
+    def _store(self, db: Client, file_path: str, chunks: Iterable[bytes], size: int):
+        try:
+            self._put_object(db, file_path, chunks, size)
         except Exception as e:
             raise Exception(f"Error uploading file: {str(e)}")
+    
+    def _scan(
+        self,
+        chunks: Iterable[bytes],
+        filename: str,
+        sink: Optional[BinaryIO] = None
+    ) -> tuple[int, str]:
+        """
+        Validate a file while reading it; returns (size, sha256 hex digest)
+        
+        The content signature is checked as soon as its first bytes arrive
+        and the size after every chunk, so a renamed binary or an oversized
+        file fails without reading the rest. Chunks are copied to sink.
+        """
+        size = 0
+        head = b""
+        sha256 = hashlib.sha256()
+        for chunk in chunks:
+            if len(head) < document_processor.SIGNATURE_BYTES:
+                head += chunk[:document_processor.SIGNATURE_BYTES - len(head)]
+                if len(head) == document_processor.SIGNATURE_BYTES:
+                    document_processor.check_signature(head, filename)
+            size += len(chunk)
+            if size > settings.MAX_NOTE_FILE_BYTES:
+                raise DocumentTooLargeError(f"File is larger than {settings.MAX_NOTE_FILE_BYTES} bytes")
+            sha256.update(chunk)
+            if sink is not None:
+                sink.write(chunk)
         
-        # Get public URL
-        file_url = db.storage.from_(self.DEFAULT_BUCKET).get_public_url(file_path)
+        if len(head) < document_processor.SIGNATURE_BYTES:
+            document_processor.check_signature(head, filename)
+        return size, sha256.hexdigest()
+    
+    def _extract(self, file: BinaryIO, filename: str) -> Iterable[str]:
+        """Reader pages, yielded as the document is parsed (at most MAX_NOTE_PAGES)"""
+        return document_processor.iter_pages(file, filename, max_pages=settings.MAX_NOTE_PAGES)
+    
+    def _chunks(self, file: BinaryIO, start: Optional[int] = None) -> Iterable[bytes]:
+        if start is not None:
+            file.seek(start)
+        return iter(lambda: file.read(self.CHUNK_BYTES), b"")
+    
+    def _chunks_at(self, fileno: int, size: int) -> Iterable[bytes]:
+        """Chunks read by position, without moving the file offset"""
+        for offset in range(0, size, self.CHUNK_BYTES):
+            yield os.pread(fileno, self.CHUNK_BYTES, offset)
+    
+    def _put_object(self, db: Client, file_path: str, chunks: Iterable[bytes], size: int):
+        """Stream chunks into the bucket (storage3's upload wants bytes or a real file)"""
+        response = db.storage.session.post(
+            f"object/{self.DEFAULT_BUCKET}/{file_path}",
+            content=chunks,
+            headers={
+                "content-type": "application/octet-stream",
+                "content-length": str(size),
+                "x-upsert": "false"
+            }
+        )
+        response.raise_for_status()
+    
+    def _set_upload_status(self, db: Client, upload_id: str, status: str, **fields):
+        db.table("note_uploads").update({
+            "status": status,
+            "updated_at": datetime.utcnow().isoformat(),
+            **fields
+        }, returning="minimal").eq("id", upload_id).execute()
+    
+    def _remove_objects(self, db: Client, file_paths: list[str]):
+        try:
+            db.storage.from_(self.DEFAULT_BUCKET).remove(file_paths)
+        except Exception as e:
+            logger.warning(f"Failed to remove rejected upload {', '.join(file_paths)}: {e}")
+    
+    async def _create_note(
+        self,
+        db: Client,
+        chapter_id: str,
+        user_id: str,
+        role: str,
+        title: str,
+        shared: dict,
+        filename: str,
+        visibility: str
+    ) -> NoteUploadResponse:
+        """Insert the note row for a stored file (and embed it when it is immediately searchable)"""
+        content = shared["lead"]
+        file_url = db.storage.from_(self.DEFAULT_BUCKET).get_public_url(shared["storage_path"])
         
         # Determine approval status
         if role == "teacher":
@@ -62,9 +669,10 @@ class UploadService:
         note_data = {
             "chapter_id": chapter_id,
             "title": title,
-            "content": content[:5000],  # Store first 5000 chars
+            "content": content[:self.PREVIEW_CHARS],
             "file_url": file_url,
             "file_name": filename,
+            "file_id": shared["id"],
             "visibility": visibility,
             "approval_status": approval_status,
             "uploaded_by": user_id,
@@ -75,23 +683,24 @@ class UploadService:
             note_data["approved_by"] = user_id
             note_data["approved_at"] = datetime.utcnow().isoformat()
         
-        response = db.table("notes").insert(note_data).execute()
+        response = returning(db.table("notes").insert(note_data), "id, created_at").execute()
         
         # If teacher uploaded or private, add to vector DB immediately
         if approval_status == "approved" and visibility == "public":
             from app.services.vector_service import vector_service
-            vector_service.add_note_embedding(
+            await vector_service.add_note_embedding(
                 db=db,
                 note_id=response.data[0]['id'],
                 title=title,
-                content=content
+                content=content,
+                file_id=shared["id"]
             )
         
         return NoteUploadResponse(
             id=response.data[0]['id'],
             chapter_id=chapter_id,
             title=title,
-            content=content[:500],  # Return preview
+            content=content[:self.PREVIEW_CHARS],  # Return preview
             file_url=file_url,
             file_name=filename,
             visibility=visibility,
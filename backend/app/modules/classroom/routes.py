@@ -1,5 +1,5 @@
-from fastapi import APIRouter, Depends, HTTPException
-from app.modules.classroom.schemas import ClassroomCreate, ClassroomJoin, ClassroomResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from app.modules.classroom.schemas import ClassroomCreate, ClassroomJoin, ClassroomResponse, RosterImport, RosterImportResponse, MAX_ROSTER_ROWS, MAX_ROSTER_CSV_BYTES
 from app.modules.classroom.service import classroom_service
 from app.core.auth import get_current_user, CurrentUser
 from app.core.permissions import require_teacher
@@ -61,6 +61,64 @@ async def list_classrooms(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/{classroom_id}/roster", response_model=RosterImportResponse)
+async def import_roster(
+    classroom_id: str,
+    roster: RosterImport,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """Add students to classroom by email list (classroom creator only)"""
+    require_teacher(current_user)
+    
+    try:
+        return await classroom_service.import_roster(
+            db, current_user.user_id, classroom_id, roster.emails
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/{classroom_id}/roster/csv", response_model=RosterImportResponse)
+async def import_roster_csv(
+    classroom_id: str,
+    file: UploadFile = File(...),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """
+    Add students to classroom from a CSV file (classroom creator only)
+    
+    Uses the `email` column if present, otherwise the first column
+    """
+    require_teacher(current_user)
+    
+    data = await file.read(MAX_ROSTER_CSV_BYTES + 1)
+    if len(data) > MAX_ROSTER_CSV_BYTES:
+        raise HTTPException(status_code=413, detail=f"Roster CSV is larger than {MAX_ROSTER_CSV_BYTES} bytes")
+    
+    emails = classroom_service.parse_roster_csv(data)
+    if not emails:
+        raise HTTPException(status_code=400, detail="No emails found in CSV")
+    if len(emails) > MAX_ROSTER_ROWS:
+        raise HTTPException(status_code=413, detail="Roster has too many rows")
+    
+    try:
+        return await classroom_service.import_roster(
+            db, current_user.user_id, classroom_id, emails
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except LookupError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.delete("/{classroom_id}")
 async def delete_classroom(
     classroom_id: str,
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
 
 
 class ClassroomCreate(BaseModel):
@@ -20,6 +20,7 @@ class ChapterResponse(BaseModel):
     name: str
     description: Optional[str]
     created_at: str
+    note_count: Optional[int] = 0
     
     class Config:
         from_attributes = True
@@ -32,6 +33,8 @@ class SubjectResponse(BaseModel):
     name: str
     description: Optional[str]
     created_at: str
+    pending_note_count: Optional[int] = 0
+    unanswered_question_count: Optional[int] = 0
     chapters: Optional[List[ChapterResponse]] = []
     
     class Config:
@@ -59,3 +62,28 @@ class SubjectCreate(BaseModel):
     classroom_id: str
     name: str
     description: Optional[str] = None
+
+
+MAX_ROSTER_ROWS = 5000
+MAX_ROSTER_CSV_BYTES = 1024 * 1024
+
+
+class RosterImport(BaseModel):
+    """Schema for bulk roster import (JSON)"""
+    emails: List[str] = Field(..., min_length=1, max_length=MAX_ROSTER_ROWS)
+
+
+class RosterRowResult(BaseModel):
+    """Outcome for one roster row"""
+    email: str
+    status: Literal['added', 'already_member', 'not_found', 'not_student', 'invalid_email', 'duplicate']
+    user_id: Optional[str] = None
+
+
+class RosterImportResponse(BaseModel):
+    """Schema for bulk roster import result"""
+    classroom_id: str
+    added: int
+    already_member: int
+    failed: int
+    results: List[RosterRowResult]
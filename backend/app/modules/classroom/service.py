@@ -1,7 +1,35 @@
 from supabase import Client
-from app.modules.classroom.schemas import ClassroomCreate, ClassroomResponse
+from app.modules.classroom.schemas import ClassroomCreate, ClassroomResponse, RosterImportResponse, RosterRowResult
 from app.utils.helpers import generate_classroom_code
 from datetime import datetime
+import csv
+import io
+import re
+
+
+# Classroom -> subjects -> chapters with trigger-maintained counters
+# (see 003_counters.sql), loaded in a single PostgREST query
+SUBJECT_TREE_SELECT = (
+    "*, subject_counters(pending_notes, unanswered_questions), "
+    "teacher_access(teacher_id), "
+    "chapters(*, chapter_counters(note_count))"
+)
+CLASSROOM_TREE_SELECT = (
+    "*, users!created_by(name), classroom_counters(member_count), "
+    f"subjects({SUBJECT_TREE_SELECT})"
+)
+
+
+EMAIL_PATTERN = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def embedded_counter(embed, field: str) -> int:
+    """Read a field from a one-to-one embed (object, one-item list or null)"""
+    if isinstance(embed, list):
+        embed = embed[0] if embed else None
+    if not embed:
+        return 0
+    return embed.get(field) or 0
 
 
 class ClassroomService:
@@ -32,37 +60,24 @@ class ClassroomService:
         user_id: str,
         code: str
     ) -> ClassroomResponse:
-        """Join classroom via code (student)"""
-        # Find classroom by code
-        classroom_response = db.table("classrooms")\
-            .select("*")\
-            .eq("code", code)\
-            .execute()
-        
-        if not classroom_response.data:
-            raise Exception("Invalid classroom code")
-        
-        classroom_id = classroom_response.data[0]['id']
-        
-        # Check if already a member
-        existing = db.table("classroom_members")\
-            .select("id")\
-            .eq("classroom_id", classroom_id)\
-            .eq("user_id", user_id)\
-            .execute()
-        
-        if existing.data:
-            raise Exception("Already a member of this classroom")
+        """
+        Join classroom via code (student)
         
-        # Add member
-        db.table("classroom_members").insert({
-            "classroom_id": classroom_id,
-            "user_id": user_id,
-            "joined_at": datetime.utcnow().isoformat()
+        Single round-trip: the join_classroom RPC looks up the code and
+        inserts the membership, relying on UNIQUE(classroom_id, user_id)
+        """
+        response = db.rpc("join_classroom", {
+            "p_code": code,
+            "p_user_id": user_id
         }).execute()
         
+        result = response.data
+        if result['status'] == "not_found":
+            raise Exception("Invalid classroom code")
+        if result['status'] == "already_member":
+            raise Exception("Already a member of this classroom")
         
-        return ClassroomResponse(**classroom_response.data[0])
+        return ClassroomResponse(**result['classroom'])
     
     async def list_classrooms(
         self,
@@ -75,105 +90,178 @@ class ClassroomService:
         
         - Students: joined classrooms
         - Teachers: created + assigned classrooms
+        
+        The subject/chapter tree and its counters come back embedded in the
+        classroom query, so the number of round-trips no longer grows with
+        the number of subjects and chapters.
         """
         if role == "student":
-            # Get classrooms where user is a member
-            # We want to fetch the classroom details AND the creator's name (which is on the classroom table)
             response = db.table("classroom_members")\
-                .select("classrooms!inner(*, users!created_by(name))")\
+                .select(f"classrooms!inner({CLASSROOM_TREE_SELECT})")\
                 .eq("user_id", user_id)\
                 .execute()
             
-            classrooms = []
-            for item in response.data:
-                classroom = item['classrooms']
-                # Map creator name from the nested inner join on classrooms
-                if 'users' in classroom and classroom['users']:
-                     classroom['creator_name'] = classroom['users']['name']
-                     del classroom['users'] # Clean up to match schema
-                
-                # Fetch subjects for this classroom
-                subjects_res = db.table("subjects")\
-                    .select("*")\
-                    .eq("classroom_id", classroom['id'])\
-                    .execute()
-                
-                # Fetch chapters for each subject
-                subjects_with_chapters = []
-                for subject in subjects_res.data:
-                    chapters_res = db.table("chapters")\
-                        .select("*")\
-                        .eq("subject_id", subject['id'])\
-                        .execute()
-                    subject['chapters'] = chapters_res.data
-                    subjects_with_chapters.append(subject)
-                
-                classroom['subjects'] = subjects_with_chapters
-                classrooms.append(ClassroomResponse(**classroom))
-            
-            return classrooms
+            return [self.build_classroom(item['classrooms']) for item in response.data]
         
         else:  # teacher
             # Get classrooms created by teacher
             created = db.table("classrooms")\
-                .select("*")\
+                .select(CLASSROOM_TREE_SELECT)\
                 .eq("created_by", user_id)\
                 .execute()
             
+            classroom_map = {c['id']: self.build_classroom(c) for c in created.data}
+            
             # Get classrooms where teacher has subject access
             assigned = db.table("teacher_access")\
-                .select("subjects!inner(classrooms!inner(*))")\
+                .select("subjects!inner(classroom_id)")\
                 .eq("teacher_id", user_id)\
                 .execute()
             
-            classroom_map = {}
+            assigned_ids = {
+                item['subjects']['classroom_id'] for item in assigned.data
+            } - set(classroom_map)
             
-            # Add created classrooms
-            for c in created.data:
-                # Fetch subjects for this classroom
-                subjects_res = db.table("subjects")\
-                    .select("*")\
-                    .eq("classroom_id", c['id'])\
+            if assigned_ids:
+                assigned_classrooms = db.table("classrooms")\
+                    .select(CLASSROOM_TREE_SELECT)\
+                    .in_("id", list(assigned_ids))\
                     .execute()
-                
-                # Fetch chapters for each subject
-                subjects_with_chapters = []
-                for subject in subjects_res.data:
-                    chapters_res = db.table("chapters")\
-                        .select("*")\
-                        .eq("subject_id", subject['id'])\
-                        .execute()
-                    subject['chapters'] = chapters_res.data
-                    subjects_with_chapters.append(subject)
-                
-                c['subjects'] = subjects_with_chapters
-                classroom_map[c['id']] = ClassroomResponse(**c)
-            
-            # Add assigned classrooms
-            for item in assigned.data:
-                classroom = item['subjects']['classrooms']
-                if classroom['id'] not in classroom_map:
-                    # Fetch subjects for this classroom
-                    subjects_res = db.table("subjects")\
-                        .select("*")\
-                        .eq("classroom_id", classroom['id'])\
-                        .execute()
-                    
-                    # Fetch chapters for each subject
-                    subjects_with_chapters = []
-                    for subject in subjects_res.data:
-                        chapters_res = db.table("chapters")\
-                            .select("*")\
-                            .eq("subject_id", subject['id'])\
-                            .execute()
-                        subject['chapters'] = chapters_res.data
-                        subjects_with_chapters.append(subject)
-                    
-                    classroom['subjects'] = subjects_with_chapters
-                    classroom_map[classroom['id']] = ClassroomResponse(**classroom)
+                for c in assigned_classrooms.data:
+                    classroom_map[c['id']] = self.build_classroom(c)
             
             return list(classroom_map.values())
 
+    def build_classroom(self, classroom: dict) -> ClassroomResponse:
+        """Build a ClassroomResponse from a row selected with CLASSROOM_TREE_SELECT"""
+        creator = classroom.pop('users', None)
+        if creator:
+            classroom['creator_name'] = creator['name']
+        
+        classroom['member_count'] = embedded_counter(
+            classroom.pop('classroom_counters', None), 'member_count'
+        )
+        classroom['subjects'] = [
+            self.build_subject(subject) for subject in classroom.get('subjects') or []
+        ]
+        return ClassroomResponse(**classroom)
+
+    def build_subject(self, subject: dict) -> dict:
+        """Flatten counter embeds of a subject row (and its chapters)"""
+        counters = subject.pop('subject_counters', None)
+        subject.pop('teacher_access', None)
+        subject.pop('classrooms', None)
+        subject['pending_note_count'] = embedded_counter(counters, 'pending_notes')
+        subject['unanswered_question_count'] = embedded_counter(counters, 'unanswered_questions')
+        
+        chapters = []
+        for chapter in subject.get('chapters') or []:
+            chapter['note_count'] = embedded_counter(
+                chapter.pop('chapter_counters', None), 'note_count'
+            )
+            chapters.append(chapter)
+        subject['chapters'] = chapters
+        return subject
+
+    async def import_roster(
+        self,
+        db: Client,
+        user_id: str,
+        classroom_id: str,
+        emails: list[str]
+    ) -> RosterImportResponse:
+        """
+        Add many students to a classroom (classroom creator only)
+        
+        Users are resolved with batched `in_` lookups and memberships are
+        inserted in one ON CONFLICT DO NOTHING upsert, so existing members
+        are reported instead of failing the import.
+        """
+        classroom = db.table("classrooms")\
+            .select("created_by")\
+            .eq("id", classroom_id)\
+            .execute()
+        
+        if not classroom.data:
+            raise LookupError("Classroom not found")
+        if classroom.data[0]['created_by'] != user_id:
+            raise PermissionError("Only the classroom creator can import a roster")
+        
+        # Validate and de-duplicate rows, keeping input order for the report
+        results: list[RosterRowResult] = []
+        pending: dict[str, RosterRowResult] = {}
+        for raw in emails:
+            email = raw.strip()
+            key = email.lower()
+            if not EMAIL_PATTERN.match(email):
+                results.append(RosterRowResult(email=email, status="invalid_email"))
+            elif key in pending:
+                results.append(RosterRowResult(email=email, status="duplicate"))
+            else:
+                row = RosterRowResult(email=email, status="not_found")
+                pending[key] = row
+                results.append(row)
+        
+        # Resolve users, ignoring case (emails are stored as registered)
+        users = db.rpc("find_users_by_email", {"p_emails": list(pending)}).execute().data if pending else []
+        
+        members = []
+        for user in users or []:
+            row = pending.get(user['email'].lower())
+            if not row:
+                continue
+            row.user_id = user['id']
+            if user['role'] != "student":
+                row.status = "not_student"
+            else:
+                row.status = "already_member"  # Until the insert says otherwise
+                members.append({
+                    "classroom_id": classroom_id,
+                    "user_id": user['id'],
+                    "joined_at": datetime.utcnow().isoformat()
+                })
+        
+        # Insert memberships; conflicting rows are skipped and not returned
+        if members:
+            inserted = db.table("classroom_members")\
+                .upsert(members, on_conflict="classroom_id,user_id", ignore_duplicates=True)\
+                .execute()
+            inserted_ids = {m['user_id'] for m in inserted.data or []}
+            for row in pending.values():
+                if row.user_id in inserted_ids:
+                    row.status = "added"
+        
+        added = sum(1 for r in results if r.status == "added")
+        already_member = sum(1 for r in results if r.status == "already_member")
+        return RosterImportResponse(
+            classroom_id=classroom_id,
+            added=added,
+            already_member=already_member,
+            failed=len(results) - added - already_member,
+            results=results
+        )
+
+    def parse_roster_csv(self, file_bytes: bytes) -> list[str]:
+        """
+        Extract emails from a roster CSV
+        
+        Uses the `email` column when a header row has one, otherwise the
+        first column. Blank rows are skipped.
+        """
+        text = file_bytes.decode('utf-8-sig', errors='replace')
+        rows = [row for row in csv.reader(io.StringIO(text)) if any(cell.strip() for cell in row)]
+        if not rows:
+            return []
+        
+        header = [cell.strip().lower() for cell in rows[0]]
+        if "email" in header:
+            column = header.index("email")
+            rows = rows[1:]
+        else:
+            column = 0
+        
+        return [row[column] for row in rows if len(row) > column and row[column].strip()]
+
     async def delete_classroom(
         self,
         db: Client,
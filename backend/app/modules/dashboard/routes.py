@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from app.modules.dashboard.schemas import TeacherDashboardResponse
+from app.modules.dashboard.schemas import TeacherDashboardResponse, TeacherDashboardCounts
 from app.modules.dashboard.service import dashboard_service
 from app.core.auth import get_current_user, CurrentUser
 from app.core.permissions import require_teacher
@@ -27,3 +27,22 @@ async def get_teacher_dashboard(
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/teacher/counts", response_model=TeacherDashboardCounts)
+async def get_teacher_dashboard_counts(
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_admin_db)
+):
+    """
+    Get pending-note and unanswered-question badge counts
+    without loading the item lists
+    """
+    require_teacher(current_user)
+    
+    try:
+        return await dashboard_service.get_teacher_dashboard_counts(
+            db, current_user.user_id
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
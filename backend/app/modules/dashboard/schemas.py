@@ -32,3 +32,10 @@ class TeacherDashboardResponse(BaseModel):
     accessed_classrooms: List[ClassroomResponse]
     pending_notes: List[PendingNote]
     pending_questions: List[PendingQuestion]
+    pending_note_count: int = 0
+    pending_question_count: int = 0
+
+class TeacherDashboardCounts(BaseModel):
+    """Badge counts from trigger-maintained counters"""
+    pending_note_count: int
+    pending_question_count: int
@@ -1,7 +1,8 @@
 from supabase import Client
-from app.modules.dashboard.schemas import TeacherDashboardResponse, PendingNote, PendingQuestion
-from app.modules.classroom.service import classroom_service
+from app.modules.dashboard.schemas import TeacherDashboardResponse, TeacherDashboardCounts, PendingNote, PendingQuestion
+from app.modules.classroom.service import classroom_service, CLASSROOM_TREE_SELECT, SUBJECT_TREE_SELECT
 from app.modules.classroom.schemas import ClassroomResponse
+from app.modules.chapter.notes.service import PENDING_NOTE_SELECT
 
 class DashboardService:
     """Dashboard aggregator service"""
@@ -13,135 +14,36 @@ class DashboardService:
     ) -> TeacherDashboardResponse:
         """
         Get all dashboard data for a teacher in one go.
-        1. List all classrooms (created + assigned)
-        2. Find all pending notes in those classrooms
-        3. Find all unanswered questions in those classrooms
+        1. List all classrooms (created + assigned) with counters
+        2. Find all pending notes in the subjects this teacher handles
+        3. Find all unanswered questions in the subjects this teacher handles
         """
         
         # 1. Get Classrooms (Split into Created and Accessed)
-        # Use classroom service to get separate lists or filter here. 
-        # Ideally, we refactor classroom_service.list_classrooms to return structured data, 
-        # but for now, let's just fetch them here or use the existing list_classrooms and split.
+        created_classrooms, accessed_classrooms, visible_subject_ids = \
+            self._load_teacher_classrooms(db, teacher_id)
         
-        # Actually, list_classrooms for teacher returns a flat list of all visible classrooms.
-        # Let's get them and split manually, BUT we need to handle subject filtering for accessed classrooms.
-        
-        # created_classrooms query
-        created_res = db.table("classrooms")\
-            .select("*")\
-            .eq("created_by", teacher_id)\
-            .execute()
-            
-        created_classrooms = []
-        for c in created_res.data:
-            # Fetch ALL subjects for created classrooms
-            subjects_res = db.table("subjects")\
-                .select("*")\
-                .eq("classroom_id", c['id'])\
-                .execute()
-            
-            # Fetch chapters for each subject
-            subjects_with_chapters = []
-            for subject in subjects_res.data:
-                chapters_res = db.table("chapters")\
-                    .select("*")\
-                    .eq("subject_id", subject['id'])\
-                    .execute()
-                subject['chapters'] = chapters_res.data
-                subjects_with_chapters.append(subject)
-            
-            c['subjects'] = subjects_with_chapters
-            created_classrooms.append(ClassroomResponse(**c))
-
-        # accessed_classrooms query (via teacher_access)
-        accessed_res = db.table("teacher_access")\
-            .select("subjects!inner(classrooms!inner(*), *)")\
-            .eq("teacher_id", teacher_id)\
-            .execute()
-            
-        accessed_classroom_map = {}
-        
-        for item in accessed_res.data:
-            classroom = item['subjects']['classrooms']
-            subject = item['subjects']
-            
-            # Remove circular classroom ref from subject dict if present to cleanly serialise
-            if 'classrooms' in subject:
-                del subject['classrooms']
-
-            if classroom['id'] not in accessed_classroom_map:
-                # Initialize classroom with empty subjects list
-                classroom['subjects'] = []
-                accessed_classroom_map[classroom['id']] = classroom
-            
-            # Fetch chapters for this SPECIFIC subject
-            chapters_res = db.table("chapters")\
-                .select("*")\
-                .eq("subject_id", subject['id'])\
-                .execute()
-            subject['chapters'] = chapters_res.data
-            
-            # Add this subject to the classroom
-            # Check if subject already added (assigned multiple times? shouldn't happen but good to be safe)
-            existing_ids = [s['id'] for s in accessed_classroom_map[classroom['id']]['subjects']]
-            if subject['id'] not in existing_ids:
-                accessed_classroom_map[classroom['id']]['subjects'].append(subject)
-        
-        accessed_classrooms = [ClassroomResponse(**c) for c in accessed_classroom_map.values()]
-        
-        # Combine for pending items queries (we still want to show pending items for all visible contexts)
-        assigned_subject_ids = [item['subjects']['id'] for item in accessed_res.data]
+        pending_note_count, pending_question_count = self._count_pending(
+            created_classrooms + accessed_classrooms, visible_subject_ids
+        )
         
-        # Pending Notes Query
-        pending_notes_res = db.table("notes")\
-            .select("*, uploaded_by, users!uploaded_by(name), chapters!inner(name, id, subject_id, subjects!inner(classroom_id, classrooms!inner(created_by)))")\
-            .eq("approval_status", "pending")\
-            .execute()
-            
-        # Helper to get subjects with ANY assigned teacher
-        # We need to know if a subject has an assigned teacher to decide if Creator should see it.
-        # IF a subject has assigned teachers, Creator does NOT see pending notes (delegated).
-        # IF no assigned teachers, Creator sees it.
-        # Assigned teachers ALWAYS see it (checked via is_assigned).
-
-        # Collect all subject IDs from pending notes to batch query
-        pending_subject_ids = set()
-        for n in pending_notes_res.data:
-            pending_subject_ids.add(n['chapters']['subject_id'])
-            
-        # Query teacher_access to see which subjects have assignments
-        # We just need "subject_id" distinct list from teacher_access where subject_id IN pending_subject_ids
-        subjects_with_teachers = set()
-        if pending_subject_ids:
-            has_teacher_res = db.table("teacher_access")\
-                .select("subject_id")\
-                .in_("subject_id", list(pending_subject_ids))\
-                .execute()
-            subjects_with_teachers = {item['subject_id'] for item in has_teacher_res.data}
-
+        # Visibility (assigned teacher, or creator when nobody is assigned)
+        # is already resolved into visible_subject_ids, so both lists are
+        # filtered by the database instead of in Python.
         final_pending_notes = []
-        for n in pending_notes_res.data:
-            chapter = n['chapters']
-            subject_id = chapter['subject_id']
-            classroom = chapter['subjects']['classrooms']
-            
-            # Check access
-            is_creator = classroom['created_by'] == teacher_id
-            is_assigned = subject_id in assigned_subject_ids
-            has_assigned_teacher = subject_id in subjects_with_teachers
-            
-            # SHOW IF: 
-            # 1. I am the assigned teacher (High priority)
-            # 2. I am the creator AND no one else is assigned (Fallback)
-            
-            if is_assigned:
-                should_show = True
-            elif is_creator and not has_assigned_teacher:
-                should_show = True
-            else:
-                should_show = False
+        final_pending_questions = []
+        if visible_subject_ids:
+            subject_ids = list(visible_subject_ids)
+            
+            # Pending Notes Query
+            pending_notes_res = db.table("notes")\
+                .select(PENDING_NOTE_SELECT)\
+                .eq("approval_status", "pending")\
+                .in_("chapters.subject_id", subject_ids)\
+                .execute()
             
-            if should_show:
+            for n in pending_notes_res.data:
+                chapter = n['chapters']
                 final_pending_notes.append(PendingNote(
                     id=n['id'],
                     title=n['title'],
@@ -155,51 +57,16 @@ class DashboardService:
                     file_url=n.get('file_url'),
                     file_name=n.get('file_name')
                 ))
-                
-        # Unanswered Questions Query
-        unanswered_q_res = db.table("questions")\
-            .select("*, user_id, users!user_id(name), chapters!inner(name, id, subject_id, subjects!inner(classroom_id, classrooms!inner(created_by)))")\
-            .is_("answer", "null")\
-            .execute()
-            
-        # Collect subject IDs from unanswered questions to check for assigned teachers
-        question_subject_ids = set()
-        for q in unanswered_q_res.data:
-            question_subject_ids.add(q['chapters']['subject_id'])
             
-        # Query which subjects have assigned teachers
-        subjects_with_teachers_q = set()
-        if question_subject_ids:
-            has_teacher_res_q = db.table("teacher_access")\
-                .select("subject_id")\
-                .in_("subject_id", list(question_subject_ids))\
+            # Unanswered Questions Query
+            unanswered_q_res = db.table("questions")\
+                .select("*, user_id, users!user_id(name), chapters!inner(name, id, subject_id)")\
+                .is_("answer", "null")\
+                .in_("chapters.subject_id", subject_ids)\
                 .execute()
-            subjects_with_teachers_q = {item['subject_id'] for item in has_teacher_res_q.data}
-            
-        final_pending_questions = []
-        for q in unanswered_q_res.data:
-            chapter = q['chapters']
-            subject_id = chapter['subject_id']
-            subject = chapter['subjects']
-            classroom = subject['classrooms']
-            
-            # Check access (same logic as pending notes)
-            is_creator = classroom['created_by'] == teacher_id
-            is_assigned = subject_id in assigned_subject_ids
-            has_assigned_teacher = subject_id in subjects_with_teachers_q
-            
-            # SHOW IF: 
-            # 1. I am the assigned teacher (High priority)
-            # 2. I am the creator AND no one else is assigned (Fallback)
             
-            if is_assigned:
-                should_show = True
-            elif is_creator and not has_assigned_teacher:
-                should_show = True
-            else:
-                should_show = False
-            
-            if should_show:
+            for q in unanswered_q_res.data:
+                chapter = q['chapters']
                 final_pending_questions.append(PendingQuestion(
                     id=q['id'],
                     title=q['title'],
@@ -216,8 +83,103 @@ class DashboardService:
             created_classrooms=created_classrooms,
             accessed_classrooms=accessed_classrooms,
             pending_notes=final_pending_notes,
-            pending_questions=final_pending_questions
+            pending_questions=final_pending_questions,
+            pending_note_count=pending_note_count,
+            pending_question_count=pending_question_count
+        )
+
+    async def get_teacher_dashboard_counts(
+        self,
+        db: Client,
+        teacher_id: str
+    ) -> TeacherDashboardCounts:
+        """Badge counts only, read from the counters embedded in the classroom tree"""
+        created_classrooms, accessed_classrooms, visible_subject_ids = \
+            self._load_teacher_classrooms(db, teacher_id)
+        
+        pending_note_count, pending_question_count = self._count_pending(
+            created_classrooms + accessed_classrooms, visible_subject_ids
+        )
+        
+        return TeacherDashboardCounts(
+            pending_note_count=pending_note_count,
+            pending_question_count=pending_question_count
         )
 
+    def _load_teacher_classrooms(
+        self,
+        db: Client,
+        teacher_id: str
+    ) -> tuple[list[ClassroomResponse], list[ClassroomResponse], set[str]]:
+        """
+        Load created and accessed classroom trees (with counters) in two queries
+        
+        Returns created classrooms, accessed classrooms (assigned subjects only)
+        and the subject IDs whose pending items this teacher should handle:
+        1. Subjects the teacher is assigned to (High priority)
+        2. Subjects of created classrooms with no assigned teacher (Fallback)
+        """
+        visible_subject_ids = set()
+        
+        # created_classrooms query (ALL subjects)
+        created_res = db.table("classrooms")\
+            .select(CLASSROOM_TREE_SELECT)\
+            .eq("created_by", teacher_id)\
+            .execute()
+        
+        created_classrooms = []
+        for c in created_res.data:
+            for subject in c.get('subjects') or []:
+                if not subject.get('teacher_access'):
+                    visible_subject_ids.add(subject['id'])
+            created_classrooms.append(classroom_service.build_classroom(c))
+
+        # accessed_classrooms query (via teacher_access, assigned subjects only)
+        accessed_res = db.table("teacher_access")\
+            .select(
+                f"subjects!inner({SUBJECT_TREE_SELECT}, "
+                "classrooms!inner(*, users!created_by(name), classroom_counters(member_count)))"
+            )\
+            .eq("teacher_id", teacher_id)\
+            .execute()
+            
+        accessed_classroom_map = {}
+        
+        for item in accessed_res.data:
+            subject = item['subjects']
+            classroom = subject.pop('classrooms')
+            visible_subject_ids.add(subject['id'])
+
+            if classroom['id'] not in accessed_classroom_map:
+                classroom['subjects'] = []
+                accessed_classroom_map[classroom['id']] = classroom
+            
+            # Check if subject already added (assigned multiple times? shouldn't happen but good to be safe)
+            existing_ids = [s['id'] for s in accessed_classroom_map[classroom['id']]['subjects']]
+            if subject['id'] not in existing_ids:
+                accessed_classroom_map[classroom['id']]['subjects'].append(subject)
+        
+        accessed_classrooms = [
+            classroom_service.build_classroom(c) for c in accessed_classroom_map.values()
+        ]
+        
+        return created_classrooms, accessed_classrooms, visible_subject_ids
+
+    def _count_pending(
+        self,
+        classrooms: list[ClassroomResponse],
+        visible_subject_ids: set[str]
+    ) -> tuple[int, int]:
+        """Sum subject counters over the visible subjects (each counted once)"""
+        subjects = {
+            subject.id: subject
+            for classroom in classrooms
+            for subject in classroom.subjects or []
+            if subject.id in visible_subject_ids
+        }
+        pending_notes = sum(s.pending_note_count or 0 for s in subjects.values())
+        pending_questions = sum(s.unanswered_question_count or 0 for s in subjects.values())
+        return pending_notes, pending_questions
+
 # Global instance
 dashboard_service = DashboardService()
@@ -0,0 +1,69 @@
+from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
+from app.modules.events.schemas import EventStatsResponse
+from app.services.event_hub import event_hub
+from app.core.auth import get_current_user, CurrentUser
+from app.core.permissions import require_teacher
+from app.core.config import settings
+import asyncio
+import json
+
+
+router = APIRouter(prefix="/events", tags=["Events"])
+
+
+@router.get("/stream")
+async def stream_events(
+    request: Request,
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """
+    Server-Sent Events stream of the current user's events
+
+    Event types:
+    - announcement.created: new announcement in one of the user's classrooms
+    - question.answered: one of the user's questions was answered
+    - note.approved / note.rejected: one of the user's notes was moderated
+    - resync: the client fell behind; refetch lists and reconnect
+    """
+    subscription = event_hub.subscribe(current_user.user_id)
+
+    async def event_source():
+        try:
+            yield ": connected\n\n"
+            while True:
+                if await request.is_disconnected():
+                    break
+                if subscription.lagging:
+                    yield "event: resync\ndata: {}\n\n"
+                    break
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.EVENTS_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Keep proxies from closing an idle connection
+                    yield ": heartbeat\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            event_hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_source(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"
+        }
+    )
+
+
+@router.get("/stats", response_model=EventStatsResponse)
+async def get_event_stats(
+    current_user: CurrentUser = Depends(get_current_user)
+):
+    """Connection metrics for this worker (teacher only)"""
+    require_teacher(current_user)
+    return EventStatsResponse(**event_hub.stats())
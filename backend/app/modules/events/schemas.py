@@ -0,0 +1,12 @@
+from pydantic import BaseModel
+
+
+class EventStatsResponse(BaseModel):
+    """Schema for event hub connection metrics (per worker)"""
+    connections: int
+    connected_users: int
+    published: int
+    delivered: int
+    dropped: int
+    disconnected_slow: int
+    cross_worker: bool
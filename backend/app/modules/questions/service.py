@@ -1,8 +1,15 @@
 from supabase import Client
 from app.modules.questions.schemas import QuestionResponse
+from app.services.event_hub import event_hub
+from app.core.supabase import returning
 from datetime import datetime
 
 
+# Question row with asker/answerer names, used by reads and by writes
+# (via returning) so every path builds the same QuestionResponse
+QUESTION_SELECT = "*, author:users!questions_user_id_fkey(name), answerer:users!questions_answered_by_fkey(name)"
+
+
 class QuestionService:
     """Question management service"""
     
@@ -28,19 +35,8 @@ class QuestionService:
         
         # Construct response directly from insert result + known user info
         question = response.data[0]
-        return QuestionResponse(
-            id=question['id'],
-            chapter_id=question['chapter_id'],
-            user_id=question['user_id'],
-            title=question['title'],
-            content=question['content'],
-            is_private=question['is_private'],
-            answer=None,
-            answered_by=None,
-            answered_at=None,
-            created_at=question['created_at'],
-            user_name=user_name
-        )
+        question['author'] = {'name': user_name}
+        return self._build_question_response(question)
     
     async def list_questions(
         self,
@@ -56,7 +52,7 @@ class QuestionService:
         - Teachers: all questions
         """
         query = db.table("questions")\
-            .select("*, author:users!questions_user_id_fkey(name), answerer:users!questions_answered_by_fkey(name)")\
+            .select(QUESTION_SELECT)\
             .eq("chapter_id", chapter_id)
         
         if role == "student":
@@ -65,22 +61,7 @@ class QuestionService:
         
         response = query.execute()
         
-        questions = []
-        for q in response.data:
-            questions.append(QuestionResponse(
-                id=q['id'],
-                chapter_id=q['chapter_id'],
-                user_id=q['user_id'],
-                title=q['title'],
-                content=q['content'],
-                is_private=q['is_private'],
-                answer=q.get('answer'),
-                answered_by=q.get('answered_by'),
-                answered_at=q.get('answered_at'),
-                created_at=q['created_at'],
-                user_name=q.get('author', {}).get('name') if q.get('author') else 'Unknown User',
-                answerer_name=q.get('answerer', {}).get('name') if q.get('answerer') else None
-            ))
+        questions = [self._build_question_response(q) for q in response.data]
         
         return questions
 
@@ -91,28 +72,13 @@ class QuestionService:
     ) -> list[QuestionResponse]:
         """List public answered questions for community view"""
         response = db.table("questions")\
-            .select("*, author:users!questions_user_id_fkey(name), answerer:users!questions_answered_by_fkey(name)")\
+            .select(QUESTION_SELECT)\
             .eq("chapter_id", chapter_id)\
             .eq("is_private", False)\
             .not_.is_("answer", "null")\
             .execute()
             
-        questions = []
-        for q in response.data:
-            questions.append(QuestionResponse(
-                id=q['id'],
-                chapter_id=q['chapter_id'],
-                user_id=q['user_id'],
-                title=q['title'],
-                content=q['content'],
-                is_private=q['is_private'],
-                answer=q.get('answer'),
-                answered_by=q.get('answered_by'),
-                answered_at=q.get('answered_at'),
-                created_at=q['created_at'],
-                user_name=q.get('author', {}).get('name') if q.get('author') else 'Unknown User',
-                answerer_name=q.get('answerer', {}).get('name') if q.get('answerer') else None
-            ))
+        questions = [self._build_question_response(q) for q in response.data]
         return questions
 
     async def list_user_questions(
@@ -122,27 +88,12 @@ class QuestionService:
     ) -> list[QuestionResponse]:
         """List all questions by user"""
         response = db.table("questions")\
-            .select("*, author:users!questions_user_id_fkey(name), answerer:users!questions_answered_by_fkey(name)")\
+            .select(QUESTION_SELECT)\
             .eq("user_id", user_id)\
             .order("created_at", desc=True)\
             .execute()
             
-        questions = []
-        for q in response.data:
-            questions.append(QuestionResponse(
-                id=q['id'],
-                chapter_id=q['chapter_id'],
-                user_id=q['user_id'],
-                title=q['title'],
-                content=q['content'],
-                is_private=q['is_private'],
-                answer=q.get('answer'),
-                answered_by=q.get('answered_by'),
-                answered_at=q.get('answered_at'),
-                created_at=q['created_at'],
-                user_name=q.get('author', {}).get('name') if q.get('author') else 'Unknown User',
-                answerer_name=q.get('answerer', {}).get('name') if q.get('answerer') else None
-            ))
+        questions = [self._build_question_response(q) for q in response.data]
         return questions
     
     async def answer_question(
@@ -152,21 +103,32 @@ class QuestionService:
         teacher_id: str,
         answer_content: str
     ) -> QuestionResponse:
-        """Answer question (teacher only)"""
-        response = db.table("questions").update({
-            "answer": answer_content,
-            "answered_by": teacher_id,
-            "answered_at": datetime.utcnow().isoformat()
-        }).eq("id", question_id).execute()
+        """
+        Answer question (teacher only)
         
-        # Fetch with user details
-        full_response = db.table("questions")\
-            .select("*, author:users!questions_user_id_fkey(name), answerer:users!questions_answered_by_fkey(name)")\
-            .eq("id", question_id)\
-            .single()\
-            .execute()
+        The update returns the joined row, so no re-read is needed
+        """
+        response = returning(
+            db.table("questions").update({
+                "answer": answer_content,
+                "answered_by": teacher_id,
+                "answered_at": datetime.utcnow().isoformat()
+            }).eq("id", question_id),
+            QUESTION_SELECT
+        ).execute()
+        
+        if not response.data:
+            raise Exception("Question not found")
+        
+        answered = self._build_question_response(response.data[0])
         
-        q = full_response.data
+        # Push to the asker's open connections
+        await event_hub.publish([answered.user_id], "question.answered", answered.model_dump())
+        
+        return answered
+
+    def _build_question_response(self, q: dict) -> QuestionResponse:
+        """Build QuestionResponse from a row selected with QUESTION_SELECT"""
         return QuestionResponse(
             id=q['id'],
             chapter_id=q['chapter_id'],
@@ -174,16 +136,15 @@ class QuestionService:
             title=q['title'],
             content=q['content'],
             is_private=q['is_private'],
-            answer=q['answer'],
-            answered_by=q['answered_by'],
-            answered_at=q['answered_at'],
+            answer=q.get('answer'),
+            answered_by=q.get('answered_by'),
+            answered_at=q.get('answered_at'),
             created_at=q['created_at'],
             user_name=q.get('author', {}).get('name') if q.get('author') else 'Unknown User',
             answerer_name=q.get('answerer', {}).get('name') if q.get('answerer') else None
         )
 
 
-
     def delete_question(
         self,
         db: Client,
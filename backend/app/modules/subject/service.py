@@ -111,25 +111,17 @@ class SubjectService:
         user_id: str,
         subject_id: str
     ) -> bool:
-        """Delete subject (classroom creator only)"""
-        # 1. Get subject's classroom creator
-        response = db.table("subjects")\
-            .select("classrooms!inner(created_by)")\
-            .eq("id", subject_id)\
-            .single()\
-            .execute()
-            
-        if not response.data:
-            return False
-            
-        creator_id = response.data['classrooms']['created_by']
+        """
+        Delete subject (classroom creator only)
         
-        if creator_id != user_id:
-            # Technically, could allow if user has DELETE access, but simplistic rule = owner only
-            return False
-            
-        db.table("subjects").delete().eq("id", subject_id).execute()
-        return True
+        Single round-trip: the ownership check is part of the DELETE
+        """
+        response = db.rpc("delete_subject", {
+            "p_subject_id": subject_id,
+            "p_user_id": user_id
+        }).execute()
+        
+        return response.data['status'] == "deleted"
 
 # Global instance
 subject_service = SubjectService()
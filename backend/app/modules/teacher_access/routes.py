@@ -1,5 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException
-from app.modules.teacher_access.schemas import TeacherAccessCreate, TeacherAccessResponse
+from app.modules.teacher_access.schemas import TeacherAccessCreate, TeacherAccessResponse, TeacherAccessBulkCreate, TeacherAccessBulkResponse
 from app.modules.teacher_access.service import teacher_access_service
 from app.core.auth import get_current_user, CurrentUser
 from app.core.permissions import require_teacher, check_subject_teacher_access
@@ -32,6 +32,29 @@ async def assign_teacher_to_subject(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/bulk", response_model=TeacherAccessBulkResponse)
+async def assign_teachers_bulk(
+    access_data: TeacherAccessBulkCreate,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Client = Depends(get_db)
+):
+    """Assign many teachers to many subjects of a classroom (teacher only)"""
+    require_teacher(current_user)
+    
+    try:
+        return await teacher_access_service.assign_teachers_bulk(
+            db,
+            current_user.user_id,
+            access_data.classroom_id,
+            access_data.subject_ids,
+            access_data.teacher_emails
+        )
+    except PermissionError as e:
+        raise HTTPException(status_code=403, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.get("/subject/{subject_id}", response_model=list[TeacherAccessResponse])
 async def list_subject_teachers(
     subject_id: str,
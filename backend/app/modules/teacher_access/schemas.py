@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from typing import Optional, Literal
 
 
 class TeacherAccessCreate(BaseModel):
@@ -18,3 +19,27 @@ class TeacherAccessResponse(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+class TeacherAccessBulkCreate(BaseModel):
+    """Schema for assigning many teachers to many subjects of a classroom"""
+    classroom_id: str
+    subject_ids: list[str] = Field(..., min_length=1, max_length=100)
+    teacher_emails: list[str] = Field(..., min_length=1, max_length=200)
+
+
+class TeacherAccessBulkRowResult(BaseModel):
+    """Outcome for one (teacher email, subject) pair"""
+    teacher_email: str
+    subject_id: str
+    status: Literal['assigned', 'already_assigned', 'unknown_email', 'subject_not_found']
+    teacher_id: Optional[str] = None
+    access_id: Optional[str] = None
+
+
+class TeacherAccessBulkResponse(BaseModel):
+    """Schema for bulk teacher assignment result"""
+    assigned: int
+    already_assigned: int
+    failed: int
+    results: list[TeacherAccessBulkRowResult]
@@ -1,5 +1,5 @@
 from supabase import Client
-from app.modules.teacher_access.schemas import TeacherAccessResponse
+from app.modules.teacher_access.schemas import TeacherAccessResponse, TeacherAccessBulkResponse, TeacherAccessBulkRowResult
 from datetime import datetime
 
 
@@ -12,43 +12,119 @@ class TeacherAccessService:
         subject_id: str,
         teacher_email: str
     ) -> TeacherAccessResponse:
-        """Assign teacher to subject"""
-        # Find teacher by email
-        teacher_response = db.table("users")\
-            .select("id, name, email")\
-            .eq("email", teacher_email)\
-            .eq("role", "teacher")\
-            .execute()
-        
-        if not teacher_response.data:
-            raise Exception("Teacher not found with this email")
-        
-        teacher = teacher_response.data[0]
+        """
+        Assign teacher to subject
         
-        # Check if already assigned
-        existing = db.table("teacher_access")\
-            .select("id")\
-            .eq("subject_id", subject_id)\
-            .eq("teacher_id", teacher['id'])\
-            .execute()
+        Single round-trip: the assign_teacher RPC resolves the email and
+        inserts the grant, relying on UNIQUE(subject_id, teacher_id)
+        """
+        response = db.rpc("assign_teacher", {
+            "p_subject_id": subject_id,
+            "p_teacher_email": teacher_email
+        }).execute()
         
-        if existing.data:
+        result = response.data
+        if result['status'] == "teacher_not_found":
+            raise Exception("Teacher not found with this email")
+        if result['status'] == "already_assigned":
             raise Exception("Teacher already has access to this subject")
         
-        # Create access
-        response = db.table("teacher_access").insert({
-            "subject_id": subject_id,
-            "teacher_id": teacher['id'],
-            "created_at": datetime.utcnow().isoformat()
-        }).execute()
-        
+        access = result['access']
+        teacher = result['teacher']
         return TeacherAccessResponse(
-            id=response.data[0]['id'],
-            subject_id=subject_id,
+            id=access['id'],
+            subject_id=access['subject_id'],
             teacher_id=teacher['id'],
             teacher_name=teacher['name'],
             teacher_email=teacher['email'],
-            created_at=response.data[0]['created_at']
+            created_at=access['created_at']
+        )
+    
+    async def assign_teachers_bulk(
+        self,
+        db: Client,
+        user_id: str,
+        classroom_id: str,
+        subject_ids: list[str],
+        teacher_emails: list[str]
+    ) -> TeacherAccessBulkResponse:
+        """
+        Assign many teachers to many subjects of one classroom
+        
+        Round-trips are fixed regardless of list sizes: subjects (with
+        existing grants), teachers by email, then one upsert that skips
+        existing (subject_id, teacher_id) grants.
+        """
+        subject_ids = list(dict.fromkeys(subject_ids))
+        # One entry per address whatever its casing, reported as first typed
+        emails: dict[str, str] = {}
+        for email in teacher_emails:
+            if email.strip():
+                emails.setdefault(email.strip().lower(), email.strip())
+        teacher_emails = list(emails.values())
+        
+        # Subjects of this classroom with their current grants
+        subjects_res = db.table("subjects")\
+            .select("id, classrooms!inner(created_by), teacher_access(teacher_id)")\
+            .eq("classroom_id", classroom_id)\
+            .in_("id", subject_ids)\
+            .execute()
+        
+        subjects = {s['id']: s for s in subjects_res.data}
+        for subject in subjects.values():
+            is_creator = subject['classrooms']['created_by'] == user_id
+            has_access = any(a['teacher_id'] == user_id for a in subject.get('teacher_access') or [])
+            if not (is_creator or has_access):
+                raise PermissionError(f"No access to subject {subject['id']}")
+        
+        # Teachers by email, ignoring case (emails are stored as registered)
+        users_res = db.rpc("find_users_by_email", {"p_emails": teacher_emails}).execute()
+        teachers = {u['email'].lower(): u for u in users_res.data or [] if u['role'] == "teacher"}
+        
+        results = []
+        rows = []
+        for email in teacher_emails:
+            teacher = teachers.get(email.lower())
+            for subject_id in subject_ids:
+                result = TeacherAccessBulkRowResult(
+                    teacher_email=email,
+                    subject_id=subject_id,
+                    status="already_assigned",
+                    teacher_id=teacher['id'] if teacher else None
+                )
+                if subject_id not in subjects:
+                    result.status = "subject_not_found"
+                elif not teacher:
+                    result.status = "unknown_email"
+                else:
+                    rows.append({
+                        "subject_id": subject_id,
+                        "teacher_id": teacher['id'],
+                        "created_at": datetime.utcnow().isoformat()
+                    })
+                results.append(result)
+        
+        # One set-based upsert; existing grants are skipped and not returned
+        if rows:
+            inserted = db.table("teacher_access")\
+                .upsert(rows, on_conflict="subject_id,teacher_id", ignore_duplicates=True)\
+                .execute()
+            inserted_ids = {
+                (a['subject_id'], a['teacher_id']): a['id'] for a in inserted.data or []
+            }
+            for result in results:
+                access_id = inserted_ids.get((result.subject_id, result.teacher_id))
+                if access_id:
+                    result.status = "assigned"
+                    result.access_id = access_id
+        
+        assigned = sum(1 for r in results if r.status == "assigned")
+        already_assigned = sum(1 for r in results if r.status == "already_assigned")
+        return TeacherAccessBulkResponse(
+            assigned=assigned,
+            already_assigned=already_assigned,
+            failed=len(results) - assigned - already_assigned,
+            results=results
         )
     
     async def list_subject_teachers(
@@ -57,31 +133,22 @@ class TeacherAccessService:
         subject_id: str
     ) -> list[TeacherAccessResponse]:
         """List all teachers assigned to subject"""
-        # First get all teacher access records for this subject
+        # Teacher details come embedded with each access record
         access_response = db.table("teacher_access")\
-            .select("*")\
+            .select("*, users(name, email)")\
             .eq("subject_id", subject_id)\
             .execute()
         
-        if not access_response.data:
-            return []
-        
         teachers = []
         for access in access_response.data:
-            # Get teacher details for each access record
-            teacher_response = db.table("users")\
-                .select("name, email")\
-                .eq("id", access['teacher_id'])\
-                .single()\
-                .execute()
-            
-            if teacher_response.data:
+            teacher = access.get('users')
+            if teacher:
                 teachers.append(TeacherAccessResponse(
                     id=access['id'],
                     subject_id=access['subject_id'],
                     teacher_id=access['teacher_id'],
-                    teacher_name=teacher_response.data['name'],
-                    teacher_email=teacher_response.data['email'],
+                    teacher_name=teacher['name'],
+                    teacher_email=teacher['email'],
                     created_at=access['created_at']
                 ))
         
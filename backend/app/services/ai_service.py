@@ -1,18 +1,10 @@
-import google.generativeai as genai
-from app.core.config import settings
-
-
-# Configure Gemini
-genai.configure(api_key=settings.GEMINI_API_KEY)
-from google.api_core import exceptions
-
+from app.core.circuit import circuits
+from app.core.metrics import track_llm_call, timed_stage
+from app.services.llm_provider import get_llm_provider, LLMRateLimitError
 
 
 class AIService:
-    """Gemini LLM interaction service"""
-    
-    def __init__(self):
-        self.model = genai.GenerativeModel('models/gemini-2.5-flash')
+    """LLM interaction service (Gemini, or the fake provider offline)"""
     
     async def generate_response(
         self,
@@ -22,7 +14,7 @@ class AIService:
         temperature: float = 0.7
     ) -> str:
         """
-        Generate AI response using Gemini
+        Generate AI response with the configured LLM provider
         
         Args:
             prompt: User question or prompt
@@ -35,16 +27,19 @@ class AIService:
         """
         full_prompt = f"{context}\n\nUser Question: {prompt}" if context else prompt
         
+        if not circuits.allow("llm"):
+            return "The AI assistant is temporarily unavailable. Please try again in a few minutes."
+        
         try:
-            response = await self.model.generate_content_async(
-                full_prompt,
-                generation_config=genai.types.GenerationConfig(
-                    max_output_tokens=max_tokens,
+            with track_llm_call("ai_service", "generate_content") as call:
+                generation = await get_llm_provider().generate(
+                    full_prompt,
+                    max_tokens=max_tokens,
                     temperature=temperature
                 )
-            )
-            return response.text
-        except exceptions.ResourceExhausted:
+                call.record_usage(generation)
+            return generation.text
+        except LLMRateLimitError:
             return "I apologize, but I'm currently receiving too many requests. Please try again in 30 seconds."
         except Exception as e:
             return f"I encountered an error processing your request: {str(e)}"
@@ -91,7 +86,8 @@ Always cite which note(s) you're referencing."""
         
         full_prompt = f"{system_prompt}\n\n{context}\n\nQuestion: {question}"
         
-        answer = await self.generate_response(full_prompt, temperature=0.5)
+        with timed_stage("generate"):
+            answer = await self.generate_response(full_prompt, temperature=0.5)
         
         return {
             'answer': answer,
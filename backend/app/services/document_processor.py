@@ -1,10 +1,371 @@
-from pdfminer.high_level import extract_text
+import codecs
 import io
-from typing import BinaryIO
+import itertools
+import os
+import posixpath
+import re
+import zipfile
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator, NamedTuple, Optional
+from xml.etree import ElementTree
+
+
+class UnsupportedDocumentError(ValueError):
+    """File content does not match a supported type (HTTP 415)"""
+
+
+class DocumentTooLargeError(ValueError):
+    """File is over the size or page limit (HTTP 413)"""
+
+
+@dataclass
+class TextChunk:
+    """A chunk of a document; start/end are character offsets into its full text"""
+    text: str
+    start: int
+    end: int
+    tokens: int
+
+
+class _Sentence(NamedTuple):
+    text: str  # Raw, with its trailing whitespace
+    start: int
+    tokens: int
+    paragraph_end: bool
+
+
+class DocumentFormat(ABC):
+    """
+    One document format: how it is recognised and how its text is read
+    
+    iter_text yields the text in pieces as it is parsed, with a form feed
+    between pages (pdfminer's convention, also used for slides and Word
+    page breaks), so no format holds a whole document in memory.
+    """
+    
+    extensions: tuple[str, ...] = ()
+    
+    @abstractmethod
+    def check_signature(self, head: bytes):
+        """Raise UnsupportedDocumentError unless head can start this format"""
+    
+    @abstractmethod
+    def iter_text(self, file: BinaryIO, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Text of a seekable file positioned at the start"""
+
+
+class PdfFormat(DocumentFormat):
+    extensions = ('.pdf',)
+    
+    def check_signature(self, head: bytes):
+        # Readers accept a PDF header anywhere in the first 1024 bytes
+        if b'%PDF-' not in head:
+            raise UnsupportedDocumentError("File content is not a PDF")
+    
+    def count_pages(self, file: BinaryIO, max_pages: int) -> int:
+        """Count pages from the page tree, raising as soon as it passes max_pages"""
+        from pdfminer.pdfpage import PDFPage
+
+        count = 0
+        try:
+            for _ in PDFPage.get_pages(file):
+                count += 1
+                if count > max_pages:
+                    raise DocumentTooLargeError(f"PDF has more than {max_pages} pages")
+        except DocumentTooLargeError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error extracting PDF text: {str(e)}")
+        file.seek(0)
+        return count
+    
+    def iter_text(self, file: BinaryIO, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Page by page, with the same output as pdfminer's extract_text"""
+        # Imported on first PDF; pdfminer is heavy and most workers never parse one
+        from pdfminer.converter import TextConverter
+        from pdfminer.layout import LAParams
+        from pdfminer.pdfinterp import PDFPageInterpreter, PDFResourceManager
+        from pdfminer.pdfpage import PDFPage
+
+        if max_pages is not None:
+            self.count_pages(file, max_pages)
+
+        with io.StringIO() as output:
+            resources = PDFResourceManager()
+            interpreter = PDFPageInterpreter(resources, TextConverter(resources, output, laparams=LAParams()))
+            try:
+                for page in PDFPage.get_pages(file):
+                    interpreter.process_page(page)
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate()
+            except Exception as e:
+                raise Exception(f"Error extracting PDF text: {str(e)}")
+
+
+class TextFormat(DocumentFormat):
+    extensions = ('.txt',)
+    
+    # Binary formats commonly renamed to .txt
+    BINARY_SIGNATURES = (b'%PDF-', b'PK\x03\x04', b'\x89PNG', b'\xff\xd8\xff', b'GIF8', b'\x7fELF', b'MZ')
+    CHUNK_BYTES = 64 * 1024
+    
+    def check_signature(self, head: bytes):
+        if head.startswith(self.BINARY_SIGNATURES) or b'\x00' in head:
+            raise UnsupportedDocumentError("File content is not plain text")
+    
+    def iter_text(self, file: BinaryIO, max_pages: Optional[int] = None) -> Iterator[str]:
+        encoding = self._encoding(file)
+        decoder = codecs.getincrementaldecoder(encoding)()
+        for chunk in iter(lambda: file.read(self.CHUNK_BYTES), b""):
+            yield decoder.decode(chunk)
+        yield decoder.decode(b"", final=True)
+    
+    def _encoding(self, file: BinaryIO) -> str:
+        """
+        UTF-8, or Latin-1 if any of the file is not UTF-8
+        
+        The whole file is validated first (in chunks) so pages already
+        handed on never need re-decoding; the file is rewound.
+        """
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        try:
+            for chunk in iter(lambda: file.read(self.CHUNK_BYTES), b""):
+                decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+            return 'utf-8'
+        except UnicodeDecodeError:
+            return 'latin-1'
+        finally:
+            file.seek(0)
+
+
+class MarkdownFormat(TextFormat):
+    extensions = ('.md', '.markdown')
+    
+    # Top two heading levels start a page; fenced code never does
+    HEADING = re.compile(r'#{1,2}\s')
+    FENCE = re.compile(r'\s{0,3}(```|~~~)')
+    
+    def iter_text(self, file: BinaryIO, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Section by section: a page break before each top-level heading"""
+        fenced = False
+        started = False
+        for line in self._lines(super().iter_text(file, max_pages)):
+            if self.FENCE.match(line):
+                fenced = not fenced
+            elif not fenced and started and self.HEADING.match(line):
+                yield '\f'
+            started = started or bool(line.strip())
+            yield line
+    
+    def _lines(self, chunks: Iterable[str]) -> Iterator[str]:
+        partial = ""
+        for chunk in chunks:
+            lines = (partial + chunk).split("\n")
+            partial = lines.pop()
+            for line in lines:
+                yield line + "\n"
+        if partial:
+            yield partial
+
+
+class OfficeXmlFormat(DocumentFormat):
+    """Office Open XML (a zip of XML parts), parsed with iterparse"""
+    
+    kind = ""
+    # Decompressed size of any one XML part (zip bomb guard)
+    MAX_PART_BYTES = 256 * 1024 * 1024
+    
+    def check_signature(self, head: bytes):
+        if not head.startswith(b'PK\x03\x04'):
+            raise UnsupportedDocumentError(f"File content is not a {self.kind} document")
+    
+    def _open_zip(self, file: BinaryIO) -> zipfile.ZipFile:
+        try:
+            return zipfile.ZipFile(file)
+        except zipfile.BadZipFile:
+            raise UnsupportedDocumentError(f"File content is not a {self.kind} document")
+    
+    def _part(self, archive: zipfile.ZipFile, name: str) -> BinaryIO:
+        try:
+            info = archive.getinfo(name)
+        except KeyError:
+            raise UnsupportedDocumentError(f"File content is not a {self.kind} document (no {name})")
+        if info.file_size > self.MAX_PART_BYTES:
+            raise DocumentTooLargeError(f"{name} is larger than {self.MAX_PART_BYTES} bytes uncompressed")
+        return archive.open(info)
+    
+    def _paragraphs(self, part: BinaryIO, ns: str) -> Iterator[str]:
+        """
+        Text of each paragraph (ns:p) of an XML part, one at a time
+        
+        Runs (ns:t) are joined, tabs and line breaks kept, and paragraphs
+        are detached once read so the parsed tree stays empty.
+        """
+        paragraph, text, tab, br = f"{ns}p", f"{ns}t", f"{ns}tab", f"{ns}br"
+        pieces = []
+        parents = []
+        try:
+            for event, element in ElementTree.iterparse(part, events=("start", "end")):
+                if event == "start":
+                    parents.append(element)
+                    continue
+                parents.pop()
+                tag = element.tag
+                if tag == text:
+                    pieces.append(element.text or "")
+                elif tag == tab:
+                    pieces.append("\t")
+                elif tag == br:
+                    pieces.append(self._line_break(element))
+                elif tag == paragraph:
+                    yield "".join(pieces) + "\n"
+                    pieces = []
+                    if parents:
+                        parents[-1].remove(element)
+                else:
+                    self._other(element, pieces)
+        except ElementTree.ParseError as e:
+            raise Exception(f"Error extracting {self.kind} text: {str(e)}")
+    
+    def _line_break(self, element) -> str:
+        return "\n"
+    
+    def _other(self, element, pieces: list[str]):
+        """Format-specific elements (page breaks)"""
+
+
+class DocxFormat(OfficeXmlFormat):
+    extensions = ('.docx',)
+    kind = "Word"
+    
+    W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+    
+    def iter_text(self, file: BinaryIO, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Paragraph by paragraph; explicit page breaks become form feeds"""
+        with self._open_zip(file) as archive, self._part(archive, "word/document.xml") as part:
+            yield from self._paragraphs(part, self.W)
+    
+    def _line_break(self, element) -> str:
+        return '\f' if element.get(f"{self.W}type") == "page" else "\n"
+    
+    def _other(self, element, pieces: list[str]):
+        if element.tag == f"{self.W}pageBreakBefore" and element.get(f"{self.W}val", "true") not in ("false", "0"):
+            pieces.append('\f')
+
+
+class PptxFormat(OfficeXmlFormat):
+    extensions = ('.pptx',)
+    kind = "PowerPoint"
+    
+    A = '{http://schemas.openxmlformats.org/drawingml/2006/main}'
+    P = '{http://schemas.openxmlformats.org/presentationml/2006/main}'
+    R = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+    RELS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+    
+    def iter_text(self, file: BinaryIO, max_pages: Optional[int] = None) -> Iterator[str]:
+        """Slide by slide in presentation order, a form feed between slides"""
+        with self._open_zip(file) as archive:
+            slides = self._slide_parts(archive)
+            if max_pages is not None and len(slides) > max_pages:
+                raise DocumentTooLargeError(f"Presentation has more than {max_pages} slides")
+            for index, name in enumerate(slides):
+                if index:
+                    yield '\f'
+                with self._part(archive, name) as part:
+                    yield from self._paragraphs(part, self.A)
+    
+    def _slide_parts(self, archive: zipfile.ZipFile) -> list[str]:
+        """Slide part names in the order of presentation.xml's slide list"""
+        with self._part(archive, "ppt/_rels/presentation.xml.rels") as part:
+            targets = {
+                rel.get("Id"): posixpath.normpath(posixpath.join("ppt", rel.get("Target")))
+                for rel in ElementTree.parse(part).getroot().iter(f"{self.RELS}Relationship")
+            }
+        with self._part(archive, "ppt/presentation.xml") as part:
+            ids = [slide.get(f"{self.R}id") for slide in ElementTree.parse(part).getroot().iter(f"{self.P}sldId")]
+        return [targets[rid] for rid in ids if rid in targets]
 
 
 class DocumentProcessor:
-    """Process PDF and text documents for RAG"""
+    """Process uploaded documents for RAG through a registry of formats"""
+    
+    # Readers accept a PDF header anywhere in the first 1024 bytes
+    SIGNATURE_BYTES = 1024
+    BINARY_SIGNATURES = TextFormat.BINARY_SIGNATURES
+    # Reader page size; Migration 009 backfilled pages with the same rule
+    PAGE_CHARS = 4000
+    
+    # Chunking (iter_chunks)
+    CHUNK_TOKENS = 256
+    CHUNK_OVERLAP_TOKENS = 32
+    CHARS_PER_TOKEN = 4
+    MAX_SENTENCE_CHARS = 8 * 1024  # Buffered text without a sentence end before it is cut at a space
+    TOKEN = re.compile(r"\w{1,6}|[^\w\s]")
+    # End of a sentence (not before a lowercase word, e.g. "e.g. this"), a blank line or a page break
+    SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*\s+(?=[^a-z\s])|\n[ \t]*\n\s*|\f\s*")
+    PARAGRAPH_END = re.compile(r"\n[ \t]*\n|\f")
+    
+    def __init__(self):
+        self.formats: dict[str, DocumentFormat] = {}
+        for document_format in (PdfFormat(), TextFormat(), MarkdownFormat(), DocxFormat(), PptxFormat()):
+            self.register(document_format)
+    
+    def register(self, document_format: DocumentFormat):
+        """
+        Add (or replace) the format for each of its extensions
+        
+        Formats subclass DocumentFormat; one missing check_signature or
+        iter_text cannot be instantiated, so it never gets here.
+        """
+        if not isinstance(document_format, DocumentFormat):
+            raise TypeError(f"{type(document_format).__name__} is not a DocumentFormat")
+        for extension in document_format.extensions:
+            self.formats[extension] = document_format
+    
+    @property
+    def extensions(self) -> list[str]:
+        return sorted(self.formats)
+    
+    def supports(self, filename: str) -> bool:
+        return os.path.splitext(filename.lower())[1] in self.formats
+    
+    def format_for(self, filename: str) -> DocumentFormat:
+        """
+        Raises:
+            UnsupportedDocumentError: No format for the extension
+        """
+        document_format = self.formats.get(os.path.splitext(filename.lower())[1])
+        if document_format is None:
+            raise UnsupportedDocumentError(f"Unsupported file type: {filename}")
+        return document_format
+    
+    def check_signature(self, head: bytes, filename: str):
+        """
+        Reject content that is not what its filename claims
+        
+        Args:
+            head: First SIGNATURE_BYTES of the file (fewer if it is shorter)
+            filename: Original filename to determine type
+            
+        Raises:
+            UnsupportedDocumentError: Content does not match the type
+        """
+        self.format_for(filename).check_signature(head)
+    
+    def count_pdf_pages(self, file: BinaryIO, max_pages: int) -> int:
+        """
+        Count PDF pages from the page tree, without extracting any text
+        
+        Stops and raises as soon as the count passes max_pages; the file is
+        rewound for extraction.
+        
+        Raises:
+            DocumentTooLargeError: More than max_pages pages
+        """
+        return self.formats['.pdf'].count_pages(file, max_pages)
     
     def extract_text_from_pdf(self, file_bytes: bytes) -> str:
         """
@@ -16,13 +377,7 @@ class DocumentProcessor:
         Returns:
             Extracted text content
         """
-        try:
-            # pdfminer expects a file-like object or path. 
-            # We use BytesIO to wrap the bytes.
-            pdf_file = io.BytesIO(file_bytes)
-            return extract_text(pdf_file)
-        except Exception as e:
-            raise Exception(f"Error extracting PDF text: {str(e)}")
+        return "".join(self.formats['.pdf'].iter_text(io.BytesIO(file_bytes)))
     
     def extract_text_from_txt(self, file_bytes: bytes) -> str:
         """
@@ -54,12 +409,97 @@ class DocumentProcessor:
         Returns:
             Extracted text content
         """
-        if filename.lower().endswith('.pdf'):
-            return self.extract_text_from_pdf(file_bytes)
-        elif filename.lower().endswith('.txt'):
-            return self.extract_text_from_txt(file_bytes)
-        else:
-            raise ValueError(f"Unsupported file type: {filename}")
+        return self.process_file(io.BytesIO(file_bytes), filename)
+    
+    def process_file(self, file: BinaryIO, filename: str, max_pages: Optional[int] = None) -> str:
+        """
+        Process a document from a seekable file object
+        
+        Args:
+            file: Binary file object positioned at the start
+            filename: Original filename to determine type
+            max_pages: PDFs with more pages are rejected before extraction
+            
+        Returns:
+            Extracted text content (form feeds between pages)
+        """
+        return "".join(self.format_for(filename).iter_text(file, max_pages))
+    
+    def iter_pages(self, file: BinaryIO, filename: str, max_pages: Optional[int] = None) -> Iterator[str]:
+        """
+        Reader pages of a document, produced while it is parsed
+        
+        Memory stays at about one page plus the parser's own state whatever
+        the document size; extraction stops as soon as the page limit is
+        passed.
+        
+        Args:
+            file: Binary file object positioned at the start
+            filename: Original filename to determine type
+            max_pages: More reader pages raise DocumentTooLargeError
+            
+        Returns:
+            Iterator of pages
+        """
+        document_format = self.format_for(filename)
+        count = 0
+        for page in self.paginate(document_format.iter_text(file, max_pages)):
+            count += 1
+            if max_pages is not None and count > max_pages:
+                raise DocumentTooLargeError(f"Document has more than {max_pages} pages")
+            yield page
+    
+    def paginate(self, fragments: Iterable[str], page_chars: int = PAGE_CHARS) -> Iterator[str]:
+        """
+        Cut a stream of text into reader pages
+        
+        Form feeds start a new page; longer stretches are cut every
+        page_chars characters, and blank pages are dropped. Only the
+        unfinished page is buffered.
+        """
+        page = ""  # Unfinished page, always shorter than page_chars
+        for fragment in fragments:
+            position = 0
+            while position <= len(fragment):
+                page_break = fragment.find('\f', position)
+                end = len(fragment) if page_break < 0 else page_break
+                # Sliced straight from the fragment: no copy of more than a page
+                if len(page) + end - position >= page_chars:
+                    split = position + page_chars - len(page)
+                    yield from self._pages(page + fragment[position:split], page_chars)
+                    position, page = split, ""
+                    while end - position >= page_chars:
+                        yield from self._pages(fragment[position:position + page_chars], page_chars)
+                        position += page_chars
+                page += fragment[position:end]
+                if page_break < 0:
+                    break
+                yield from self._pages(page, page_chars)
+                position, page = page_break + 1, ""
+        yield from self._pages(page, page_chars)
+    
+    def _pages(self, section: str, page_chars: int) -> Iterator[str]:
+        for start in range(0, len(section), page_chars):
+            page = section[start:start + page_chars]
+            if page.strip(' \t\r\n'):
+                yield page
+    
+    def split_pages(self, text: str, page_chars: int = PAGE_CHARS) -> list[str]:
+        """
+        Split extracted text into reader pages
+        
+        Form feeds (pdfminer's page breaks) start a new page; longer
+        stretches are cut every page_chars characters, and blank pages are
+        dropped. Migration 009 backfills with the same rule.
+        
+        Args:
+            text: Full document text
+            page_chars: Maximum characters per page
+            
+        Returns:
+            List of pages
+        """
+        return list(self.paginate([text], page_chars))
     
     def chunk_text(self, text: str, chunk_size: int = 1000) -> list[str]:
         """
@@ -67,30 +507,152 @@ class DocumentProcessor:
         
         Args:
             text: Full document text
-            chunk_size: Maximum characters per chunk
+            chunk_size: Maximum characters per chunk (about CHARS_PER_TOKEN per token)
             
         Returns:
             List of text chunks
         """
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        current_length = 0
-        
-        for word in words:
-            word_length = len(word) + 1  # +1 for space
-            if current_length + word_length > chunk_size and current_chunk:
-                chunks.append(" ".join(current_chunk))
-                current_chunk = [word]
-                current_length = word_length
-            else:
-                current_chunk.append(word)
-                current_length += word_length
-        
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
-        
-        return chunks
+        max_tokens = max(1, chunk_size // self.CHARS_PER_TOKEN)
+        return [chunk.text for chunk in self.iter_chunks([text], max_tokens=max_tokens, overlap_tokens=0)]
+    
+    def iter_chunks(
+        self,
+        fragments: Iterable[str],
+        max_tokens: int = CHUNK_TOKENS,
+        overlap_tokens: int = CHUNK_OVERLAP_TOKENS
+    ) -> Iterator[TextChunk]:
+        """
+        Chunk a stream of text (e.g. iter_pages) lazily
+        
+        Chunks are whole sentences up to max_tokens (approximate, see
+        count_tokens); a chunk ends at a paragraph break when one leaves it
+        at least half full. Each chunk after the first starts with the
+        previous chunk's last sentences, up to overlap_tokens. Only a
+        sentence and the chunk being built are held in memory.
+        
+        Args:
+            fragments: Text in pieces, in order
+            max_tokens: Chunk size; longer sentences are split between words
+            overlap_tokens: Tokens repeated from the end of the previous chunk
+            
+        Returns:
+            Iterator of chunks with offsets into "".join(fragments)
+        """
+        if not 0 <= overlap_tokens < max_tokens:
+            raise ValueError("overlap_tokens must be at least 0 and less than max_tokens")
+        
+        current: list[_Sentence] = []
+        tokens = 0
+        for sentence in self._sentences(fragments, max_tokens):
+            if current and tokens + sentence.tokens > max_tokens:
+                cut = self._cut(current, sentence.tokens, max_tokens)
+                chunk = self._chunk(current[:cut])
+                if chunk is not None:
+                    yield chunk
+                carried = current[cut:]
+                room = max_tokens - sentence.tokens - sum(s.tokens for s in carried)
+                current = self._overlap(current[:cut], min(overlap_tokens, room)) + carried
+                tokens = sum(s.tokens for s in current)
+            current.append(sentence)
+            tokens += sentence.tokens
+        chunk = self._chunk(current)
+        if chunk is not None:
+            yield chunk
+    
+    def count_tokens(self, text: str) -> int:
+        """
+        Approximate token count without a tokenizer
+        
+        Every punctuation mark and every run of up to six word characters
+        counts as one token, which tracks subword tokenizers on prose to
+        within about 10%.
+        """
+        return sum(1 for _ in self.TOKEN.finditer(text))
+    
+    def _sentences(self, fragments: Iterable[str], max_tokens: int) -> Iterator[_Sentence]:
+        """Sentences of the stream as they complete, none over max_tokens"""
+        buffer = ""
+        offset = 0  # Stream offset of buffer[0]
+        for fragment in fragments:
+            buffer += fragment
+            position = 0
+            for match in self.SENTENCE_END.finditer(buffer):
+                if match.end() == len(buffer):
+                    # The whitespace (or paragraph break) may go on in the next fragment
+                    break
+                yield from self._sentence(buffer[position:match.end()], offset + position, max_tokens)
+                position = match.end()
+            if len(buffer) - position > self.MAX_SENTENCE_CHARS:
+                # No sentence end in sight (tables, code): hand on whole words
+                split = buffer.rfind(" ", position, len(buffer) - 1) + 1 or len(buffer)
+                if split > position:
+                    yield from self._sentence(buffer[position:split], offset + position, max_tokens)
+                    position = split
+            buffer = buffer[position:]
+            offset += position
+        if buffer:
+            yield from self._sentence(buffer, offset, max_tokens)
+    
+    def _sentence(self, text: str, start: int, max_tokens: int) -> Iterator[_Sentence]:
+        tokens = self.count_tokens(text)
+        paragraph_end = bool(self.PARAGRAPH_END.search(text))
+        if tokens <= max_tokens:
+            yield _Sentence(text, start, tokens, paragraph_end)
+            return
+        
+        # Longer than a chunk: pieces of whole words (or of one very long word)
+        position = 0
+        while True:
+            # Counted from the piece start, as count_tokens would count the piece
+            overflow = next(itertools.islice(self.TOKEN.finditer(text, position), max_tokens, None), None)
+            if overflow is None:
+                break
+            split = text.rfind(" ", position, overflow.start()) + 1
+            if split <= position:
+                split = overflow.start()
+            piece = text[position:split]
+            yield _Sentence(piece, start + position, self.count_tokens(piece), False)
+            position = split
+        piece = text[position:]
+        yield _Sentence(piece, start + position, self.count_tokens(piece), paragraph_end)
+    
+    def _cut(self, sentences: list[_Sentence], incoming: int, max_tokens: int) -> int:
+        """
+        How many sentences go in the chunk: up to the last paragraph end
+        that leaves it half full, if the rest still fits with the incoming
+        sentence; otherwise all of them
+        """
+        total = sum(s.tokens for s in sentences)
+        tokens = 0
+        cut = len(sentences)
+        for index, sentence in enumerate(sentences):
+            tokens += sentence.tokens
+            if sentence.paragraph_end and tokens * 2 >= max_tokens and total - tokens + incoming <= max_tokens:
+                cut = index + 1
+        return cut
+    
+    def _overlap(self, sentences: list[_Sentence], budget: int) -> list[_Sentence]:
+        """Trailing whole sentences within budget tokens"""
+        overlap = []
+        for sentence in reversed(sentences):
+            if sentence.tokens > budget:
+                break
+            overlap.insert(0, sentence)
+            budget -= sentence.tokens
+        return overlap
+    
+    def _chunk(self, sentences: list[_Sentence]) -> Optional[TextChunk]:
+        text = "".join(s.text for s in sentences)
+        stripped = text.strip()
+        if not stripped:
+            return None
+        start = sentences[0].start + len(text) - len(text.lstrip())
+        return TextChunk(
+            text=stripped,
+            start=start,
+            end=start + len(stripped),
+            tokens=sum(s.tokens for s in sentences)
+        )
 
 
 # Global instance
@@ -0,0 +1,253 @@
+from app.core.config import settings
+from collections import defaultdict
+from datetime import datetime
+from typing import Optional
+import asyncio
+import json
+import logging
+import select
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Postgres channel shared by all uvicorn workers
+NOTIFY_CHANNEL = "edunexus_events"
+# Postgres rejects larger NOTIFY payloads; bigger events go through event_payloads
+NOTIFY_MAX_BYTES = 8000
+
+
+class Subscription:
+    """One connected client (SSE stream) listening for a user's events"""
+
+    def __init__(self, user_id: str, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self.lagging = False  # Set once the client fell too far behind
+
+
+class EventHub:
+    """
+    In-process pub/sub hub for per-user push events
+
+    - Each connection gets a bounded queue; when a slow client's queue is
+      full the oldest event is dropped, and after EVENTS_MAX_DROPPED drops
+      the connection is flagged so the stream closes and the client resyncs
+    - With DATABASE_URL configured, events are published through Postgres
+      NOTIFY and every worker's LISTEN thread fans them out locally, so a
+      user connected to worker A sees writes handled by worker B; events
+      too large for NOTIFY are stored in event_payloads and sent by id
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, set[Subscription]] = defaultdict(set)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener: Optional[threading.Thread] = None
+        self._notify_conn = None
+        self._notify_lock = threading.Lock()
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.disconnected_slow = 0
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, user_id: str) -> Subscription:
+        """Register a connection for user_id (must run inside the event loop)"""
+        self._loop = asyncio.get_running_loop()
+        self._ensure_listener()
+
+        subscription = Subscription(user_id, settings.EVENTS_QUEUE_SIZE)
+        self._subscribers[user_id].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Remove a connection"""
+        subscribers = self._subscribers.get(subscription.user_id)
+        if not subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def stats(self) -> dict:
+        """Connection and delivery counters for this worker"""
+        return {
+            "connections": sum(len(subs) for subs in self._subscribers.values()),
+            "connected_users": len(self._subscribers),
+            "published": self.published,
+            "delivered": self.delivered,
+            "dropped": self.dropped,
+            "disconnected_slow": self.disconnected_slow,
+            "cross_worker": bool(settings.DATABASE_URL)
+        }
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    async def publish(self, user_ids: list[str], event_type: str, payload: dict):
+        """
+        Push an event to every connection of the given users
+
+        Never raises - a failed push must not fail the write that caused it.
+        """
+        user_ids = list({uid for uid in user_ids if uid})
+        if not user_ids:
+            return
+
+        message = {
+            "type": event_type,
+            "user_ids": user_ids,
+            "payload": payload,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        self.published += 1
+
+        try:
+            if settings.DATABASE_URL:
+                # Every worker (including this one) receives it via LISTEN
+                await asyncio.to_thread(self._notify, json.dumps(message, default=str))
+            else:
+                self._dispatch(message)
+        except Exception as e:
+            logger.error(f"Failed to publish {event_type} event: {e}")
+
+    def _dispatch(self, message: dict):
+        """Fan a message out to local connections (event loop thread only)"""
+        event = {
+            "type": message["type"],
+            "payload": message["payload"],
+            "created_at": message["created_at"]
+        }
+        for user_id in message["user_ids"]:
+            for subscription in list(self._subscribers.get(user_id, ())):
+                self._offer(subscription, event)
+
+    def _offer(self, subscription: Subscription, event: dict):
+        """Enqueue without blocking; drop the oldest event for slow clients"""
+        if subscription.lagging:
+            return
+
+        if subscription.queue.full():
+            subscription.queue.get_nowait()
+            subscription.dropped += 1
+            self.dropped += 1
+
+            if subscription.dropped >= settings.EVENTS_MAX_DROPPED:
+                subscription.lagging = True
+                self.disconnected_slow += 1
+                logger.warning(f"Disconnecting slow event client for user {subscription.user_id}")
+
+        subscription.queue.put_nowait(event)
+        self.delivered += 1
+
+    # ------------------------------------------------------------------
+    # Postgres LISTEN/NOTIFY
+    # ------------------------------------------------------------------
+
+    def _notify(self, data: str):
+        """Send NOTIFY on a shared autocommit connection (worker thread)"""
+        import psycopg2
+
+        with self._notify_lock:
+            if self._notify_conn is None or self._notify_conn.closed:
+                self._notify_conn = psycopg2.connect(settings.DATABASE_URL)
+                self._notify_conn.autocommit = True
+            try:
+                with self._notify_conn.cursor() as cur:
+                    self._send(cur, data)
+            except psycopg2.Error:
+                # Drop the broken connection so the next publish reconnects
+                self._notify_conn.close()
+                raise
+
+    def _send(self, cur, data: str):
+        """NOTIFY the message itself, or a reference to it when it is too large"""
+        if len(data.encode()) < NOTIFY_MAX_BYTES:
+            cur.execute("SELECT pg_notify(%s, %s)", (NOTIFY_CHANNEL, data))
+        else:
+            cur.execute(
+                "SELECT pg_notify(%s, json_build_object('ref', store_event_payload(%s::jsonb))::text)",
+                (NOTIFY_CHANNEL, data)
+            )
+
+    def close(self):
+        """Drop the shared NOTIFY connection (worker shutdown)"""
+        with self._notify_lock:
+            if self._notify_conn is not None:
+                self._notify_conn.close()
+                self._notify_conn = None
+
+    def _ensure_listener(self):
+        """Start the LISTEN thread once, if cross-worker delivery is configured"""
+        if not settings.DATABASE_URL:
+            return
+        if self._listener and self._listener.is_alive():
+            return
+
+        self._listener = threading.Thread(
+            target=self._listen_forever,
+            name="event-hub-listener",
+            daemon=True
+        )
+        self._listener.start()
+
+    def _listen_forever(self):
+        """Blocking LISTEN loop; reconnects with backoff on failure"""
+        import psycopg2
+        import time
+
+        delay = 1
+        while True:
+            try:
+                conn = psycopg2.connect(settings.DATABASE_URL)
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
+                logger.info("Event hub listening for cross-worker events")
+                delay = 1
+
+                while True:
+                    if select.select([conn], [], [], 30) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        self._receive(conn, notify.payload)
+            except Exception as e:
+                logger.error(f"Event hub listener error: {e}. Reconnecting in {delay}s")
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    def _receive(self, conn, data: str):
+        """Hand a NOTIFY payload over to the event loop thread"""
+        if self._loop is None or self._loop.is_closed():
+            return
+        with conn.cursor() as cur:
+            message = self._decode(cur, data)
+        if message is not None:
+            self._loop.call_soon_threadsafe(self._dispatch, message)
+
+    def _decode(self, cur, data: str) -> Optional[dict]:
+        """The message in a NOTIFY payload, loaded from event_payloads if it was sent by reference"""
+        try:
+            message = json.loads(data)
+        except ValueError:
+            logger.warning("Ignoring malformed event payload")
+            return None
+        if "ref" not in message:
+            return message
+
+        cur.execute("SELECT message FROM event_payloads WHERE id = %s", (message["ref"],))
+        row = cur.fetchone()
+        if row is None:
+            logger.warning(f"Event payload {message['ref']} is no longer stored")
+            return None
+        return row[0]
+
+
+# Global instance
+event_hub = EventHub()
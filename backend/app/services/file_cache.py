@@ -0,0 +1,152 @@
+from app.core.config import settings
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Optional
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+try:
+    import fcntl
+except ImportError:  # Windows: evictions are only serialized within a worker
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class DiskFileCache:
+    """
+    Size-bounded LRU of stored files on local disk, shared by all workers
+
+    Entries are immutable and keyed by content hash, so a cached file never
+    goes stale. A miss downloads the whole object once (concurrent misses
+    in a worker for the same key wait for that one download) into a temp
+    file that is renamed into place. Recency is the file's modification
+    time, set on every hit.
+
+    After each fill the directory is rescanned under an exclusive file lock
+    and the least recently used files are deleted until everything in it,
+    downloads in progress included, is back under NOTE_CACHE_MAX_BYTES: the
+    bound holds for all workers together. Readers get an open handle, so
+    eviction never cuts off a download in progress. File I/O runs in
+    threads.
+    """
+
+    CHUNK_BYTES = 64 * 1024
+    LOCK_NAME = ".lock"
+    # Temp files this old were left by a download that died
+    STALE_TEMP_SECONDS = 3600
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filling: dict[str, asyncio.Lock] = {}
+
+    @property
+    def directory(self) -> Path:
+        return Path(settings.NOTE_CACHE_DIR or os.path.join(tempfile.gettempdir(), "edunexus-note-cache"))
+
+    def fits(self, size: int) -> bool:
+        """Whether a file of this size is cached at all (0 disables the cache)"""
+        return 0 < size <= settings.NOTE_CACHE_MAX_BYTES
+
+    async def open(self, key: str, fetch: Callable[[], Iterable[bytes]]) -> BinaryIO:
+        """Open the cached file for key, downloading it with fetch() on a miss"""
+        handle = await asyncio.to_thread(self._hit, key)
+        if handle is not None:
+            return handle
+
+        lock = self._filling.setdefault(key, asyncio.Lock())
+        async with lock:
+            handle = await asyncio.to_thread(self._hit, key)
+            if handle is None:
+                handle = await asyncio.to_thread(self._fill, key, fetch)
+        if not lock.locked():
+            self._filling.pop(key, None)
+        return handle
+
+    def _hit(self, key: str) -> Optional[BinaryIO]:
+        path = self.directory / key
+        try:
+            handle = open(path, "rb")
+        except FileNotFoundError:
+            return None
+        self._touch(path)
+        return handle
+
+    def _fill(self, key: str, fetch: Callable[[], Iterable[bytes]]) -> BinaryIO:
+        directory = self.directory
+        directory.mkdir(parents=True, exist_ok=True)
+        temp = directory / f".{key}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(temp, "wb") as out:
+                for chunk in fetch():
+                    out.write(chunk)
+            path = directory / key
+            os.replace(temp, path)
+        except BaseException:
+            temp.unlink(missing_ok=True)
+            raise
+
+        handle = open(path, "rb")
+        self._touch(path)
+        self._evict(keep=key)
+        return handle
+
+    def _touch(self, path: Path):
+        """Mark as most recently used (exact timestamps: coarse clocks would tie)"""
+        now = time.time_ns()
+        try:
+            os.utime(path, ns=(now, now))
+        except FileNotFoundError:
+            pass  # Evicted by another worker; the open handle still reads
+
+    def _evict(self, keep: str):
+        """Delete least recently used files until the directory fits (never keep)"""
+        with self._lock, self._directory_lock():
+            total = 0
+            entries = []
+            for entry in os.scandir(self.directory):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name == self.LOCK_NAME or not entry.is_file():
+                    continue
+                if entry.name.endswith(".tmp"):
+                    if time.time() - stat.st_mtime > self.STALE_TEMP_SECONDS:
+                        Path(entry.path).unlink(missing_ok=True)
+                        continue
+                else:
+                    entries.append((stat.st_mtime_ns, entry.name, stat.st_size))
+                total += stat.st_size
+
+            entries.sort()
+            for _, name, size in entries:
+                if total <= settings.NOTE_CACHE_MAX_BYTES:
+                    break
+                if name == keep:
+                    continue
+                (self.directory / name).unlink(missing_ok=True)
+                total -= size
+                logger.debug(f"Evicted {name} ({size} bytes) from the note cache")
+
+    @contextmanager
+    def _directory_lock(self) -> Iterator[None]:
+        """Exclusive across workers sharing the directory"""
+        if fcntl is None:
+            yield
+            return
+        with open(self.directory / self.LOCK_NAME, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+# Global instance
+note_file_cache = DiskFileCache()
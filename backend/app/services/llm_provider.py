@@ -0,0 +1,244 @@
+from app.core.config import settings
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Optional
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import random
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+
+EMBEDDING_DIMENSION = 768
+
+
+class LLMRateLimitError(Exception):
+    """Provider refused the call because of rate limits / quota"""
+
+
+class LLMProviderError(Exception):
+    """Provider call failed for any other reason"""
+
+
+@dataclass
+class Generation:
+    """Text returned by a provider plus token usage (None when unknown)"""
+    text: str
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+
+
+class LLMProvider(ABC):
+    """
+    Interface for text generation and embeddings
+
+    Services wrap calls in track_llm_call(); providers only talk to the model.
+    """
+
+    name = "base"
+
+    @abstractmethod
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> Generation:
+        ...
+
+    @abstractmethod
+    def embed(self, texts: list[str], task_type: str = "retrieval_document") -> list[list[float]]:
+        """Synchronous; callers run it in a thread"""
+
+    @abstractmethod
+    def check(self):
+        """Cheap reachability check for readiness probes (synchronous); raises on failure"""
+
+
+class GeminiProvider(LLMProvider):
+    """Google Gemini via google-generativeai"""
+
+    name = "gemini"
+    generation_model = "models/gemini-2.5-flash"
+    embedding_model = "models/text-embedding-004"
+
+    def __init__(self, api_key: str):
+        import google.generativeai as genai
+        from google.api_core import exceptions
+
+        if not api_key:
+            raise ValueError("GEMINI_API_KEY is required when LLM_PROVIDER=gemini")
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._rate_limited = exceptions.ResourceExhausted
+        self.model = genai.GenerativeModel(self.generation_model)
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> Generation:
+        config = None
+        if max_tokens is not None or temperature is not None:
+            config = self._genai.types.GenerationConfig(
+                max_output_tokens=max_tokens,
+                temperature=temperature
+            )
+        try:
+            response = await self.model.generate_content_async(prompt, generation_config=config)
+        except self._rate_limited as e:
+            raise LLMRateLimitError(str(e)) from e
+        return Generation(response.text, *self._usage(response))
+
+    def embed(self, texts: list[str], task_type: str = "retrieval_document") -> list[list[float]]:
+        try:
+            result = self._genai.embed_content(
+                model=self.embedding_model,
+                content=texts,
+                task_type=task_type
+            )
+        except self._rate_limited as e:
+            raise LLMRateLimitError(str(e)) from e
+        return result['embedding']
+
+    def check(self):
+        self._genai.get_model(self.generation_model)
+
+    @staticmethod
+    def _usage(response) -> tuple[Optional[int], Optional[int]]:
+        """
+        Newer SDKs expose usage_metadata; older ones only report output
+        tokens per candidate.
+        """
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            return (
+                getattr(usage, "prompt_token_count", 0) or 0,
+                getattr(usage, "candidates_token_count", 0) or 0
+            )
+        try:
+            return None, sum(c.token_count for c in response.candidates) or None
+        except Exception:
+            return None, None
+
+
+class FakeLLMProvider(LLMProvider):
+    """
+    Offline, deterministic stand-in for load tests and local runs
+
+    - Embeddings hash words into a fixed-size vector, so texts sharing words
+      are close and the same text always gets the same vector.
+    - Generations are templated from the prompt (JSON when JSON is asked for).
+    - Latency and failures are injected from settings; failures follow a
+      seeded sequence so runs are repeatable.
+    """
+
+    name = "fake"
+
+    def __init__(
+        self,
+        generate_latency_ms: float = 0.0,
+        embed_latency_ms: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        seed: int = 0
+    ):
+        self.generate_latency_ms = generate_latency_ms
+        self.embed_latency_ms = embed_latency_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self._rng = random.Random(seed)
+
+    def _maybe_fail(self):
+        roll = self._rng.random()
+        if roll < self.rate_limit_rate:
+            raise LLMRateLimitError("429 Resource has been exhausted (injected by fake LLM provider)")
+        if roll < self.rate_limit_rate + self.error_rate:
+            raise LLMProviderError("500 Internal error (injected by fake LLM provider)")
+
+    async def generate(
+        self,
+        prompt: str,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None
+    ) -> Generation:
+        if self.generate_latency_ms:
+            await asyncio.sleep(self.generate_latency_ms / 1000)
+        self._maybe_fail()
+
+        if "JSON" in prompt:
+            text = self._recommendations(prompt)
+        else:
+            question = re.findall(r"Question:\s*(.+)", prompt)
+            sources = len(re.findall(r"^\d+\. ", prompt, re.MULTILINE))
+            text = (
+                f"Offline answer to \"{question[-1].strip() if question else prompt[:80]}\" "
+                f"based on {sources} note(s)."
+            )
+        if max_tokens:
+            text = " ".join(text.split()[:max_tokens])
+        return Generation(text, prompt_tokens=len(prompt) // 4, completion_tokens=len(text.split()))
+
+    @staticmethod
+    def _recommendations(prompt: str) -> str:
+        # Topic: first quoted phrase or "Chapter:" line before the JSON example
+        instructions = prompt.split("{", 1)[0]
+        quoted = re.findall(r'"([^"\n]{3,80})"', instructions)
+        chapter = re.findall(r"Chapter:\s*(.+)", instructions)
+        topic = quoted[0] if quoted else chapter[0].strip() if chapter else "this chapter"
+        return json.dumps({
+            "videos": [
+                {"title": f"{topic}: video {i}", "search_terms": f"{topic} lecture {i}",
+                 "description": f"Offline recommendation {i} for {topic}"}
+                for i in range(1, 4)
+            ],
+            "articles": [
+                {"title": f"{topic}: article {i}", "search_terms": f"{topic} tutorial {i}",
+                 "description": f"Offline recommendation {i} for {topic}"}
+                for i in range(1, 4)
+            ]
+        })
+
+    def embed(self, texts: list[str], task_type: str = "retrieval_document") -> list[list[float]]:
+        if self.embed_latency_ms:
+            time.sleep(self.embed_latency_ms / 1000)
+        self._maybe_fail()
+        return [hash_embedding(text) for text in texts]
+
+    def check(self):
+        self._maybe_fail()
+
+
+def hash_embedding(text: str, dimension: int = EMBEDDING_DIMENSION) -> list[float]:
+    """Feature-hashed bag of words, L2-normalized"""
+    vector = [0.0] * dimension
+    words = re.findall(r"\w+", text.lower()) or [text]
+    for word in words:
+        digest = hashlib.blake2b(word.encode(), digest_size=16).digest()
+        # Four signed buckets per word keeps collisions from dominating
+        for i in range(0, 16, 4):
+            bucket = int.from_bytes(digest[i:i + 3], "little") % dimension
+            vector[bucket] += 1.0 if digest[i + 3] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+@lru_cache()
+def get_llm_provider() -> LLMProvider:
+    """Provider selected by settings.LLM_PROVIDER (created on first use)"""
+    if settings.LLM_PROVIDER == "fake":
+        logger.warning("Using the fake LLM provider: AI responses are canned")
+        return FakeLLMProvider(
+            generate_latency_ms=settings.FAKE_LLM_GENERATE_LATENCY_MS,
+            embed_latency_ms=settings.FAKE_LLM_EMBED_LATENCY_MS,
+            error_rate=settings.FAKE_LLM_ERROR_RATE,
+            rate_limit_rate=settings.FAKE_LLM_RATE_LIMIT_RATE
+        )
+    return GeminiProvider(settings.GEMINI_API_KEY)
@@ -1,3 +1,4 @@
+from app.core.circuit import circuits
 from app.services.vector_service import vector_service
 from app.services.ai_service import ai_service
 
@@ -26,7 +27,16 @@ class RAGService:
         Returns:
             dict with 'answer', 'sources', 'note_count'
         """
+        # Fail fast while readiness probes report the LLM or pgvector down
+        if not (circuits.allow("llm") and circuits.allow("vector")):
+            return {
+                'answer': "The AI assistant is temporarily unavailable. Please try again in a few minutes.",
+                'sources': [],
+                'note_count': 0
+            }
+        
         # Step 1: Retrieve relevant notes from vector DB
+        # (timed as embed_query + vector_search)
         retrieved_notes = await vector_service.search_notes(
             db=db,
             query=question,
@@ -51,7 +61,7 @@ class RAGService:
             for note in retrieved_notes
         ]
         
-        # Step 3: Generate AI response with context
+        # Step 3: Generate AI response with context (timed as generate)
         result = await ai_service.generate_chapter_response(
             question=question,
             retrieved_notes=enriched_notes,
@@ -1,5 +1,6 @@
-import google.generativeai as genai
-from app.core.config import settings
+from app.core.circuit import circuits
+from app.core.metrics import track_llm_call
+from app.services.llm_provider import get_llm_provider, LLMRateLimitError
 import json
 import logging
 import hashlib
@@ -8,15 +9,11 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
 
 class RecommendationService:
     """Generate external resource recommendations"""
     
     def __init__(self):
-        self.model = genai.GenerativeModel('models/gemini-2.5-flash')
         self.max_retries = 3
         self.base_delay = 2  # seconds
     
@@ -29,7 +26,7 @@ class RecommendationService:
                 error_msg = str(e).lower()
                 
                 # Check if it's a rate limit error
-                if 'rate limit' in error_msg or 'quota' in error_msg or 'too many requests' in error_msg or '429' in error_msg:
+                if isinstance(e, LLMRateLimitError) or 'rate limit' in error_msg or 'quota' in error_msg or 'too many requests' in error_msg or '429' in error_msg:
                     if attempt < self.max_retries - 1:
                         delay = self.base_delay * (2 ** attempt)  # Exponential backoff: 2s, 4s, 8s
                         logger.warning(f"Rate limit hit, retrying in {delay}s (attempt {attempt + 1}/{self.max_retries})")
@@ -44,6 +41,13 @@ class RecommendationService:
         
         raise Exception("Max retries exceeded")
     
+    async def _generate(self, prompt: str):
+        """Single LLM call (one retry attempt)"""
+        with track_llm_call("recommendation_service", "generate_content") as call:
+            generation = await get_llm_provider().generate(prompt)
+            call.record_usage(generation)
+        return generation
+    
     async def get_recommendations(
         self,
         chapter_name: str,
@@ -105,10 +109,18 @@ Make sure recommendations are:
 - STRICTLY VALID JSON format
 """
         
+        if not circuits.allow("llm"):
+            logger.warning("Skipping recommendations: LLM circuit is open")
+            return {
+                'recommendations': [],
+                'chapter': chapter_name,
+                'subject': subject_name
+            }
+        
         try:
             # Use retry logic for API call
             response = await self._retry_with_backoff(
-                self.model.generate_content_async,
+                self._generate,
                 prompt
             )
             text = response.text
@@ -0,0 +1,244 @@
+from supabase import Client
+from app.core.config import settings
+from app.core import metrics
+from app.core.supabase import public_object_path
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterator, Optional
+import asyncio
+import logging
+import os
+import socket
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseHeldError(RuntimeError):
+    """Another worker or script holds the storage GC lease"""
+
+
+@dataclass
+class GCReport:
+    """Outcome of one collection (a dry run counts what it would remove)"""
+    files_deleted: int = 0
+    uploads_deleted: int = 0
+    live_paths: int = 0
+    objects_scanned: int = 0
+    orphans: int = 0
+    objects_deleted: int = 0
+    reclaimed_bytes: int = 0
+    seconds: float = 0.0
+    dry_run: bool = False
+
+
+class StorageGarbageCollector:
+    """
+    Removes notes-bucket objects that nothing live points at
+
+    1. collect_storage_rows deletes note_files no note uses and expired
+       uploads that never completed (both past the grace period)
+    2. The bucket is listed folder by folder in pages; each object is looked
+       up in a set of live paths: note_files.storage_path, file URLs of notes
+       from before note_files, and in-flight uploads with their parts
+    3. Orphans older than the grace period are removed in batches paced to
+       STORAGE_GC_DELETES_PER_SECOND
+
+    The grace period covers uploads between their storage write and their
+    database row. A dry run deletes nothing but leaves the rows step 1 would
+    delete out of the live set, so it reports what a real run removes.
+    Runs synchronously; `run` moves it off the event loop.
+
+    Only the holder of the maintenance lease collects. The lease lasts
+    STORAGE_GC_LEASE_SECONDS and is renewed as the collection makes progress;
+    if it is lost (the collector stalled and another one took over), the
+    collection stops before its next delete.
+    """
+
+    LEASE_NAME = "storage_gc"
+    LIST_PAGE = 1000  # Storage's maximum list page
+    SELECT_PAGE = 1000
+
+    def __init__(self):
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._renewed_at = 0.0
+
+    async def run(self, db: Client, dry_run: bool = False, hold_seconds: int = 0) -> GCReport:
+        return await asyncio.to_thread(self.collect, db, dry_run, hold_seconds)
+
+    def collect(self, db: Client, dry_run: bool = False, hold_seconds: int = 0) -> GCReport:
+        """
+        One full collection under the lease; with dry_run nothing is deleted
+
+        Raises LeaseHeldError if another collector holds the lease. Afterwards
+        the lease is kept for hold_seconds (0 releases it).
+        """
+        if not self._acquire_lease(db, settings.STORAGE_GC_LEASE_SECONDS):
+            raise LeaseHeldError(f"Another storage GC holds the {self.LEASE_NAME} lease")
+        self._renewed_at = time.monotonic()
+        try:
+            return self._collect(db, dry_run)
+        finally:
+            # Kept or released; a lease lost to another collector stays theirs
+            self._acquire_lease(db, hold_seconds)
+
+    def _collect(self, db: Client, dry_run: bool) -> GCReport:
+        from app.modules.chapter.upload.service import UploadService
+
+        bucket = UploadService.DEFAULT_BUCKET
+        start = time.perf_counter()
+        report = GCReport(dry_run=dry_run)
+        grace_seconds = settings.STORAGE_GC_GRACE_MINUTES * 60
+
+        collectable = {"files": [], "uploads": []}
+        if dry_run:
+            collectable = db.rpc("collectable_storage_rows", {"p_grace_seconds": grace_seconds}).execute().data
+            report.files_deleted = len(collectable["files"])
+            report.uploads_deleted = len(collectable["uploads"])
+        else:
+            deleted = db.rpc("collect_storage_rows", {"p_grace_seconds": grace_seconds}).execute().data
+            report.files_deleted = deleted["files"]
+            report.uploads_deleted = deleted["uploads"]
+
+        live = self._live_paths(db, bucket, set(collectable["files"]), set(collectable["uploads"]))
+        report.live_paths = len(live)
+
+        # Listed in full before deleting: removals would shift list offsets
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=grace_seconds)
+        orphans = []
+        for path, size, created_at in self._walk(db, bucket, ""):
+            report.objects_scanned += 1
+            if path not in live and created_at is not None and created_at <= cutoff:
+                orphans.append((path, size))
+        report.orphans = len(orphans)
+
+        for i in range(0, len(orphans), settings.STORAGE_GC_BATCH_SIZE):
+            self._delete(db, bucket, orphans[i:i + settings.STORAGE_GC_BATCH_SIZE], report)
+
+        report.seconds = round(time.perf_counter() - start, 3)
+        if not dry_run:
+            metrics.record_storage_gc(report.objects_deleted, report.reclaimed_bytes)
+        logger.info(
+            f"Storage GC{' (dry run)' if dry_run else ''}: {report.objects_deleted} of "
+            f"{report.objects_scanned} objects removed, {report.reclaimed_bytes} bytes reclaimed, "
+            f"{report.files_deleted} files and {report.uploads_deleted} uploads deleted "
+            f"in {report.seconds:.1f}s"
+        )
+        return report
+
+    async def run_periodically(self):
+        """
+        Collect every STORAGE_GC_INTERVAL_MINUTES on whichever worker gets the lease
+
+        The lease is kept for an interval after each collection, so the other
+        workers skip their turn and the bucket is collected once per interval.
+        """
+        from app.core.supabase import get_supabase_admin_client
+
+        interval = settings.STORAGE_GC_INTERVAL_MINUTES * 60
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.run(get_supabase_admin_client(), hold_seconds=interval)
+            except LeaseHeldError:
+                pass
+            except Exception as e:
+                logger.warning(f"Storage GC failed: {e}")
+
+    def _acquire_lease(self, db: Client, seconds: int) -> bool:
+        """Take or renew the lease for seconds (0 releases it); False if another holder has it"""
+        return bool(db.rpc("acquire_maintenance_lease", {
+            "p_name": self.LEASE_NAME,
+            "p_holder": self.holder,
+            "p_seconds": int(seconds)
+        }).execute().data)
+
+    def _renew_lease(self, db: Client):
+        """Renew once a third of the lease has passed; stop the collection if it was lost"""
+        if time.monotonic() - self._renewed_at < settings.STORAGE_GC_LEASE_SECONDS / 3:
+            return
+        if not self._acquire_lease(db, settings.STORAGE_GC_LEASE_SECONDS):
+            raise LeaseHeldError(f"Lost the {self.LEASE_NAME} lease while collecting")
+        self._renewed_at = time.monotonic()
+
+    def _live_paths(self, db: Client, bucket: str, skip_files: set[str], skip_uploads: set[str]) -> set[str]:
+        """Every object path something live points at, apart from the skipped (collectable) rows"""
+        live = set()
+        for row in self._pages(db, lambda: db.table("note_files").select("id, storage_path")):
+            if row["id"] not in skip_files:
+                live.add(row["storage_path"])
+
+        # Notes from before note_files only have their public URL
+        for row in self._pages(db, lambda: db.table("notes").select("file_url").is_("file_id", "null")):
+            path = public_object_path(row["file_url"], bucket)
+            if path:
+                live.add(path)
+
+        for row in self._pages(
+            db, lambda: db.table("note_uploads").select("id, storage_path, parts").in_("status", ["pending", "processing"])
+        ):
+            if row["id"] in skip_uploads:
+                continue
+            live.add(row["storage_path"])
+            live.update(row["parts"])
+        return live
+
+    def _pages(self, db: Client, query: Callable) -> Iterator[dict]:
+        offset = 0
+        while True:
+            self._renew_lease(db)
+            rows = query().order("id").range(offset, offset + self.SELECT_PAGE - 1).execute().data
+            yield from rows
+            if len(rows) < self.SELECT_PAGE:
+                return
+            offset += self.SELECT_PAGE
+
+    def _walk(self, db: Client, bucket: str, prefix: str) -> Iterator[tuple[str, int, Optional[datetime]]]:
+        """(path, size, created_at) of every object under prefix, one list page at a time"""
+        folders = []
+        offset = 0
+        while True:
+            self._renew_lease(db)
+            entries = db.storage.from_(bucket).list(prefix, {
+                "limit": self.LIST_PAGE,
+                "offset": offset,
+                "sortBy": {"column": "name", "order": "asc"}
+            })
+            for entry in entries:
+                path = f"{prefix}/{entry['name']}" if prefix else entry["name"]
+                if entry.get("id") is None:
+                    folders.append(path)
+                    continue
+                created_at = entry.get("created_at")
+                yield (
+                    path,
+                    (entry.get("metadata") or {}).get("size", 0),
+                    datetime.fromisoformat(created_at) if created_at else None
+                )
+            if len(entries) < self.LIST_PAGE:
+                break
+            offset += self.LIST_PAGE
+
+        for folder in folders:
+            yield from self._walk(db, bucket, folder)
+
+    def _delete(self, db: Client, bucket: str, batch: list[tuple[str, int]], report: GCReport):
+        self._renew_lease(db)
+        if report.dry_run:
+            report.objects_deleted += len(batch)
+            report.reclaimed_bytes += sum(size for _, size in batch)
+            return
+        try:
+            removed = {o["name"] for o in db.storage.from_(bucket).remove([path for path, _ in batch])}
+        except Exception as e:
+            logger.warning(f"Storage GC failed to remove {len(batch)} objects: {e}")
+            return
+        for path, size in batch:
+            if path in removed:
+                report.objects_deleted += 1
+                report.reclaimed_bytes += size
+        time.sleep(len(batch) / settings.STORAGE_GC_DELETES_PER_SECOND)
+
+
+# Global instance
+storage_gc = StorageGarbageCollector()
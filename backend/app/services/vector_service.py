@@ -1,14 +1,13 @@
 from supabase import Client
-from app.core.config import settings
-import google.generativeai as genai
+from app.core.circuit import circuits
+from app.core.metrics import track_llm_call, timed_stage
+from app.core.supabase import returning
+from app.services.llm_provider import get_llm_provider, EMBEDDING_DIMENSION
 from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
-# Configure Gemini
-genai.configure(api_key=settings.GEMINI_API_KEY)
-
 
 import asyncio
 
@@ -16,34 +15,77 @@ class VectorService:
     """Supabase pgvector service for semantic search"""
     
     def __init__(self):
-        self.embedding_model = "models/text-embedding-004"
-        self.embedding_dimension = 768
+        self.embedding_dimension = EMBEDDING_DIMENSION
     
     def _generate_embedding(self, text: str) -> list[float]:
         """
-        Generate embedding using Gemini (Synchronous helper)
+        Generate embedding with the LLM provider (Synchronous helper)
         """
         try:
-            result = genai.embed_content(
-                model=self.embedding_model,
-                content=text,
-                task_type="retrieval_document"
-            )
-            return result['embedding']
+            with track_llm_call("vector_service", "embed_content"):
+                embeddings = get_llm_provider().embed([text], task_type="retrieval_document")
+            return embeddings[0]
         except Exception as e:
             logger.error(f"Failed to generate embedding: {e}")
             raise
             
+    async def _apply_file_embeddings(self, db: Client, notes: list[dict]) -> list[dict]:
+        """
+        Resolve notes backed by a note file in one call
+        
+        Notes whose file already has an embedding (duplicate uploads) get it
+        copied and are dropped; the rest are embedded from the file's lead
+        text, since notes.content is only a preview. Returns the notes that
+        still need an embedding.
+        """
+        shared = [note['id'] for note in notes if note.get('file_id')]
+        if not shared:
+            return notes
+        try:
+            response = await asyncio.to_thread(
+                lambda: db.rpc("reuse_file_embeddings", {"note_ids": shared}).execute()
+            )
+        except Exception as e:
+            logger.warning(f"Failed to reuse file embeddings: {e}")
+            return notes
+        
+        resolved = {row['note_id']: row for row in response.data or []}
+        remaining = []
+        for note in notes:
+            row = resolved.get(note['id'])
+            if row is None:
+                remaining.append(note)
+            elif not row['reused']:
+                remaining.append({**note, 'content': row['lead']})
+        if len(remaining) < len(notes):
+            logger.info(f"Reused file embeddings for {len(notes) - len(remaining)} notes")
+        return remaining
+    
     async def add_note_embedding(
         self,
         db: Client,
         note_id: str,
         title: str,
-        content: str
+        content: str,
+        file_id: Optional[str] = None
     ):
         """
         Generate and store embedding for a note
+        
+        Notes of an already-embedded file reuse its embedding instead, and
+        other file-backed notes are embedded from the file's lead text.
         """
+        if file_id:
+            pending = await self._apply_file_embeddings(
+                db, [{'id': note_id, 'content': content, 'file_id': file_id}]
+            )
+            if not pending:
+                return
+            content = pending[0]['content']
+        
+        if not circuits.allow("llm"):
+            logger.warning(f"Skipping embedding for note {note_id}: LLM circuit is open")
+            return
         try:
             # Combine title and content for better semantic search
             text = f"{title}\n{content}"
@@ -51,11 +93,12 @@ class VectorService:
             # Run embedding generation in thread to avoid blocking
             embedding = await asyncio.to_thread(self._generate_embedding, text)
             
-            # Run DB update in thread
+            # Via the batch RPC so the note's file keeps the embedding too
             await asyncio.to_thread(
-                lambda: db.table("notes").update({
-                    "embedding": embedding
-                }).eq("id", note_id).execute()
+                lambda: db.rpc(
+                    "set_note_embeddings",
+                    {"embeddings": [{"note_id": note_id, "embedding": embedding}]}
+                ).execute()
             )
             
             logger.info(f"Added embedding for note {note_id}")
@@ -63,6 +106,57 @@ class VectorService:
             logger.error(f"Failed to add embedding for note {note_id}: {e}")
             # Don't raise - embedding is optional, note should still be saved
     
+    def _generate_embeddings(self, texts: list[str]) -> list[list[float]]:
+        """
+        Generate embeddings for many texts in one provider call (Synchronous helper)
+        """
+        try:
+            with track_llm_call("vector_service", "embed_content_batch"):
+                return get_llm_provider().embed(texts, task_type="retrieval_document")
+        except Exception as e:
+            logger.error(f"Failed to generate embeddings: {e}")
+            raise
+
+    async def add_note_embeddings(
+        self,
+        db: Client,
+        notes: list[dict]
+    ):
+        """
+        Generate and store embeddings for a batch of notes
+        
+        Args:
+            db: Supabase client
+            notes: List of dicts with 'id', 'title', 'content' and
+                optionally 'file_id' (see _apply_file_embeddings)
+        """
+        notes = await self._apply_file_embeddings(db, notes)
+        if not notes:
+            return
+        if not circuits.allow("llm"):
+            logger.warning(f"Skipping embeddings for {len(notes)} notes: LLM circuit is open")
+            return
+        try:
+            texts = [f"{note['title']}\n{note['content']}" for note in notes]
+            embeddings = await asyncio.to_thread(self._generate_embeddings, texts)
+            
+            # One statement for the whole batch
+            await asyncio.to_thread(
+                lambda: db.rpc(
+                    "set_note_embeddings",
+                    {
+                        "embeddings": [
+                            {"note_id": note['id'], "embedding": embedding}
+                            for note, embedding in zip(notes, embeddings)
+                        ]
+                    }
+                ).execute()
+            )
+            
+            logger.info(f"Added embeddings for {len(notes)} notes")
+        except Exception as e:
+            logger.error(f"Failed to add embeddings for {len(notes)} notes: {e}")
+    
     async def delete_note_embedding(
         self,
         db: Client,
@@ -74,9 +168,10 @@ class VectorService:
         try:
             # Run DB update in thread
             await asyncio.to_thread(
-                lambda: db.table("notes").update({
-                    "embedding": None
-                }).eq("id", note_id).execute()
+                lambda: returning(
+                    db.table("notes").update({"embedding": None}).eq("id", note_id),
+                    "id"
+                ).execute()
             )
             
             logger.info(f"Deleted embedding for note {note_id}")
@@ -95,19 +190,21 @@ class VectorService:
         """
         try:
             # Generate query embedding in thread
-            query_embedding = await asyncio.to_thread(self._generate_embedding, query)
+            with timed_stage("embed_query"):
+                query_embedding = await asyncio.to_thread(self._generate_embedding, query)
             
             # Run DB search in thread
-            response = await asyncio.to_thread(
-                lambda: db.rpc(
-                    "search_notes_by_similarity",
-                    {
-                        "query_embedding": query_embedding,
-                        "target_chapter_id": chapter_id,
-                        "result_limit": limit
-                    }
-                ).execute()
-            )
+            with timed_stage("vector_search"):
+                response = await asyncio.to_thread(
+                    lambda: db.rpc(
+                        "search_notes_by_similarity",
+                        {
+                            "query_embedding": query_embedding,
+                            "target_chapter_id": chapter_id,
+                            "result_limit": limit
+                        }
+                    ).execute()
+                )
             
             return response.data if response.data else []
         except Exception as e:
@@ -0,0 +1,41 @@
+"""
+Remove orphaned objects from the notes bucket
+
+Deletes note_files no note uses and expired unfinished uploads, then removes
+every bucket object nothing live points at (older than
+STORAGE_GC_GRACE_MINUTES). Safe to run while the API is serving uploads.
+Takes the same lease as the in-process schedule and exits with status 1 if
+another collection holds it.
+
+Usage (from backend/):
+    python scripts/gc_storage.py --dry-run
+    python scripts/gc_storage.py
+"""
+from dataclasses import asdict
+from pathlib import Path
+import argparse
+import asyncio
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.supabase import get_supabase_admin_client  # noqa: E402
+from app.services.storage_gc import storage_gc, LeaseHeldError  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Collect orphaned note files")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed, delete nothing")
+    args = parser.parse_args()
+
+    try:
+        report = asyncio.run(storage_gc.run(get_supabase_admin_client(), dry_run=args.dry_run))
+    except LeaseHeldError as e:
+        print(e, file=sys.stderr)
+        sys.exit(1)
+    for key, value in asdict(report).items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
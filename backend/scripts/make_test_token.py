@@ -0,0 +1,31 @@
+"""
+Issue locally signed bearer tokens for AUTH_PROVIDER=local
+
+The uid must match users.firebase_uid (seed_data.py creates
+dummy-teacher-firebase-uid, dummy-student-firebase-uid, seed-student-<n>, ...).
+
+Usage (from backend/):
+    python scripts/make_test_token.py dummy-student-firebase-uid
+    python scripts/make_test_token.py seed-student-1 seed-student-2 --expires-in 86400
+"""
+from pathlib import Path
+import argparse
+import sys
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.core.auth_provider import create_local_token  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sign local test tokens")
+    parser.add_argument("uids", nargs="+", help="users.firebase_uid values")
+    parser.add_argument("--expires-in", type=int, default=3600, help="Seconds (default 3600)")
+    args = parser.parse_args()
+
+    for uid in args.uids:
+        print(create_local_token(uid, expires_in=args.expires_in))
+
+
+if __name__ == "__main__":
+    main()
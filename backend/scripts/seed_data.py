@@ -1,240 +1,589 @@
 """
-Seed script to add dummy data to Supabase database
-Run this script to populate your database with test data
+Synthetic data generator for local and load testing
+
+Generates classrooms, subjects, chapters, memberships, notes (with fake
+embeddings), questions and announcements at any scale, reproducibly from a
+seed. Rows are streamed in batches, so memory stays flat at production size.
+
+Two sinks:
+- Postgres COPY (fast, used when --database-url / DATABASE_URL is set).
+  Triggers are disabled during the load when the role allows it and the
+  counter tables are rebuilt afterwards; the HNSW index is rebuilt once at
+  the end instead of row by row.
+- Supabase REST (batched inserts with the service key) otherwise.
+
+Usage (from backend/):
+    python scripts/seed_data.py                                  # small demo dataset
+    python scripts/seed_data.py --preset production --database-url postgresql://...
+    python scripts/seed_data.py --classrooms 10 --notes-per-chapter 50 --seed 7
+
+The demo accounts (dummy-teacher-firebase-uid / dummy-student-firebase-uid)
+are always created: the teacher owns the first classroom and the student is a
+member of every classroom. Seed into an empty database (--truncate wipes one
+in COPY mode).
 """
-import asyncio
-from supabase import create_client, Client
-from datetime import datetime
+from dataclasses import dataclass, fields, replace
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+import argparse
+import csv
+import hashlib
+import io
+import math
 import os
+import random
+import sys
+import time
+import uuid
+
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_SERVICE_KEY = os.getenv("SUPABASE_SERVICE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_SERVICE_KEY:
-    raise Exception("Missing Supabase credentials in .env file")
+EMBEDDING_DIMENSION = 768
 
-# Create admin client
-db: Client = create_client(SUPABASE_URL, SUPABASE_SERVICE_KEY)
+# Insert order respects foreign keys; every flush writes tables in this order
+TABLES = {
+    "users": ("id", "firebase_uid", "email", "name", "role", "created_at"),
+    "classrooms": ("id", "name", "description", "code", "created_by", "created_at"),
+    "classroom_members": ("id", "classroom_id", "user_id", "joined_at"),
+    "subjects": ("id", "classroom_id", "name", "description", "created_at"),
+    "teacher_access": ("id", "subject_id", "teacher_id", "created_at"),
+    "chapters": ("id", "subject_id", "name", "description", "created_at"),
+    "notes": (
+        "id", "chapter_id", "title", "content", "file_url", "file_name", "visibility",
+        "approval_status", "uploaded_by", "approved_by", "approved_at", "created_at", "embedding"
+    ),
+    "questions": (
+        "id", "chapter_id", "user_id", "title", "content", "is_private",
+        "answer", "answered_by", "answered_at", "created_at"
+    ),
+    "announcements": ("id", "chapter_id", "title", "content", "created_by", "created_at"),
+}
 
+# Subject -> (chapter names, key terms). Subjects repeat with a level suffix
+# when a classroom has more subjects than this catalog.
+CATALOG = {
+    "Operating Systems": (
+        ["Introduction to OS", "Process Management", "CPU Scheduling", "Synchronization",
+         "Deadlocks", "Memory Management", "Virtual Memory", "File Systems", "I/O Systems", "Protection"],
+        ["process", "thread", "scheduler", "context switch", "semaphore", "mutex", "deadlock",
+         "page table", "TLB", "paging", "segmentation", "inode", "system call", "kernel", "interrupt"],
+    ),
+    "Computer Networks": (
+        ["Network Fundamentals", "Physical Layer", "Data Link Layer", "Network Layer", "Routing",
+         "Transport Layer", "TCP Congestion Control", "Application Layer", "Network Security", "Wireless Networks"],
+        ["packet", "frame", "router", "switch", "IP address", "subnet", "TCP handshake", "UDP",
+         "sliding window", "congestion window", "DNS", "HTTP", "encryption", "MAC address", "latency"],
+    ),
+    "Database Systems": (
+        ["Relational Model", "SQL Basics", "Normalization", "Indexing", "Query Processing",
+         "Transactions", "Concurrency Control", "Recovery", "NoSQL Databases", "Distributed Databases"],
+        ["relation", "primary key", "foreign key", "join", "B-tree", "hash index", "normal form",
+         "functional dependency", "transaction", "isolation level", "two-phase locking", "write-ahead log",
+         "query plan", "replication", "sharding"],
+    ),
+    "Physics": (
+        ["Kinematics", "Newton's Laws", "Work and Energy", "Momentum", "Rotational Motion",
+         "Gravitation", "Oscillations", "Waves", "Thermodynamics", "Electrostatics"],
+        ["velocity", "acceleration", "force", "mass", "kinetic energy", "potential energy", "momentum",
+         "torque", "angular velocity", "gravitational field", "amplitude", "frequency", "entropy",
+         "electric field", "charge"],
+    ),
+    "Biology": (
+        ["Cell Structure", "Biomolecules", "Cell Division", "Genetics", "Molecular Biology",
+         "Evolution", "Photosynthesis", "Respiration", "Human Physiology", "Ecology"],
+        ["cell membrane", "mitochondria", "chloroplast", "enzyme", "protein", "DNA", "RNA",
+         "mitosis", "meiosis", "allele", "mutation", "natural selection", "ATP", "ecosystem", "homeostasis"],
+    ),
+    "Mathematics": (
+        ["Sets and Functions", "Limits", "Derivatives", "Applications of Derivatives", "Integrals",
+         "Differential Equations", "Vectors", "Matrices", "Probability", "Statistics"],
+        ["function", "limit", "derivative", "integral", "chain rule", "maximum", "differential equation",
+         "vector", "dot product", "matrix", "determinant", "eigenvalue", "probability", "variance",
+         "normal distribution"],
+    ),
+    "Economics": (
+        ["Introduction to Economics", "Demand and Supply", "Elasticity", "Production and Costs",
+         "Market Structures", "National Income", "Money and Banking", "Inflation", "Fiscal Policy", "International Trade"],
+        ["demand", "supply", "equilibrium price", "elasticity", "marginal cost", "monopoly",
+         "perfect competition", "GDP", "inflation", "interest rate", "central bank", "fiscal deficit",
+         "exchange rate", "opportunity cost", "utility"],
+    ),
+    "History": (
+        ["Ancient Civilizations", "Classical Empires", "Medieval Societies", "Renaissance",
+         "Age of Exploration", "Industrial Revolution", "Colonialism", "World War I", "World War II", "Cold War"],
+        ["empire", "trade route", "feudalism", "reformation", "colonization", "revolution", "treaty",
+         "nationalism", "industrialization", "alliance", "independence movement", "propaganda",
+         "economic depression", "diplomacy", "decolonization"],
+    ),
+}
 
-def generate_classroom_code():
-    """Generate a random 6-character classroom code"""
-    import random
-    import string
-    return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
+EXPLANATIONS = [
+    "{a} describes how {b} behaves under changing conditions.",
+    "The key idea is that {a} depends directly on {b}.",
+    "In exam questions, {a} is usually compared with {b}.",
+    "A common mistake is to confuse {a} with {b}.",
+    "{a} can be derived from first principles using {b}.",
+    "When {b} increases, the effect on {a} is often non-linear.",
+    "Textbooks introduce {a} before {b} because it builds the intuition.",
+    "Remember that {a} only applies when {b} is held constant.",
+    "The diagram in class showed {a} and {b} side by side.",
+    "{a} is the reason {b} matters in real-world applications.",
+]
 
+EXAMPLES = [
+    "For example, consider a simple case where {a} is small.",
+    "Worked example: start from {a}, then apply {b} step by step.",
+    "Our teacher's example linked {a} to everyday experience.",
+    "Practice problem 3 uses {a} and {b} together.",
+]
 
-async def seed_data():
-    """Seed the database with dummy data"""
-    print("🌱 Starting database seeding...")
-    
-    try:
-        # 1. Create Teacher User
-        print("\n📝 Creating teacher user...")
-        teacher_data = {
-            "firebase_uid": "dummy-teacher-firebase-uid",
-            "email": "teacher@edunexus.com",
-            "name": "Dr. Sarah Miller",
-            "role": "teacher",
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        # Check if teacher already exists
-        existing_teacher = db.table("users").select("*").eq("email", teacher_data["email"]).execute()
-        if existing_teacher.data:
-            print("   ✓ Teacher user already exists")
-            teacher_id = existing_teacher.data[0]["id"]
-        else:
-            teacher_response = db.table("users").insert(teacher_data).execute()
-            teacher_id = teacher_response.data[0]["id"]
-            print(f"   ✓ Created teacher: {teacher_data['name']} (ID: {teacher_id})")
-        
-        # 2. Create Student User
-        print("\n📝 Creating student user...")
-        student_data = {
-            "firebase_uid": "dummy-student-firebase-uid",
-            "email": "student@edunexus.com",
-            "name": "Alex Johnson",
-            "role": "student",
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        existing_student = db.table("users").select("*").eq("email", student_data["email"]).execute()
-        if existing_student.data:
-            print("   ✓ Student user already exists")
-            student_id = existing_student.data[0]["id"]
-        else:
-            student_response = db.table("users").insert(student_data).execute()
-            student_id = student_response.data[0]["id"]
-            print(f"   ✓ Created student: {student_data['name']} (ID: {student_id})")
-        
-        # 3. Create Classroom
-        print("\n📝 Creating classroom...")
-        classroom_code = generate_classroom_code()
-        classroom_data = {
-            "name": "Computer Science Engineering - FY",
-            "description": "Final Year Computer Science classroom",
-            "code": classroom_code,
-            "created_by": teacher_id,
-            "created_at": datetime.utcnow().isoformat()
-        }
-        
-        classroom_response = db.table("classrooms").insert(classroom_data).execute()
-        classroom_id = classroom_response.data[0]["id"]
-        print(f"   ✓ Created classroom: {classroom_data['name']}")
-        print(f"   ✓ Classroom code: {classroom_code}")
-        
-        # 4. Add student as classroom member
-        print("\n📝 Adding student to classroom...")
-        member_data = {
-            "classroom_id": classroom_id,
-            "user_id": student_id,
-            "joined_at": datetime.utcnow().isoformat()
-        }
-        db.table("classroom_members").insert(member_data).execute()
-        print("   ✓ Student added to classroom")
-        
-        # 5. Create Subjects
-        print("\n📝 Creating subjects...")
-        subjects = [
-            {
-                "name": "Operating Systems",
-                "description": "Study of OS concepts and implementation",
-                "chapters": [
-                    {"name": "Unit 1: Introduction to OS", "description": "Basic concepts"},
-                    {"name": "Unit 2: Process Management", "description": "Processes and threads"},
-                    {"name": "Unit 3: Memory Management", "description": "Virtual memory"},
-                    {"name": "Unit 4: File Systems", "description": "File organization"},
-                ]
-            },
-            {
-                "name": "Computer Networks",
-                "description": "Networking fundamentals and protocols",
-                "chapters": [
-                    {"name": "Unit 1: Network Fundamentals", "description": "OSI model"},
-                    {"name": "Unit 2: TCP/IP Protocol Suite", "description": "Internet protocols"},
-                    {"name": "Unit 3: Network Security", "description": "Cryptography"},
-                    {"name": "Unit 4: Wireless Networks", "description": "WiFi and mobile"},
-                ]
-            },
-        ]
-        
-        for subject_data in subjects:
-            chapters = subject_data.pop("chapters")
-            subject_data["classroom_id"] = classroom_id
-            subject_data["created_at"] = datetime.utcnow().isoformat()
-            
-            subject_response = db.table("subjects").insert(subject_data).execute()
-            subject_id = subject_response.data[0]["id"]
-            print(f"   ✓ Created subject: {subject_data['name']}")
-            
-            # Create chapters for this subject
-            for chapter_data in chapters:
-                chapter_data["subject_id"] = subject_id
-                chapter_data["created_at"] = datetime.utcnow().isoformat()
-                db.table("chapters").insert(chapter_data).execute()
-            print(f"     ✓ Created {len(chapters)} chapters")
-        
-        # 6. Get first chapter for notes/questions
-        first_subject = db.table("subjects").select("*").eq("classroom_id", classroom_id).limit(1).execute()
-        first_subject_id = first_subject.data[0]["id"]
-        
-        first_chapter = db.table("chapters").select("*").eq("subject_id", first_subject_id).limit(1).execute()
-        chapter_id = first_chapter.data[0]["id"]
-        
-        # 7. Create Notes
-        print("\n📝 Creating sample notes...")
-        notes = [
-            {
-                "chapter_id": chapter_id,
-                "title": "Complete OS Overview",
-                "content": "The Operating System is system software that manages computer hardware and software resources.",
-                "visibility": "public",
-                "approval_status": "approved",
-                "uploaded_by": teacher_id,
-                "approved_by": teacher_id,
-                "approved_at": datetime.utcnow().isoformat(),
-                "created_at": datetime.utcnow().isoformat()
-            },
-            {
-                "chapter_id": chapter_id,
-                "title": "Process vs Thread",
-                "content": "A process is an instance of a program. A thread is a lightweight process.",
-                "visibility": "public",
-                "approval_status": "approved",
-                "uploaded_by": student_id,
-                "approved_by": teacher_id,
-                "approved_at": datetime.utcnow().isoformat(),
-                "created_at": datetime.utcnow().isoformat()
-            },
-        ]
-        
-        for note in notes:
-            db.table("notes").insert(note).execute()
-        print(f"   ✓ Created {len(notes)} notes")
-        
-        # 8. Create Questions
-        print("\n📝 Creating sample questions...")
-        questions = [
-            {
-                "chapter_id": chapter_id,
-                "user_id": student_id,
-                "title": "Process Scheduling",
-                "content": "What is the difference between preemptive and non-preemptive scheduling?",
-                "is_private": False,
-                "created_at": datetime.utcnow().isoformat()
-            },
-            {
-                "chapter_id": chapter_id,
-                "user_id": student_id,
-                "title": "Deadlock",
-                "content": "Can you explain the four conditions for deadlock?",
-                "is_private": False,
-                "answer": "The four conditions are: Mutual Exclusion, Hold and Wait, No Preemption, and Circular Wait.",
-                "answered_by": teacher_id,
-                "answered_at": datetime.utcnow().isoformat(),
-                "created_at": datetime.utcnow().isoformat()
-            },
+NOTE_TITLES = [
+    "{chapter} - summary", "Notes on {a}", "{a} vs {b}", "Revision sheet: {chapter}",
+    "Lecture notes: {a}", "Key formulas for {chapter}", "{chapter} cheat sheet", "Understanding {a}",
+]
+
+QUESTION_TITLES = [
+    "Difference between {a} and {b}?", "How does {a} affect {b}?", "Confused about {a}",
+    "Exam tip for {a}?", "Why is {a} important?", "Doubt in {chapter}",
+]
+
+QUESTION_BODIES = [
+    "I read the notes on {a} but I still don't understand how it relates to {b}. Can someone explain?",
+    "In today's class we covered {a}. Is {b} always required, or only in special cases?",
+    "Can you share an example where {a} and {b} appear in the same problem?",
+    "The textbook definition of {a} seems different from the lecture. Which one should we use for the exam?",
+]
+
+ANSWERS = [
+    "Good question. {a} and {b} are related, but {a} is the more general concept. Review the second example in the notes.",
+    "Think of {a} as the cause and {b} as the effect. We will go over this again in the next class.",
+    "Use the lecture definition of {a}. The textbook version is equivalent once you account for {b}.",
+]
+
+ANNOUNCEMENTS = [
+    ("Quiz on {chapter}", "There will be a short quiz on {chapter} next week. Focus on {a} and {b}."),
+    ("Assignment posted: {chapter}", "The assignment on {a} is now available. Submit before Friday."),
+    ("Extra class", "We will hold an extra session on {a} this Saturday for anyone who needs help."),
+    ("Reading for {chapter}", "Please read the notes on {a} before the next lecture."),
+]
+
+
+@dataclass
+class SeedConfig:
+    classrooms: int = 2
+    teachers: int = 3
+    students: int = 40
+    members_per_classroom: int = 25
+    subjects_per_classroom: int = 3
+    chapters_per_subject: int = 4
+    notes_per_chapter: int = 5
+    questions_per_chapter: int = 5
+    announcements_per_chapter: int = 1
+    embeddings: bool = True
+    seed: int = 42
+
+
+PRESETS = {
+    "demo": SeedConfig(),
+    # 50 x 8 x 10 = 4,000 chapters -> 100k notes, 1M questions
+    "production": SeedConfig(
+        classrooms=50, teachers=60, students=5000, members_per_classroom=120,
+        subjects_per_classroom=8, chapters_per_subject=10, notes_per_chapter=25,
+        questions_per_chapter=250, announcements_per_chapter=3
+    ),
+}
+
+
+# ============================================
+# SINKS
+# ============================================
+
+def _copy_value(value):
+    if value is None:
+        return None
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return value
+
+
+class CopySink:
+    """COPY into Postgres; one transaction for the whole load"""
+
+    def __init__(self, database_url: str, truncate: bool = False):
+        import psycopg2
+
+        self.conn = psycopg2.connect(database_url)
+        self.cursor = self.conn.cursor()
+        if truncate:
+            self.cursor.execute("TRUNCATE users, classrooms, note_files CASCADE")
+
+        # Skips per-row counter triggers and FK checks; needs superuser or
+        # replication rights, otherwise the triggers simply run.
+        self.cursor.execute("SAVEPOINT replica")
+        try:
+            self.cursor.execute("SET LOCAL session_replication_role = replica")
+            self.cursor.execute("RELEASE SAVEPOINT replica")
+            self.triggers_disabled = True
+        except Exception:
+            self.cursor.execute("ROLLBACK TO SAVEPOINT replica")
+            self.triggers_disabled = False
+
+        # Building HNSW once is far cheaper than maintaining it per row
+        self.cursor.execute("DROP INDEX IF EXISTS notes_embedding_idx")
+
+    def write(self, table: str, rows: list[dict]):
+        columns = TABLES[table]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            writer.writerow([_copy_value(row[column]) for column in columns])
+        buffer.seek(0)
+        self.cursor.copy_expert(
+            f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+
+    def finish(self):
+        if self.triggers_disabled:
+            self.cursor.execute("SET LOCAL session_replication_role = origin")
+            self._rebuild_counters()
+        print("   ... building notes_embedding_idx")
+        self.cursor.execute("SET LOCAL maintenance_work_mem = '512MB'")
+        self.cursor.execute(
+            "CREATE INDEX notes_embedding_idx ON notes USING hnsw (embedding vector_cosine_ops)"
+        )
+        self.cursor.execute("ANALYZE")
+        self.conn.commit()
+        self.conn.close()
+
+    def _rebuild_counters(self):
+        """Same backfill as 003_counters.sql"""
+        self.cursor.execute("""
+            INSERT INTO classroom_counters (classroom_id, member_count)
+            SELECT c.id, COUNT(m.id)
+            FROM classrooms c
+            LEFT JOIN classroom_members m ON m.classroom_id = c.id
+            GROUP BY c.id
+            ON CONFLICT (classroom_id) DO UPDATE SET member_count = EXCLUDED.member_count;
+
+            INSERT INTO subject_counters (subject_id, pending_notes, unanswered_questions)
+            SELECT
+                s.id,
+                (SELECT COUNT(*) FROM notes n JOIN chapters ch ON ch.id = n.chapter_id
+                 WHERE ch.subject_id = s.id AND n.approval_status = 'pending'),
+                (SELECT COUNT(*) FROM questions q JOIN chapters ch ON ch.id = q.chapter_id
+                 WHERE ch.subject_id = s.id AND q.answer IS NULL)
+            FROM subjects s
+            ON CONFLICT (subject_id) DO UPDATE SET
+                pending_notes = EXCLUDED.pending_notes,
+                unanswered_questions = EXCLUDED.unanswered_questions;
+
+            INSERT INTO chapter_counters (chapter_id, note_count)
+            SELECT ch.id, COUNT(n.id)
+            FROM chapters ch
+            LEFT JOIN notes n ON n.chapter_id = ch.id
+            GROUP BY ch.id
+            ON CONFLICT (chapter_id) DO UPDATE SET note_count = EXCLUDED.note_count;
+        """)
+
+
+class SupabaseSink:
+    """Batched inserts through PostgREST with the service key (triggers keep counters)"""
+
+    def __init__(self):
+        from supabase import create_client
+
+        url = os.getenv("SUPABASE_URL")
+        key = os.getenv("SUPABASE_SERVICE_KEY")
+        if not url or not key:
+            raise Exception("Missing Supabase credentials in .env file (or pass --database-url)")
+        self.db = create_client(url, key)
+
+    def write(self, table: str, rows: list[dict]):
+        self.db.table(table).insert(rows, returning="minimal").execute()
+
+    def finish(self):
+        pass
+
+
+# ============================================
+# GENERATOR
+# ============================================
+
+class Generator:
+    """Streams rows into a sink in FK order, flushing every batch_size rows"""
+
+    def __init__(self, config: SeedConfig, sink, batch_size: int):
+        self.config = config
+        self.sink = sink
+        self.batch_size = batch_size
+        self.rng = random.Random(config.seed)
+        self.buffers = {table: [] for table in TABLES}
+        self.counts = {table: 0 for table in TABLES}
+        self.start = datetime(2025, 1, 6, 8, 0, tzinfo=timezone.utc)
+        self.term_vectors: dict[str, list[float]] = {}
+        self.noise_pool = [
+            [self.rng.gauss(0, 1) for _ in range(EMBEDDING_DIMENSION)] for _ in range(256)
         ]
-        
-        for question in questions:
-            db.table("questions").insert(question).execute()
-        print(f"   ✓ Created {len(questions)} questions")
-        
-        # 9. Create Announcements
-        print("\n📝 Creating sample announcements...")
-        announcements = [
-            {
-                "chapter_id": chapter_id,
-                "title": "Quiz on Unit 1",
-                "content": "There will be a quiz on OS fundamentals next week.",
-                "created_by": teacher_id,
-                "created_at": datetime.utcnow().isoformat()
-            },
+
+    # ---- primitives ----
+
+    def uid(self) -> str:
+        return str(uuid.UUID(int=self.rng.getrandbits(128), version=4))
+
+    def ts(self, after: Optional[datetime] = None, within_days: float = 120) -> datetime:
+        base = after or self.start
+        return base + timedelta(seconds=self.rng.uniform(0, within_days * 86400))
+
+    def emit(self, table: str, row: dict):
+        self.buffers[table].append(row)
+        if len(self.buffers[table]) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        # Parents go first, so children in the same flush always find them
+        for table in TABLES:
+            rows = self.buffers[table]
+            if rows:
+                self.sink.write(table, rows)
+                self.counts[table] += len(rows)
+                self.buffers[table] = []
+
+    # ---- text ----
+
+    def fill(self, template: str, terms: list[str], chapter: str) -> str:
+        a, b = self.rng.sample(terms, 2)
+        return template.format(a=a, b=b, chapter=chapter)
+
+    def paragraph(self, terms: list[str], chapter: str) -> str:
+        sentences = [self.fill(self.rng.choice(EXPLANATIONS), terms, chapter)
+                     for _ in range(self.rng.randint(3, 6))]
+        if self.rng.random() < 0.5:
+            sentences.append(self.fill(self.rng.choice(EXAMPLES), terms, chapter))
+        return " ".join(s[0].upper() + s[1:] for s in sentences)
+
+    # ---- embeddings ----
+
+    def term_vector(self, term: str) -> list[float]:
+        """Stable pseudo-random direction per term, independent of the seed"""
+        vector = self.term_vectors.get(term)
+        if vector is None:
+            term_rng = random.Random(hashlib.sha256(term.encode()).digest())
+            vector = [term_rng.gauss(0, 1) for _ in range(EMBEDDING_DIMENSION)]
+            self.term_vectors[term] = vector
+        return vector
+
+    def embedding(self, chapter_key: str, focus_terms: tuple[str, str]) -> str:
+        """
+        Unit vector near the chapter's direction, pulled towards the note's
+        focus terms, so similarity search has real neighbours to find
+        """
+        chapter = self.term_vector(chapter_key)
+        a, b = (self.term_vector(term) for term in focus_terms)
+        # Mixing two pooled noise vectors is ~20x cheaper than 768 gauss() calls
+        noise_a, noise_b = self.rng.sample(self.noise_pool, 2)
+        weight = self.rng.uniform(-1, 1)
+        values = [
+            c + 0.6 * (x + y) + 0.5 * (n + weight * m)
+            for c, x, y, n, m in zip(chapter, a, b, noise_a, noise_b)
         ]
-        
-        for announcement in announcements:
-            db.table("announcements").insert(announcement).execute()
-        print(f"   ✓ Created {len(announcements)} announcements")
-        
-        print("\n✅ Database seeding completed successfully!")
-        print(f"\n📊 Summary:")
-        print(f"   - Teacher: {teacher_data['email']}")
-        print(f"   - Student: {student_data['email']}")
-        print(f"   - Classroom: {classroom_data['name']} (Code: {classroom_code})")
-        print(f"   - Subjects: {len(subjects)}")
-        print(f"   - Notes: {len(notes)}")
-        print(f"   - Questions: {len(questions)}")
-        print(f"   - Announcements: {len(announcements)}")
-        
-    except Exception as e:
-        print(f"\n❌ Error during seeding: {str(e)}")
-        raise
+        scale = 1 / (math.hypot(*values) or 1.0)
+        return "[" + ",".join(["%.5f" % (v * scale) for v in values]) + "]"
+
+    # ---- dataset ----
+
+    def run(self):
+        config, rng = self.config, self.rng
+        catalog = list(CATALOG.items())
+
+        teachers = [self.user("teacher", i) for i in range(max(config.teachers, 1))]
+        students = [self.user("student", i) for i in range(max(config.students, 1))]
+        demo_student = students[0]
+
+        for c_index in range(config.classrooms):
+            owner = teachers[c_index % len(teachers)]
+            classroom_created = self.ts(within_days=7)
+            classroom = {
+                "id": self.uid(), "name": f"Class {c_index + 1:03d} - Year {c_index % 4 + 1}",
+                "description": f"Section {chr(65 + c_index % 26)} of year {c_index % 4 + 1}",
+                "code": f"{rng.choice('ABCDEFGHJKLMNPQRSTUVWXYZ')}{c_index:05d}",
+                "created_by": owner["id"], "created_at": classroom_created.isoformat()
+            }
+            self.emit("classrooms", classroom)
+
+            roster = [demo_student] + rng.sample(
+                students[1:], min(max(config.members_per_classroom - 1, 0), len(students) - 1)
+            )
+            for member in roster:
+                self.emit("classroom_members", {
+                    "id": self.uid(), "classroom_id": classroom["id"], "user_id": member["id"],
+                    "joined_at": self.ts(classroom_created, 14).isoformat()
+                })
+
+            for s_index in range(config.subjects_per_classroom):
+                subject_name, (chapter_names, terms) = catalog[(c_index + s_index) % len(catalog)]
+                level = s_index // len(catalog)
+                if level:
+                    subject_name = f"{subject_name} {'I' * (level + 1)}"
+                subject = {
+                    "id": self.uid(), "classroom_id": classroom["id"], "name": subject_name,
+                    "description": f"Covers {', '.join(terms[:3])} and more",
+                    "created_at": self.ts(classroom_created, 7).isoformat()
+                }
+                self.emit("subjects", subject)
+
+                # Subject teacher; a colleague co-teaches roughly a third of subjects
+                subject_teachers = [owner]
+                if len(teachers) > 1 and rng.random() < 0.33:
+                    colleague = rng.choice([t for t in teachers if t is not owner])
+                    subject_teachers.append(colleague)
+                    self.emit("teacher_access", {
+                        "id": self.uid(), "subject_id": subject["id"], "teacher_id": colleague["id"],
+                        "created_at": self.ts(classroom_created, 7).isoformat()
+                    })
+
+                for ch_index in range(config.chapters_per_subject):
+                    name = chapter_names[ch_index % len(chapter_names)]
+                    if ch_index >= len(chapter_names):
+                        name = f"{name} (part {ch_index // len(chapter_names) + 1})"
+                    chapter = {
+                        "id": self.uid(), "subject_id": subject["id"],
+                        "name": f"Unit {ch_index + 1}: {name}",
+                        "description": f"{name} in {subject_name}",
+                        "created_at": self.ts(classroom_created, 60).isoformat()
+                    }
+                    self.emit("chapters", chapter)
+                    self.chapter_rows(chapter, name, terms, roster, subject_teachers)
+
+        self.flush()
+        self.sink.finish()
+        return {"teacher": teachers[0], "student": demo_student}
+
+    def user(self, role: str, index: int) -> dict:
+        if index == 0:
+            # Demo logins kept from the original seed script
+            firebase_uid = f"dummy-{role}-firebase-uid"
+            email = f"{role}@edunexus.com"
+            name = "Dr. Sarah Miller" if role == "teacher" else "Alex Johnson"
+        else:
+            firebase_uid = f"seed-{role}-{index}"
+            email = f"{role}{index}@seed.edunexus.com"
+            name = f"{role.title()} {index}"
+        row = {
+            "id": self.uid(), "firebase_uid": firebase_uid, "email": email, "name": name,
+            "role": role, "created_at": self.start.isoformat()
+        }
+        self.emit("users", row)
+        return row
+
+    def chapter_rows(self, chapter: dict, name: str, terms: list[str], roster: list[dict], teachers: list[dict]):
+        config, rng = self.config, self.rng
+        created = datetime.fromisoformat(chapter["created_at"])
+        chapter_key = chapter["description"]
+
+        for _ in range(config.notes_per_chapter):
+            by_teacher = rng.random() < 0.2
+            uploader = rng.choice(teachers) if by_teacher else rng.choice(roster)
+            status = "approved" if by_teacher else rng.choices(
+                ["approved", "pending", "rejected"], [0.65, 0.3, 0.05]
+            )[0]
+            visibility = "private" if rng.random() < 0.15 else "public"
+            focus = rng.sample(terms, 2)
+            title = self.fill(rng.choice(NOTE_TITLES), focus, name)
+            content = "\n\n".join(self.paragraph(terms, name) for _ in range(rng.randint(2, 6)))
+            uploaded_at = self.ts(created, 60)
+            approved = status == "approved"
+            self.emit("notes", {
+                "id": self.uid(), "chapter_id": chapter["id"], "title": title, "content": content,
+                "file_url": None, "file_name": None, "visibility": visibility,
+                "approval_status": status, "uploaded_by": uploader["id"],
+                "approved_by": (uploader if by_teacher else rng.choice(teachers))["id"] if approved else None,
+                "approved_at": self.ts(uploaded_at, 3).isoformat() if approved else None,
+                "created_at": uploaded_at.isoformat(),
+                # Only approved notes are embedded by the app
+                "embedding": self.embedding(chapter_key, focus)
+                if approved and config.embeddings else None
+            })
+
+        for _ in range(config.questions_per_chapter):
+            asked_at = self.ts(created, 60)
+            answered = rng.random() < 0.6
+            self.emit("questions", {
+                "id": self.uid(), "chapter_id": chapter["id"], "user_id": rng.choice(roster)["id"],
+                "title": self.fill(rng.choice(QUESTION_TITLES), terms, name),
+                "content": self.fill(rng.choice(QUESTION_BODIES), terms, name),
+                "is_private": rng.random() < 0.2,
+                "answer": self.fill(rng.choice(ANSWERS), terms, name) if answered else None,
+                "answered_by": rng.choice(teachers)["id"] if answered else None,
+                "answered_at": self.ts(asked_at, 5).isoformat() if answered else None,
+                "created_at": asked_at.isoformat()
+            })
+
+        for _ in range(config.announcements_per_chapter):
+            title, body = rng.choice(ANNOUNCEMENTS)
+            self.emit("announcements", {
+                "id": self.uid(), "chapter_id": chapter["id"],
+                "title": self.fill(title, terms, name), "content": self.fill(body, terms, name),
+                "created_by": rng.choice(teachers)["id"],
+                "created_at": self.ts(created, 60).isoformat()
+            })
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate synthetic EduNexus data")
+    parser.add_argument("--preset", choices=sorted(PRESETS), default="demo")
+    for f in fields(SeedConfig):
+        if f.type in (int, "int"):
+            parser.add_argument(f"--{f.name.replace('_', '-')}", type=int, dest=f.name,
+                                help=f"Overrides the preset (demo: {f.default})")
+    parser.add_argument("--no-embeddings", action="store_true", help="Leave notes.embedding NULL")
+    parser.add_argument("--batch-size", type=int, help="Rows per insert/COPY (default 5000 COPY, 500 REST)")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"),
+                        help="Postgres URL for COPY loading (default: DATABASE_URL)")
+    parser.add_argument("--truncate", action="store_true",
+                        help="COPY mode only: wipe users/classrooms (and everything below) first")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    overrides = {f.name: getattr(args, f.name) for f in fields(SeedConfig)
+                 if getattr(args, f.name, None) is not None}
+    config = replace(PRESETS[args.preset], **overrides)
+    if args.no_embeddings:
+        config = replace(config, embeddings=False)
+
+    chapters = config.classrooms * config.subjects_per_classroom * config.chapters_per_subject
+    print("🌱 Generating synthetic data "
+          f"(seed {config.seed}: {config.classrooms} classrooms, {chapters} chapters, "
+          f"~{chapters * config.notes_per_chapter} notes, ~{chapters * config.questions_per_chapter} questions)")
+
+    if args.database_url:
+        sink = CopySink(args.database_url, truncate=args.truncate)
+        batch_size = args.batch_size or 5000
+        print(f"   Postgres COPY (triggers {'deferred' if sink.triggers_disabled else 'per row'})")
+    else:
+        if args.truncate:
+            raise SystemExit("--truncate needs --database-url")
+        sink = SupabaseSink()
+        batch_size = args.batch_size or 500
+        print("   Supabase REST inserts")
+
+    started = time.perf_counter()
+    generator = Generator(config, sink, batch_size)
+    demo = generator.run()
+    elapsed = time.perf_counter() - started
+
+    print(f"\n✅ Done in {elapsed:.1f}s")
+    for table, count in generator.counts.items():
+        print(f"   - {table}: {count}")
+    print(f"\n   Demo teacher: {demo['teacher']['email']} ({demo['teacher']['firebase_uid']})")
+    print(f"   Demo student: {demo['student']['email']} ({demo['student']['firebase_uid']})")
+    return 0
 
 
 if __name__ == "__main__":
-    asyncio.run(seed_data())
+    sys.exit(main())
@@ -0,0 +1,229 @@
+-- Trigger-maintained counters for dashboard badges and classroom-tree stats
+-- Counters live in one-to-one side tables so PostgREST can embed them in the
+-- same query that loads the classroom -> subject -> chapter hierarchy.
+
+-- ============================================
+-- COUNTER TABLES
+-- ============================================
+CREATE TABLE classroom_counters (
+    classroom_id UUID PRIMARY KEY REFERENCES classrooms(id) ON DELETE CASCADE,
+    member_count INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE subject_counters (
+    subject_id UUID PRIMARY KEY REFERENCES subjects(id) ON DELETE CASCADE,
+    pending_notes INTEGER NOT NULL DEFAULT 0,
+    unanswered_questions INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE chapter_counters (
+    chapter_id UUID PRIMARY KEY REFERENCES chapters(id) ON DELETE CASCADE,
+    note_count INTEGER NOT NULL DEFAULT 0
+);
+
+-- ============================================
+-- HELPERS
+-- ============================================
+-- Increments upsert (the parent row always exists on INSERT/UPDATE).
+-- Decrements only UPDATE: during a cascade delete the parent is already gone,
+-- and the counter row is removed by its own ON DELETE CASCADE.
+
+CREATE OR REPLACE FUNCTION bump_subject_counter(
+    target_subject_id UUID,
+    pending_delta INTEGER,
+    unanswered_delta INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    IF target_subject_id IS NULL OR (pending_delta = 0 AND unanswered_delta = 0) THEN
+        RETURN;
+    END IF;
+
+    IF pending_delta > 0 OR unanswered_delta > 0 THEN
+        INSERT INTO subject_counters (subject_id, pending_notes, unanswered_questions)
+        VALUES (target_subject_id, GREATEST(pending_delta, 0), GREATEST(unanswered_delta, 0))
+        ON CONFLICT (subject_id) DO UPDATE SET
+            pending_notes = subject_counters.pending_notes + pending_delta,
+            unanswered_questions = subject_counters.unanswered_questions + unanswered_delta;
+    ELSE
+        UPDATE subject_counters SET
+            pending_notes = GREATEST(pending_notes + pending_delta, 0),
+            unanswered_questions = GREATEST(unanswered_questions + unanswered_delta, 0)
+        WHERE subject_id = target_subject_id;
+    END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- NOTES: pending per subject, notes per chapter
+-- ============================================
+CREATE OR REPLACE FUNCTION notes_counters_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_subject UUID;
+    new_subject UUID;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        SELECT subject_id INTO old_subject FROM chapters WHERE id = OLD.chapter_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        SELECT subject_id INTO new_subject FROM chapters WHERE id = NEW.chapter_id;
+    END IF;
+
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO chapter_counters (chapter_id, note_count) VALUES (NEW.chapter_id, 1)
+        ON CONFLICT (chapter_id) DO UPDATE SET note_count = chapter_counters.note_count + 1;
+
+        IF NEW.approval_status = 'pending' THEN
+            PERFORM bump_subject_counter(new_subject, 1, 0);
+        END IF;
+        RETURN NEW;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        UPDATE chapter_counters SET note_count = GREATEST(note_count - 1, 0)
+        WHERE chapter_id = OLD.chapter_id;
+
+        IF OLD.approval_status = 'pending' THEN
+            PERFORM bump_subject_counter(old_subject, -1, 0);
+        END IF;
+        RETURN OLD;
+    END IF;
+
+    -- UPDATE
+    IF NEW.chapter_id IS DISTINCT FROM OLD.chapter_id THEN
+        UPDATE chapter_counters SET note_count = GREATEST(note_count - 1, 0)
+        WHERE chapter_id = OLD.chapter_id;
+        INSERT INTO chapter_counters (chapter_id, note_count) VALUES (NEW.chapter_id, 1)
+        ON CONFLICT (chapter_id) DO UPDATE SET note_count = chapter_counters.note_count + 1;
+    END IF;
+
+    IF OLD.approval_status = 'pending' THEN
+        PERFORM bump_subject_counter(old_subject, -1, 0);
+    END IF;
+    IF NEW.approval_status = 'pending' THEN
+        PERFORM bump_subject_counter(new_subject, 1, 0);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notes_counters
+AFTER INSERT OR DELETE OR UPDATE OF approval_status, chapter_id ON notes
+FOR EACH ROW EXECUTE FUNCTION notes_counters_trigger();
+
+-- ============================================
+-- QUESTIONS: unanswered per subject
+-- ============================================
+CREATE OR REPLACE FUNCTION questions_counters_trigger()
+RETURNS TRIGGER AS $$
+DECLARE
+    old_subject UUID;
+    new_subject UUID;
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.answer IS NULL THEN
+        SELECT subject_id INTO old_subject FROM chapters WHERE id = OLD.chapter_id;
+        PERFORM bump_subject_counter(old_subject, 0, -1);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.answer IS NULL THEN
+        SELECT subject_id INTO new_subject FROM chapters WHERE id = NEW.chapter_id;
+        PERFORM bump_subject_counter(new_subject, 0, 1);
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER questions_counters
+AFTER INSERT OR DELETE OR UPDATE OF answer, chapter_id ON questions
+FOR EACH ROW EXECUTE FUNCTION questions_counters_trigger();
+
+-- ============================================
+-- CLASSROOM MEMBERS: members per classroom
+-- ============================================
+CREATE OR REPLACE FUNCTION classroom_members_counters_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO classroom_counters (classroom_id, member_count) VALUES (NEW.classroom_id, 1)
+        ON CONFLICT (classroom_id) DO UPDATE SET member_count = classroom_counters.member_count + 1;
+        RETURN NEW;
+    END IF;
+
+    UPDATE classroom_counters SET member_count = GREATEST(member_count - 1, 0)
+    WHERE classroom_id = OLD.classroom_id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER classroom_members_counters
+AFTER INSERT OR DELETE ON classroom_members
+FOR EACH ROW EXECUTE FUNCTION classroom_members_counters_trigger();
+
+-- ============================================
+-- ZERO ROWS FOR NEW PARENTS
+-- ============================================
+-- Every classroom/subject/chapter gets a counter row so embeds never return null.
+
+CREATE OR REPLACE FUNCTION create_counter_row_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_TABLE_NAME = 'classrooms' THEN
+        INSERT INTO classroom_counters (classroom_id) VALUES (NEW.id) ON CONFLICT DO NOTHING;
+    ELSIF TG_TABLE_NAME = 'subjects' THEN
+        INSERT INTO subject_counters (subject_id) VALUES (NEW.id) ON CONFLICT DO NOTHING;
+    ELSIF TG_TABLE_NAME = 'chapters' THEN
+        INSERT INTO chapter_counters (chapter_id) VALUES (NEW.id) ON CONFLICT DO NOTHING;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER classrooms_counter_row
+AFTER INSERT ON classrooms
+FOR EACH ROW EXECUTE FUNCTION create_counter_row_trigger();
+
+CREATE TRIGGER subjects_counter_row
+AFTER INSERT ON subjects
+FOR EACH ROW EXECUTE FUNCTION create_counter_row_trigger();
+
+CREATE TRIGGER chapters_counter_row
+AFTER INSERT ON chapters
+FOR EACH ROW EXECUTE FUNCTION create_counter_row_trigger();
+
+-- ============================================
+-- BACKFILL
+-- ============================================
+INSERT INTO classroom_counters (classroom_id, member_count)
+SELECT c.id, COUNT(m.id)
+FROM classrooms c
+LEFT JOIN classroom_members m ON m.classroom_id = c.id
+GROUP BY c.id
+ON CONFLICT (classroom_id) DO UPDATE SET member_count = EXCLUDED.member_count;
+
+INSERT INTO subject_counters (subject_id, pending_notes, unanswered_questions)
+SELECT
+    s.id,
+    (SELECT COUNT(*) FROM notes n JOIN chapters ch ON ch.id = n.chapter_id
+     WHERE ch.subject_id = s.id AND n.approval_status = 'pending'),
+    (SELECT COUNT(*) FROM questions q JOIN chapters ch ON ch.id = q.chapter_id
+     WHERE ch.subject_id = s.id AND q.answer IS NULL)
+FROM subjects s
+ON CONFLICT (subject_id) DO UPDATE SET
+    pending_notes = EXCLUDED.pending_notes,
+    unanswered_questions = EXCLUDED.unanswered_questions;
+
+INSERT INTO chapter_counters (chapter_id, note_count)
+SELECT ch.id, COUNT(n.id)
+FROM chapters ch
+LEFT JOIN notes n ON n.chapter_id = ch.id
+GROUP BY ch.id
+ON CONFLICT (chapter_id) DO UPDATE SET note_count = EXCLUDED.note_count;
+
+COMMENT ON TABLE classroom_counters IS 'Members per classroom, maintained by triggers on classroom_members';
+COMMENT ON TABLE subject_counters IS 'Pending notes and unanswered questions per subject, maintained by triggers';
+COMMENT ON TABLE chapter_counters IS 'Notes per chapter, maintained by triggers on notes';
@@ -0,0 +1,50 @@
+-- Set-based note moderation and batched embedding writes
+
+-- ============================================
+-- BULK APPROVE / REJECT
+-- ============================================
+-- decisions: [{"note_id": "<uuid>", "status": "approved" | "rejected"}, ...]
+-- Applies every decision in one UPDATE. Rejected notes lose their embedding in
+-- the same statement; approved notes get theirs via set_note_embeddings.
+CREATE OR REPLACE FUNCTION moderate_notes(
+    decisions JSONB,
+    moderator_id UUID
+)
+RETURNS TABLE (
+    note_id UUID,
+    approval_status TEXT
+) AS $$
+    UPDATE notes AS n SET
+        approval_status = d.status,
+        approved_by = CASE WHEN d.status = 'approved' THEN moderator_id END,
+        approved_at = CASE WHEN d.status = 'approved' THEN NOW() END,
+        embedding = CASE WHEN d.status = 'approved' THEN n.embedding END
+    FROM (
+        SELECT DISTINCT ON (x.note_id) x.note_id, x.status
+        FROM jsonb_to_recordset(decisions) AS x(note_id UUID, status TEXT)
+        WHERE x.status IN ('approved', 'rejected')
+    ) AS d
+    WHERE n.id = d.note_id
+    RETURNING n.id, n.approval_status;
+$$ LANGUAGE sql;
+
+-- ============================================
+-- BATCHED EMBEDDING WRITES
+-- ============================================
+-- embeddings: [{"note_id": "<uuid>", "embedding": [768 floats]}, ...]
+CREATE OR REPLACE FUNCTION set_note_embeddings(
+    embeddings JSONB
+)
+RETURNS INTEGER AS $$
+    WITH updated AS (
+        UPDATE notes AS n SET
+            embedding = (e->>'embedding')::vector
+        FROM jsonb_array_elements(embeddings) AS e
+        WHERE n.id = (e->>'note_id')::UUID
+        RETURNING n.id
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$ LANGUAGE sql;
+
+COMMENT ON FUNCTION moderate_notes IS 'Approve/reject many notes in one set-based update';
+COMMENT ON FUNCTION set_note_embeddings IS 'Write a batch of note embeddings in one statement';
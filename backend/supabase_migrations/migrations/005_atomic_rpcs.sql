@@ -0,0 +1,171 @@
+-- Single round-trip, transactional RPCs for multi-step write flows
+-- Each function relies on the existing unique constraints instead of a
+-- read-then-write check, so concurrent calls cannot race, and reports the
+-- outcome as {"status": ...} alongside the affected row.
+
+-- ============================================
+-- JOIN CLASSROOM
+-- ============================================
+-- status: joined | already_member | not_found
+CREATE OR REPLACE FUNCTION join_classroom(
+    p_code TEXT,
+    p_user_id UUID
+)
+RETURNS JSONB AS $$
+DECLARE
+    target classrooms%ROWTYPE;
+    member_id UUID;
+BEGIN
+    SELECT * INTO target FROM classrooms WHERE code = p_code;
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'not_found');
+    END IF;
+
+    INSERT INTO classroom_members (classroom_id, user_id, joined_at)
+    VALUES (target.id, p_user_id, NOW())
+    ON CONFLICT (classroom_id, user_id) DO NOTHING
+    RETURNING id INTO member_id;
+
+    RETURN jsonb_build_object(
+        'status', CASE WHEN member_id IS NULL THEN 'already_member' ELSE 'joined' END,
+        'classroom', to_jsonb(target)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- CREATE USER PROFILE
+-- ============================================
+-- status: created | uid_exists | email_exists
+CREATE OR REPLACE FUNCTION create_user_profile(
+    p_firebase_uid TEXT,
+    p_email TEXT,
+    p_name TEXT,
+    p_role TEXT
+)
+RETURNS JSONB AS $$
+DECLARE
+    created users%ROWTYPE;
+BEGIN
+    -- Covers both UNIQUE(firebase_uid) and UNIQUE(email)
+    INSERT INTO users (firebase_uid, email, name, role, created_at)
+    VALUES (p_firebase_uid, p_email, p_name, p_role, NOW())
+    ON CONFLICT DO NOTHING
+    RETURNING * INTO created;
+
+    IF created.id IS NOT NULL THEN
+        RETURN jsonb_build_object('status', 'created', 'user', to_jsonb(created));
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM users WHERE firebase_uid = p_firebase_uid) THEN
+        RETURN jsonb_build_object('status', 'uid_exists');
+    END IF;
+    RETURN jsonb_build_object('status', 'email_exists');
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- ASSIGN TEACHER
+-- ============================================
+-- status: assigned | already_assigned | teacher_not_found
+CREATE OR REPLACE FUNCTION assign_teacher(
+    p_subject_id UUID,
+    p_teacher_email TEXT
+)
+RETURNS JSONB AS $$
+DECLARE
+    teacher users%ROWTYPE;
+    access teacher_access%ROWTYPE;
+BEGIN
+    SELECT * INTO teacher FROM users WHERE email = p_teacher_email AND role = 'teacher';
+    IF NOT FOUND THEN
+        RETURN jsonb_build_object('status', 'teacher_not_found');
+    END IF;
+
+    INSERT INTO teacher_access (subject_id, teacher_id, created_at)
+    VALUES (p_subject_id, teacher.id, NOW())
+    ON CONFLICT (subject_id, teacher_id) DO NOTHING
+    RETURNING * INTO access;
+
+    IF access.id IS NULL THEN
+        RETURN jsonb_build_object('status', 'already_assigned');
+    END IF;
+
+    RETURN jsonb_build_object(
+        'status', 'assigned',
+        'access', to_jsonb(access),
+        'teacher', jsonb_build_object('id', teacher.id, 'name', teacher.name, 'email', teacher.email)
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- DELETE SUBJECT (classroom creator only)
+-- ============================================
+-- status: deleted | forbidden | not_found
+CREATE OR REPLACE FUNCTION delete_subject(
+    p_subject_id UUID,
+    p_user_id UUID
+)
+RETURNS JSONB AS $$
+DECLARE
+    deleted_id UUID;
+BEGIN
+    DELETE FROM subjects s
+    USING classrooms c
+    WHERE s.id = p_subject_id
+      AND c.id = s.classroom_id
+      AND c.created_by = p_user_id
+    RETURNING s.id INTO deleted_id;
+
+    IF deleted_id IS NOT NULL THEN
+        RETURN jsonb_build_object('status', 'deleted');
+    END IF;
+    IF EXISTS (SELECT 1 FROM subjects WHERE id = p_subject_id) THEN
+        RETURN jsonb_build_object('status', 'forbidden');
+    END IF;
+    RETURN jsonb_build_object('status', 'not_found');
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- DELETE CHAPTER (classroom creator or subject teacher)
+-- ============================================
+-- status: deleted | forbidden | not_found
+CREATE OR REPLACE FUNCTION delete_chapter(
+    p_chapter_id UUID,
+    p_user_id UUID
+)
+RETURNS JSONB AS $$
+DECLARE
+    deleted_id UUID;
+BEGIN
+    DELETE FROM chapters ch
+    USING subjects s, classrooms c
+    WHERE ch.id = p_chapter_id
+      AND s.id = ch.subject_id
+      AND c.id = s.classroom_id
+      AND (
+          c.created_by = p_user_id
+          OR EXISTS (
+              SELECT 1 FROM teacher_access ta
+              WHERE ta.subject_id = s.id AND ta.teacher_id = p_user_id
+          )
+      )
+    RETURNING ch.id INTO deleted_id;
+
+    IF deleted_id IS NOT NULL THEN
+        RETURN jsonb_build_object('status', 'deleted');
+    END IF;
+    IF EXISTS (SELECT 1 FROM chapters WHERE id = p_chapter_id) THEN
+        RETURN jsonb_build_object('status', 'forbidden');
+    END IF;
+    RETURN jsonb_build_object('status', 'not_found');
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION join_classroom IS 'Join classroom by code in one statement (idempotent on membership)';
+COMMENT ON FUNCTION create_user_profile IS 'Create user profile, reporting uid/email conflicts';
+COMMENT ON FUNCTION assign_teacher IS 'Grant a teacher access to a subject by email';
+COMMENT ON FUNCTION delete_subject IS 'Delete subject if the caller created its classroom';
+COMMENT ON FUNCTION delete_chapter IS 'Delete chapter if the caller created its classroom or teaches its subject';
@@ -0,0 +1,27 @@
+-- Return full note rows from bulk moderation
+-- A table-typed result lets PostgREST embed uploader/approver in the RPC call
+-- itself, so the API no longer re-selects the notes it just updated.
+
+DROP FUNCTION IF EXISTS moderate_notes(JSONB, UUID);
+
+-- decisions: [{"note_id": "<uuid>", "status": "approved" | "rejected"}, ...]
+CREATE OR REPLACE FUNCTION moderate_notes(
+    decisions JSONB,
+    moderator_id UUID
+)
+RETURNS SETOF notes AS $$
+    UPDATE notes AS n SET
+        approval_status = d.status,
+        approved_by = CASE WHEN d.status = 'approved' THEN moderator_id END,
+        approved_at = CASE WHEN d.status = 'approved' THEN NOW() END,
+        embedding = CASE WHEN d.status = 'approved' THEN n.embedding END
+    FROM (
+        SELECT DISTINCT ON (x.note_id) x.note_id, x.status
+        FROM jsonb_to_recordset(decisions) AS x(note_id UUID, status TEXT)
+        WHERE x.status IN ('approved', 'rejected')
+    ) AS d
+    WHERE n.id = d.note_id
+    RETURNING n.*;
+$$ LANGUAGE sql;
+
+COMMENT ON FUNCTION moderate_notes IS 'Approve/reject many notes in one set-based update, returning the updated rows';
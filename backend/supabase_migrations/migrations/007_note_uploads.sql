@@ -0,0 +1,28 @@
+-- Two-phase note uploads
+-- The API hands out a signed Storage upload URL and records the pending upload
+-- here; the client PUTs the file straight to Storage and then finalizes, which
+-- extracts text from the stored object and creates the note. File bytes never
+-- pass through the API on the way in.
+
+CREATE TABLE note_uploads (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    chapter_id UUID NOT NULL REFERENCES chapters(id) ON DELETE CASCADE,
+    uploaded_by UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    title TEXT NOT NULL,
+    file_name TEXT NOT NULL,
+    visibility TEXT NOT NULL CHECK (visibility IN ('public', 'private')),
+    storage_path TEXT NOT NULL UNIQUE,
+    -- pending -> processing (claimed by one finalize call) -> completed | failed
+    status TEXT NOT NULL DEFAULT 'pending' CHECK (status IN ('pending', 'processing', 'completed', 'failed')),
+    error TEXT,
+    note_id UUID REFERENCES notes(id) ON DELETE SET NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW(),
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_note_uploads_uploaded_by ON note_uploads(uploaded_by);
+-- Abandoned uploads (signed URL expired, never finalized)
+CREATE INDEX idx_note_uploads_pending ON note_uploads(expires_at) WHERE status = 'pending';
+
+COMMENT ON TABLE note_uploads IS 'Signed direct-to-storage note uploads awaiting or past finalize';
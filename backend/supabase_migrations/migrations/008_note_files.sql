@@ -0,0 +1,87 @@
+-- Content-addressed note files
+-- Identical uploads (same SHA-256) share one storage object, one extracted
+-- text and one embedding. Notes point at their file; ref_count tracks how
+-- many notes do, so unreferenced files can be collected later.
+
+CREATE TABLE note_files (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    sha256 TEXT NOT NULL UNIQUE,
+    storage_path TEXT NOT NULL,
+    size_bytes BIGINT NOT NULL,
+    content TEXT NOT NULL,  -- Full extracted text (notes.content keeps a prefix)
+    embedding vector(768),  -- First embedding computed for a note of this file
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+ALTER TABLE notes ADD COLUMN file_id UUID REFERENCES note_files(id) ON DELETE SET NULL;
+CREATE INDEX idx_notes_file ON notes(file_id);
+
+-- ============================================
+-- REFERENCE COUNT
+-- ============================================
+CREATE OR REPLACE FUNCTION notes_file_refs_trigger()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.file_id IS NOT NULL THEN
+        UPDATE note_files SET ref_count = GREATEST(ref_count - 1, 0) WHERE id = OLD.file_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.file_id IS NOT NULL THEN
+        UPDATE note_files SET ref_count = ref_count + 1 WHERE id = NEW.file_id;
+    END IF;
+
+    IF TG_OP = 'DELETE' THEN
+        RETURN OLD;
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER notes_file_refs
+AFTER INSERT OR DELETE OR UPDATE OF file_id ON notes
+FOR EACH ROW EXECUTE FUNCTION notes_file_refs_trigger();
+
+-- ============================================
+-- SHARED EMBEDDINGS
+-- ============================================
+-- Same contract as before; additionally the first embedding written for a
+-- note with a file is kept on the file for later duplicates.
+CREATE OR REPLACE FUNCTION set_note_embeddings(
+    embeddings JSONB
+)
+RETURNS INTEGER AS $$
+    WITH updated AS (
+        UPDATE notes AS n SET
+            embedding = (e->>'embedding')::vector
+        FROM jsonb_array_elements(embeddings) AS e
+        WHERE n.id = (e->>'note_id')::UUID
+        RETURNING n.id, n.file_id, n.embedding
+    ),
+    shared AS (
+        UPDATE note_files AS f SET
+            embedding = u.embedding
+        FROM (SELECT DISTINCT ON (file_id) file_id, embedding FROM updated WHERE file_id IS NOT NULL) AS u
+        WHERE f.id = u.file_id AND f.embedding IS NULL
+    )
+    SELECT COUNT(*)::INTEGER FROM updated;
+$$ LANGUAGE sql;
+
+-- Copy file embeddings onto the given notes; returns the notes that got one,
+-- so callers only send the rest to the embedding model.
+CREATE OR REPLACE FUNCTION reuse_file_embeddings(
+    note_ids UUID[]
+)
+RETURNS TABLE (
+    note_id UUID
+) AS $$
+    UPDATE notes AS n SET
+        embedding = f.embedding
+    FROM note_files AS f
+    WHERE n.id = ANY(note_ids)
+      AND n.file_id = f.id
+      AND f.embedding IS NOT NULL
+    RETURNING n.id;
+$$ LANGUAGE sql;
+
+COMMENT ON TABLE note_files IS 'Uploaded files by SHA-256, shared by every note with identical content';
+COMMENT ON FUNCTION reuse_file_embeddings IS 'Give notes the cached embedding of their file, returning the ids that were filled';
@@ -0,0 +1,146 @@
+-- Full note text, page by page
+-- notes.content held the first 5000 characters of the extracted text and
+-- every note list shipped all of it. The complete text now lives once per file
+-- in note_file_pages (large values are TOAST-compressed by Postgres), notes of
+-- a file keep a short preview, and note_files.lead keeps the opening text used
+-- for embeddings and RAG context. Notes uploaded before note_files existed
+-- have no other copy of their text and keep it in notes.content.
+
+CREATE TABLE note_file_pages (
+    file_id UUID NOT NULL REFERENCES note_files(id) ON DELETE CASCADE,
+    page INTEGER NOT NULL CHECK (page >= 1),
+    content TEXT NOT NULL,
+    PRIMARY KEY (file_id, page)
+);
+
+ALTER TABLE note_files
+    ADD COLUMN lead TEXT NOT NULL DEFAULT '',
+    ADD COLUMN page_count INTEGER NOT NULL DEFAULT 0,
+    ADD COLUMN char_count INTEGER NOT NULL DEFAULT 0;
+
+-- ============================================
+-- BACKFILL
+-- ============================================
+-- Same split as DocumentProcessor.split_pages: form feeds (PDF page breaks),
+-- then at most 4000 characters per page, blank pages dropped.
+INSERT INTO note_file_pages (file_id, page, content)
+SELECT
+    f.id,
+    ROW_NUMBER() OVER (PARTITION BY f.id ORDER BY p.n, c.start),
+    substr(p.text, c.start, 4000)
+FROM note_files AS f
+CROSS JOIN LATERAL regexp_split_to_table(f.content, E'\f') WITH ORDINALITY AS p(text, n)
+CROSS JOIN LATERAL generate_series(1, length(p.text), 4000) AS c(start)
+WHERE btrim(substr(p.text, c.start, 4000), E' \t\r\n') <> '';
+
+UPDATE note_files AS f SET
+    lead = left(f.content, 5000),
+    char_count = length(f.content),
+    page_count = (SELECT COUNT(*) FROM note_file_pages WHERE file_id = f.id);
+
+ALTER TABLE note_files DROP COLUMN content;
+
+UPDATE notes SET content = left(content, 500) WHERE file_id IS NOT NULL;
+
+-- ============================================
+-- REGISTER FILE
+-- ============================================
+-- File row and its pages in one transaction.
+-- status: created | exists (an identical file won the race; returned instead)
+CREATE OR REPLACE FUNCTION register_note_file(
+    p_sha256 TEXT,
+    p_storage_path TEXT,
+    p_size_bytes BIGINT,
+    p_lead TEXT,
+    p_char_count INTEGER,
+    p_pages TEXT[]
+)
+RETURNS JSONB AS $$
+DECLARE
+    created note_files%ROWTYPE;
+BEGIN
+    INSERT INTO note_files (sha256, storage_path, size_bytes, lead, char_count, page_count)
+    VALUES (p_sha256, p_storage_path, p_size_bytes, p_lead, p_char_count, COALESCE(array_length(p_pages, 1), 0))
+    ON CONFLICT (sha256) DO NOTHING
+    RETURNING * INTO created;
+
+    IF created.id IS NULL THEN
+        SELECT * INTO created FROM note_files WHERE sha256 = p_sha256;
+        RETURN jsonb_build_object('status', 'exists', 'file', to_jsonb(created) - 'embedding');
+    END IF;
+
+    INSERT INTO note_file_pages (file_id, page, content)
+    SELECT created.id, t.page, t.content
+    FROM unnest(p_pages) WITH ORDINALITY AS t(content, page);
+
+    RETURN jsonb_build_object('status', 'created', 'file', to_jsonb(created) - 'embedding');
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- FILE EMBEDDINGS: reuse, or the text to embed
+-- ============================================
+-- For each note with a file: reused = the file's embedding was copied onto
+-- the note; otherwise lead is the text to embed (the note only has a preview).
+DROP FUNCTION IF EXISTS reuse_file_embeddings(UUID[]);
+
+CREATE FUNCTION reuse_file_embeddings(
+    note_ids UUID[]
+)
+RETURNS TABLE (
+    note_id UUID,
+    reused BOOLEAN,
+    lead TEXT
+) AS $$
+    WITH filled AS (
+        UPDATE notes AS n SET
+            embedding = f.embedding
+        FROM note_files AS f
+        WHERE n.id = ANY(note_ids)
+          AND n.file_id = f.id
+          AND f.embedding IS NOT NULL
+        RETURNING n.id
+    )
+    SELECT n.id, filled.id IS NOT NULL, CASE WHEN filled.id IS NULL THEN f.lead END
+    FROM notes AS n
+    JOIN note_files AS f ON f.id = n.file_id
+    LEFT JOIN filled ON filled.id = n.id
+    WHERE n.id = ANY(note_ids);
+$$ LANGUAGE sql;
+
+-- ============================================
+-- SEARCH: lead text instead of the preview
+-- ============================================
+CREATE OR REPLACE FUNCTION search_notes_by_similarity(
+    query_embedding vector(768),
+    target_chapter_id UUID,
+    result_limit INTEGER DEFAULT 5
+)
+RETURNS TABLE (
+    note_id UUID,
+    title TEXT,
+    content TEXT,
+    similarity FLOAT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        notes.id,
+        notes.title,
+        COALESCE(note_files.lead, notes.content),
+        1 - (notes.embedding <=> query_embedding) AS similarity
+    FROM notes
+    LEFT JOIN note_files ON note_files.id = notes.file_id
+    WHERE
+        notes.chapter_id = target_chapter_id
+        AND notes.embedding IS NOT NULL
+        AND notes.approval_status = 'approved'
+        AND notes.visibility = 'public'
+    ORDER BY notes.embedding <=> query_embedding
+    LIMIT result_limit;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE note_file_pages IS 'Complete extracted text of a note file, one row per page';
+COMMENT ON FUNCTION reuse_file_embeddings IS 'Give notes the cached embedding of their file, or return the file text to embed';
+COMMENT ON FUNCTION register_note_file IS 'Insert a note file with its pages, or return the existing file with the same SHA-256';
@@ -0,0 +1,13 @@
+-- Resumable note uploads
+-- A resumable upload is a note_uploads row with a declared length. Each
+-- PATCH stores its bytes as a part object next to the final path and moves
+-- upload_offset forward (compare-and-set on the old offset); finalize
+-- assembles the parts into the final object and creates the note as usual.
+-- Signed uploads leave upload_length NULL.
+
+ALTER TABLE note_uploads
+    ADD COLUMN upload_length BIGINT CHECK (upload_length > 0),
+    ADD COLUMN upload_offset BIGINT NOT NULL DEFAULT 0,
+    ADD COLUMN parts TEXT[] NOT NULL DEFAULT '{}';  -- Part object paths, in offset order
+
+COMMENT ON COLUMN note_uploads.upload_length IS 'Declared file size of a resumable upload (NULL for signed uploads)';
@@ -0,0 +1,68 @@
+-- Storage garbage collection
+-- Deleting notes (directly or through subject/classroom cascades) only drops
+-- note_files.ref_count, and abandoned or failed uploads leave rows and
+-- objects behind. The collector (app/services/storage_gc.py) deletes the
+-- rows here, then removes every bucket object nothing live points at.
+
+-- ============================================
+-- ROWS
+-- ============================================
+-- Files no note uses and uploads past their expiry that never completed,
+-- both older than the grace period. Their objects become orphans for the
+-- bucket sweep. Returns the number of rows deleted per table.
+CREATE OR REPLACE FUNCTION collect_storage_rows(
+    p_grace_seconds INTEGER
+)
+RETURNS JSONB AS $$
+DECLARE
+    cutoff TIMESTAMP WITH TIME ZONE := NOW() - make_interval(secs => p_grace_seconds);
+    files INTEGER;
+    uploads INTEGER;
+BEGIN
+    DELETE FROM note_files
+    WHERE ref_count = 0
+      AND created_at < cutoff
+      AND NOT EXISTS (SELECT 1 FROM notes WHERE notes.file_id = note_files.id);
+    GET DIAGNOSTICS files = ROW_COUNT;
+
+    DELETE FROM note_uploads
+    WHERE status <> 'completed'
+      AND expires_at < cutoff;
+    GET DIAGNOSTICS uploads = ROW_COUNT;
+
+    RETURN jsonb_build_object('files', files, 'uploads', uploads);
+END;
+$$ LANGUAGE plpgsql;
+
+-- ============================================
+-- LEASES
+-- ============================================
+-- One holder at a time for periodic jobs that every worker schedules.
+CREATE TABLE maintenance_leases (
+    name TEXT PRIMARY KEY,
+    holder TEXT NOT NULL,
+    expires_at TIMESTAMP WITH TIME ZONE NOT NULL
+);
+
+-- TRUE when the caller holds the lease (newly or still) for p_seconds
+CREATE OR REPLACE FUNCTION acquire_maintenance_lease(
+    p_name TEXT,
+    p_holder TEXT,
+    p_seconds INTEGER
+)
+RETURNS BOOLEAN AS $$
+    WITH acquired AS (
+        INSERT INTO maintenance_leases (name, holder, expires_at)
+        VALUES (p_name, p_holder, NOW() + make_interval(secs => p_seconds))
+        ON CONFLICT (name) DO UPDATE SET
+            holder = EXCLUDED.holder,
+            expires_at = EXCLUDED.expires_at
+        WHERE maintenance_leases.expires_at < NOW()
+           OR maintenance_leases.holder = EXCLUDED.holder
+        RETURNING 1
+    )
+    SELECT EXISTS (SELECT 1 FROM acquired);
+$$ LANGUAGE sql;
+
+COMMENT ON FUNCTION collect_storage_rows IS 'Delete unreferenced note files and expired unfinished uploads (objects are swept separately)';
+COMMENT ON TABLE maintenance_leases IS 'Time-limited locks so only one worker runs a periodic job';
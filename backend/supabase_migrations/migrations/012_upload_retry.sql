@@ -0,0 +1,37 @@
+-- Finalize retries
+-- A finalize that ingested the file but could not create the note puts the
+-- upload back to pending with the file it ingested (the signed object or
+-- the parts may already be gone), so a retry only creates the note. The
+-- collector keeps a file while an unfinished upload holds it.
+
+ALTER TABLE note_uploads ADD COLUMN file_id UUID REFERENCES note_files(id) ON DELETE SET NULL;
+
+CREATE OR REPLACE FUNCTION collect_storage_rows(
+    p_grace_seconds INTEGER
+)
+RETURNS JSONB AS $$
+DECLARE
+    cutoff TIMESTAMP WITH TIME ZONE := NOW() - make_interval(secs => p_grace_seconds);
+    files INTEGER;
+    uploads INTEGER;
+BEGIN
+    DELETE FROM note_files
+    WHERE ref_count = 0
+      AND created_at < cutoff
+      AND NOT EXISTS (SELECT 1 FROM notes WHERE notes.file_id = note_files.id)
+      AND NOT EXISTS (
+          SELECT 1 FROM note_uploads
+          WHERE note_uploads.file_id = note_files.id AND note_uploads.status <> 'completed'
+      );
+    GET DIAGNOSTICS files = ROW_COUNT;
+
+    DELETE FROM note_uploads
+    WHERE status <> 'completed'
+      AND expires_at < cutoff;
+    GET DIAGNOSTICS uploads = ROW_COUNT;
+
+    RETURN jsonb_build_object('files', files, 'uploads', uploads);
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON COLUMN note_uploads.file_id IS 'File ingested by a finalize whose note was not created yet';
@@ -0,0 +1,23 @@
+-- Oversized push events
+-- Postgres rejects NOTIFY payloads of 8000 bytes or more. The event hub
+-- (app/services/event_hub.py) stores larger events here and notifies only
+-- their id; every worker's listener loads the row. Rows only have to
+-- outlive delivery, so each insert prunes the old ones.
+
+CREATE TABLE event_payloads (
+    id BIGSERIAL PRIMARY KEY,
+    message JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+CREATE INDEX idx_event_payloads_created ON event_payloads(created_at);
+
+CREATE OR REPLACE FUNCTION store_event_payload(
+    p_message JSONB
+)
+RETURNS BIGINT AS $$
+    DELETE FROM event_payloads WHERE created_at < NOW() - INTERVAL '10 minutes';
+    INSERT INTO event_payloads (message) VALUES (p_message) RETURNING id;
+$$ LANGUAGE sql;
+
+COMMENT ON TABLE event_payloads IS 'Push events too large for NOTIFY, loaded by id by every worker';
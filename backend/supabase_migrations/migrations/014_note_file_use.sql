@@ -0,0 +1,77 @@
+-- Note file reuse vs. garbage collection
+-- A duplicate upload reuses an existing note_files row before its note is
+-- inserted. If that row had no notes and was past the grace period, the
+-- collector could delete it (and then its object) in between. Reusing a
+-- file now stamps last_used_at in the same statement that returns it, and
+-- the collector only deletes files unused for the whole grace period.
+
+ALTER TABLE note_files ADD COLUMN last_used_at TIMESTAMP WITH TIME ZONE DEFAULT NOW();
+
+-- Same contract as before; an existing file is returned stamped as used
+CREATE OR REPLACE FUNCTION register_note_file(
+    p_sha256 TEXT,
+    p_storage_path TEXT,
+    p_size_bytes BIGINT,
+    p_lead TEXT,
+    p_char_count INTEGER,
+    p_pages TEXT[]
+)
+RETURNS JSONB AS $$
+DECLARE
+    created note_files%ROWTYPE;
+BEGIN
+    LOOP
+        INSERT INTO note_files (sha256, storage_path, size_bytes, lead, char_count, page_count)
+        VALUES (p_sha256, p_storage_path, p_size_bytes, p_lead, p_char_count, COALESCE(array_length(p_pages, 1), 0))
+        ON CONFLICT (sha256) DO NOTHING
+        RETURNING * INTO created;
+        EXIT WHEN created.id IS NOT NULL;
+
+        UPDATE note_files SET last_used_at = NOW()
+        WHERE sha256 = p_sha256
+        RETURNING * INTO created;
+        IF created.id IS NOT NULL THEN
+            RETURN jsonb_build_object('status', 'exists', 'file', to_jsonb(created) - 'embedding');
+        END IF;
+        -- Collected between the two statements: insert again
+    END LOOP;
+
+    INSERT INTO note_file_pages (file_id, page, content)
+    SELECT created.id, t.page, t.content
+    FROM unnest(p_pages) WITH ORDINALITY AS t(content, page);
+
+    RETURN jsonb_build_object('status', 'created', 'file', to_jsonb(created) - 'embedding');
+END;
+$$ LANGUAGE plpgsql;
+
+-- Same as 012, with files judged by their last use rather than creation.
+-- The DELETE re-checks last_used_at after waiting on a concurrent reuse.
+CREATE OR REPLACE FUNCTION collect_storage_rows(
+    p_grace_seconds INTEGER
+)
+RETURNS JSONB AS $$
+DECLARE
+    cutoff TIMESTAMP WITH TIME ZONE := NOW() - make_interval(secs => p_grace_seconds);
+    files INTEGER;
+    uploads INTEGER;
+BEGIN
+    DELETE FROM note_files
+    WHERE ref_count = 0
+      AND COALESCE(last_used_at, created_at) < cutoff
+      AND NOT EXISTS (SELECT 1 FROM notes WHERE notes.file_id = note_files.id)
+      AND NOT EXISTS (
+          SELECT 1 FROM note_uploads
+          WHERE note_uploads.file_id = note_files.id AND note_uploads.status <> 'completed'
+      );
+    GET DIAGNOSTICS files = ROW_COUNT;
+
+    DELETE FROM note_uploads
+    WHERE status <> 'completed'
+      AND expires_at < cutoff;
+    GET DIAGNOSTICS uploads = ROW_COUNT;
+
+    RETURN jsonb_build_object('files', files, 'uploads', uploads);
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON COLUMN note_files.last_used_at IS 'Last time an upload reused this file; the collector keeps it for the grace period after';
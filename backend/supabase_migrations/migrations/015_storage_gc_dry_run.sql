@@ -0,0 +1,34 @@
+-- Storage GC dry runs
+-- A dry run must not delete rows, but the rows collect_storage_rows would
+-- delete must not count as live either, or their objects are not reported.
+-- Same conditions as collect_storage_rows (014), read only.
+
+CREATE OR REPLACE FUNCTION collectable_storage_rows(
+    p_grace_seconds INTEGER
+)
+RETURNS JSONB AS $$
+    WITH cutoff AS (
+        SELECT NOW() - make_interval(secs => p_grace_seconds) AS at
+    )
+    SELECT jsonb_build_object(
+        'files', COALESCE((
+            SELECT jsonb_agg(f.id)
+            FROM note_files AS f, cutoff
+            WHERE f.ref_count = 0
+              AND COALESCE(f.last_used_at, f.created_at) < cutoff.at
+              AND NOT EXISTS (SELECT 1 FROM notes WHERE notes.file_id = f.id)
+              AND NOT EXISTS (
+                  SELECT 1 FROM note_uploads
+                  WHERE note_uploads.file_id = f.id AND note_uploads.status <> 'completed'
+              )
+        ), '[]'::jsonb),
+        'uploads', COALESCE((
+            SELECT jsonb_agg(u.id)
+            FROM note_uploads AS u, cutoff
+            WHERE u.status <> 'completed'
+              AND u.expires_at < cutoff.at
+        ), '[]'::jsonb)
+    );
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION collectable_storage_rows IS 'Ids of the rows collect_storage_rows would delete (storage GC dry run)';
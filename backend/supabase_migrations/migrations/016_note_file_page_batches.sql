@@ -0,0 +1,59 @@
+-- Note file pages written as they are extracted
+-- register_note_file took every page of a file in one call (up to
+-- MAX_NOTE_PAGES pages in a single payload), so the whole text was held
+-- until extraction finished. A file row is now inserted first without its
+-- digest, its pages are inserted in batches while the document is parsed,
+-- and complete_note_file sets the digest with the lead and counts.
+-- Until then no upload can find the row by digest. A row left unfinished by
+-- a failed upload has no notes and is collected after the grace period like
+-- any unused file.
+
+ALTER TABLE note_files ALTER COLUMN sha256 DROP NOT NULL;
+
+-- status: created | exists (an identical file completed first; ours is
+-- deleted with its pages and the existing file is returned stamped as used)
+CREATE OR REPLACE FUNCTION complete_note_file(
+    p_file_id UUID,
+    p_sha256 TEXT,
+    p_lead TEXT,
+    p_char_count INTEGER,
+    p_page_count INTEGER
+)
+RETURNS JSONB AS $$
+DECLARE
+    completed note_files%ROWTYPE;
+BEGIN
+    LOOP
+        BEGIN
+            UPDATE note_files SET
+                sha256 = p_sha256,
+                lead = p_lead,
+                char_count = p_char_count,
+                page_count = p_page_count,
+                last_used_at = NOW()
+            WHERE id = p_file_id
+            RETURNING * INTO completed;
+            IF completed.id IS NULL THEN
+                RAISE EXCEPTION 'Note file % no longer exists', p_file_id;
+            END IF;
+            RETURN jsonb_build_object('status', 'created', 'file', to_jsonb(completed) - 'embedding');
+        EXCEPTION WHEN unique_violation THEN
+            NULL;
+        END;
+
+        UPDATE note_files SET last_used_at = NOW()
+        WHERE sha256 = p_sha256
+        RETURNING * INTO completed;
+        IF completed.id IS NOT NULL THEN
+            DELETE FROM note_files WHERE id = p_file_id;
+            RETURN jsonb_build_object('status', 'exists', 'file', to_jsonb(completed) - 'embedding');
+        END IF;
+        -- Collected between the two statements: complete ours again
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP FUNCTION IF EXISTS register_note_file(TEXT, TEXT, BIGINT, TEXT, INTEGER, TEXT[]);
+
+COMMENT ON FUNCTION complete_note_file IS 'Give a note file its digest, lead and counts once its pages are written, or return the existing file with the same SHA-256';
+COMMENT ON COLUMN note_files.sha256 IS 'Content digest; NULL while the pages of a new file are being written';
@@ -0,0 +1,19 @@
+-- Note file chunks
+-- Sentence-aware chunks of each file's text (DocumentProcessor.iter_chunks),
+-- written at ingest in the same pass as the pages. start_offset/end_offset
+-- are character offsets into the file text (its pages joined by form
+-- feeds) and page is the page the chunk starts on, so a passage can be cited
+-- and retrieved on its own. Files ingested before this migration have none.
+
+CREATE TABLE note_file_chunks (
+    file_id UUID NOT NULL REFERENCES note_files(id) ON DELETE CASCADE,
+    chunk INTEGER NOT NULL CHECK (chunk >= 1),
+    page INTEGER NOT NULL CHECK (page >= 1),
+    start_offset INTEGER NOT NULL,
+    end_offset INTEGER NOT NULL,
+    tokens INTEGER NOT NULL,
+    content TEXT NOT NULL,
+    PRIMARY KEY (file_id, chunk)
+);
+
+COMMENT ON TABLE note_file_chunks IS 'Overlapping sentence-aware chunks of a note file with their offsets into its text';
@@ -0,0 +1,24 @@
+-- Case-insensitive user lookup by email
+-- Emails are stored as registered, so an exact `in` filter misses a stored
+-- "Alice@School.edu" when "alice@school.edu" is typed. Bulk teacher
+-- assignment and roster import match on lower(email) through this function,
+-- backed by an expression index. The list goes in the request body, so it is
+-- not bound by URL length.
+
+CREATE INDEX idx_users_email_lower ON users (lower(email));
+
+CREATE OR REPLACE FUNCTION find_users_by_email(
+    p_emails TEXT[]
+)
+RETURNS TABLE (
+    id UUID,
+    name TEXT,
+    email TEXT,
+    role TEXT
+) AS $$
+    SELECT u.id, u.name, u.email, u.role
+    FROM users AS u
+    WHERE lower(u.email) = ANY(SELECT lower(e) FROM unnest(p_emails) AS e);
+$$ LANGUAGE sql STABLE;
+
+COMMENT ON FUNCTION find_users_by_email IS 'Users whose email matches any of the given emails, ignoring case';
@@ -0,0 +1,117 @@
+"""
+Chunking benchmark
+
+Chunks a synthetic document (seeded paragraphs, cut into reader pages the
+way uploads are) with document_processor.iter_chunks and reports
+throughput and peak memory. Chunks are consumed as they are produced, so
+peak memory is the chunker's own working set and must stay flat whatever
+the input size.
+
+Usage (from backend/):
+    python -m tests.benchmarks.chunking
+    python -m tests.benchmarks.chunking --mb 4 --check
+"""
+from typing import Iterator, Optional
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from .environment import install_environment
+
+install_environment()
+
+from app.services.document_processor import document_processor  # noqa: E402
+from .seed import _paragraphs  # noqa: E402
+
+# Per MB of input, best of the samples
+CHUNKING_BUDGET_SECONDS = 1.5
+# Peak traced memory while chunking, whatever the input size
+CHUNKING_MEMORY_BUDGET_BYTES = 256 * 1024
+
+
+def document(size_bytes: int, seed: int = 7) -> str:
+    """Seeded prose paragraphs, about size_bytes long"""
+    rng = random.Random(seed)
+    parts = []
+    length = 0
+    while length < size_bytes:
+        part = _paragraphs(rng, 20) + "\n\n"
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)[:size_bytes]
+
+
+def pages(text: str) -> Iterator[str]:
+    return document_processor.paginate([text])
+
+
+def measure(text: str, max_tokens: int, overlap_tokens: int) -> dict:
+    """One pass over text: seconds, peak memory and chunk stats"""
+    count = tokens = 0
+    tracemalloc.start()
+    started = time.perf_counter()
+    for chunk in document_processor.iter_chunks(pages(text), max_tokens, overlap_tokens):
+        count += 1
+        tokens += chunk.tokens
+    seconds = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": seconds, "peak_bytes": peak, "chunks": count, "tokens": tokens}
+
+
+def run(mb: float = 1.0, samples: int = 3, max_tokens: int = document_processor.CHUNK_TOKENS,
+        overlap_tokens: int = document_processor.CHUNK_OVERLAP_TOKENS) -> dict:
+    text = document(int(mb * 1024 * 1024))
+    # tracemalloc slows everything down: time untraced, trace once for memory
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        for _ in document_processor.iter_chunks(pages(text), max_tokens, overlap_tokens):
+            pass
+        timings.append(time.perf_counter() - started)
+    traced = measure(text, max_tokens, overlap_tokens)
+    seconds = min(timings)
+    return {
+        "input_bytes": len(text),
+        "samples": samples,
+        "seconds": seconds,
+        "mb_per_second": len(text) / (1024 * 1024) / seconds,
+        "peak_bytes": traced["peak_bytes"],
+        "chunks": traced["chunks"],
+        "avg_tokens": traced["tokens"] / max(traced["chunks"], 1),
+        "max_tokens": max_tokens,
+        "overlap_tokens": overlap_tokens,
+        "budget_seconds": CHUNKING_BUDGET_SECONDS * mb,
+        "memory_budget_bytes": CHUNKING_MEMORY_BUDGET_BYTES,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="EduNexus chunking benchmark")
+    parser.add_argument("--mb", type=float, default=1.0, help="Input size in MB (default 1)")
+    parser.add_argument("--samples", type=int, default=3)
+    parser.add_argument("--max-tokens", type=int, default=document_processor.CHUNK_TOKENS)
+    parser.add_argument("--overlap-tokens", type=int, default=document_processor.CHUNK_OVERLAP_TOKENS)
+    parser.add_argument("--check", action="store_true", help="Exit 1 when over the time or memory budget")
+    args = parser.parse_args(argv)
+
+    result = run(args.mb, args.samples, args.max_tokens, args.overlap_tokens)
+    print(
+        f"chunking {result['input_bytes'] / 1024:.0f} KB (best of {result['samples']}): "
+        f"{result['seconds'] * 1000:.0f}ms, {result['mb_per_second']:.1f} MB/s, "
+        f"{result['chunks']} chunks of ~{result['avg_tokens']:.0f}/{result['max_tokens']} tokens "
+        f"(overlap {result['overlap_tokens']}), peak {result['peak_bytes'] / 1024:.0f} KB "
+        f"(budget {result['budget_seconds'] * 1000:.0f}ms, {result['memory_budget_bytes'] / 1024:.0f} KB)"
+    )
+
+    failed = result["seconds"] > result["budget_seconds"] or result["peak_bytes"] > result["memory_budget_bytes"]
+    if args.check and failed:
+        print("FAILED: chunking over its time or memory budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
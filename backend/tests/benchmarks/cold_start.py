@@ -0,0 +1,109 @@
+"""
+Worker cold-start benchmark
+
+Starts a fresh interpreter per sample, imports app.main and runs the FastAPI
+lifespan startup, then reports import/startup time and which heavy SDKs got
+imported. Importing the app must not pull in LAZY_MODULES - they load on
+first use (or during STARTUP_WARMUP).
+
+Usage (from backend/):
+    python -m tests.benchmarks.cold_start
+    python -m tests.benchmarks.cold_start --samples 10 --warmup --check
+"""
+from pathlib import Path
+from typing import Optional
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+# Import + lifespan startup, median of the samples, without warmup
+COLD_START_BUDGET_MS = 3000
+
+LAZY_MODULES = (
+    "pdfminer",
+    "google.generativeai",
+    "firebase_admin",
+    "qdrant_client",
+    "psycopg2",
+    "jose",
+)
+
+_PROBE = """
+import asyncio, json, sys, time
+started = time.perf_counter()
+from tests.benchmarks.environment import install_environment
+install_environment()
+import app.main
+imported = time.perf_counter()
+loaded = [m for m in {lazy!r} if m in sys.modules]
+
+async def start():
+    async with app.main.app.router.lifespan_context(app.main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(start())
+print(json.dumps({{
+    "import_ms": (imported - started) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "loaded_at_import": loaded
+}}))
+"""
+
+
+def measure(warmup: bool = False) -> dict:
+    """One cold start in a fresh interpreter"""
+    env = dict(os.environ, STARTUP_WARMUP="true" if warmup else "false")
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(lazy=LAZY_MODULES)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def run(samples: int, warmup: bool = False) -> dict:
+    runs = [measure(warmup) for _ in range(samples)]
+    totals = [r["import_ms"] + r["startup_ms"] for r in runs]
+    return {
+        "samples": samples,
+        "warmup": warmup,
+        "import_ms": statistics.median(r["import_ms"] for r in runs),
+        "startup_ms": statistics.median(r["startup_ms"] for r in runs),
+        "total_ms": statistics.median(totals),
+        "max_total_ms": max(totals),
+        "loaded_at_import": sorted({m for r in runs for m in r["loaded_at_import"]}),
+        "budget_ms": COLD_START_BUDGET_MS,
+    }
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="EduNexus worker cold-start benchmark")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--warmup", action="store_true",
+                        help="Also run STARTUP_WARMUP (offline providers; Supabase warmup fails fast)")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 when over budget or a lazy module is imported eagerly")
+    args = parser.parse_args(argv)
+
+    result = run(args.samples, args.warmup)
+    print(
+        f"cold start (median of {result['samples']}): import {result['import_ms']:.0f}ms, "
+        f"startup {result['startup_ms']:.0f}ms, total {result['total_ms']:.0f}ms "
+        f"(max {result['max_total_ms']:.0f}ms, budget {result['budget_ms']}ms)"
+    )
+    if result["loaded_at_import"]:
+        print(f"imported eagerly: {', '.join(result['loaded_at_import'])}")
+
+    failed = result["loaded_at_import"] or (not args.warmup and result["total_ms"] > COLD_START_BUDGET_MS)
+    if args.check and failed:
+        print("FAILED: cold start over budget or heavy modules imported at startup")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,38 @@
+"""
+Offline configuration for the benchmark suite
+
+install_environment() must run before `app` is imported: it fills in the
+settings the app requires and selects the local auth provider and the fake
+LLM provider, so no Firebase or Gemini credentials are needed.
+"""
+import os
+
+
+def install_environment():
+    """Dummy Supabase settings + offline auth/LLM providers"""
+    os.environ.setdefault("SUPABASE_URL", "http://supabase.bench")
+    os.environ.setdefault("SUPABASE_KEY", "bench-anon-key")
+    os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench-service-key")
+    os.environ["AUTH_PROVIDER"] = "local"
+    os.environ.setdefault("LOCAL_AUTH_SECRET", "bench-only-local-auth-secret-0123456789")
+    os.environ["LLM_PROVIDER"] = "fake"
+    os.environ["APP_ENV"] = "benchmark"
+    # Events fan out in-process only
+    os.environ.pop("DATABASE_URL", None)
+
+
+def bench_token(firebase_uid: str) -> str:
+    """Bearer token accepted by the local auth provider"""
+    from app.core.auth_provider import create_local_token
+
+    return create_local_token(firebase_uid, expires_in=24 * 3600)
+
+
+def configure_providers(embed_latency_ms: float = 0.0, generate_latency_ms: float = 0.0):
+    """Simulated Gemini latencies, so LLM-bound endpoints keep a realistic shape"""
+    from app.services.llm_provider import get_llm_provider, FakeLLMProvider
+
+    provider = get_llm_provider()
+    assert isinstance(provider, FakeLLMProvider), "benchmarks require LLM_PROVIDER=fake"
+    provider.embed_latency_ms = embed_latency_ms
+    provider.generate_latency_ms = generate_latency_ms
@@ -0,0 +1,995 @@
+"""
+In-memory stand-in for Supabase PostgREST + Storage
+
+Plugs into the real supabase-py client at the HTTP layer (httpx transport), so
+the app's query builders, metrics hooks and response parsing all run
+unchanged. The schema (columns, defaults, unique keys, foreign keys) is parsed
+from supabase_migrations/migrations, so embeds resolve the same relationships
+PostgREST would.
+
+Supported surface (what the app uses):
+- select with columns, `*`, embeds (`alias:table!hint!inner(...)`, nested),
+  to-one / to-many / one-to-one cardinality
+- filters eq/neq/gt/gte/lt/lte/like/ilike/is/in, `not.`, `or=(...)`/`and(...)`,
+  filters on embedded columns (`chapters.subject_id=in.(...)`)
+- order, limit, offset, count=exact, single-object responses
+- insert / upsert (on_conflict, ignore/merge duplicates) / update / delete,
+  with `select` shaping the returned representation
+- RPCs registered in RPC_FUNCTIONS
+- Storage object uploads (direct and signed), (ranged) downloads, listing and removal
+
+Triggers are not emulated; seed counter tables explicitly.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable, Optional
+import json
+import math
+import re
+import threading
+import time
+import uuid
+import httpx
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "supabase_migrations" / "migrations"
+
+
+class FakeAPIError(Exception):
+    """PostgREST-style error response"""
+
+    def __init__(self, status: int, code: str, message: str, details: Optional[str] = None):
+        super().__init__(message)
+        self.status = status
+        self.body = {"code": code, "message": message, "details": details, "hint": None}
+
+
+# ============================================
+# SCHEMA (parsed from migrations)
+# ============================================
+
+class ForeignKey:
+    def __init__(self, table: str, column: str, ref_table: str, ref_column: str, on_delete: str):
+        self.table = table
+        self.column = column
+        self.ref_table = ref_table
+        self.ref_column = ref_column
+        self.on_delete = on_delete  # "cascade" | "set null" | "restrict"
+        self.name = f"{table}_{column}_fkey"
+
+
+class TableDef:
+    def __init__(self, name: str):
+        self.name = name
+        self.columns: dict[str, dict] = {}  # column -> {"type", "default"}
+        self.primary_key: tuple[str, ...] = ()
+        self.unique: list[tuple[str, ...]] = []
+        self.foreign_keys: list[ForeignKey] = []
+
+
+def _split_top_level(text: str, sep: str = ",") -> list[str]:
+    """Split on sep outside parentheses and quotes"""
+    parts, depth, quote, current = [], 0, None, []
+    for ch in text:
+        if quote:
+            current.append(ch)
+            if ch == quote:
+                quote = None
+            continue
+        if ch in ("'", '"'):
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append("".join(current).strip())
+            current = []
+            continue
+        current.append(ch)
+    if "".join(current).strip():
+        parts.append("".join(current).strip())
+    return parts
+
+
+def _strip_sql_comments(sql: str) -> str:
+    return re.sub(r"--[^\n]*", "", sql)
+
+
+def load_schema(migrations_dir: Path = MIGRATIONS_DIR) -> dict[str, TableDef]:
+    """Tables, defaults, keys and foreign keys from CREATE TABLE and ALTER TABLE ADD/DROP COLUMN"""
+    tables: dict[str, TableDef] = {}
+
+    for path in sorted(migrations_dir.glob("*.sql")):
+        sql = _strip_sql_comments(path.read_text())
+
+        for match in re.finditer(r"CREATE TABLE (?:IF NOT EXISTS )?(\w+)\s*\(", sql, re.I):
+            name = match.group(1)
+            # Find the matching close paren
+            depth, start = 1, match.end()
+            i = start
+            while depth:
+                depth += {"(": 1, ")": -1}.get(sql[i], 0)
+                i += 1
+            table = tables.setdefault(name, TableDef(name))
+            for item in _split_top_level(sql[start:i - 1]):
+                _parse_table_item(table, item)
+
+        for match in re.finditer(r"ALTER TABLE (\w+)\s+((?:ADD|DROP) COLUMN [^;]+);", sql, re.I):
+            table = tables.get(match.group(1))
+            if table is None:
+                continue
+            for action in _split_top_level(match.group(2)):
+                added = re.match(r"\s*ADD COLUMN (?:IF NOT EXISTS )?(.+)", action, re.I | re.S)
+                dropped = re.match(r"\s*DROP COLUMN (?:IF EXISTS )?(\w+)", action, re.I)
+                if added:
+                    _parse_table_item(table, added.group(1))
+                elif dropped:
+                    table.columns.pop(dropped.group(1), None)
+
+    return tables
+
+
+def _parse_table_item(table: TableDef, item: str):
+    upper = item.upper()
+    constraint = re.match(r"(PRIMARY KEY|UNIQUE)\s*\(([^)]*)\)", item, re.I)
+    if constraint:
+        columns = tuple(c.strip() for c in constraint.group(2).split(","))
+        if constraint.group(1).upper() == "PRIMARY KEY":
+            table.primary_key = columns
+        else:
+            table.unique.append(columns)
+        return
+    if upper.startswith(("CHECK", "CONSTRAINT", "FOREIGN KEY", "EXCLUDE")):
+        return
+
+    parts = item.split()
+    column, col_type = parts[0], parts[1].lower() if len(parts) > 1 else "text"
+    default = None
+    default_match = re.search(r"DEFAULT\s+('(?:[^']*)'|[\w.]+\(\)|[\w.]+)", item, re.I)
+    if default_match:
+        default = default_match.group(1)
+    table.columns[column] = {"type": col_type, "default": default}
+
+    if "PRIMARY KEY" in upper:
+        table.primary_key = (column,)
+    elif re.search(r"\bUNIQUE\b", upper):
+        table.unique.append((column,))
+
+    ref = re.search(r"REFERENCES\s+(\w+)\s*\((\w+)\)", item, re.I)
+    if ref:
+        on_delete = "restrict"
+        on_delete_match = re.search(r"ON DELETE (CASCADE|SET NULL)", item, re.I)
+        if on_delete_match:
+            on_delete = on_delete_match.group(1).lower()
+        table.foreign_keys.append(ForeignKey(table.name, column, ref.group(1), ref.group(2), on_delete))
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _default_value(expr: Optional[str]):
+    if expr is None:
+        return None
+    lowered = expr.lower()
+    if lowered in ("uuid_generate_v4()", "gen_random_uuid()"):
+        return str(uuid.uuid4())
+    if lowered in ("now()", "current_timestamp"):
+        return _now()
+    if lowered in ("true", "false"):
+        return lowered == "true"
+    if expr == "'{}'":
+        return []
+    if expr.startswith("'"):
+        return expr.strip("'")
+    try:
+        return int(expr)
+    except ValueError:
+        try:
+            return float(expr)
+        except ValueError:
+            return None
+
+
+# ============================================
+# STORAGE
+# ============================================
+
+class Table:
+    """Rows of one table with lazily built lookup indexes"""
+
+    def __init__(self, definition: TableDef):
+        self.definition = definition
+        self.rows: list[dict] = []
+        self._indexes: dict[tuple[str, ...], dict[tuple, list[dict]]] = {}
+
+    def index(self, columns: tuple[str, ...]) -> dict[tuple, list[dict]]:
+        if columns not in self._indexes:
+            built = defaultdict(list)
+            for row in self.rows:
+                built[tuple(row.get(c) for c in columns)].append(row)
+            self._indexes[columns] = built
+        return self._indexes[columns]
+
+    def append(self, row: dict):
+        self.rows.append(row)
+        for columns, built in self._indexes.items():
+            built[tuple(row.get(c) for c in columns)].append(row)
+
+    def invalidate(self):
+        self._indexes.clear()
+
+
+# ============================================
+# QUERY PARSING
+# ============================================
+
+class Embed:
+    def __init__(self, alias: str, table: str, hint: Optional[str], inner: bool, select: list):
+        self.alias = alias
+        self.table = table
+        self.hint = hint
+        self.inner = inner
+        self.select = select
+
+
+def parse_select(text: str) -> list:
+    """'*, a, alias:t!hint!inner(x, y)' -> ['*', 'a', Embed(...)]"""
+    items = []
+    for part in _split_top_level(text.replace(" ", "").replace("\n", "")):
+        if not part:
+            continue
+        if "(" not in part:
+            items.append(part.split(":")[-1])
+            continue
+        head, inner_select = part.split("(", 1)
+        inner_select = inner_select[:-1]
+        alias = None
+        if ":" in head:
+            alias, head = head.split(":", 1)
+        name, *modifiers = head.split("!")
+        hint, inner = None, False
+        for modifier in modifiers:
+            if modifier == "inner":
+                inner = True
+            elif modifier != "left":
+                hint = modifier
+        items.append(Embed(alias or name, name, hint, inner, parse_select(inner_select)))
+    return items
+
+
+def _parse_value_list(text: str) -> list[str]:
+    return [v.strip().strip('"') for v in _split_top_level(text.strip("()"))]
+
+
+def parse_condition(column: str, expression: str) -> tuple:
+    """('col', 'not.in.(a,b)') -> ('cond', 'col', negate, op, value)"""
+    negate = False
+    if expression.startswith("not."):
+        negate, expression = True, expression[4:]
+    op, _, value = expression.partition(".")
+    if op == "in":
+        value = _parse_value_list(value)
+    return ("cond", column, negate, op, value)
+
+
+def parse_logic(expression: str) -> list:
+    """'(a.eq.1,and(b.eq.2,c.eq.3))' -> list of conditions/groups"""
+    nodes = []
+    for part in _split_top_level(expression[1:-1]):
+        negate = False
+        if part.startswith("not."):
+            negate, part = True, part[4:]
+        group = re.match(r"^(and|or)\((.*)\)$", part)
+        if group:
+            nodes.append((group.group(1), negate, parse_logic(f"({group.group(2)})")))
+        else:
+            column, _, rest = part.partition(".")
+            cond = parse_condition(column, rest)
+            if negate:
+                cond = (cond[0], cond[1], not cond[2], cond[3], cond[4])
+            nodes.append(cond)
+    return nodes
+
+
+def _coerce_compare(stored, raw: str):
+    """Compare a stored value with a URL value the way Postgres would"""
+    if isinstance(stored, bool):
+        return stored, raw.lower() in ("true", "t", "1")
+    if isinstance(stored, (int, float)):
+        try:
+            return stored, float(raw)
+        except ValueError:
+            return str(stored), raw
+    return stored, raw
+
+
+def _equals(stored, raw: str) -> bool:
+    left, right = _coerce_compare(stored, raw)
+    return left == right
+
+
+def _like(value, pattern: str, case_insensitive: bool) -> bool:
+    if value is None:
+        return False
+    regex = "^" + re.escape(pattern).replace("\\*", ".*").replace("%", ".*").replace("_", ".") + "$"
+    return re.match(regex, str(value), re.I if case_insensitive else 0) is not None
+
+
+def evaluate(row: dict, node) -> bool:
+    kind = node[0]
+    if kind in ("and", "or"):
+        _, negate, children = node
+        results = (evaluate(row, child) for child in children)
+        result = all(results) if kind == "and" else any(results)
+        return not result if negate else result
+
+    _, column, negate, op, value = node
+    stored = row.get(column)
+    if op == "is":
+        target = {"null": None, "true": True, "false": False}.get(str(value).lower())
+        result = stored is target
+    elif op == "in":
+        result = stored is not None and any(_equals(stored, v) for v in value)
+    elif op in ("like", "ilike"):
+        result = _like(stored, value, op == "ilike")
+    elif stored is None:
+        result = False
+    else:
+        left, right = _coerce_compare(stored, value)
+        result = {
+            "eq": lambda: left == right,
+            "neq": lambda: left != right,
+            "gt": lambda: left > right,
+            "gte": lambda: left >= right,
+            "lt": lambda: left < right,
+            "lte": lambda: left <= right,
+        }.get(op, lambda: _unsupported(op))()
+    return not result if negate else result
+
+
+def _unsupported(op: str):
+    raise FakeAPIError(400, "PGRST100", f"Operator '{op}' is not supported by the fake")
+
+
+# ============================================
+# FAKE SUPABASE
+# ============================================
+
+class FakeSupabase:
+    """
+    In-memory PostgREST/Storage backend for the real supabase-py client
+
+    Usage:
+        fake = FakeSupabase(latency_ms=2)
+        fake.install(get_supabase_client())
+        fake.install(get_supabase_admin_client())
+    """
+
+    def __init__(self, latency_ms: float = 0.0, migrations_dir: Path = MIGRATIONS_DIR):
+        self.schema = load_schema(migrations_dir)
+        self.tables = {name: Table(definition) for name, definition in self.schema.items()}
+        self.objects: dict[str, bytes] = {}
+        self.object_created: dict[str, str] = {}  # key -> created_at (set directly to age objects)
+        self.upload_tokens: dict[str, str] = {}
+        self.latency = latency_ms / 1000
+        self.calls = 0
+        self._lock = threading.RLock()
+        self.rpc_functions: dict[str, Callable] = dict(RPC_FUNCTIONS)
+
+    # ------------------------------------------------------------------
+    # Wiring
+    # ------------------------------------------------------------------
+
+    def install(self, client):
+        """Route a supabase Client's PostgREST and Storage traffic here"""
+        transport = httpx.MockTransport(self.handle)
+        # Keep the sessions (and their event hooks); only swap the transport
+        client.postgrest.session._transport = transport
+        client.storage.session._transport = transport
+        return client
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls += 1
+            try:
+                return self._route(request)
+            except FakeAPIError as e:
+                return httpx.Response(e.status, json=e.body)
+
+    def _route(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        if "/storage/v1/" in path:
+            return self._storage(request, path.split("/storage/v1/", 1)[1])
+
+        resource = path.split("/rest/v1/", 1)[1].strip("/")
+        params = request.url.params
+        prefer = request.headers.get("prefer", "")
+        single = "vnd.pgrst.object" in request.headers.get("accept", "")
+        body = json.loads(request.content) if request.content else None
+
+        if resource.startswith("rpc/"):
+            rows, table = self._call_rpc(resource[4:], body or {})
+        elif request.method == "GET":
+            rows, table = self._select(resource, params), resource
+        elif request.method == "POST":
+            rows, table = self._insert(resource, body, params, prefer), resource
+        elif request.method == "PATCH":
+            rows, table = self._update(resource, body, params), resource
+        elif request.method == "DELETE":
+            rows, table = self._delete(resource, params), resource
+        else:
+            raise FakeAPIError(405, "PGRST000", f"Method {request.method} not supported")
+
+        # Writes and RPCs re-shape their rows with `select` like PostgREST does
+        if "return=minimal" in prefer:
+            rows = []
+        elif table is not None and (request.method != "GET" or resource.startswith("rpc/")):
+            rows = self._shape(table, rows, params) if isinstance(rows, list) else rows
+
+        total = len(rows) if isinstance(rows, list) else 1
+        headers = {"content-range": f"0-{max(total - 1, 0)}/{total if 'count=' in prefer else '*'}"}
+
+        if single:
+            if not isinstance(rows, list) or len(rows) != 1:
+                raise FakeAPIError(
+                    406, "PGRST116",
+                    "JSON object requested, multiple (or no) rows returned",
+                    f"The result contains {total if isinstance(rows, list) else 1} rows"
+                )
+            rows = rows[0]
+
+        if "return=minimal" in prefer:
+            return httpx.Response(204, headers=headers)
+        status = 201 if request.method == "POST" and not resource.startswith("rpc/") else 200
+        return httpx.Response(status, json=rows, headers=headers)
+
+    def _storage(self, request: httpx.Request, path: str) -> httpx.Response:
+        if path.startswith("bucket/") and request.method == "GET":
+            bucket = path[len("bucket/"):]
+            return httpx.Response(200, json={
+                "id": bucket, "name": bucket, "owner": "", "public": True,
+                "created_at": _now(), "updated_at": _now(),
+                "file_size_limit": None, "allowed_mime_types": None
+            })
+        if path.startswith("object/upload/sign/"):
+            key = path[len("object/upload/sign/"):]
+            if request.method == "POST":
+                token = uuid.uuid4().hex
+                self.upload_tokens[key] = token
+                return httpx.Response(200, json={"url": f"/object/upload/sign/{key}?token={token}"})
+            if request.url.params.get("token") != self.upload_tokens.get(key):
+                return httpx.Response(400, json={"statusCode": "403", "error": "invalid_signature", "message": "Invalid signature"})
+            if key in self.objects:
+                return httpx.Response(400, json={"statusCode": "409", "error": "Duplicate", "message": "The resource already exists"})
+            self._put_object(key, request.content)
+            return httpx.Response(200, json={"Key": key})
+        if path.startswith("object/list/") and request.method == "POST":
+            return httpx.Response(200, json=self._list_objects(path[len("object/list/"):], json.loads(request.content)))
+        if path.startswith("object/") and request.method == "DELETE":
+            bucket = path[len("object/"):]
+            prefixes = json.loads(request.content)["prefixes"]
+            removed = [p for p in prefixes if self.objects.pop(f"{bucket}/{p}", None) is not None]
+            return httpx.Response(200, json=[{"name": p, "bucket_id": bucket} for p in removed])
+        if path.startswith("object/") and request.method in ("POST", "PUT"):
+            key = path[len("object/"):]
+            self._put_object(key, request.content)
+            return httpx.Response(200, json={"Key": key, "Id": str(uuid.uuid4())})
+        if path.startswith("object/") and request.method == "GET":
+            key = path.split("/", 2)[-1] if path.startswith("object/public/") else path[len("object/"):]
+            if key not in self.objects:
+                return httpx.Response(400, json={"statusCode": "404", "error": "not_found", "message": "Object not found"})
+            content = self.objects[key]
+            byte_range = request.headers.get("range", "")
+            if byte_range.startswith("bytes="):
+                first, _, last = byte_range[len("bytes="):].partition("-")
+                start, end = int(first), min(int(last or len(content) - 1), len(content) - 1)
+                return httpx.Response(206, content=content[start:end + 1], headers={
+                    "Content-Range": f"bytes {start}-{end}/{len(content)}"
+                })
+            return httpx.Response(200, content=content)
+        if path.startswith("object/") and request.method == "HEAD":
+            key = path[len("object/"):]
+            if key not in self.objects:
+                return httpx.Response(400)
+            return httpx.Response(200, headers={"Content-Length": str(len(self.objects[key]))})
+        return httpx.Response(400, json={"statusCode": "400", "error": "unsupported", "message": f"Unsupported storage call {path}"})
+
+    def _put_object(self, key: str, content: bytes):
+        self.objects[key] = content
+        self.object_created[key] = _now()
+
+    def _list_objects(self, bucket: str, body: dict) -> list[dict]:
+        """Immediate children of a prefix: folders (id null) and objects, sorted by name"""
+        prefix = body.get("prefix", "").strip("/")
+        base = f"{bucket}/{prefix}/" if prefix else f"{bucket}/"
+        entries = {}
+        for key, content in self.objects.items():
+            if not key.startswith(base):
+                continue
+            name, slash, _ = key[len(base):].partition("/")
+            if slash:
+                entries.setdefault(name, {"name": name, "id": None, "created_at": None, "metadata": None})
+            else:
+                entries[name] = {
+                    "name": name, "id": str(uuid.uuid5(uuid.NAMESPACE_URL, key)),
+                    "created_at": self.object_created.get(key), "metadata": {"size": len(content)}
+                }
+        listed = [entries[name] for name in sorted(entries)]
+        offset = body.get("offset", 0)
+        return listed[offset:offset + body.get("limit", 100)]
+
+    def age_objects(self, seconds: float):
+        """Move every object's created_at back (for grace-period checks)"""
+        for key, created in self.object_created.items():
+            self.object_created[key] = (datetime.fromisoformat(created) - timedelta(seconds=seconds)).isoformat()
+
+    # ------------------------------------------------------------------
+    # Direct access (seeding and assertions)
+    # ------------------------------------------------------------------
+
+    def table(self, name: str) -> Table:
+        if name not in self.tables:
+            raise FakeAPIError(404, "42P01", f'relation "public.{name}" does not exist')
+        return self.tables[name]
+
+    def insert_rows(self, table: str, rows: list[dict]) -> list[dict]:
+        """Insert without HTTP (no latency, not counted)"""
+        with self._lock:
+            return self._write_rows(table, rows, on_conflict=None, resolution=None)
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def _select(self, name: str, params: httpx.QueryParams) -> list[dict]:
+        table = self.table(name)
+        own_filters, embed_filters = self._split_filters(params)
+        rows = [row for row in table.rows if all(evaluate(row, f) for f in own_filters)]
+        rows = self._order(rows, params.get("order"))
+
+        select = parse_select(params.get("select", "*"))
+        shaped = []
+        for row in rows:
+            built = self._build(name, row, select, embed_filters, "")
+            if built is not None:
+                shaped.append(built)
+
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        shaped = shaped[offset:offset + int(limit) if limit is not None else None]
+        return shaped
+
+    def _split_filters(self, params: httpx.QueryParams) -> tuple[list, dict[str, list]]:
+        """Top-level conditions, and conditions keyed by embed path ('a.b')"""
+        reserved = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+        own, embedded = [], defaultdict(list)
+        for key, value in params.multi_items():
+            if key in reserved:
+                continue
+            path, _, column = key.rpartition(".")
+            if column in ("or", "and"):
+                node = (column, False, parse_logic(value))
+            elif column.startswith("not.") and column[4:] in ("or", "and"):
+                node = (column[4:], True, parse_logic(value))
+            else:
+                node = parse_condition(column, value)
+            if path:
+                embedded[path].append(node)
+            else:
+                own.append(node)
+        return own, embedded
+
+    def _order(self, rows: list[dict], order: Optional[str]) -> list[dict]:
+        if not order:
+            return rows
+        for term in reversed(order.split(",")):
+            column, *flags = term.split(".")
+            desc = "desc" in flags
+            nulls_first = "nullsfirst" in flags or (desc and "nullslast" not in flags)
+            present = [r for r in rows if r.get(column) is not None]
+            missing = [r for r in rows if r.get(column) is None]
+            present.sort(key=lambda r: r.get(column), reverse=desc)
+            rows = missing + present if nulls_first else present + missing
+        return rows
+
+    def _relationship(self, parent: str, embed: Embed) -> tuple[str, ForeignKey, bool]:
+        """
+        Resolve an embed to (direction, fk, to_one)
+
+        direction 'parent' means the parent row holds the FK (many-to-one);
+        'child' means the embedded table references the parent (one-to-many,
+        or one-to-one when the FK column is unique).
+        """
+        candidates = []
+        for fk in self.schema[parent].foreign_keys:
+            if fk.ref_table == embed.table:
+                candidates.append(("parent", fk))
+        for fk in self.schema.get(embed.table, TableDef(embed.table)).foreign_keys:
+            if fk.ref_table == parent and not (embed.table == parent):
+                candidates.append(("child", fk))
+
+        if embed.hint:
+            candidates = [(d, fk) for d, fk in candidates if embed.hint in (fk.name, fk.column)]
+        if embed.table not in self.schema or not candidates:
+            raise FakeAPIError(
+                400, "PGRST200",
+                f"Could not find a relationship between '{parent}' and '{embed.table}' in the schema cache"
+            )
+        if len(candidates) > 1:
+            raise FakeAPIError(
+                300, "PGRST201",
+                f"Could not embed because more than one relationship was found for '{parent}' and '{embed.table}'"
+            )
+
+        direction, fk = candidates[0]
+        if direction == "parent":
+            return direction, fk, True
+        child = self.schema[embed.table]
+        to_one = child.primary_key == (fk.column,) or (fk.column,) in child.unique
+        return direction, fk, to_one
+
+    def _build(self, table: str, row: dict, select: list, embed_filters: dict, path: str) -> Optional[dict]:
+        """Project a row and attach embeds; None when an !inner embed is empty"""
+        definition = self.schema[table]
+        result = {}
+        for item in select:
+            if isinstance(item, Embed):
+                continue
+            if item == "*":
+                for column in definition.columns:
+                    result[column] = self._serialize(definition, column, row.get(column))
+            else:
+                if item not in definition.columns:
+                    raise FakeAPIError(400, "42703", f"column {table}.{item} does not exist")
+                result[item] = self._serialize(definition, item, row.get(item))
+
+        for embed in (i for i in select if isinstance(i, Embed)):
+            embed_path = f"{path}.{embed.alias}" if path else embed.alias
+            direction, fk, to_one = self._relationship(table, embed)
+            target = self.table(embed.table)
+            if direction == "parent":
+                related = target.index((fk.ref_column,)).get((row.get(fk.column),), [])
+            else:
+                related = target.index((fk.column,)).get((row.get(fk.ref_column),), [])
+
+            filters = embed_filters.get(embed_path, [])
+            built = []
+            for related_row in related:
+                if not all(evaluate(related_row, f) for f in filters):
+                    continue
+                nested = self._build(embed.table, related_row, embed.select, embed_filters, embed_path)
+                if nested is not None:
+                    built.append(nested)
+
+            if embed.inner and not built:
+                return None
+            result[embed.alias] = (built[0] if built else None) if to_one else built
+        return result
+
+    def _serialize(self, definition: TableDef, column: str, value):
+        # pgvector columns come back as text, as they do from PostgREST
+        if value is not None and definition.columns[column]["type"].startswith("vector"):
+            return "[" + ",".join(repr(float(v)) for v in value) + "]"
+        return value
+
+    def _shape(self, table: str, rows: list[dict], params: httpx.QueryParams) -> list[dict]:
+        select = params.get("select")
+        if not select or table not in self.schema:
+            return [self._build(table, row, ["*"], {}, "") for row in rows]
+        parsed = parse_select(select)
+        return [built for row in rows if (built := self._build(table, row, parsed, {}, "")) is not None]
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _insert(self, name: str, body, params: httpx.QueryParams, prefer: str) -> list[dict]:
+        rows = body if isinstance(body, list) else [body]
+        resolution = None
+        if "resolution=ignore-duplicates" in prefer:
+            resolution = "ignore"
+        elif "resolution=merge-duplicates" in prefer:
+            resolution = "merge"
+        on_conflict = tuple(params["on_conflict"].split(",")) if "on_conflict" in params else None
+        return self._write_rows(name, rows, on_conflict, resolution)
+
+    def _write_rows(self, name: str, rows: list[dict], on_conflict, resolution) -> list[dict]:
+        table = self.table(name)
+        definition = table.definition
+        written = []
+        for values in rows:
+            unknown = set(values) - set(definition.columns)
+            if unknown:
+                raise FakeAPIError(
+                    400, "PGRST204",
+                    f"Could not find the '{sorted(unknown)[0]}' column of '{name}' in the schema cache"
+                )
+            row = {
+                column: values[column] if column in values else _default_value(spec["default"])
+                for column, spec in definition.columns.items()
+            }
+            _parse_vectors(definition, row)
+            self._check_foreign_keys(definition, row)
+
+            conflict_key = on_conflict or definition.primary_key
+            existing = None
+            keys = [conflict_key] + [u for u in definition.unique if u != conflict_key]
+            for key in (k for k in keys if k):
+                matches = table.index(key).get(tuple(row.get(c) for c in key))
+                if matches and all(row.get(c) is not None for c in key):
+                    if resolution and key == conflict_key:
+                        existing = matches[0]
+                        break
+                    raise FakeAPIError(
+                        409, "23505",
+                        f'duplicate key value violates unique constraint "{name}_{"_".join(key)}_key"'
+                    )
+
+            if existing is not None:
+                if resolution == "merge":
+                    existing.update(values)
+                    table.invalidate()
+                    written.append(existing)
+                continue
+            table.append(row)
+            written.append(row)
+        return written
+
+    def _check_foreign_keys(self, definition: TableDef, row: dict):
+        for fk in definition.foreign_keys:
+            value = row.get(fk.column)
+            if value is None:
+                continue
+            if not self.table(fk.ref_table).index((fk.ref_column,)).get((value,)):
+                raise FakeAPIError(
+                    409, "23503",
+                    f'insert or update on table "{definition.name}" violates foreign key constraint "{fk.name}"'
+                )
+
+    def _update(self, name: str, body: dict, params: httpx.QueryParams) -> list[dict]:
+        table = self.table(name)
+        unknown = set(body) - set(table.definition.columns)
+        if unknown:
+            raise FakeAPIError(
+                400, "PGRST204",
+                f"Could not find the '{sorted(unknown)[0]}' column of '{name}' in the schema cache"
+            )
+        own_filters, _ = self._split_filters(params)
+        updated = [row for row in table.rows if all(evaluate(row, f) for f in own_filters)]
+        _parse_vectors(table.definition, body)
+        for row in updated:
+            row.update(body)
+        if updated:
+            table.invalidate()
+        return updated
+
+    def _delete(self, name: str, params: httpx.QueryParams) -> list[dict]:
+        table = self.table(name)
+        own_filters, _ = self._split_filters(params)
+        deleted = [row for row in table.rows if all(evaluate(row, f) for f in own_filters)]
+        self._remove(name, deleted)
+        return deleted
+
+    def _remove(self, name: str, rows: list[dict]):
+        if not rows:
+            return
+        table = self.table(name)
+        doomed = {id(row) for row in rows}
+        table.rows = [row for row in table.rows if id(row) not in doomed]
+        table.invalidate()
+
+        # ON DELETE CASCADE / SET NULL
+        for child in self.schema.values():
+            for fk in child.foreign_keys:
+                if fk.ref_table != name:
+                    continue
+                keys = {row.get(fk.ref_column) for row in rows}
+                child_table = self.tables[child.name]
+                dependents = [r for r in child_table.rows if r.get(fk.column) in keys]
+                if not dependents:
+                    continue
+                if fk.on_delete == "cascade":
+                    self._remove(child.name, dependents)
+                elif fk.on_delete == "set null":
+                    for dependent in dependents:
+                        dependent[fk.column] = None
+                    child_table.invalidate()
+                else:
+                    raise FakeAPIError(409, "23503", f'delete on "{name}" violates foreign key constraint "{fk.name}"')
+
+    # ------------------------------------------------------------------
+    # RPCs
+    # ------------------------------------------------------------------
+
+    def _call_rpc(self, name: str, params: dict):
+        if name not in self.rpc_functions:
+            raise FakeAPIError(
+                404, "PGRST202",
+                f"Could not find the function public.{name} in the fake (add it to RPC_FUNCTIONS)"
+            )
+        return self.rpc_functions[name](self, params)
+
+
+# ============================================
+# RPC IMPLEMENTATIONS
+# ============================================
+# Each returns (rows_or_value, table) - table names the row type for
+# SETOF-returning functions so `select` can embed, else None.
+
+def _parse_vectors(definition: TableDef, row: dict):
+    """pgvector accepts '[1,2,3]' text as well as JSON arrays"""
+    for column, value in row.items():
+        if isinstance(value, str) and definition.columns[column]["type"].startswith("vector"):
+            row[column] = json.loads(value)
+
+
+def _cosine_similarity(a: list[float], b: list[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+def _rpc_search_notes_by_similarity(fake: FakeSupabase, params: dict):
+    notes = fake.table("notes").index(("chapter_id",)).get((params["target_chapter_id"],), [])
+    files = fake.table("note_files").index(("id",))
+    query = params["query_embedding"]
+    scored = [
+        {
+            "note_id": n["id"],
+            "title": n["title"],
+            # File lead text, else the note's own (pre-note_files) content
+            "content": next((f["lead"] for f in files.get((n.get("file_id"),), [])), n["content"]),
+            "similarity": _cosine_similarity(n["embedding"], query)
+        }
+        for n in notes
+        if n.get("embedding") is not None
+        and n["approval_status"] == "approved"
+        and n["visibility"] == "public"
+    ]
+    scored.sort(key=lambda r: r["similarity"], reverse=True)
+    return scored[:params.get("result_limit", 5)], None
+
+
+def _rpc_set_note_embeddings(fake: FakeSupabase, params: dict):
+    notes = fake.table("notes")
+    by_id = notes.index(("id",))
+    files = fake.table("note_files").index(("id",))
+    count = 0
+    for item in params["embeddings"]:
+        for note in by_id.get((item["note_id"],), []):
+            note["embedding"] = item["embedding"]
+            count += 1
+            # The file keeps the first embedding for later duplicates
+            for file in files.get((note.get("file_id"),), []):
+                if file.get("embedding") is None:
+                    file["embedding"] = item["embedding"]
+    return count, None
+
+
+def _rpc_reuse_file_embeddings(fake: FakeSupabase, params: dict):
+    by_id = fake.table("notes").index(("id",))
+    files = fake.table("note_files").index(("id",))
+    rows = []
+    for note_id in params["note_ids"]:
+        for note in by_id.get((note_id,), []):
+            for file in files.get((note.get("file_id"),), []):
+                reused = file.get("embedding") is not None
+                if reused:
+                    note["embedding"] = file["embedding"]
+                rows.append({"note_id": note_id, "reused": reused, "lead": None if reused else file["lead"]})
+    return rows, None
+
+
+def _rpc_find_users_by_email(fake: FakeSupabase, params: dict):
+    emails = {email.lower() for email in params["p_emails"]}
+    return [
+        {"id": u["id"], "name": u["name"], "email": u["email"], "role": u["role"]}
+        for u in fake.table("users").rows if u["email"].lower() in emails
+    ], None
+
+
+def _rpc_complete_note_file(fake: FakeSupabase, params: dict):
+    files = fake.table("note_files")
+    own = files.index(("id",)).get((params["p_file_id"],), [])
+    if not own:
+        raise FakeAPIError(400, "P0001", f"Note file {params['p_file_id']} no longer exists")
+    existing = files.index(("sha256",)).get((params["p_sha256"],), [])
+    if existing:
+        file, status = existing[0], "exists"
+        file["last_used_at"] = _now()
+        fake._remove("note_files", own)
+    else:
+        file, status = own[0], "created"
+        file.update({
+            "sha256": params["p_sha256"],
+            "lead": params["p_lead"],
+            "char_count": params["p_char_count"],
+            "page_count": params["p_page_count"],
+            "last_used_at": _now()
+        })
+        files.invalidate()
+    return {"status": status, "file": {k: v for k, v in file.items() if k != "embedding"}}, None
+
+
+def _collectable_storage_rows(fake: FakeSupabase, params: dict) -> tuple[list[dict], list[dict]]:
+    # ref_count is trigger-maintained (not emulated): test references directly
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=params["p_grace_seconds"])
+    referenced = {n.get("file_id") for n in fake.table("notes").rows}
+    referenced.update(u.get("file_id") for u in fake.table("note_uploads").rows if u["status"] != "completed")
+    files = [
+        f for f in fake.table("note_files").rows
+        if f["id"] not in referenced and datetime.fromisoformat(f["last_used_at"] or f["created_at"]) < cutoff
+    ]
+    uploads = [
+        u for u in fake.table("note_uploads").rows
+        if u["status"] != "completed" and datetime.fromisoformat(u["expires_at"]) < cutoff
+    ]
+    return files, uploads
+
+
+def _rpc_collectable_storage_rows(fake: FakeSupabase, params: dict):
+    files, uploads = _collectable_storage_rows(fake, params)
+    return {"files": [f["id"] for f in files], "uploads": [u["id"] for u in uploads]}, None
+
+
+def _rpc_collect_storage_rows(fake: FakeSupabase, params: dict):
+    files, uploads = _collectable_storage_rows(fake, params)
+    fake._remove("note_files", files)
+    fake._remove("note_uploads", uploads)
+    return {"files": len(files), "uploads": len(uploads)}, None
+
+
+def _rpc_acquire_maintenance_lease(fake: FakeSupabase, params: dict):
+    leases = fake.table("maintenance_leases")
+    now = datetime.now(timezone.utc)
+    expires_at = (now + timedelta(seconds=params["p_seconds"])).isoformat()
+    current = leases.index(("name",)).get((params["p_name"],), [])
+    if not current:
+        fake._write_rows("maintenance_leases", [{
+            "name": params["p_name"], "holder": params["p_holder"], "expires_at": expires_at
+        }], on_conflict=None, resolution=None)
+        return True, None
+    lease = current[0]
+    if datetime.fromisoformat(lease["expires_at"]) < now or lease["holder"] == params["p_holder"]:
+        lease.update({"holder": params["p_holder"], "expires_at": expires_at})
+        return True, None
+    return False, None
+
+
+def _rpc_moderate_notes(fake: FakeSupabase, params: dict):
+    notes = fake.table("notes")
+    by_id = notes.index(("id",))
+    updated = []
+    for decision in params["decisions"]:
+        if decision["status"] not in ("approved", "rejected"):
+            continue
+        for note in by_id.get((decision["note_id"],), []):
+            approved = decision["status"] == "approved"
+            note.update({
+                "approval_status": decision["status"],
+                "approved_by": params["moderator_id"] if approved else None,
+                "approved_at": _now() if approved else None,
+                "embedding": note.get("embedding") if approved else None
+            })
+            if note not in updated:
+                updated.append(note)
+    notes.invalidate()
+    return updated, "notes"
+
+
+RPC_FUNCTIONS: dict[str, Callable] = {
+    "search_notes_by_similarity": _rpc_search_notes_by_similarity,
+    "set_note_embeddings": _rpc_set_note_embeddings,
+    "reuse_file_embeddings": _rpc_reuse_file_embeddings,
+    "complete_note_file": _rpc_complete_note_file,
+    "find_users_by_email": _rpc_find_users_by_email,
+    "moderate_notes": _rpc_moderate_notes,
+    "collect_storage_rows": _rpc_collect_storage_rows,
+    "collectable_storage_rows": _rpc_collectable_storage_rows,
+    "acquire_maintenance_lease": _rpc_acquire_maintenance_lease,
+}
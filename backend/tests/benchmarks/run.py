@@ -0,0 +1,242 @@
+"""
+Endpoint benchmark suite
+
+Runs the real FastAPI app in-process against an in-memory PostgREST/Storage
+stand-in (fake_supabase), with the local auth and fake LLM providers in place
+of Firebase and Gemini, and reports p50/p95 latency and Supabase calls per
+request for the main endpoints.
+
+Usage (from backend/):
+    python -m tests.benchmarks.run
+    python -m tests.benchmarks.run --iterations 100 --db-latency-ms 5 --check
+    python -m tests.benchmarks.run --json results.json
+
+--check exits non-zero when an endpoint fails or makes more Supabase calls
+than its budget in QUERY_BUDGETS, so N+1 regressions fail CI before deploy.
+"""
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Optional
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from .environment import install_environment, configure_providers, bench_token  # noqa: E402
+
+install_environment()
+
+import httpx  # noqa: E402
+from app.main import app  # noqa: E402
+from app.core.supabase import get_supabase_client, get_supabase_admin_client  # noqa: E402
+from .fake_supabase import FakeSupabase  # noqa: E402
+from .seed import SeedConfig, Dataset, SMALL, seed_dataset  # noqa: E402
+
+
+API = "/api/v1"
+
+# Max Supabase calls (PostgREST + Storage) per request, auth lookup included.
+# Independent of dataset size by design - a count that grows with the data is
+# an N+1. Lower these when an endpoint gets cheaper; raising one needs a reason.
+QUERY_BUDGETS = {
+    "classrooms.list (teacher)": 4,
+    "classrooms.list (student)": 2,
+    "dashboard.teacher": 5,
+    "notes.list (student)": 4,
+    "questions.list (student)": 4,
+    "notebook.query": 5,
+    "upload.note (student)": 10,  # file row, pages and chunks (one insert per batch), completion
+    "upload.note (duplicate)": 5,
+    "upload.sign (student)": 5,
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    user: str  # "teacher" | "student"
+    request: Callable[[Dataset, int], dict]  # (dataset, iteration) -> httpx request kwargs
+
+
+def _chapter(ids: list[str], i: int) -> str:
+    return ids[i % len(ids)]
+
+
+SCENARIOS = [
+    Scenario("classrooms.list (teacher)", "teacher",
+             lambda d, i: {"method": "GET", "url": f"{API}/classrooms/"}),
+    Scenario("classrooms.list (student)", "student",
+             lambda d, i: {"method": "GET", "url": f"{API}/classrooms/"}),
+    Scenario("dashboard.teacher", "teacher",
+             lambda d, i: {"method": "GET", "url": f"{API}/dashboard/teacher"}),
+    Scenario("notes.list (student)", "student",
+             lambda d, i: {"method": "GET", "url": f"{API}/notes/chapter/{_chapter(d.student_chapter_ids, i)}"}),
+    Scenario("questions.list (student)", "student",
+             lambda d, i: {"method": "GET", "url": f"{API}/questions/chapter/{_chapter(d.student_chapter_ids, i)}"}),
+    Scenario("notebook.query", "student",
+             lambda d, i: {
+                 "method": "POST",
+                 "url": f"{API}/notebook/chapter/{_chapter(d.student_chapter_ids, i)}/query",
+                 "json": {"question": "How does the momentum equation relate to energy?"}
+             }),
+    Scenario("upload.note (student)", "student",
+             lambda d, i: {
+                 "method": "POST",
+                 "url": f"{API}/upload/chapter/{_chapter(d.student_chapter_ids, i)}/note",
+                 "data": {"title": f"Benchmark upload {i}", "visibility": "public"},
+                 "files": {"file": (f"notes-{i}.txt", (f"Benchmark note {i} body. " * 200).encode(), "text/plain")}
+             }),
+    # Same bytes every time: hash lookup only, no extraction/storage/file row
+    Scenario("upload.note (duplicate)", "student",
+             lambda d, i: {
+                 "method": "POST",
+                 "url": f"{API}/upload/chapter/{_chapter(d.student_chapter_ids, i)}/note",
+                 "data": {"title": f"Benchmark upload {i}", "visibility": "public"},
+                 "files": {"file": ("lecture.txt", ("Shared lecture handout. " * 200).encode(), "text/plain")}
+             }),
+    Scenario("upload.sign (student)", "student",
+             lambda d, i: {
+                 "method": "POST",
+                 "url": f"{API}/upload/chapter/{_chapter(d.student_chapter_ids, i)}/note/sign",
+                 "json": {"title": f"Benchmark upload {i}", "file_name": f"notes-{i}.pdf", "visibility": "public"}
+             }),
+]
+
+
+@dataclass
+class Result:
+    name: str
+    samples: int
+    errors: int
+    p50_ms: float
+    p95_ms: float
+    mean_queries: float
+    max_queries: int
+    budget: Optional[int]
+    first_error: Optional[str] = None
+
+    @property
+    def over_budget(self) -> bool:
+        return self.budget is not None and self.max_queries > self.budget
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def setup(config: SeedConfig, db_latency_ms: float, embed_latency_ms: float, generate_latency_ms: float):
+    """Seeded fake wired into both Supabase clients, with offline auth/LLM providers"""
+    fake = FakeSupabase(latency_ms=db_latency_ms)
+    fake.install(get_supabase_client())
+    fake.install(get_supabase_admin_client())
+    configure_providers(embed_latency_ms=embed_latency_ms, generate_latency_ms=generate_latency_ms)
+    dataset = seed_dataset(fake, config)
+    return fake, dataset
+
+
+async def run_benchmarks(
+    fake: FakeSupabase,
+    dataset: Dataset,
+    iterations: int,
+    warmup: int = 2,
+    only: Optional[list[str]] = None
+) -> list[Result]:
+    """Run every scenario sequentially and collect latency/query stats"""
+    tokens = {
+        "teacher": bench_token(dataset.teacher_uid),
+        "student": bench_token(dataset.student_uid),
+    }
+    results = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for scenario in SCENARIOS:
+            if only and not any(o in scenario.name for o in only):
+                continue
+            headers = {"Authorization": f"Bearer {tokens[scenario.user]}"}
+            latencies, queries, errors, first_error = [], [], 0, None
+
+            for i in range(warmup + iterations):
+                calls_before = fake.calls
+                start = time.perf_counter()
+                response = await client.request(headers=headers, **scenario.request(dataset, i))
+                elapsed = time.perf_counter() - start
+                if i < warmup:
+                    continue
+                if response.status_code >= 400:
+                    errors += 1
+                    first_error = first_error or f"{response.status_code} {response.text[:200]}"
+                    continue
+                latencies.append(elapsed * 1000)
+                queries.append(fake.calls - calls_before)
+
+            results.append(Result(
+                name=scenario.name,
+                samples=len(latencies),
+                errors=errors,
+                p50_ms=_percentile(latencies, 50),
+                p95_ms=_percentile(latencies, 95),
+                mean_queries=statistics.mean(queries) if queries else 0.0,
+                max_queries=max(queries) if queries else 0,
+                budget=QUERY_BUDGETS.get(scenario.name),
+                first_error=first_error
+            ))
+    return results
+
+
+def print_report(results: list[Result], dataset: Dataset):
+    sizes = ", ".join(f"{table}={count}" for table, count in dataset.counts.items())
+    print(f"Dataset: {sizes}\n")
+    header = f"{'endpoint':<28}{'n':>5}{'err':>5}{'p50 ms':>10}{'p95 ms':>10}{'queries':>9}{'max':>5}{'budget':>8}"
+    print(header)
+    print("-" * len(header))
+    for r in results:
+        flag = "  OVER" if r.over_budget else ""
+        print(
+            f"{r.name:<28}{r.samples:>5}{r.errors:>5}{r.p50_ms:>10.1f}{r.p95_ms:>10.1f}"
+            f"{r.mean_queries:>9.1f}{r.max_queries:>5}{r.budget if r.budget is not None else '-':>8}{flag}"
+        )
+    for r in results:
+        if r.first_error:
+            print(f"\n{r.name}: {r.errors} failed, first error: {r.first_error}")
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="EduNexus endpoint benchmarks")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0,
+                        help="Simulated round trip per PostgREST call")
+    parser.add_argument("--embed-latency-ms", type=float, default=20.0)
+    parser.add_argument("--generate-latency-ms", type=float, default=200.0)
+    parser.add_argument("--small", action="store_true", help="Use the small dataset")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Run scenarios whose name contains any of these")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--check", action="store_true",
+                        help="Exit 1 on errors or query budget regressions")
+    args = parser.parse_args(argv)
+
+    config = replace(SMALL if args.small else SeedConfig(), seed=args.seed)
+    fake, dataset = setup(config, args.db_latency_ms, args.embed_latency_ms, args.generate_latency_ms)
+    results = asyncio.run(run_benchmarks(fake, dataset, args.iterations, only=args.only))
+    print_report(results, dataset)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps([r.__dict__ for r in results], indent=2))
+
+    if args.check and any(r.errors or r.over_budget for r in results):
+        print("\nFAILED: errors or query budget regressions")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
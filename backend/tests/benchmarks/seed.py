@@ -0,0 +1,211 @@
+"""
+Realistic, reproducible dataset for the benchmark suite
+
+Shapes the data the way a school deployment looks: a teacher who created a
+few classrooms and co-teaches subjects in colleagues' classrooms, students
+in several classrooms, and chapters with a mix of approved/pending/private
+notes, answered/unanswered/private questions and announcements.
+"""
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+import random
+import uuid
+
+from app.services.llm_provider import hash_embedding
+from .fake_supabase import FakeSupabase
+
+
+WORDS = (
+    "energy matrix cell photosynthesis derivative integral vector momentum "
+    "theorem equation reaction enzyme protein graph algorithm recursion "
+    "entropy voltage current resistance market supply demand inflation "
+    "poetry metaphor narrative revolution empire treaty climate erosion "
+    "genome mutation velocity acceleration friction catalyst isotope orbit"
+).split()
+
+
+@dataclass
+class SeedConfig:
+    classrooms: int = 4               # Created by the benchmark teacher
+    colleague_classrooms: int = 2     # Created by a colleague; teacher co-teaches there
+    subjects_per_classroom: int = 5
+    chapters_per_subject: int = 6
+    students: int = 120
+    students_per_classroom: int = 40
+    notes_per_chapter: int = 15
+    questions_per_chapter: int = 10
+    announcements_per_chapter: int = 2
+    seed: int = 42
+
+
+@dataclass
+class Dataset:
+    teacher_uid: str
+    student_uid: str
+    teacher_id: str
+    student_id: str
+    student_chapter_ids: list[str] = field(default_factory=list)
+    teacher_chapter_ids: list[str] = field(default_factory=list)
+    counts: dict[str, int] = field(default_factory=dict)
+
+
+SMALL = SeedConfig(
+    classrooms=2, colleague_classrooms=1, subjects_per_classroom=2,
+    chapters_per_subject=2, students=20, students_per_classroom=10,
+    notes_per_chapter=5, questions_per_chapter=4, announcements_per_chapter=1
+)
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def _paragraphs(rng: random.Random, count: int) -> str:
+    return "\n\n".join(
+        " ".join(_sentence(rng, rng.randint(8, 16)) for _ in range(rng.randint(3, 6)))
+        for _ in range(count)
+    )
+
+
+def seed_dataset(fake: FakeSupabase, config: SeedConfig = SeedConfig()) -> Dataset:
+    """Insert the dataset directly into the fake (not counted as API calls)"""
+    rng = random.Random(config.seed)
+    start = datetime(2025, 1, 6, tzinfo=timezone.utc)
+    clock = iter(start + timedelta(minutes=i) for i in range(10 ** 9))
+
+    def uid() -> str:
+        return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+    def ts() -> str:
+        return next(clock).isoformat()
+
+    users, classrooms, members, subjects, access = [], [], [], [], []
+    chapters, notes, questions, announcements = [], [], [], []
+
+    def user(role: str, index: int) -> dict:
+        row = {
+            "id": uid(), "firebase_uid": f"bench-{role}-{index}",
+            "email": f"{role}{index}@bench.edunexus", "name": f"{role.title()} {index}",
+            "role": role, "created_at": ts()
+        }
+        users.append(row)
+        return row
+
+    teacher = user("teacher", 0)
+    colleague = user("teacher", 1)
+    students = [user("student", i) for i in range(config.students)]
+    student = students[0]
+
+    owners = [teacher] * config.classrooms + [colleague] * config.colleague_classrooms
+    dataset = Dataset(
+        teacher_uid=teacher["firebase_uid"], student_uid=student["firebase_uid"],
+        teacher_id=teacher["id"], student_id=student["id"]
+    )
+
+    for c_index, owner in enumerate(owners):
+        classroom = {
+            "id": uid(), "name": f"Classroom {c_index}", "description": _sentence(rng, 10),
+            "code": f"B{c_index:05d}", "created_by": owner["id"], "created_at": ts()
+        }
+        classrooms.append(classroom)
+
+        roster = [student] + rng.sample(students[1:], min(config.students_per_classroom - 1, len(students) - 1))
+        for member in roster:
+            members.append({"id": uid(), "classroom_id": classroom["id"], "user_id": member["id"], "joined_at": ts()})
+
+        for s_index in range(config.subjects_per_classroom):
+            subject = {
+                "id": uid(), "classroom_id": classroom["id"], "name": f"Subject {c_index}.{s_index}",
+                "description": _sentence(rng, 8), "created_at": ts()
+            }
+            subjects.append(subject)
+            # The benchmark teacher co-teaches every other colleague subject
+            if owner is colleague and s_index % 2 == 0:
+                access.append({"id": uid(), "subject_id": subject["id"], "teacher_id": teacher["id"], "created_at": ts()})
+
+            for ch_index in range(config.chapters_per_subject):
+                chapter = {
+                    "id": uid(), "subject_id": subject["id"], "name": f"Chapter {c_index}.{s_index}.{ch_index}",
+                    "description": _sentence(rng, 8), "created_at": ts()
+                }
+                chapters.append(chapter)
+                dataset.student_chapter_ids.append(chapter["id"])
+                if owner is teacher:
+                    dataset.teacher_chapter_ids.append(chapter["id"])
+
+                for _ in range(config.notes_per_chapter):
+                    author = rng.choice(roster)
+                    status = rng.choices(["approved", "pending", "rejected"], [0.65, 0.3, 0.05])[0]
+                    visibility = "private" if rng.random() < 0.15 else "public"
+                    title = _sentence(rng, 4)
+                    content = _paragraphs(rng, rng.randint(2, 5))
+                    notes.append({
+                        "id": uid(), "chapter_id": chapter["id"], "title": title, "content": content,
+                        "file_url": None, "file_name": None, "visibility": visibility,
+                        "approval_status": status, "uploaded_by": author["id"],
+                        "approved_by": owner["id"] if status == "approved" else None,
+                        "approved_at": ts() if status == "approved" else None,
+                        "created_at": ts(),
+                        "embedding": hash_embedding(f"{title}\n{content}")
+                        if status == "approved" and visibility == "public" else None
+                    })
+
+                for _ in range(config.questions_per_chapter):
+                    answered = rng.random() < 0.6
+                    questions.append({
+                        "id": uid(), "chapter_id": chapter["id"], "user_id": rng.choice(roster)["id"],
+                        "title": _sentence(rng, 6).rstrip(".") + "?", "content": _sentence(rng, 20),
+                        "is_private": rng.random() < 0.2,
+                        "answer": _sentence(rng, 25) if answered else None,
+                        "answered_by": owner["id"] if answered else None,
+                        "answered_at": ts() if answered else None,
+                        "created_at": ts()
+                    })
+
+                for _ in range(config.announcements_per_chapter):
+                    announcements.append({
+                        "id": uid(), "chapter_id": chapter["id"], "title": _sentence(rng, 5),
+                        "content": _sentence(rng, 30), "created_by": owner["id"], "created_at": ts()
+                    })
+
+    for table, rows in (
+        ("users", users), ("classrooms", classrooms), ("classroom_members", members),
+        ("subjects", subjects), ("teacher_access", access), ("chapters", chapters),
+        ("notes", notes), ("questions", questions), ("announcements", announcements),
+    ):
+        fake.insert_rows(table, rows)
+        dataset.counts[table] = len(rows)
+
+    _seed_counters(fake, classrooms, members, subjects, chapters, notes, questions)
+    return dataset
+
+
+def _seed_counters(fake, classrooms, members, subjects, chapters, notes, questions):
+    """What the 003_counters triggers would have maintained"""
+    subject_of_chapter = {c["id"]: c["subject_id"] for c in chapters}
+
+    member_count = {c["id"]: 0 for c in classrooms}
+    for m in members:
+        member_count[m["classroom_id"]] += 1
+
+    pending = {s["id"]: 0 for s in subjects}
+    unanswered = {s["id"]: 0 for s in subjects}
+    note_count = {c["id"]: 0 for c in chapters}
+    for n in notes:
+        note_count[n["chapter_id"]] += 1
+        if n["approval_status"] == "pending":
+            pending[subject_of_chapter[n["chapter_id"]]] += 1
+    for q in questions:
+        if q["answer"] is None:
+            unanswered[subject_of_chapter[q["chapter_id"]]] += 1
+
+    fake.insert_rows("classroom_counters", [
+        {"classroom_id": cid, "member_count": count} for cid, count in member_count.items()
+    ])
+    fake.insert_rows("subject_counters", [
+        {"subject_id": sid, "pending_notes": pending[sid], "unanswered_questions": unanswered[sid]}
+        for sid in pending
+    ])
+    fake.insert_rows("chapter_counters", [
+        {"chapter_id": cid, "note_count": count} for cid, count in note_count.items()
+    ])
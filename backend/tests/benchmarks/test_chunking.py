@@ -0,0 +1,51 @@
+"""
+Chunking checks (pytest tests/benchmarks)
+
+iter_chunks keeps sentences whole, stays within its token budget, repeats
+the tail of each chunk at the start of the next, and chunks a 1 MB
+document within CHUNKING_BUDGET_SECONDS in flat memory.
+"""
+from .chunking import CHUNKING_BUDGET_SECONDS, CHUNKING_MEMORY_BUDGET_BYTES, document, run
+from app.services.document_processor import document_processor
+
+
+def test_chunks_are_sentences_within_budget_with_overlap():
+    text = document(64 * 1024)
+    # Fragment boundaries must not matter
+    fragments = [text[i:i + 1000] for i in range(0, len(text), 1000)]
+    chunks = list(document_processor.iter_chunks(fragments))
+
+    assert chunks == list(document_processor.iter_chunks([text]))
+    assert len(chunks) > 10
+    for previous, chunk in zip([None] + chunks, chunks):
+        assert text[chunk.start:chunk.end] == chunk.text
+        assert chunk.tokens == document_processor.count_tokens(chunk.text) <= document_processor.CHUNK_TOKENS
+        if chunk is not chunks[-1]:  # The document itself is cut mid-sentence
+            assert chunk.text[-1] in ".!?", chunk.text[-40:]
+        if previous is not None:
+            # Overlap is the previous chunk's trailing sentences
+            assert previous.start < chunk.start < previous.end <= chunk.end
+    assert chunks[-1].end == len(text.rstrip())
+
+
+def test_paragraph_breaks_and_long_sentences():
+    paragraphs = ["First paragraph. It is short.", "Second paragraph here.", "Third one. Third one. Third one."]
+    chunks = list(document_processor.iter_chunks(["\n\n".join(paragraphs)], max_tokens=10, overlap_tokens=0))
+    assert [c.text for c in chunks] == paragraphs
+
+    word = "word " * 100
+    chunks = list(document_processor.iter_chunks([word], max_tokens=10, overlap_tokens=0))
+    assert all(c.tokens <= 10 for c in chunks)
+    assert " ".join(c.text for c in chunks) == word.strip()
+
+    # The character-sized wrapper keeps its list-of-strings contract
+    assert document_processor.chunk_text("One. Two. Three.", chunk_size=1000) == ["One. Two. Three."]
+
+
+def test_one_mb_within_budget_in_flat_memory():
+    small = run(mb=1, samples=2)
+    assert small["seconds"] <= CHUNKING_BUDGET_SECONDS, f"{small['seconds']:.2f}s for 1 MB"
+    assert small["peak_bytes"] <= CHUNKING_MEMORY_BUDGET_BYTES, f"peak {small['peak_bytes']} bytes"
+
+    large = run(mb=3, samples=1)
+    assert large["peak_bytes"] <= max(2 * small["peak_bytes"], CHUNKING_MEMORY_BUDGET_BYTES // 4)
@@ -0,0 +1,22 @@
+"""
+Cold-start regression checks (pytest tests/benchmarks)
+
+Importing the app must stay free of heavy SDK imports and the worker must
+come up within COLD_START_BUDGET_MS.
+"""
+from .cold_start import COLD_START_BUDGET_MS, run
+
+
+def test_cold_start_is_lazy_and_within_budget():
+    result = run(samples=3)
+    assert result["loaded_at_import"] == [], f"imported eagerly: {result['loaded_at_import']}"
+    assert result["total_ms"] <= COLD_START_BUDGET_MS, (
+        f"cold start {result['total_ms']:.0f}ms > budget {COLD_START_BUDGET_MS}ms"
+    )
+
+
+def test_lifespan_warmup_completes_offline():
+    # Offline providers initialize; the Supabase step fails fast and is only logged
+    result = run(samples=1, warmup=True)
+    assert result["loaded_at_import"] == []
+    assert result["startup_ms"] > 0
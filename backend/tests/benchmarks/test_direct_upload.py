@@ -0,0 +1,152 @@
+"""
+Two-phase note uploads (pytest tests/benchmarks)
+
+sign -> client PUTs straight to Storage -> finalize, against the fake.
+"""
+import asyncio
+import httpx
+
+from .environment import bench_token
+from .fake_supabase import FakeAPIError
+from .run import API, app, setup
+from .seed import SMALL
+from app.core.config import settings
+
+
+def _flow(steps):
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    headers = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+    # The browser's PUT goes to Storage, not to the API
+    storage = httpx.Client(transport=httpx.MockTransport(fake.handle))
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            return await steps(api, storage, fake, dataset.student_chapter_ids[0])
+
+    return asyncio.run(go())
+
+
+async def _sign(api, chapter_id, file_name="notes.txt"):
+    response = await api.post(
+        f"{API}/upload/chapter/{chapter_id}/note/sign",
+        json={"title": "Direct upload", "file_name": file_name, "visibility": "public"}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_signed_upload_creates_note_on_finalize():
+    async def steps(api, storage, fake, chapter_id):
+        ticket = await _sign(api, chapter_id)
+
+        early = await api.post(f"{API}/upload/{ticket['upload_id']}/finalize")
+        assert early.status_code == 409
+
+        assert storage.put(ticket["upload_url"], content=b"Momentum is conserved. " * 500).status_code == 200
+        first = await api.post(f"{API}/upload/{ticket['upload_id']}/finalize")
+        retry = await api.post(f"{API}/upload/{ticket['upload_id']}/finalize")
+        return ticket, first, retry, fake
+
+    ticket, first, retry, fake = _flow(steps)
+    assert first.status_code == 200, first.text
+    note = first.json()
+    assert note["content"].startswith("Momentum is conserved.")
+    assert note["approval_status"] == "pending"
+    assert retry.status_code == 200 and retry.json()["id"] == note["id"]
+
+    upload = next(u for u in fake.table("note_uploads").rows if u["id"] == ticket["upload_id"])
+    assert (upload["status"], upload["note_id"]) == ("completed", note["id"])
+
+
+def test_failed_note_insert_can_be_retried():
+    async def steps(api, storage, fake, chapter_id):
+        ticket = await _sign(api, chapter_id)
+        storage.put(ticket["upload_url"], content=b"Retry after a failed insert. " * 500)
+
+        insert = fake._insert
+
+        def failing_insert(name, body, params, prefer):
+            if name == "notes":
+                raise FakeAPIError(503, "PGRST000", "Database unavailable")
+            return insert(name, body, params, prefer)
+
+        fake._insert = failing_insert
+        failed = await api.post(f"{API}/upload/{ticket['upload_id']}/finalize")
+        fake._insert = insert
+        retry = await api.post(f"{API}/upload/{ticket['upload_id']}/finalize")
+        return ticket, failed, retry, fake
+
+    ticket, failed, retry, fake = _flow(steps)
+    assert failed.status_code == 400
+    assert retry.status_code == 200, retry.text
+    assert retry.json()["content"].startswith("Retry after a failed insert.")
+
+    upload = next(u for u in fake.table("note_uploads").rows if u["id"] == ticket["upload_id"])
+    assert (upload["status"], upload["note_id"]) == ("completed", retry.json()["id"])
+    assert [n["id"] for n in fake.table("notes").rows if n.get("file_id") == upload["file_id"]] == [retry.json()["id"]]
+    assert [f["id"] for f in fake.table("note_files").rows] == [upload["file_id"]]
+    assert len(fake.objects) == 1
+
+
+def test_oversized_upload_is_rejected_and_removed(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_NOTE_FILE_BYTES", 1024)
+
+    async def steps(api, storage, fake, chapter_id):
+        ticket = await _sign(api, chapter_id)
+        storage.put(ticket["upload_url"], content=b"x" * 4096)
+        response = await api.post(f"{API}/upload/{ticket['upload_id']}/finalize")
+        return ticket, response, fake
+
+    ticket, response, fake = _flow(steps)
+    assert response.status_code == 413
+    assert f"notes/{ticket['path']}" not in fake.objects
+    upload = next(u for u in fake.table("note_uploads").rows if u["id"] == ticket["upload_id"])
+    assert upload["status"] == "failed"
+
+
+def test_duplicate_upload_shares_the_stored_file():
+    body = b"Shared lecture handout. " * 500
+
+    async def steps(api, storage, fake, chapter_id):
+        direct = await api.post(
+            f"{API}/upload/chapter/{chapter_id}/note",
+            data={"title": "Handout", "visibility": "public"},
+            files={"file": ("handout.txt", body, "text/plain")}
+        )
+        ticket = await _sign(api, chapter_id, "handout-copy.txt")
+        storage.put(ticket["upload_url"], content=body)
+        signed = await api.post(f"{API}/upload/{ticket['upload_id']}/finalize")
+        return direct, signed, fake
+
+    direct, signed, fake = _flow(steps)
+    assert direct.status_code == 200 and signed.status_code == 200, signed.text
+    assert signed.json()["file_url"] == direct.json()["file_url"]
+    assert len(fake.table("note_files").rows) == 1
+    # The second copy was dropped from storage
+    assert len(fake.objects) == 1
+
+
+def test_full_text_is_read_page_by_page():
+    body = ("First page text. " * 300 + "\f" + "Second page text. " * 300).encode()
+
+    async def steps(api, storage, fake, chapter_id):
+        created = await api.post(
+            f"{API}/upload/chapter/{chapter_id}/note",
+            data={"title": "Long handout", "visibility": "private"},
+            files={"file": ("long.txt", body, "text/plain")}
+        )
+        note_id = created.json()["id"]
+        second = await api.get(f"{API}/notes/{note_id}", params={"page": 2})
+        missing = await api.get(f"{API}/notes/{note_id}", params={"page": 9})
+        return created, second, missing
+
+    created, second, missing = _flow(steps)
+    assert created.status_code == 200, created.text
+    assert len(created.json()["content"]) == 500
+    assert second.status_code == 200, second.text
+    detail = second.json()
+    # Form feed first, then 4000-character pages: 5100 + 5400 characters
+    assert (detail["page"], detail["page_count"]) == (2, 4)
+    assert detail["text"] == ("First page text. " * 300)[4000:]
+    assert missing.status_code == 404
@@ -0,0 +1,142 @@
+"""
+Document format plugins (pytest tests/benchmarks)
+
+DOCX and PPTX are built in memory (zip + minimal XML parts), read through
+document_processor.iter_pages and uploaded through the API against the
+fake. Large documents are extracted with flat memory.
+"""
+import asyncio
+import httpx
+import io
+import pytest
+import tracemalloc
+import zipfile
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+from app.services.document_processor import (
+    document_processor, DocumentFormat, DocumentTooLargeError, UnsupportedDocumentError
+)
+
+
+W = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+A = "http://schemas.openxmlformats.org/drawingml/2006/main"
+P = "http://schemas.openxmlformats.org/presentationml/2006/main"
+R = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+RELS = "http://schemas.openxmlformats.org/package/2006/relationships"
+LINE = "Momentum is conserved in every closed system we study. " * 8
+
+
+def _docx(paragraphs: list[str]) -> bytes:
+    """A form feed in paragraphs is an explicit page break"""
+    body = "".join(
+        '<w:p><w:r><w:br w:type="page"/></w:r></w:p>' if p == "\f"
+        else f"<w:p><w:r><w:t>{p}</w:t></w:r><w:r><w:tab/><w:t>end</w:t></w:r></w:p>"
+        for p in paragraphs
+    )
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("word/document.xml", f'<w:document xmlns:w="{W}"><w:body>{body}</w:body></w:document>')
+    return out.getvalue()
+
+
+def _pptx(slides: list[list[str]], order: list[int]) -> bytes:
+    """Slides are stored as slide1..N but presented in order"""
+    out = io.BytesIO()
+    with zipfile.ZipFile(out, "w", zipfile.ZIP_DEFLATED) as archive:
+        rels = "".join(f'<Relationship Id="rId{i + 1}" Target="slides/slide{i + 1}.xml"/>' for i in range(len(slides)))
+        archive.writestr("ppt/_rels/presentation.xml.rels", f'<Relationships xmlns="{RELS}">{rels}</Relationships>')
+        ids = "".join(f'<p:sldId id="{256 + i}" r:id="rId{i + 1}"/>' for i in order)
+        archive.writestr(
+            "ppt/presentation.xml",
+            f'<p:presentation xmlns:p="{P}" xmlns:r="{R}"><p:sldIdLst>{ids}</p:sldIdLst></p:presentation>'
+        )
+        for i, lines in enumerate(slides):
+            paragraphs = "".join(f"<a:p><a:r><a:t>{line}</a:t></a:r></a:p>" for line in lines)
+            archive.writestr(
+                f"ppt/slides/slide{i + 1}.xml",
+                f'<p:sld xmlns:p="{P}" xmlns:a="{A}"><p:cSld><p:spTree><p:sp><p:txBody>'
+                f"{paragraphs}</p:txBody></p:sp></p:spTree></p:cSld></p:sld>"
+            )
+    return out.getvalue()
+
+
+def _pages(data: bytes, filename: str, max_pages=None) -> list[str]:
+    return list(document_processor.iter_pages(io.BytesIO(data), filename, max_pages=max_pages))
+
+
+def test_formats_yield_pages_and_slides():
+    assert _pages(_docx(["Forces", "Vectors", "\f", "Energy"]), "unit.docx") == [
+        "Forces\tend\nVectors\tend\n", "\nEnergy\tend\n"
+    ]
+    deck = _pptx([["Title", "Subtitle"], ["Second"], ["Third"]], order=[2, 0, 1])
+    assert _pages(deck, "deck.pptx") == ["Third\n", "Title\nSubtitle\n", "Second\n"]
+
+    markdown = b"# Waves\nIntro\n```\n# not a heading\n```\n## Sound\nBody\n### Pitch\nMore\n"
+    assert _pages(markdown, "waves.md") == [
+        "# Waves\nIntro\n```\n# not a heading\n```\n", "## Sound\nBody\n### Pitch\nMore\n"
+    ]
+
+
+def test_renamed_and_oversized_documents_are_rejected():
+    for filename in ("deck.pptx", "unit.docx"):
+        with pytest.raises(UnsupportedDocumentError):
+            document_processor.check_signature(b"%PDF-1.7 ...", filename)
+
+    deck = _pptx([["slide"]] * 6, order=list(range(6)))
+    with pytest.raises(DocumentTooLargeError):
+        _pages(deck, "deck.pptx", max_pages=5)
+
+
+def test_large_documents_extract_with_flat_memory():
+    def peak(data, filename):
+        tracemalloc.start()
+        for _ in document_processor.iter_pages(io.BytesIO(data), filename):
+            pass
+        peak_bytes = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak_bytes
+
+    small = peak(_docx([f"{i} {LINE}" for i in range(1000)]), "small.docx")
+    large = peak(_docx([f"{i} {LINE}" for i in range(10000)]), "large.docx")  # ~4.5 MB of text
+    assert large < 2 * small, (small, large)
+
+
+def test_docx_upload_creates_a_paged_note():
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    headers = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+    document = _docx([f"Paragraph {i}. {LINE}" for i in range(40)])
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            note = await api.post(
+                f"{API}/upload/chapter/{dataset.student_chapter_ids[0]}/note",
+                data={"title": "Unit 3", "visibility": "private"},
+                files={"file": ("unit3.docx", document, "application/octet-stream")}
+            )
+            assert note.status_code == 200, note.text
+            return note.json(), await api.get(f"{API}/notes/{note.json()['id']}?page=2")
+
+    note, page = asyncio.run(go())
+    assert note["content"].startswith("Paragraph 0. Momentum")
+    assert page.status_code == 200, page.text
+    assert page.json()["page_count"] == len(_pages(document, "unit3.docx")) > 1
+
+
+def test_incomplete_format_plugins_are_rejected():
+    class NoText(DocumentFormat):
+        extensions = (".odt",)
+
+        def check_signature(self, head: bytes):
+            pass
+
+    class NotAFormat:
+        extensions = (".rtf",)
+
+    with pytest.raises(TypeError):
+        document_processor.register(NoText())
+    with pytest.raises(TypeError):
+        document_processor.register(NotAFormat())
+    assert not document_processor.supports("notes.odt") and not document_processor.supports("notes.rtf")
@@ -0,0 +1,122 @@
+"""
+Event hub delivery (pytest tests/benchmarks)
+
+Every connection of each recipient gets the event; a slow connection's
+bounded queue drops its oldest events and flags the client once it has
+dropped too many. Cross-worker messages must fit NOTIFY: oversized events
+travel by reference through event_payloads and arrive intact.
+"""
+import asyncio
+import json
+
+from .environment import install_environment
+
+install_environment()
+
+from app.core.config import settings  # noqa: E402
+from app.services.event_hub import EventHub, NOTIFY_MAX_BYTES  # noqa: E402
+
+
+class Postgres:
+    """Just enough of a cursor for pg_notify, store_event_payload and the listener's lookup"""
+
+    def __init__(self):
+        self.notifications: list[str] = []
+        self.payloads: dict[int, dict] = {}
+        self.row = None
+
+    def execute(self, sql: str, params: tuple):
+        if "store_event_payload" in sql:
+            ref = len(self.payloads) + 1
+            self.payloads[ref] = json.loads(params[1])
+            self.notifications.append(json.dumps({"ref": ref}))
+        elif "pg_notify" in sql:
+            self.notifications.append(params[1])
+        else:
+            message = self.payloads.get(params[0])
+            self.row = None if message is None else (message,)
+
+    def fetchone(self):
+        return self.row
+
+
+def _message(text: str) -> dict:
+    return {
+        "type": "announcement.created",
+        "user_ids": ["user-1", "user-2"],
+        "payload": {"id": "a-1", "content": text},
+        "created_at": "2026-01-01T00:00:00"
+    }
+
+
+def test_oversized_events_are_notified_by_reference():
+    hub = EventHub()
+    db = Postgres()
+    small, large = _message("Short notice"), _message("Long announcement. " * 1000)
+
+    for message in (small, large):
+        hub._send(db, json.dumps(message))
+
+    assert all(len(n.encode()) < NOTIFY_MAX_BYTES for n in db.notifications)
+    assert json.loads(db.notifications[0]) == small
+    assert list(db.payloads.values()) == [large]
+    assert [hub._decode(db, n) for n in db.notifications] == [small, large]
+
+
+def test_missing_or_malformed_payloads_are_skipped():
+    hub = EventHub()
+    db = Postgres()
+    assert hub._decode(db, json.dumps({"ref": 42})) is None
+    assert hub._decode(db, "not json") is None
+
+
+def test_full_queues_drop_oldest_then_flag_the_client(monkeypatch):
+    monkeypatch.setattr(settings, "EVENTS_QUEUE_SIZE", 3)
+    monkeypatch.setattr(settings, "EVENTS_MAX_DROPPED", 4)
+
+    async def go():
+        hub = EventHub()
+        subscription = hub.subscribe("user-1")
+        for i in range(6):
+            await hub.publish(["user-1"], "note.approved", {"n": i})
+        queued = [subscription.queue.get_nowait()["payload"]["n"] for _ in range(subscription.queue.qsize())]
+        return hub, subscription, queued
+
+    hub, subscription, queued = asyncio.run(go())
+    # Three dropped, the newest three kept
+    assert queued == [3, 4, 5]
+    assert (subscription.dropped, subscription.lagging) == (3, False)
+
+    async def lag():
+        hub.unsubscribe(subscription)
+        lagging = hub.subscribe("user-1")
+        for i in range(8):
+            await hub.publish(["user-1"], "note.approved", {"n": i})
+        return lagging
+
+    lagging = asyncio.run(lag())
+    # Flagged at the fourth drop; nothing is queued for it afterwards
+    assert (lagging.dropped, lagging.lagging) == (4, True)
+    assert [lagging.queue.get_nowait()["payload"]["n"] for _ in range(lagging.queue.qsize())] == [4, 5, 6]
+    assert hub.stats()["disconnected_slow"] == 1
+
+
+def test_events_fan_out_to_every_connection_of_each_user():
+    async def go():
+        hub = EventHub()
+        first, second = hub.subscribe("user-1"), hub.subscribe("user-1")
+        other, outsider = hub.subscribe("user-2"), hub.subscribe("user-3")
+        await hub.publish(["user-1", "user-2", "user-1", None], "question.answered", {"id": "q-1"})
+        hub.unsubscribe(second)
+        await hub.publish(["user-1"], "note.rejected", {"id": "n-1"})
+        return hub, [[s.queue.get_nowait()["type"] for _ in range(s.queue.qsize())] for s in (first, second, other, outsider)]
+
+    hub, received = asyncio.run(go())
+    assert received == [
+        ["question.answered", "note.rejected"],
+        ["question.answered"],
+        ["question.answered"],
+        []
+    ]
+    stats = hub.stats()
+    assert (stats["published"], stats["delivered"], stats["connections"]) == (2, 4, 3)
@@ -0,0 +1,126 @@
+"""
+Note downloads through the API (pytest tests/benchmarks)
+
+GET /notes/{id}/file against the fake: access rules, byte ranges,
+conditional GETs, and repeat downloads served from the disk cache.
+"""
+import asyncio
+import httpx
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+from app.core.config import settings
+from app.modules.chapter.notes import service as notes_module
+from app.services.file_cache import DiskFileCache
+
+
+BODY = b"Thermodynamics revision sheet, second law. " * 500
+
+
+def _download(monkeypatch, tmp_path, steps, cache_bytes=10 * len(BODY)):
+    monkeypatch.setattr(settings, "NOTE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "NOTE_CACHE_MAX_BYTES", cache_bytes)
+    monkeypatch.setattr(notes_module, "note_file_cache", DiskFileCache())
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+
+    gets = []
+    storage = fake._storage
+
+    def counting_storage(request, path):
+        if request.method == "GET" and path.startswith("object/"):
+            gets.append(request.headers.get("range"))
+        return storage(request, path)
+
+    fake._storage = counting_storage
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        student = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+        classmate = {"Authorization": f"Bearer {bench_token('bench-student-1')}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=student) as api:
+            response = await api.post(
+                f"{API}/upload/chapter/{dataset.student_chapter_ids[0]}/note",
+                data={"title": "Revision", "visibility": "private"},
+                files={"file": ("revision.txt", BODY, "text/plain")}
+            )
+            assert response.status_code == 200, response.text
+            url = f"{API}/notes/{response.json()['id']}/file"
+            return await steps(api, url, classmate)
+
+    return asyncio.run(go()), gets
+
+
+def test_ranges_and_conditional_gets_from_the_cache(monkeypatch, tmp_path):
+    async def steps(api, url, classmate):
+        full = await api.get(url)
+        part = await api.get(url, headers={"Range": "bytes=10-19"})
+        tail = await api.get(url, headers={"Range": "bytes=-5"})
+        beyond = await api.get(url, headers={"Range": f"bytes={len(BODY)}-"})
+        cached = await api.get(url, headers={"If-None-Match": full.headers["ETag"]})
+        stale_if_range = await api.get(url, headers={"Range": "bytes=0-9", "If-Range": '"other"'})
+        hidden = await api.get(url, headers=classmate)
+        return full, part, tail, beyond, cached, stale_if_range, hidden
+
+    (full, part, tail, beyond, cached, stale_if_range, hidden), gets = _download(monkeypatch, tmp_path, steps)
+
+    assert full.status_code == 200 and full.content == BODY
+    assert full.headers["Accept-Ranges"] == "bytes" and full.headers["Content-Type"].startswith("text/plain")
+    assert (part.status_code, part.content) == (206, BODY[10:20])
+    assert part.headers["Content-Range"] == f"bytes 10-19/{len(BODY)}"
+    assert (tail.status_code, tail.content) == (206, BODY[-5:])
+    assert beyond.status_code == 416 and beyond.headers["Content-Range"] == f"bytes */{len(BODY)}"
+    assert cached.status_code == 304 and not cached.content
+    assert stale_if_range.status_code == 200 and stale_if_range.content == BODY
+    assert hidden.status_code == 404  # another student's private note
+
+    # Only the first download reached Storage
+    assert gets == [None]
+    assert _cached(tmp_path) == [full.headers["ETag"].strip('"')]
+
+
+def test_files_larger_than_the_cache_stream_ranges_from_storage(monkeypatch, tmp_path):
+    async def steps(api, url, classmate):
+        return await api.get(url, headers={"Range": "bytes=100-199"}), await api.get(url)
+
+    (part, full), gets = _download(monkeypatch, tmp_path, steps, cache_bytes=len(BODY) - 1)
+    assert (part.status_code, part.content) == (206, BODY[100:200])
+    assert full.content == BODY
+    assert gets == ["bytes=100-199", f"bytes=0-{len(BODY) - 1}"]
+    assert not _cached(tmp_path)
+
+
+def test_least_recently_used_files_are_evicted(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "NOTE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "NOTE_CACHE_MAX_BYTES", 250)
+    cache = DiskFileCache()
+
+    async def fill():
+        for key in ("a", "b", "a", "c"):
+            with await cache.open(key, lambda: iter([key.encode() * 100])) as handle:
+                assert handle.read() == key.encode() * 100
+
+    asyncio.run(fill())
+    assert _cached(tmp_path) == ["a", "c"]
+
+
+def test_workers_sharing_the_directory_stay_within_the_bound(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "NOTE_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "NOTE_CACHE_MAX_BYTES", 250)
+    workers = [DiskFileCache(), DiskFileCache()]
+
+    async def fill():
+        for i, key in enumerate("abcd"):
+            with await workers[i % 2].open(key, lambda: iter([key.encode() * 100])):
+                pass
+        # A file another worker evicted is simply downloaded again
+        with await workers[1].open("a", lambda: iter([b"a" * 100])) as handle:
+            return handle.read()
+
+    assert asyncio.run(fill()) == b"a" * 100
+    assert _cached(tmp_path) == ["a", "d"]
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 250
+
+
+def _cached(directory):
+    return sorted(p.name for p in directory.iterdir() if not p.name.startswith("."))
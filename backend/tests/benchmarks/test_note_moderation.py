@@ -0,0 +1,46 @@
+"""
+Bulk note moderation (pytest tests/benchmarks)
+
+A teacher only moderates notes in subjects they teach (classroom creator
+or teacher_access); other notes come back in not_found, untouched.
+"""
+import asyncio
+import httpx
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+
+
+def test_bulk_moderation_skips_subjects_the_teacher_does_not_teach():
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    classrooms = {c["id"]: c for c in fake.table("classrooms").rows}
+    granted = {a["subject_id"] for a in fake.table("teacher_access").rows if a["teacher_id"] == dataset.teacher_id}
+    created = {
+        s["id"] for s in fake.table("subjects").rows
+        if classrooms[s["classroom_id"]]["created_by"] == dataset.teacher_id
+    }
+    taught = created | granted
+    subject_of = {c["id"]: c["subject_id"] for c in fake.table("chapters").rows}
+    pending = [n for n in fake.table("notes").rows if n["approval_status"] == "pending"]
+    own = next(n for n in pending if subject_of[n["chapter_id"]] in created)
+    shared = next(n for n in pending if subject_of[n["chapter_id"]] in granted)
+    other = next(n for n in pending if subject_of[n["chapter_id"]] not in taught)
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": f"Bearer {bench_token(dataset.teacher_uid)}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            return await api.patch(f"{API}/notes/approval", json={"decisions": [
+                {"note_id": own["id"], "status": "approved"},
+                {"note_id": shared["id"], "status": "rejected"},
+                {"note_id": other["id"], "status": "approved"},
+                {"note_id": "00000000-0000-4000-8000-000000000000", "status": "approved"}
+            ]})
+
+    response = asyncio.run(go())
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert {n["id"]: n["approval_status"] for n in body["notes"]} == {own["id"]: "approved", shared["id"]: "rejected"}
+    assert body["not_found"] == [other["id"], "00000000-0000-4000-8000-000000000000"]
+    assert other["approval_status"] == "pending"
@@ -0,0 +1,75 @@
+"""
+Note queries never ship embeddings (pytest tests/benchmarks)
+
+Drives every note API path against the fake - whose `*` expands to every
+column, embedding included - and fails if a notes select asks for `*` or
+`embedding`, or if any PostgREST response carries an embedding.
+"""
+import asyncio
+import httpx
+import json
+
+from .environment import bench_token
+from .run import API, SCENARIOS, app, run_benchmarks, setup
+from .seed import SMALL
+
+
+def _embedding_keys(value, path="$"):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            if key == "embedding":
+                yield f"{path}.{key}"
+            yield from _embedding_keys(item, f"{path}.{key}")
+    elif isinstance(value, list):
+        for i, item in enumerate(value):
+            yield from _embedding_keys(item, f"{path}[{i}]")
+
+
+def test_note_queries_never_select_embeddings():
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    selects, leaks = [], []
+    route = fake._route
+
+    def recording_route(request):
+        response = route(request)
+        resource = request.url.path.split("/rest/v1/", 1)[-1]
+        if resource.startswith("notes") or resource.startswith("rpc/moderate_notes"):
+            selects.append((request.method, resource, request.url.params.get("select", "*")))
+        if "/rest/v1/" in request.url.path and response.content:
+            body = json.loads(response.content)
+            leaks.extend(f"{request.method} {resource}: {key}" for key in _embedding_keys(body))
+        return response
+
+    fake._route = recording_route
+
+    async def moderate():
+        transport = httpx.ASGITransport(app=app)
+        teacher = {"Authorization": f"Bearer {bench_token(dataset.teacher_uid)}"}
+        student = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as api:
+            dashboard = await api.get(f"{API}/dashboard/teacher", headers=teacher)
+            pending = [n["id"] for n in dashboard.json()["pending_notes"]]
+            assert len(pending) >= 3, dashboard.text
+
+            responses = [
+                await api.patch(f"{API}/notes/{pending[0]}/approval",
+                                json={"status": "approved"}, headers=teacher),
+                await api.patch(f"{API}/notes/approval", headers=teacher, json={"decisions": [
+                    {"note_id": pending[1], "status": "approved"},
+                    {"note_id": pending[2], "status": "rejected"}
+                ]}),
+                await api.get(f"{API}/notes/{pending[0]}", headers=teacher),
+                await api.get(f"{API}/notes/my-notes", headers=student),
+            ]
+            for response in responses:
+                assert response.status_code == 200, response.text
+
+    asyncio.run(run_benchmarks(fake, dataset, iterations=1, warmup=0))
+    asyncio.run(moderate())
+
+    assert {s.name.split(" ")[0] for s in SCENARIOS} >= {"notes.list", "dashboard.teacher"}
+    assert selects
+    for method, resource, select in selects:
+        columns = [c.strip() for c in select.split(",")]
+        assert "*" not in columns and "embedding" not in columns, f"{method} {resource}: select={select}"
+    assert not leaks, leaks
@@ -0,0 +1,45 @@
+"""
+Query-count regression checks (pytest tests/benchmarks)
+
+Runs every benchmark scenario on two dataset sizes: each must succeed, stay
+within its QUERY_BUDGETS entry, and make the same number of Supabase calls
+regardless of how much data there is.
+"""
+from dataclasses import replace
+import asyncio
+
+from .run import QUERY_BUDGETS, SCENARIOS, run_benchmarks, setup
+from .seed import SMALL
+
+
+def _run(config):
+    fake, dataset = setup(config, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    return {r.name: r for r in asyncio.run(run_benchmarks(fake, dataset, iterations=3, warmup=1))}
+
+
+def test_every_scenario_has_a_budget():
+    assert {s.name for s in SCENARIOS} == set(QUERY_BUDGETS)
+
+
+def test_endpoints_stay_within_query_budgets():
+    results = _run(SMALL)
+    for name, result in results.items():
+        assert result.errors == 0, f"{name}: {result.first_error}"
+        assert not result.over_budget, f"{name}: {result.max_queries} calls > budget {result.budget}"
+
+
+def test_query_counts_do_not_grow_with_data():
+    small = _run(SMALL)
+    larger = _run(replace(
+        SMALL,
+        classrooms=SMALL.classrooms * 2,
+        subjects_per_classroom=SMALL.subjects_per_classroom * 2,
+        chapters_per_subject=SMALL.chapters_per_subject * 2,
+        notes_per_chapter=SMALL.notes_per_chapter * 2,
+        questions_per_chapter=SMALL.questions_per_chapter * 2
+    ))
+    for name, result in small.items():
+        assert larger[name].max_queries == result.max_queries, (
+            f"{name}: {result.max_queries} calls on the small dataset, "
+            f"{larger[name].max_queries} on the larger one (N+1?)"
+        )
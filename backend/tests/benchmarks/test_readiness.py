@@ -0,0 +1,111 @@
+"""
+Circuits and readiness (pytest tests/benchmarks)
+
+Circuits open after consecutive failed probes, go half-open after the
+cooldown and close on the next success; an open storage circuit turns
+uploads away with 503. /ready reports each probe and answers 503 only when
+a required dependency is down.
+"""
+import asyncio
+import httpx
+import time
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+from app import main as main_module
+from app.core import circuit as circuit_module, readiness
+from app.core.circuit import CLOSED, HALF_OPEN, OPEN, Circuit, circuits
+from app.core.config import settings
+
+
+def test_circuit_opens_half_opens_and_closes(monkeypatch):
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(settings, "CIRCUIT_COOLDOWN_SECONDS", 30.0)
+    now = [1000.0]
+    monkeypatch.setattr(circuit_module.time, "monotonic", lambda: now[0])
+    circuit = Circuit("storage")
+
+    circuit.record(False, "timeout")
+    assert (circuit.state, circuit.allow()) == (CLOSED, True)
+    circuit.record(False, "timeout")
+    assert (circuit.state, circuit.allow()) == (OPEN, False)
+
+    now[0] += 29
+    assert circuit.state == OPEN
+    now[0] += 1
+    assert (circuit.state, circuit.allow()) == (HALF_OPEN, True)
+
+    # One more failure while half-open opens it again for a full cooldown
+    circuit.record(False, "refused")
+    assert circuit.state == OPEN and circuit.last_error == "refused"
+    now[0] += 30
+    circuit.record(True)
+    assert circuit.snapshot() == {"state": CLOSED, "failures": 0, "last_error": None}
+
+
+def _ready(monkeypatch, probes, calls=1):
+    monkeypatch.setattr(settings, "READINESS_PROBE_TIMEOUT_SECONDS", 0.2)
+    monkeypatch.setattr(settings, "CIRCUIT_FAILURE_THRESHOLD", 2)
+    monkeypatch.setattr(circuits, "_circuits", {})
+    monkeypatch.setattr(readiness, "PROBES", probes)
+    monkeypatch.setattr(main_module, "readiness_checker", readiness.ReadinessChecker())
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as api:
+            return [await api.get("/ready") for _ in range(calls)]
+
+    return asyncio.run(go())
+
+
+def _ok():
+    pass
+
+
+def _down():
+    raise ConnectionError("connection refused")
+
+
+def _hung():
+    time.sleep(1)
+
+
+def test_ready_reports_degraded_and_caches(monkeypatch):
+    monkeypatch.setattr(settings, "READINESS_CACHE_SECONDS", 60.0)
+    first, second = _ready(monkeypatch, {"supabase": _ok, "storage": _ok, "llm": _down}, calls=2)
+
+    assert first.status_code == 200
+    report = first.json()
+    assert (report["status"], report["ready"], report["cached"]) == ("degraded", True, False)
+    llm = report["checks"]["llm"]
+    assert (llm["ok"], llm["error"], llm["circuit"]) == (False, "connection refused", CLOSED)
+    assert report["checks"]["supabase"]["ok"] and report["checks"]["supabase"]["circuit"] == CLOSED
+    assert second.json()["cached"] is True
+
+
+def test_ready_fails_on_a_required_dependency_and_opens_its_circuit(monkeypatch):
+    monkeypatch.setattr(settings, "READINESS_CACHE_SECONDS", 0.0)
+    responses = _ready(monkeypatch, {"supabase": _ok, "storage": _hung}, calls=2)
+
+    assert [r.status_code for r in responses] == [503, 503]
+    storage = responses[-1].json()["checks"]["storage"]
+    assert responses[-1].json()["status"] == "unavailable"
+    assert storage["error"] == "timed out after 0.2s" and storage["circuit"] == OPEN
+
+    # Uploads fail fast while the storage circuit is open
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+
+    async def upload():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            return await api.post(
+                f"{API}/upload/chapter/{dataset.student_chapter_ids[0]}/note",
+                data={"title": "Blocked", "visibility": "private"},
+                files={"file": ("notes.txt", b"Circuit test body. " * 100, "text/plain")}
+            )
+
+    response = asyncio.run(upload())
+    assert response.status_code == 503
+    assert not fake.objects
@@ -0,0 +1,91 @@
+"""
+Resumable note uploads (pytest tests/benchmarks)
+
+create -> PATCH chunks at the current offset (HEAD to resume) -> finalize,
+against the fake.
+"""
+import asyncio
+import httpx
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+
+
+BODY = b"Conservation of energy, worked examples. " * 400
+
+
+def _flow(steps):
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    headers = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            return await steps(api, fake, dataset.student_chapter_ids[0])
+
+    return asyncio.run(go())
+
+
+async def _create(api, chapter_id, size, file_name="lecture.txt"):
+    response = await api.post(
+        f"{API}/upload/chapter/{chapter_id}/note/resumable",
+        json={"title": "Lecture 4", "file_name": file_name, "visibility": "private", "size": size}
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def _patch(api, upload_id, offset, chunk):
+    return api.patch(f"{API}/upload/{upload_id}", content=chunk, headers={
+        "Upload-Offset": str(offset),
+        "Content-Type": "application/offset+octet-stream"
+    })
+
+
+def test_interrupted_upload_resumes_from_the_stored_offset():
+    async def steps(api, fake, chapter_id):
+        upload = await _create(api, chapter_id, len(BODY))
+        upload_id = upload["upload_id"]
+
+        first = await _patch(api, upload_id, 0, BODY[:6000])
+        # A retried (duplicate) chunk is refused and changes nothing
+        duplicate = await _patch(api, upload_id, 0, BODY[:6000])
+        early = await api.post(f"{API}/upload/{upload_id}/finalize")
+        head = await api.head(f"{API}/upload/{upload_id}")
+        rest = await _patch(api, upload_id, int(head.headers["Upload-Offset"]), BODY[6000:])
+        note = await api.post(f"{API}/upload/{upload_id}/finalize")
+        return first, duplicate, early, head, rest, note, fake
+
+    first, duplicate, early, head, rest, note, fake = _flow(steps)
+    assert first.status_code == 204 and first.headers["Upload-Offset"] == "6000"
+    assert duplicate.status_code == 409
+    assert early.status_code == 409
+    assert (head.headers["Upload-Offset"], head.headers["Upload-Length"]) == ("6000", str(len(BODY)))
+    assert rest.status_code == 204 and rest.headers["Upload-Offset"] == str(len(BODY))
+
+    assert note.status_code == 200, note.text
+    assert note.json()["content"].startswith("Conservation of energy")
+    # Parts were assembled into one object and removed
+    assert list(fake.objects.values()) == [BODY]
+
+
+def test_renamed_binary_fails_on_the_first_chunk():
+    async def steps(api, fake, chapter_id):
+        upload = await _create(api, chapter_id, 4096, file_name="slides.pdf")
+        rejected = await _patch(api, upload["upload_id"], 0, b"\x89PNG\r\n\x1a\n" + b"\x00" * 2040)
+        head = await api.head(f"{API}/upload/{upload['upload_id']}")
+        return rejected, head, fake
+
+    rejected, head, fake = _flow(steps)
+    assert rejected.status_code == 415
+    assert head.status_code == 409  # failed, nothing more to send
+    assert not fake.objects
+
+
+def test_chunk_past_declared_size_is_rejected():
+    async def steps(api, fake, chapter_id):
+        upload = await _create(api, chapter_id, 100)
+        return await _patch(api, upload["upload_id"], 0, BODY[:200])
+
+    assert _flow(steps).status_code == 413
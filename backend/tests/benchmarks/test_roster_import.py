@@ -0,0 +1,55 @@
+"""
+Roster imports (pytest tests/benchmarks)
+
+Emails match whatever their casing in the roster or as stored, and an oversized CSV is
+refused before it is parsed.
+"""
+import asyncio
+import httpx
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+from app.modules.classroom.schemas import MAX_ROSTER_CSV_BYTES
+
+
+def _import(stored_email="alice@school.edu", **request):
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    classroom = next(c for c in fake.table("classrooms").rows if c["created_by"] == dataset.teacher_id)
+    fake.insert_rows("users", [{
+        "id": "00000000-0000-4000-8000-000000000029", "firebase_uid": "roster-student",
+        "email": stored_email, "name": "Alice", "role": "student"
+    }])
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": f"Bearer {bench_token(dataset.teacher_uid)}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            suffix = "/csv" if "files" in request else ""
+            return await api.post(f"{API}/classrooms/{classroom['id']}/roster{suffix}", **request)
+
+    return asyncio.run(go())
+
+
+def test_emails_match_case_insensitively():
+    response = _import(json={"emails": ["Alice@School.edu", "alice@school.EDU", "nobody@school.edu"]})
+    assert response.status_code == 200, response.text
+    statuses = [(r["email"], r["status"]) for r in response.json()["results"]]
+    assert statuses == [
+        ("Alice@School.edu", "added"),
+        ("alice@school.EDU", "duplicate"),
+        ("nobody@school.edu", "not_found")
+    ]
+
+
+def test_mixed_case_stored_email_matches():
+    response = _import(stored_email="Alice@School.edu", json={"emails": ["alice@school.edu"]})
+    assert response.status_code == 200, response.text
+    statuses = [(r["email"], r["status"]) for r in response.json()["results"]]
+    assert statuses == [("alice@school.edu", "added")]
+
+
+def test_oversized_csv_is_refused():
+    body = b"email\n" + b"student@school.edu\n" * (MAX_ROSTER_CSV_BYTES // 19 + 1)
+    response = _import(files={"file": ("roster.csv", body, "text/csv")})
+    assert response.status_code == 413
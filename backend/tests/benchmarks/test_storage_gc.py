@@ -0,0 +1,172 @@
+"""
+Storage garbage collection (pytest tests/benchmarks)
+
+Uploads two notes, deletes one, strands an object and a stale upload, then
+collects against the fake: only objects nothing live points at - and only
+once they are past the grace period - are removed. Only the lease holder
+collects, and a collection that loses its lease stops deleting.
+"""
+import asyncio
+import httpx
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+from app.core.config import settings
+from app.core.supabase import get_supabase_admin_client
+from app.modules.chapter.upload.service import upload_service
+from app.services.storage_gc import storage_gc, LeaseHeldError
+
+
+def _seed(monkeypatch):
+    monkeypatch.setattr(settings, "STORAGE_GC_GRACE_MINUTES", 60)
+    monkeypatch.setattr(settings, "STORAGE_GC_BATCH_SIZE", 2)
+    monkeypatch.setattr(settings, "STORAGE_GC_DELETES_PER_SECOND", 10_000.0)
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    headers = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            notes = []
+            for title in ("Kept", "Deleted"):
+                response = await api.post(
+                    f"{API}/upload/chapter/{dataset.student_chapter_ids[0]}/note",
+                    data={"title": title, "visibility": "private"},
+                    files={"file": (f"{title}.txt", f"{title} note body. ".encode() * 200, "text/plain")}
+                )
+                assert response.status_code == 200, response.text
+                notes.append(response.json())
+            return notes
+
+    kept, deleted = asyncio.run(go())
+    # The note row goes; its note_files row and object stay behind
+    fake._remove("notes", [n for n in fake.table("notes").rows if n["id"] == deleted["id"]])
+    fake._put_object("notes/stray/orphan.bin", b"x" * 1000)
+    expired = (datetime.now(timezone.utc) - timedelta(days=2)).isoformat()
+    fake.table("note_uploads").rows.append({
+        "id": "00000000-0000-4000-8000-000000000047", "user_id": dataset.student_uid, "status": "pending",
+        "storage_path": "abandoned/upload.txt", "parts": ["abandoned/upload.txt.part-000000000000-deadbeef"],
+        "expires_at": expired, "created_at": expired
+    })
+    fake._put_object("notes/abandoned/upload.txt.part-000000000000-deadbeef", b"y" * 500)
+    return fake, kept, deleted
+
+
+def _kept_path(fake, note_id):
+    note = next(n for n in fake.table("notes").rows if n["id"] == note_id)
+    file = next(f for f in fake.table("note_files").rows if f["id"] == note["file_id"])
+    return f"notes/{file['storage_path']}"
+
+
+def _age(fake):
+    fake.age_objects(2 * 3600)
+    for row in fake.table("note_files").rows:
+        for column in ("created_at", "last_used_at"):
+            row[column] = (datetime.fromisoformat(row[column]) - timedelta(hours=2)).isoformat()
+
+
+def test_orphans_inside_the_grace_period_are_kept(monkeypatch):
+    fake, kept, _ = _seed(monkeypatch)
+    before = set(fake.objects)
+
+    report = storage_gc.collect(get_supabase_admin_client())
+    assert report.orphans == 0 and report.objects_deleted == 0
+    assert set(fake.objects) == before
+
+
+def test_orphans_are_removed_and_live_files_kept(monkeypatch):
+    fake, kept, deleted = _seed(monkeypatch)
+    live = _kept_path(fake, kept["id"])
+    _age(fake)
+    orphan_bytes = sum(len(v) for k, v in fake.objects.items() if k != live)
+
+    # A dry run deletes nothing but reports what the real run removes
+    dry = storage_gc.collect(get_supabase_admin_client(), dry_run=True)
+    assert (dry.objects_deleted, dry.reclaimed_bytes) == (3, orphan_bytes)
+    assert (dry.files_deleted, dry.uploads_deleted) == (1, 1)
+    assert len(fake.objects) == 4 and len(fake.table("note_files").rows) == 2
+
+    report = storage_gc.collect(get_supabase_admin_client())
+    assert list(fake.objects) == [live]
+    assert (report.objects_scanned, report.objects_deleted) == (4, 3)
+    assert report.reclaimed_bytes == orphan_bytes
+    assert (report.files_deleted, report.uploads_deleted) == (1, 1)
+    assert not [u for u in fake.table("note_uploads").rows if u["status"] == "pending"]
+
+
+def test_file_being_reused_is_kept(monkeypatch):
+    fake, kept, deleted = _seed(monkeypatch)
+    _age(fake)
+    db = get_supabase_admin_client()
+    unused = next(f for f in fake.table("note_files").rows if f["storage_path"] in deleted["file_url"])
+
+    # A duplicate upload found the unused file; its note is not inserted yet
+    assert upload_service._find_file(db, unused["sha256"])["id"] == unused["id"]
+    report = storage_gc.collect(db)
+    assert report.files_deleted == 0
+    assert f"notes/{unused['storage_path']}" in fake.objects
+
+
+def test_lease_is_held_by_one_worker(monkeypatch):
+    _seed(monkeypatch)
+    db = get_supabase_admin_client()
+    assert storage_gc._acquire_lease(db, 60)
+    assert storage_gc._acquire_lease(db, 60)  # renewal by the holder
+    monkeypatch.setattr(storage_gc, "holder", "other-host:1")
+    assert not storage_gc._acquire_lease(db, 60)
+
+
+def test_collection_stops_when_another_holder_has_the_lease(monkeypatch):
+    fake, _, _ = _seed(monkeypatch)
+    _age(fake)
+    db = get_supabase_admin_client()
+    db.rpc("acquire_maintenance_lease", {
+        "p_name": storage_gc.LEASE_NAME, "p_holder": "other-host:1", "p_seconds": 60
+    }).execute()
+    objects = dict(fake.objects)
+
+    with pytest.raises(LeaseHeldError):
+        storage_gc.collect(db)
+    assert fake.objects == objects
+
+
+def test_collection_renews_its_lease_and_releases_it(monkeypatch):
+    fake, _, _ = _seed(monkeypatch)
+    _age(fake)
+    db = get_supabase_admin_client()
+    monkeypatch.setattr(settings, "STORAGE_GC_LEASE_SECONDS", 0)  # Renewed at every step
+    renewals = []
+    acquire = storage_gc._acquire_lease
+    monkeypatch.setattr(
+        storage_gc, "_acquire_lease", lambda db, seconds: renewals.append(seconds) or acquire(db, seconds)
+    )
+
+    storage_gc.collect(db)
+    assert len(renewals) > 3
+    monkeypatch.setattr(storage_gc, "holder", "other-host:1")
+    assert acquire(db, 60)  # Released
+
+
+def test_lost_lease_stops_the_deletes(monkeypatch):
+    fake, _, _ = _seed(monkeypatch)
+    _age(fake)
+    db = get_supabase_admin_client()
+    monkeypatch.setattr(settings, "STORAGE_GC_LEASE_SECONDS", 0)
+    delete = storage_gc._delete
+
+    def stolen_after_first_batch(db, bucket, batch, report):
+        delete(db, bucket, batch, report)
+        # Another collector took over
+        fake.table("maintenance_leases").rows[0].update({
+            "holder": "other-host:1",
+            "expires_at": (datetime.now(timezone.utc) + timedelta(minutes=5)).isoformat()
+        })
+
+    monkeypatch.setattr(storage_gc, "_delete", stolen_after_first_batch)
+    with pytest.raises(LeaseHeldError):
+        storage_gc.collect(db)
+    assert len(fake.objects) == 4 - settings.STORAGE_GC_BATCH_SIZE
+    assert fake.table("maintenance_leases").rows[0]["holder"] == "other-host:1"
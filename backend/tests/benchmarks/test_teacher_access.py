@@ -0,0 +1,60 @@
+"""
+Bulk teacher assignment (pytest tests/benchmarks)
+
+Teacher emails match whatever their casing in the request or as stored.
+"""
+import asyncio
+import httpx
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+
+
+def _seed(stored_email=None):
+    """Dataset, a classroom and subject of the teacher, and a colleague (with stored_email, if given)"""
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    classroom = next(c for c in fake.table("classrooms").rows if c["created_by"] == dataset.teacher_id)
+    subject = next(s for s in fake.table("subjects").rows if s["classroom_id"] == classroom["id"])
+    colleague = next(u for u in fake.table("users").rows if u["firebase_uid"] == "bench-teacher-1")
+    if stored_email is not None:
+        colleague["email"] = stored_email
+        fake.table("users").invalidate()
+    return dataset, classroom, subject, colleague
+
+
+def _post(dataset, payload):
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        headers = {"Authorization": f"Bearer {bench_token(dataset.teacher_uid)}"}
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            return await api.post(f"{API}/teacher-access/bulk", json=payload)
+
+    response = asyncio.run(go())
+    assert response.status_code == 200, response.text
+    return [(r["teacher_email"], r["status"], r["teacher_id"]) for r in response.json()["results"]]
+
+
+def test_teacher_emails_match_case_insensitively():
+    dataset, classroom, subject, colleague = _seed()
+
+    results = _post(dataset, {
+        "classroom_id": classroom["id"],
+        "subject_ids": [subject["id"]],
+        "teacher_emails": [colleague["email"].upper(), colleague["email"], "nobody@bench.edunexus"]
+    })
+    assert results == [
+        (colleague["email"].upper(), "assigned", colleague["id"]),
+        ("nobody@bench.edunexus", "unknown_email", None)
+    ]
+
+
+def test_mixed_case_stored_email_matches():
+    dataset, classroom, subject, colleague = _seed(stored_email="Colleague.Teacher@Bench.Edunexus")
+
+    results = _post(dataset, {
+        "classroom_id": classroom["id"],
+        "subject_ids": [subject["id"]],
+        "teacher_emails": ["colleague.teacher@bench.edunexus"]
+    })
+    assert results == [("colleague.teacher@bench.edunexus", "assigned", colleague["id"])]
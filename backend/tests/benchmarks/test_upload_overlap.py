@@ -0,0 +1,131 @@
+"""
+Storage transfer overlapped with text extraction (pytest tests/benchmarks)
+
+A new file is stored while its text is extracted: the upload takes about
+as long as the slower of the two, and a failure on either side leaves no
+stored object behind. Pages are written in batches while they are extracted.
+"""
+import asyncio
+import httpx
+import time
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+from app.core.supabase import get_supabase_admin_client
+from app.modules.chapter.upload.service import upload_service
+from app.services.document_processor import document_processor
+
+
+STEP_SECONDS = 0.3
+
+
+def _upload(monkeypatch, extract):
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    headers = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+
+    storage = fake._storage
+
+    def slow_storage(request, path):
+        if request.method == "POST" and path.startswith("object/notes/"):
+            time.sleep(STEP_SECONDS)
+        return storage(request, path)
+
+    fake._storage = slow_storage
+    monkeypatch.setattr(document_processor, "iter_pages", extract)
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            start = time.perf_counter()
+            response = await api.post(
+                f"{API}/upload/chapter/{dataset.student_chapter_ids[0]}/note",
+                data={"title": "Overlap", "visibility": "private"},
+                files={"file": ("notes.txt", b"Overlapped upload body. " * 2000, "text/plain")}
+            )
+            return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(go())
+    return response, elapsed, fake
+
+
+def test_extraction_and_storage_run_concurrently(monkeypatch):
+    def slow_extract(file, filename, max_pages=None):
+        time.sleep(STEP_SECONDS)
+        yield file.read().decode()
+
+    response, elapsed, fake = _upload(monkeypatch, slow_extract)
+    assert response.status_code == 200, response.text
+    assert len(fake.objects) == 1
+    # Sequential would be 2 * STEP_SECONDS plus the rest of the request
+    assert elapsed < 1.6 * STEP_SECONDS, f"{elapsed:.2f}s"
+
+
+def test_failed_extraction_removes_the_stored_object(monkeypatch):
+    def broken_extract(file, filename, max_pages=None):
+        raise Exception("Error extracting PDF text: broken xref")
+
+    response, _, fake = _upload(monkeypatch, broken_extract)
+    assert response.status_code == 400
+    assert "broken xref" in response.json()["detail"]
+    assert not fake.objects
+    assert not fake.table("note_files").rows
+
+
+def _pages_written() -> int:
+    return len(get_supabase_admin_client().table("note_file_pages").select("page").execute().data)
+
+
+def test_pages_are_written_while_extracting(monkeypatch):
+    pages = 2 * upload_service.PAGE_BATCH + 10
+    written_before_last = []
+
+    def many_pages(file, filename, max_pages=None):
+        for page in range(1, pages + 1):
+            if page == pages:
+                written_before_last.append(_pages_written())
+            yield f"Page {page} text."
+
+    response, _, fake = _upload(monkeypatch, many_pages)
+    assert response.status_code == 200, response.text
+    assert written_before_last == [2 * upload_service.PAGE_BATCH]
+    assert len(fake.table("note_file_pages").rows) == pages
+    file = fake.table("note_files").rows[0]
+    assert file["page_count"] == pages
+    assert file["char_count"] == sum(len(f"Page {page} text.") for page in range(1, pages + 1))
+    assert file["lead"].startswith("Page 1 text.\fPage 2 text.")
+    assert file["sha256"] is not None
+
+
+def test_extraction_failing_midway_leaves_no_rows(monkeypatch):
+    def failing_pages(file, filename, max_pages=None):
+        for page in range(1, upload_service.PAGE_BATCH + 10):
+            yield f"Page {page} text."
+        raise Exception("Error extracting PDF text: broken xref")
+
+    response, _, fake = _upload(monkeypatch, failing_pages)
+    assert response.status_code == 400
+    assert not fake.objects
+    assert not fake.table("note_files").rows
+    assert not fake.table("note_file_pages").rows
+
+
+def test_chunks_are_stored_with_offsets_into_the_text(monkeypatch):
+    pages = [
+        " ".join(f"Sentence {i} of page {page} says something worth citing." for i in range(1, 40))
+        for page in range(1, 6)
+    ]
+
+    def sentence_pages(file, filename, max_pages=None):
+        yield from pages
+
+    response, _, fake = _upload(monkeypatch, sentence_pages)
+    assert response.status_code == 200, response.text
+    text = "\f".join(pages)
+    chunks = sorted(fake.table("note_file_chunks").rows, key=lambda c: c["chunk"])
+    assert len(chunks) > len(pages)
+    assert [c["chunk"] for c in chunks] == list(range(1, len(chunks) + 1))
+    for chunk in chunks:
+        assert text[chunk["start_offset"]:chunk["end_offset"]] == chunk["content"]
+        assert chunk["content"].split(" of page ")[1].startswith(str(chunk["page"]))
+    assert chunks[-1]["page"] == len(pages)
@@ -0,0 +1,81 @@
+"""
+Streaming upload validation (pytest tests/benchmarks)
+
+Oversized bodies, renamed binaries and documents over the page limit are
+rejected with 413/415 before anything is extracted or stored.
+"""
+import asyncio
+import httpx
+
+from .environment import bench_token
+from .run import API, app, setup
+from .seed import SMALL
+from app.core.config import settings
+
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 2048
+
+
+def _upload(**request):
+    fake, dataset = setup(SMALL, db_latency_ms=0, embed_latency_ms=0, generate_latency_ms=0)
+    headers = {"Authorization": f"Bearer {bench_token(dataset.student_uid)}"}
+
+    async def go():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", headers=headers) as api:
+            return await api.post(f"{API}/upload/chapter/{dataset.student_chapter_ids[0]}/note", **request)
+
+    notes = len(fake.table("notes").rows)
+    response = asyncio.run(go())
+    return response, fake, notes
+
+
+def _form(name, body):
+    return {"data": {"title": "Upload", "visibility": "private"}, "files": {"file": (name, body, "application/octet-stream")}}
+
+
+def test_renamed_binary_is_rejected():
+    for name in ("slides.pdf", "notes.txt"):
+        response, fake, notes = _upload(**_form(name, PNG))
+        assert response.status_code == 415, response.text
+        assert not fake.objects and len(fake.table("notes").rows) == notes
+
+
+def test_declared_oversized_body_is_refused_before_reading(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_NOTE_FILE_BYTES", 1024)
+    response, fake, _ = _upload(**_form("big.txt", b"x" * 128 * 1024))
+    assert response.status_code == 413
+    # Not even the auth lookup ran
+    assert fake.calls == 0
+
+
+def test_streamed_oversized_body_is_cut_off(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_NOTE_FILE_BYTES", 1024)
+    async def body():
+        # Chunked transfer (no Content-Length): counted as it arrives
+        yield (
+            b'--b\r\nContent-Disposition: form-data; name="title"\r\n\r\nUpload\r\n'
+            b'--b\r\nContent-Disposition: form-data; name="visibility"\r\n\r\nprivate\r\n'
+            b'--b\r\nContent-Disposition: form-data; name="file"; filename="big.txt"\r\n\r\n'
+        )
+        for _ in range(64):
+            yield b"x" * 4096
+
+    response, fake, _ = _upload(content=body(), headers={"content-type": "multipart/form-data; boundary=b"})
+    assert response.status_code == 413
+    # The form never finished parsing: no auth lookup, nothing stored
+    assert fake.calls == 0
+
+
+def test_file_over_limit_within_form_overhead_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_NOTE_FILE_BYTES", 1024)
+    response, fake, notes = _upload(**_form("notes.txt", b"x" * 2048))
+    assert response.status_code == 413, response.text
+    assert not fake.objects and len(fake.table("notes").rows) == notes
+
+
+def test_document_over_page_limit_is_rejected(monkeypatch):
+    monkeypatch.setattr(settings, "MAX_NOTE_PAGES", 2)
+    response, fake, notes = _upload(**_form("notes.txt", b"Page text. " * 1200))
+    assert response.status_code == 413, response.text
+    assert not fake.objects and len(fake.table("notes").rows) == notes
@@ -177,12 +177,12 @@ export const TeacherUploadSection = ({ chapterId }: TeacherUploadSectionProps) =
                         ref={fileInputRef}
                         className="hidden"
                         onChange={handleFileChange}
-                        accept=".pdf,.txt"
+                        accept=".pdf,.txt,.md,.docx,.pptx"
                         data-testid="file-input"
                       />
                       <FileUp className={`h-8 w-8 mx-auto mb-2 ${selectedFile ? 'text-primary' : 'text-muted-foreground'}`} />
                       <p className={`text-sm ${selectedFile ? 'text-primary font-medium' : 'text-muted-foreground'}`}>
-                        {selectedFile ? selectedFile.name : 'Click to upload PDF or text file'}
+                        {selectedFile ? selectedFile.name : 'Click to upload PDF, Word, PowerPoint, Markdown or text file'}
                       </p>
                     </div>
                   </div>
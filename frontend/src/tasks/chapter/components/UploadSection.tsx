@@ -172,11 +172,11 @@ export const UploadSection = ({ chapterId }: UploadSectionProps) => {
                       ref={fileInputRef}
                       className="hidden"
                       onChange={handleFileChange}
-                      accept=".pdf,.txt"
+                      accept=".pdf,.txt,.md,.docx,.pptx"
                     />
                     <FileUp className={`h-8 w-8 mx-auto mb-2 ${selectedFile ? 'text-primary' : 'text-muted-foreground'}`} />
                     <p className={`text-sm ${selectedFile ? 'text-primary font-medium' : 'text-muted-foreground'}`}>
-                      {selectedFile ? selectedFile.name : 'Click to upload PDF or text file'}
+                      {selectedFile ? selectedFile.name : 'Click to upload PDF, Word, PowerPoint, Markdown or text file'}
                     </p>
                   </div>
                 </div>